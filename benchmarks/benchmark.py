@@ -0,0 +1,349 @@
+"""Benchmarks of the set up, evaluations and solutions of the optimisation of canonical vaults.
+
+The cases are built with ``Shape.from_library`` and the ``FormDiagram`` generators at increasing discretisations.
+For each case and discretisation the script times the set up (``set_up_general_optimisation``), single evaluations of the
+objective, constraints, gradient and jacobian, the search of the independent edges and full solves, and writes a JSON report.
+Two reports are compared with ``--compare``. The benchmarks run offline, the solvers not installed are skipped.
+
+Usage::
+
+    python benchmarks/benchmark.py --output report.json
+    python benchmarks/benchmark.py --cases crossvault dome --sizes 8 12 16 --solvers SLSQP IPOPT
+    python benchmarks/benchmark.py --compare before.json after.json --threshold 1.2
+
+"""
+from __future__ import print_function
+
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import timeit
+import warnings
+
+import numpy
+import scipy
+
+import compas
+import compas_tno
+
+from compas_tno.algorithms import find_independents
+from compas_tno.analysis import Analysis
+from compas_tno.diagrams import FormDiagram
+from compas_tno.problems import set_up_general_optimisation
+from compas_tno.shapes import Shape
+from compas_tno.solvers import available_backends
+from compas_tno.solvers import backend_available
+
+
+SIZES = [6, 10, 14]
+SOLVERS = ['SLSQP', 'IPOPT']
+XY_SPAN = [[0.0, 10.0], [0.0, 10.0]]
+
+
+def crossvault(size):
+    shape = Shape.from_library({'type': 'crossvault', 'thk': 0.5, 'discretisation': [50, 50], 'xy_span': XY_SPAN, 't': 0.0})
+    form = FormDiagram.create_cross_form(xy_span=XY_SPAN, discretisation=size)
+    return form, shape
+
+
+def pointed_crossvault(size):
+    shape = Shape.from_library({'type': 'pointed_crossvault', 'thk': 0.5, 'discretisation': [50, 50], 'xy_span': XY_SPAN, 't': 0.0, 'hc': 8.0, 'he': None, 'hm': None})
+    form = FormDiagram.create_cross_form(xy_span=XY_SPAN, discretisation=size)
+    return form, shape
+
+
+def pavillionvault(size):
+    shape = Shape.from_library({'type': 'pavillionvault', 'thk': 0.5, 'discretisation': [50, 50], 'xy_span': XY_SPAN, 't': 0.0, 'spr_angle': 0.0, 'expanded': False})
+    form = FormDiagram.create_ortho_form(xy_span=XY_SPAN, discretisation=size, fix='all')
+    return form, shape
+
+
+def dome(size):
+    shape = Shape.from_library({'type': 'dome', 'thk': 0.5, 'discretisation': [16, 40], 'center': [5.0, 5.0, 0.0], 'radius': 5.0, 't': 0.0})
+    form = FormDiagram.create_circular_radial_form(center=[5.0, 5.0], radius=5.0, discretisation=[size, 2 * size])
+    return form, shape
+
+
+def arch(size):
+    shape = Shape.from_library({'type': 'arch', 'thk': 0.2, 'discretisation': 100, 'H': 1.0, 'L': 2.0, 'b': 0.5, 'x0': 0.0, 't': 0.0})
+    form = FormDiagram.create_arch(H=1.0, L=2.0, discretisation=4 * size)
+    return form, shape
+
+
+CASES = {
+    'crossvault': crossvault,
+    'pointed_crossvault': pointed_crossvault,
+    'pavillionvault': pavillionvault,
+    'dome': dome,
+    'arch': arch,
+}
+
+
+def build_analysis(case, size, solver='SLSQP', max_iter=100):
+    """Minimum thrust analysis of a case, with loads and envelope applied, not set up."""
+
+    with quiet():
+        form, shape = CASES[case](size)
+    starting_point = 'loadpath' if backend_available('CVXPY') else 'tna'
+
+    analysis = Analysis.create_minthrust_analysis(form, shape, max_iter=max_iter, starting_point=starting_point, solver=solver)
+    analysis.optimiser.settings['solver_convex'] = 'CVXPY'
+    if case == 'arch':
+        analysis.optimiser.set_constraints(['funicular', 'envelope', 'reac_bounds'])
+        analysis.optimiser.set_starting_point('current')
+
+    with quiet():
+        analysis.apply_selfweight()
+        analysis.apply_envelope()
+        if case == 'arch':
+            analysis.apply_reaction_bounds()
+
+    return analysis
+
+
+@contextlib.contextmanager
+def quiet():
+    """Silence the prints and warnings of the set up and the solvers."""
+
+    with contextlib.redirect_stdout(io.StringIO()), warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        yield
+
+
+def time_call(func, repeat=5):
+    """Time a function, repeated in loops long enough for the resolution of the timer.
+
+    Returns
+    -------
+    dict
+        Best and median time of a call in seconds, and the number of calls in each of the ``repeat`` loops.
+
+    """
+
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    times = sorted(t / number for t in timer.repeat(repeat=repeat, number=number))
+
+    return {'best': times[0], 'median': times[len(times) // 2], 'number': number, 'repeat': repeat}
+
+
+def time_once(func, repeat=1):
+    """Time a function without loops, for expensive calls. ``func`` must build its own input at each repeat."""
+
+    times = []
+    for _ in range(repeat):
+        t0 = timeit.default_timer()
+        result = func()
+        times.append(timeit.default_timer() - t0)
+    times.sort()
+
+    return {'best': times[0], 'median': times[len(times) // 2], 'number': 1, 'repeat': repeat}, result
+
+
+def benchmark_case(case, size, solvers=SOLVERS, repeat=5, setup_repeat=1, max_iter=100):
+    """Benchmark of one case and discretisation.
+
+    Returns
+    -------
+    dict
+        The sizes of the problem, the timings of the set up and the evaluations, and the results of the solves.
+
+    """
+
+    def setup():
+        analysis = build_analysis(case, size, max_iter=max_iter)
+        with quiet():
+            set_up_general_optimisation(analysis)
+        return analysis
+
+    timings = {}
+    timings['setup'], analysis = time_once(setup, repeat=setup_repeat)
+
+    optimiser = analysis.optimiser
+    M = optimiser.M
+    x0 = optimiser.x0
+
+    timings['objective'] = time_call(lambda: optimiser.fobj(x0, M), repeat=repeat)
+    timings['constraints'] = time_call(lambda: optimiser.fconstr(x0, M), repeat=repeat)
+    if optimiser.fgrad:
+        timings['gradient'] = time_call(lambda: optimiser.fgrad(x0, M), repeat=repeat)
+    if optimiser.fjac:
+        timings['jacobian'] = time_call(lambda: optimiser.fjac(x0, M), repeat=repeat)
+    timings['independents'] = time_call(lambda: find_independents(M.E), repeat=repeat)
+
+    result = {
+        'case': case,
+        'size': size,
+        'n': len(M.X),
+        'm': int(M.m),
+        'nind': len(M.ind),
+        'nvar': len(x0),
+        'nconstr': len(optimiser.g0),
+        'timings': timings,
+        'solves': {},
+    }
+
+    for solver in solvers:
+        if not backend_available(solver):
+            result['solves'][solver] = {'skipped': 'backend not installed'}
+            continue
+
+        analysis = build_analysis(case, size, solver=solver, max_iter=max_iter)
+        with quiet():
+            set_up_general_optimisation(analysis)
+            t0 = timeit.default_timer()
+            analysis.run()
+            elapsed = timeit.default_timer() - t0
+
+        optimiser = analysis.optimiser
+        result['solves'][solver] = {
+            'time': elapsed,
+            'fopt': float(optimiser.fopt),
+            'exitflag': int(optimiser.exitflag),
+            'niter': optimiser.niter if optimiser.niter is None else int(optimiser.niter),
+        }
+
+    return result
+
+
+def metadata():
+    """Versions, machine and commit of the report."""
+
+    try:
+        commit = subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=os.path.dirname(os.path.abspath(__file__)), stderr=subprocess.DEVNULL)
+        commit = commit.decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        'date': datetime.datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'compas_tno': compas_tno.__version__,
+        'compas': compas.__version__,
+        'numpy': numpy.__version__,
+        'scipy': scipy.__version__,
+        'backends': available_backends(),
+    }
+
+
+def run(cases, sizes, solvers=SOLVERS, repeat=5, setup_repeat=1, max_iter=100):
+    """Run the benchmarks of the cases at each discretisation.
+
+    Returns
+    -------
+    dict
+        The report with the metadata and the results of each case and discretisation.
+
+    """
+
+    results = []
+    for case in cases:
+        for size in sizes:
+            print('{0} {1}...'.format(case, size), end=' ')
+            sys.stdout.flush()
+            try:
+                result = benchmark_case(case, size, solvers=solvers, repeat=repeat, setup_repeat=setup_repeat, max_iter=max_iter)
+            except Exception as e:
+                result = {'case': case, 'size': size, 'error': '{0}: {1}'.format(type(e).__name__, e)}
+                print(result['error'])
+            else:
+                print('{0} edges, setup {1:.3f}s'.format(result['m'], result['timings']['setup']['median']))
+            results.append(result)
+
+    return {'meta': metadata(), 'results': results}
+
+
+def flatten(report):
+    """The times of a report by (case, size, measure), with the solves as ``solve:<solver>``."""
+
+    times = {}
+    for result in report['results']:
+        key = (result['case'], result['size'])
+        for name, timing in result.get('timings', {}).items():
+            times[key + (name,)] = timing['median']
+        for solver, solve in result.get('solves', {}).items():
+            if 'time' in solve:
+                times[key + ('solve:' + solver,)] = solve['time']
+
+    return times
+
+
+def compare(before, after, threshold=1.2):
+    """Print the ratio of the times of two reports and list the measures slower than ``threshold``.
+
+    Returns
+    -------
+    list
+        The (case, size, measure) slower than ``threshold`` in ``after``.
+
+    """
+
+    times_before = flatten(before)
+    times_after = flatten(after)
+
+    print('before: {0} ({1})'.format(before['meta'].get('commit'), before['meta'].get('date')))
+    print('after : {0} ({1})'.format(after['meta'].get('commit'), after['meta'].get('date')))
+    print('{0:<20} {1:>5} {2:<16} {3:>12} {4:>12} {5:>8}'.format('case', 'size', 'measure', 'before [s]', 'after [s]', 'ratio'))
+
+    slower = []
+    for key in sorted(set(times_before) & set(times_after)):
+        ratio = times_after[key] / times_before[key] if times_before[key] else float('inf')
+        flag = ' *' if ratio > threshold else ''
+        print('{0:<20} {1:>5} {2:<16} {3:>12.6f} {4:>12.6f} {5:>8.2f}{6}'.format(key[0], key[1], key[2], times_before[key], times_after[key], ratio, flag))
+        if ratio > threshold:
+            slower.append(key)
+
+    fopt_before = {(r['case'], r['size'], solver): solve['fopt'] for r in before['results'] for solver, solve in r.get('solves', {}).items() if 'fopt' in solve}
+    for r in after['results']:
+        for solver, solve in r.get('solves', {}).items():
+            key = (r['case'], r['size'], solver)
+            if key in fopt_before and 'fopt' in solve and abs(solve['fopt'] - fopt_before[key]) > 1e-3 * abs(fopt_before[key]):
+                print('{0} {1} {2}: fopt changed from {3} to {4}'.format(key[0], key[1], solver, fopt_before[key], solve['fopt']))
+
+    return slower
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmarks of compas_tno on canonical vaults.')
+    parser.add_argument('--cases', nargs='+', default=sorted(CASES), choices=sorted(CASES))
+    parser.add_argument('--sizes', nargs='+', type=int, default=SIZES, help='Discretisations of the form diagrams.')
+    parser.add_argument('--solvers', nargs='*', default=SOLVERS, help='Solvers of the full solves, none to skip them.')
+    parser.add_argument('--repeat', type=int, default=5, help='Repetitions of the timings of the evaluations.')
+    parser.add_argument('--setup-repeat', type=int, default=1, help='Repetitions of the timing of the set up.')
+    parser.add_argument('--max-iter', type=int, default=100, help='Maximum number of iterations of the solves.')
+    parser.add_argument('--output', default=None, help='Path of the JSON report, by default benchmark_<commit>.json.')
+    parser.add_argument('--compare', nargs=2, metavar=('BEFORE', 'AFTER'), help='Compare two reports instead of running.')
+    parser.add_argument('--threshold', type=float, default=1.2, help='Ratio of the times above which a measure is reported slower.')
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            before = json.load(f)
+        with open(args.compare[1]) as f:
+            after = json.load(f)
+        slower = compare(before, after, threshold=args.threshold)
+        print('{0} measures slower than {1}x'.format(len(slower), args.threshold))
+        return 1 if slower else 0
+
+    report = run(args.cases, args.sizes, solvers=args.solvers, repeat=args.repeat, setup_repeat=args.setup_repeat, max_iter=args.max_iter)
+
+    output = args.output or 'benchmark_{0}.json'.format((report['meta']['commit'] or 'local')[:7])
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print('Report saved @:', output)
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
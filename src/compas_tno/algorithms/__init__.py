@@ -25,6 +25,16 @@ Equilibrium
     equilibrium_residual
 
 
+Factorization
+=============
+
+.. autosummary::
+    :toctree: generated/
+    :nosignatures:
+
+    LaplacianFactorization
+
+
 Independents
 ============
 
@@ -35,12 +45,14 @@ Independents
     find_independents_backward
     find_independents_forward
     find_independents_QR
+    find_independents_sparse
     find_independents
     independents_exclude
     independents_include
     inds_incl_excl
     check_independents
     check_horizontal_loads
+    NullSpaceOperator
 
 
 Smoothing
@@ -84,16 +96,21 @@ if not compas.IPY:
         weights_from_xyz_dict,
         equilibrium_residual
     )
+    from .factorization import (
+        LaplacianFactorization
+    )
     from .independents import (
         find_independents_forward,
         find_independents_backward,
         find_independents_QR,
+        find_independents_sparse,
         find_independents,
         independents_exclude,
         independents_include,
         inds_incl_excl,
         check_independents,
-        check_horizontal_loads
+        check_horizontal_loads,
+        NullSpaceOperator
     )
     from .smoothing import (
         constrained_smoothing,
@@ -119,15 +136,19 @@ __all__ = [
     'weights_from_xyz_dict',
     'equilibrium_residual',
 
+    'LaplacianFactorization',
+
     'find_independents_forward',
     'find_independents_backward',
     'find_independents_QR',
+    'find_independents_sparse',
     'find_independents',
     'independents_exclude',
     'independents_include',
     'inds_incl_excl',
     'check_independents',
     'check_horizontal_loads',
+    'NullSpaceOperator',
 
     'constrained_smoothing',
     'apply_sag',
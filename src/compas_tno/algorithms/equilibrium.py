@@ -199,7 +199,8 @@ def xyz_from_q(q, Pi, Xb, Ci, Cit, Cb, SPLU_D=None):
     Cb : array [m x nb]
         Connectivity matrix on the fixed vertices
     SPLU_D : callable, optional
-        Sparse LU decomposition of CitQCi to speed up optimisation, by default None
+        Sparse LU decomposition of CitQCi to speed up optimisation, by default None.
+        The solver returned by :meth:`~compas_tno.algorithms.LaplacianFactorization.factorize` can also be used.
 
     Returns
     -------
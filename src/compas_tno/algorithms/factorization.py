@@ -0,0 +1,170 @@
+from numpy import arange
+from numpy import asarray
+from numpy import argsort
+from numpy import float64
+from numpy import ones
+
+from scipy.sparse import coo_matrix
+from scipy.sparse import csc_matrix
+from scipy.sparse.linalg import splu
+
+
+class LaplacianFactorization(object):
+    """Reusable factorization of the weighted Laplacian ``CitQCi`` of the free vertices of a form diagram.
+
+    The sparsity pattern of ``CitQCi`` is fixed by the topology of the diagram, only its values change with the force densities.
+    The pattern, the map ``q -> CitQCi`` and the fill-reducing ordering are computed once, so that every call to
+    :meth:`factorize` only performs the numerical factorization.
+
+    Parameters
+    ----------
+    Ci : sparse matrix [m x ni]
+        Connectivity matrix on the free vertices.
+    method : str, optional
+        Factorization used, by default ``'lu'``.
+        ``'lu'`` uses SuperLU with the minimum degree ordering of ``CitQCi`` computed in the first factorization.
+        ``'cholesky'`` uses CHOLMOD on the SPD matrix ``-CitQCi`` (valid for compressive ``q < 0``) reusing the symbolic analysis.
+        It requires ``scikit-sparse`` and falls back to ``'lu'`` in the iterations in which ``-CitQCi`` is not positive definite.
+
+    Attributes
+    ----------
+    method : str
+        The factorization method.
+    ni : int
+        Number of free vertices.
+    nnz : int
+        Number of non-zeros in the pattern of ``CitQCi``.
+    perm : array
+        Fill-reducing permutation of the free vertices. None until the first factorization.
+
+    """
+
+    def __init__(self, Ci, method='lu'):
+        if method not in ['lu', 'cholesky']:
+            raise ValueError('Factorization method not recognised: {}'.format(method))
+
+        Ci = coo_matrix(Ci)
+        m, ni = Ci.shape
+
+        # pattern of CitQCi with its entries numbered (1-based to survive sparse indexing)
+        pattern = csc_matrix(abs(Ci).transpose() @ abs(Ci))
+        pattern.sort_indices()
+        self.ni = ni
+        self.nnz = pattern.nnz
+        self._indices = pattern.indices
+        self._indptr = pattern.indptr
+        numbering = csc_matrix((arange(1, self.nnz + 1, dtype=float64), pattern.indices, pattern.indptr), shape=(ni, ni))
+
+        # map from q to the values of the pattern: CitQCi = sum_j q_j c_j c_j^T
+        entries = {}
+        for edge, vertex, value in zip(Ci.row, Ci.col, Ci.data):
+            entries.setdefault(edge, []).append((vertex, value))
+        rows, cols, edges, vals = [], [], [], []
+        for edge in entries:
+            for a, va in entries[edge]:
+                for b, vb in entries[edge]:
+                    rows.append(a)
+                    cols.append(b)
+                    edges.append(edge)
+                    vals.append(va * vb)
+        position = asarray(numbering[rows, cols]).flatten().astype(int) - 1
+        self._T = csc_matrix((vals, (position, edges)), shape=(self.nnz, m)).tocsr()
+        self._numbering = numbering
+
+        self.method = method
+        self.perm = None
+        self._iperm = None
+        self._Tperm = None
+        self._indices_perm = None
+        self._indptr_perm = None
+        self._symbolic = None
+
+        if method == 'cholesky':
+            from sksparse.cholmod import analyze
+            self._symbolic = analyze(self.matrix(ones(m)))
+
+    def matrix(self, q):
+        """Assemble ``CitQCi`` for the given force densities using the fixed pattern.
+
+        Parameters
+        ----------
+        q : array [m x 1]
+            Force densities of all edges.
+
+        Returns
+        -------
+        CitQCi : sparse matrix [ni x ni]
+            The weighted Laplacian of the free vertices in CSC format.
+
+        """
+
+        data = self._T @ asarray(q, dtype=float64).flatten()
+        return csc_matrix((data, self._indices, self._indptr), shape=(self.ni, self.ni))
+
+    def factorize(self, q):
+        """Numerical factorization of ``CitQCi`` for the given force densities.
+
+        Parameters
+        ----------
+        q : array [m x 1]
+            Force densities of all edges.
+
+        Returns
+        -------
+        solver : object
+            Object with a method ``solve(b)`` returning the solution of ``CitQCi x = b``, as the one returned by ``splu``.
+
+        """
+
+        if self.method == 'cholesky':
+            from sksparse.cholmod import CholmodNotPositiveDefiniteError
+            try:
+                return _NegatedCholesky(self._symbolic.cholesky(-1 * self.matrix(q)))
+            except CholmodNotPositiveDefiniteError:
+                pass
+
+        if self.perm is None:
+            self._set_ordering(q)
+
+        data = self._Tperm @ asarray(q, dtype=float64).flatten()
+        A = csc_matrix((data, self._indices_perm, self._indptr_perm), shape=(self.ni, self.ni))
+        lu = splu(A, permc_spec='NATURAL')
+
+        return _PermutedLU(lu, self.perm, self._iperm)
+
+    def _set_ordering(self, q):
+        """Compute the fill-reducing ordering from a first factorization and the permuted map ``q -> CitQCi``."""
+
+        lu = splu(self.matrix(q), permc_spec='MMD_AT_PLUS_A', options=dict(SymmetricMode=True))
+        self._iperm = lu.perm_c
+        self.perm = argsort(self._iperm)
+
+        numbering_perm = self._numbering[self.perm][:, self.perm].tocsc()
+        numbering_perm.sort_indices()
+        position = numbering_perm.data.astype(int) - 1
+        self._Tperm = self._T[position]
+        self._indices_perm = numbering_perm.indices
+        self._indptr_perm = numbering_perm.indptr
+
+
+class _PermutedLU(object):
+    """LU factors of the symmetrically permuted matrix ``A[perm][:, perm]``."""
+
+    def __init__(self, lu, perm, iperm):
+        self.lu = lu
+        self.perm = perm
+        self.iperm = iperm
+
+    def solve(self, b):
+        b = asarray(b, dtype=float64)
+        return self.lu.solve(b[self.perm])[self.iperm]
+
+
+class _NegatedCholesky(object):
+    """Cholesky factor of ``-A``, solving ``A x = b``."""
+
+    def __init__(self, factor):
+        self.factor = factor
+
+    def solve(self, b):
+        return -1 * self.factor(asarray(b, dtype=float64))
@@ -3,7 +3,6 @@ from compas_tno.diagrams import ForceDiagram
 from compas_tna.equilibrium import horizontal_nodal
 
 from compas_tno.algorithms.equilibrium import vertical_equilibrium_fdm
-from compas_tno.plotters import TNOPlotter
 
 from compas.numerical import connectivity_matrix
 from compas.numerical import spsolve_with_known
@@ -52,6 +51,9 @@ def form_update_with_parallelisation(form, zmax=5.0, plot=False, printout=False,
     force: ForceDiagram
         The force diagram after the process.
     """
+
+    from compas_tno.plotters import TNOPlotter
+
     # mark supports as 'is_anchor'
     corners = list(form.vertices_where({'is_fixed': True}))
     form.vertices_attribute('is_anchor', True, keys=corners)
@@ -152,6 +154,9 @@ def reciprocal_from_form(form, plot=False, restore_form_topology=True):
         The reciprocal force diagram.
 
     """
+
+    from compas_tno.plotters import TNOPlotter
+
     # mark supports as 'is_anchor'
     corners = list(form.vertices_where({'is_fixed': True}))
     form.vertices_attribute('is_anchor', True, keys=corners)
@@ -1,5 +1,9 @@
 
+from numpy import absolute
+from numpy import argmax
+from numpy import finfo
 from numpy import hstack
+from numpy import ones
 from numpy import array
 from numpy import asarray
 from numpy import any
@@ -7,7 +11,18 @@ from numpy.linalg import matrix_rank
 from numpy.linalg import svd
 from numpy.random import rand
 from numpy import diag
+from numpy import float64
+from numpy import identity
+from numpy import vstack
+from numpy import zeros
 from scipy.linalg import qr
+from scipy.sparse import bmat
+from scipy.sparse import csc_matrix
+from scipy.sparse import hstack as shstack
+from scipy.sparse import identity as sidentity
+from scipy.sparse import issparse
+from scipy.sparse.linalg import LinearOperator
+from scipy.sparse.linalg import splu
 from math import sqrt
 
 
@@ -145,17 +160,118 @@ def find_independents_QR(E, tol=None):
     return ind
 
 
-def find_independents(E, method='SVD', tol=None):
-    """ Overall method to find independent edges dependent on method
+def find_independents_sparse(E, tol=None, diagnostics=False):
+    """ Find independent edges of the matrix E with a sparse elimination in the order of the columns.
+    The columns are eliminated one by one with partial pivoting on the rows, as in a left-looking LU factorization.
+    Everytime that the pivot of a column vanishes, the column is spanned by the previous columns and the edge is selected as independent.
+    The selection is the same of ``find_independents_forward``, but each column costs a sparse triangular solve instead of an SVD.
 
     Parameters
     ----------
-    E : array
+    E : array or sparse matrix
         Equilibrium matrix.
+    tol : float, optional
+        Tolerance for small pivots, relative to the norm of the column. Default is None, in which ``max(E.shape) * eps`` is used.
+    diagnostics : bool, optional
+        Whether or not the numerical rank diagnostics are returned, by default False.
+
+    Returns
+    -------
+    ind : list
+        Independent columns.
+    diagnostics : dict
+        Only if ``diagnostics=True``. The numerical ``rank`` of E, the relative ``pivots`` of the dependent columns, the smallest
+        of them ``min_pivot``, the largest relative pivot discarded ``max_discarded`` and the ``tol`` used.
+
+    """
+
+    E = csc_matrix(E, dtype=float64)
+    E.sum_duplicates()
+    neq, m = E.shape
+
+    if not tol:
+        tol = max(E.shape) * finfo(float64).eps
+
+    pivot_row = -ones(neq, dtype=int)  # pivot of each row
+    rows_L = []  # rows and values of the columns of L, in the order of the pivots
+    vals_L = []
+    rows_pivot = []
+    pivots = []
+    discarded = [0.0]
+    ind = []
+    x = zeros(neq)
+
+    for j in range(m):
+        rows = E.indices[E.indptr[j]:E.indptr[j + 1]]
+        vals = E.data[E.indptr[j]:E.indptr[j + 1]]
+        norm = sqrt(vals @ vals)
+        if norm == 0:  # edges connecting supported points
+            ind.append(j)
+            continue
+
+        # pivots reached by the column, in the graph of L
+        x[rows] = vals
+        pattern = set(rows.tolist())
+        stack = [pivot_row[i] for i in rows if pivot_row[i] >= 0]
+        reached = set()
+        while stack:
+            p = stack.pop()
+            if p in reached:
+                continue
+            reached.add(p)
+            pattern.update(rows_L[p].tolist())
+            stack.extend(pivot_row[i] for i in rows_L[p] if pivot_row[i] >= 0 and pivot_row[i] not in reached)
+
+        # L is lower triangular in the order of the pivots
+        for p in sorted(reached):
+            xp = x[rows_pivot[p]]
+            if xp != 0.0:
+                x[rows_L[p]] -= xp * vals_L[p]
+
+        pattern = array(sorted(pattern), dtype=int)
+        candidates = pattern[pivot_row[pattern] < 0]
+        pivot = 0.0
+        if len(candidates):
+            i = candidates[argmax(absolute(x[candidates]))]
+            pivot = x[i]
+
+        if abs(pivot) <= tol * norm:
+            ind.append(j)
+            discarded.append(abs(pivot) / norm)
+        else:
+            others = candidates[candidates != i]
+            others = others[x[others] != 0.0]
+            pivot_row[i] = len(rows_pivot)
+            rows_pivot.append(i)
+            rows_L.append(others)
+            vals_L.append(x[others] / pivot)
+            pivots.append(abs(pivot) / norm)
+
+        x[pattern] = 0.0
+
+    if diagnostics:
+        pivots = array(pivots)
+        return ind, {'rank': len(pivots),
+                     'pivots': pivots,
+                     'min_pivot': pivots.min() if len(pivots) else 0.0,
+                     'max_discarded': max(discarded),
+                     'tol': tol}
+
+    return ind
+
+
+def find_independents(E, method='sparse', tol=None):
+    """ Overall method to find independent edges dependent on method
+
+    Parameters
+    ----------
+    E : array or sparse matrix
+        Equilibrium matrix. It is converted to a dense array for the methods 'SVD' and 'QR'.
     method : str
-        Method to find independents. Default is 'SVD'. More to come.
+        Method to find independents, 'sparse', 'SVD' or 'QR'. Default is 'sparse'.
+        The methods 'sparse' (see ``find_independents_sparse``) and 'SVD' (see ``find_independents_forward``) select the same edges.
     tol : float
-        Tolerance for small singular values. Default is None.
+        Tolerance for small singular values or pivots. Default is None.
 
     Returns
     -------
@@ -164,8 +280,14 @@ def find_independents(E, method='SVD', tol=None):
 
     """
 
+    if method == 'sparse':
+        return find_independents_sparse(E, tol=tol)
+
+    if issparse(E):
+        E = E.toarray()
+
     if method == 'SVD':
-        ind = find_independents_forward(E, tol)
+        ind = find_independents_forward(E, tol=tol)
     elif method == 'QR':
         ind = find_independents_QR(E, tol)
     else:
@@ -371,8 +493,8 @@ def check_horizontal_loads(E, p):
 
     Parameters
     ----------
-    E : array
-        Equilibrium matrix.
+    E : array or sparse matrix
+        Equilibrium matrix. If sparse, the loads are checked with ``find_independents_sparse``.
     p : array
         Vector of horizontal loads.
 
@@ -383,6 +505,11 @@ def check_horizontal_loads(E, p):
 
     """
 
+    if issparse(E):
+        # the loads can be taken if the last column of [E p] is spanned by the columns of E
+        m = E.shape[1]
+        return m in find_independents_sparse(shstack([E, csc_matrix(asarray(p, dtype=float64).reshape(-1, 1))]))
+
     r = matrix_rank(E)
     r_ = matrix_rank(hstack([E, p]))
 
@@ -437,3 +564,125 @@ def matrix_svd(E):
     _, s, _ = svd(asarray(E))
 
     return s
+
+
+class NullSpaceOperator(LinearOperator):
+    """Implicit matrix ``B`` mapping the force densities in the independent edges to all force densities ``q = B qid + d``.
+    The matrix is never formed. The least-squares solutions with ``Ed`` are computed with a sparse LU factorization of the augmented system
+    ``[[I, Ed], [Edt, 0]]``, which is equivalent to apply ``pinv(Ed)`` when ``Ed`` has full column rank.
+
+    Parameters
+    ----------
+    E : array or sparse matrix [2ni x m]
+        Equilibrium matrix.
+    ind : list
+        Index of the independent edges.
+    dep : list
+        Index of the dependent edges.
+
+    Attributes
+    ----------
+    Ed : csc_matrix [2ni x (m - k)]
+        Equilibrium matrix sliced on the dependent edges.
+    Ei : csc_matrix [2ni x k]
+        Equilibrium matrix sliced on the independent edges.
+
+    """
+
+    def __init__(self, E, ind, dep):
+        E = csc_matrix(E)
+        self.ind = list(ind)
+        self.dep = list(dep)
+        self.Ed = E[:, self.dep]
+        self.Ei = E[:, self.ind]
+        self.neq = E.shape[0]
+        self.ndep = len(self.dep)
+        K = bmat([[sidentity(self.neq), self.Ed], [self.Ed.transpose(), None]], format='csc')
+        self.lu = splu(K)
+        super(NullSpaceOperator, self).__init__(dtype=float64, shape=(E.shape[1], len(self.ind)))
+
+    def solve_dep(self, b):
+        """Least-squares solution ``x = pinv(Ed) b``.
+
+        Parameters
+        ----------
+        b : array [2ni x r]
+            Right hand side.
+
+        Returns
+        -------
+        x : array [(m - k) x r]
+            Force densities in the dependent edges.
+        """
+
+        b = asarray(b, dtype=float64).reshape(self.neq, -1)
+        sol = self.lu.solve(vstack([b, zeros((self.ndep, b.shape[1]))]))
+        return sol[self.neq:]
+
+    def solve_dep_transpose(self, c):
+        """Product with the transpose of the pseudo-inverse ``y = pinv(Ed).T c``.
+
+        Parameters
+        ----------
+        c : array [(m - k) x r]
+            Right hand side.
+
+        Returns
+        -------
+        y : array [2ni x r]
+            The product.
+        """
+
+        c = asarray(c, dtype=float64).reshape(self.ndep, -1)
+        sol = self.lu.solve(vstack([zeros((self.neq, c.shape[1])), c]))
+        return sol[:self.neq]
+
+    def particular_solution(self, ph):
+        """Force densities ``d`` in equilibrium with the horizontal loads when ``qid = 0``.
+
+        Parameters
+        ----------
+        ph : array [2ni x 1]
+            Horizontal loads applied.
+
+        Returns
+        -------
+        d : array [m x 1]
+            The particular solution.
+        """
+
+        d = zeros((self.shape[0], 1))
+        d[self.dep] = self.solve_dep(ph)
+        return d
+
+    def toarray(self):
+        """Form the dense matrix ``B``.
+
+        Returns
+        -------
+        B : array [m x k]
+            The dense matrix.
+        """
+
+        return self.matmat(identity(self.shape[1]))
+
+    def _matmat(self, X):
+        if issparse(X):
+            X = X.toarray()
+        X = asarray(X, dtype=float64)
+        Q = zeros((self.shape[0], X.shape[1]))
+        Q[self.ind] = X
+        Q[self.dep] = -1 * self.solve_dep(self.Ei @ X)
+        return Q
+
+    def _matvec(self, x):
+        return self._matmat(asarray(x).reshape(-1, 1)).flatten()
+
+    def _rmatmat(self, Y):
+        if issparse(Y):
+            Y = Y.toarray()
+        Y = asarray(Y, dtype=float64)
+        return Y[self.ind] - self.Ei.transpose() @ self.solve_dep_transpose(Y[self.dep])
+
+    def _rmatvec(self, y):
+        return self._rmatmat(asarray(y).reshape(-1, 1)).flatten()
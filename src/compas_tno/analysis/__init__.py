@@ -13,6 +13,7 @@ Classes
     :nosignatures:
 
     Analysis
+    ThicknessContinuation
 
 Routines
 ========
@@ -24,6 +25,7 @@ Routines
     limit_analysis_GSF
     thk_minmax_GSF
     max_n_minmax_GSF
+    minmax_sweep_parallel
 
 """
 
@@ -31,16 +33,26 @@ from .analysis import (
     Analysis
 )
 
+from .continuation import (
+    ThicknessContinuation
+)
+
 from .routines import (
     limit_analysis_GSF,
     thk_minmax_GSF,
     max_n_minmax_GSF
 )
 
+from .parallel import (
+    minmax_sweep_parallel
+)
+
 __all__ = [
     'Analysis',
+    'ThicknessContinuation',
 
     'limit_analysis_GSF',
     'thk_minmax_GSF',
-    'max_n_minmax_GSF'
+    'max_n_minmax_GSF',
+    'minmax_sweep_parallel'
 ]
@@ -10,6 +10,7 @@ from compas_tno.solvers import run_optimisation_MATLAB
 from compas_tno.solvers import run_optimisation_CVXPY
 from compas_tno.solvers import run_optimisation_MMA
 from compas_tno.solvers import run_optimisation_ipopt
+from compas_tno.solvers import require_backend
 
 from compas_tno.utilities import apply_selfweight_from_shape
 from compas_tno.utilities import apply_selfweight_from_pattern
@@ -724,6 +725,9 @@ class Analysis(Data):
         if not isinstance(solver, str):
             raise ValueError('Please provide the name of the solver')
 
+        # the packages of the backends are only imported by the solvers on their first run
+        require_backend(solver)
+
         if self.is_convex() and solver in ['CVXPY', 'MATLAB']:
             if solver == 'MATLAB':
                 run_optimisation_MATLAB(self)
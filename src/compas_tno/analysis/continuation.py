@@ -0,0 +1,314 @@
+import time
+
+from numpy import array
+
+from compas_tno.diagrams import FormArrays
+from compas_tno.problems import objective_selector
+from compas_tno.solvers import post_process_general
+from compas_tno.utilities import set_b_constraint
+
+
+class ThicknessContinuation(object):
+    """Continuation of the optimisation problem of an :class:`~compas_tno.analysis.Analysis` on the thickness of its shape.
+
+    The problem is set up once. At every thickness step the matrices of the :class:`~compas_tno.problems.Problem`,
+    the independent edges and the factorizations are kept and only the self-weight, the envelope ``ub``, ``lb`` and the reaction bounds ``b`` are updated.
+    Each optimisation is warm-started from the previous optimum, with the force densities scaled by the ratio of thicknesses,
+    which keeps the thrust network in equilibrium with the new self-weight.
+
+    Parameters
+    ----------
+    analysis : :class:`~compas_tno.analysis.Analysis`
+        The Analysis object with form, shape and optimiser. The shape must come from the library with an analytical envelope.
+    thk : float, optional
+        Thickness in which the problem is set up, by default None, in which the thickness of the shape is used.
+
+    Attributes
+    ----------
+    analysis : :class:`~compas_tno.analysis.Analysis`
+        The Analysis object.
+    thk : float
+        Current thickness of the shape.
+    solutions : dict
+        Optimum of the variables for each converged ``(objective, thk)``.
+
+    Notes
+    -----
+    Only the thickness in ``shape.datashape`` is updated, the meshes of the shape are not regenerated during the continuation.
+    If the analysis is already set up, the loads of its problem are scaled to the thickness instead of recomputed on the form diagram.
+
+    """
+
+    analytical_shapes = ['arch', 'pointed_arch', 'crossvault', 'pointed_crossvault', 'dome', 'pavillionvault']
+
+    def __init__(self, analysis, thk=None):
+        datashape = analysis.shape.datashape
+        if datashape['type'] not in self.analytical_shapes:
+            raise ValueError('Thickness continuation requires a shape with analytical envelope {}, got: {}'.format(self.analytical_shapes, datashape['type']))
+
+        variables = analysis.optimiser.settings['variables']
+        if 't' in variables or 'n' in variables:
+            raise ValueError('The thickness is a parameter of the continuation and can not be a variable: {}'.format(variables))
+
+        if thk is not None:
+            datashape['thk'] = thk
+
+        self.analysis = analysis
+        self.thk = datashape['thk']
+        self.solutions = {}
+
+        M = analysis.optimiser.M
+        if M is not None and M.thk:
+            # the set up may have changed the faces of the form (e.g. starting point 'tna'), the loads of the problem are scaled instead
+            arrays = FormArrays(analysis.form)
+            arrays.set('pz', M.P[:, 2] * self.thk / M.thk)
+            arrays.sync()
+        else:
+            analysis.apply_selfweight()
+        analysis.apply_envelope()
+        analysis.apply_reaction_bounds()
+        analysis.optimiser.M = None  # a problem from previous optimisations may have outdated loads
+        analysis.set_up_optimiser()
+
+        # the self-weight is linear on the thickness for the shapes with analytical envelope
+        self._thk0 = self.thk
+        self._swt0 = analysis.shape.compute_selfweight()
+        self._pz0 = array(analysis.form.vertices_attribute('pz'))
+        self._x0 = analysis.optimiser.x0.copy()
+
+    def selfweight(self, thk=None):
+        """Self-weight of the shape for a given thickness.
+
+        Parameters
+        ----------
+        thk : float, optional
+            The thickness, by default None, in which the current thickness is used.
+
+        Returns
+        -------
+        swt : float
+            The self-weight.
+
+        """
+
+        if thk is None:
+            thk = self.thk
+
+        return self._swt0 * thk / self._thk0
+
+    def set_objective(self, objective):
+        """Change the objective function of the problem, keeping the problem set up.
+
+        Parameters
+        ----------
+        objective : str
+            The objective, as in the settings of the :class:`~compas_tno.optimisers.Optimiser`.
+
+        """
+
+        optimiser = self.analysis.optimiser
+        optimiser.settings['objective'] = objective
+        optimiser.fobj, optimiser.fgrad = objective_selector(objective)
+
+    def set_thickness(self, thk):
+        """Update the loads, envelope and reaction bounds of the problem to a new thickness.
+
+        Parameters
+        ----------
+        thk : float
+            The new thickness.
+
+        """
+
+        analysis = self.analysis
+        form = analysis.form
+        optimiser = analysis.optimiser
+        M = optimiser.M
+
+        analysis.shape.datashape['thk'] = thk
+        form.attributes['thk'] = thk
+        self.thk = thk
+
+        analysis.apply_envelope()
+        M.ub = array(form.vertices_attribute('ub')).reshape(-1, 1)
+        M.lb = array(form.vertices_attribute('lb')).reshape(-1, 1)
+        M.ub0 = M.ub
+        M.lb0 = M.lb
+
+        if 'reac_bounds' in M.constraints:
+            analysis.apply_reaction_bounds()
+            M.b = set_b_constraint(form)
+
+        M.P[:, 2] = self._pz0 * thk / self._thk0
+        M.thk = thk
+        M.clear_cache()
+
+        if 'zb' in M.variables:
+            start = len(M.ind) + (2 * M.nb if 'xyb' in M.variables else 0)
+            optimiser.bounds[start:start + M.nb] = [[M.lb[i].item(), M.ub[i].item()] for i in M.fixed]
+
+    def warm_start(self, x, thk_from, thk_to):
+        """Starting point for a thickness from the optimum in another thickness.
+
+        Parameters
+        ----------
+        x : array
+            The optimum of the variables in ``thk_from``.
+        thk_from : float
+            The thickness of the optimum.
+        thk_to : float
+            The thickness of the new starting point.
+
+        Returns
+        -------
+        x0 : array
+            The starting point, with the force densities scaled by ``thk_to/thk_from`` and projected on the bounds of the variables.
+
+        """
+
+        optimiser = self.analysis.optimiser
+        x0 = array(x, dtype=float).reshape(-1, 1)
+        x0[:len(optimiser.M.ind)] *= thk_to / thk_from
+
+        for i, (lower, upper) in enumerate(optimiser.bounds):
+            if lower is not None and x0[i] < lower:
+                x0[i] = lower
+            if upper is not None and x0[i] > upper:
+                x0[i] = upper
+
+        return x0
+
+    def solve(self, thk, x0=None):
+        """Solve the problem in a given thickness.
+
+        Parameters
+        ----------
+        thk : float
+            The thickness.
+        x0 : array, optional
+            The starting point, by default None, in which the starting point of the set up is warm-started to ``thk``.
+
+        Returns
+        -------
+        exitflag : int
+            The exitflag of the optimisation, ``0`` if converged.
+
+        """
+
+        optimiser = self.analysis.optimiser
+
+        self.set_thickness(thk)
+        if x0 is None:
+            x0 = self.warm_start(self._x0, self._thk0, thk)
+        optimiser.x0 = x0
+        self.analysis.run()
+
+        if optimiser.exitflag == 0:
+            self.solutions[(optimiser.settings['objective'], round(thk, 5))] = optimiser.xopt.copy()
+
+        return optimiser.exitflag
+
+    def restore(self, thk, objective=None):
+        """Restore in the problem and in the form diagram the converged solution of an objective in a given thickness.
+
+        Parameters
+        ----------
+        thk : float
+            The thickness of the solution.
+        objective : str, optional
+            The objective of the solution, by default None, in which the current objective is used.
+
+        """
+
+        optimiser = self.analysis.optimiser
+        if objective is None:
+            objective = optimiser.settings['objective']
+        xopt = self.solutions[(objective, round(thk, 5))]
+
+        self.set_thickness(thk)
+        optimiser.xopt = xopt
+        optimiser.exitflag = 0
+        optimiser.fopt = float(optimiser.fobj(xopt, optimiser.M))
+        post_process_general(self.analysis)
+
+    def sweep(self, thk_start, thk_step, thk_end=None, thk_min_step=None, printout=True, callback=None):
+        """Successive optimisations changing the thickness in constant steps, warm-started from the previous optimum.
+
+        When an optimisation fails, it is retried from the solutions of the other objectives found in the same thickness.
+        If these also fail, the step is halved and the thickness is restarted from the last converged solution,
+        until the step is smaller than ``thk_min_step``.
+
+        Parameters
+        ----------
+        thk_start : float
+            The first thickness.
+        thk_step : float
+            The thickness step, negative to reduce the thickness.
+        thk_end : float, optional
+            The last thickness, by default None, in which the sweep continues until the thickness vanishes.
+        thk_min_step : float, optional
+            The smallest step of the adaptive step control, by default None, in which the step is not refined.
+        printout : bool, optional
+            Whether or not print a line for each step, by default True
+        callback : callable, optional
+            Function ``callback(thk, fopt)`` called after each converged optimisation, by default None
+
+        Returns
+        -------
+        thicknesses : list
+            The thicknesses in which the optimisation converged.
+        fopts : list
+            The optimum value of the objective function in these thicknesses.
+
+        """
+
+        optimiser = self.analysis.optimiser
+        objective = optimiser.settings['objective']
+        if thk_min_step is None:
+            thk_min_step = abs(thk_step)
+
+        thicknesses = []
+        fopts = []
+        step = thk_step
+        thk = round(thk_start, 5)
+        last = None
+
+        while thk > 0 and (thk_end is None or (thk_end - thk) * step >= -1e-8):
+
+            starting_points = [key for key in self.solutions if key[1] == thk and key[0] != objective]
+            if last is None:
+                x0 = None
+            else:
+                x0 = self.warm_start(self.solutions[(objective, last)], last, thk)
+
+            time0 = time.time()
+            exitflag = self.solve(thk, x0)
+            for key in starting_points:
+                if exitflag == 0:
+                    break
+                exitflag = self.solve(thk, self.solutions[key])
+            run_time = time.time() - time0
+
+            if exitflag == 0:
+                thicknesses.append(thk)
+                fopts.append(optimiser.fopt)
+                if printout:
+                    print('{0:.5f}  |   True  |   {1:.1f} |   {2:.6f} |   {3}   |   {4:.2f}s'.format(thk, optimiser.fopt, optimiser.fopt/self.selfweight(thk), step, run_time))
+                if callback:
+                    callback(thk, optimiser.fopt)
+                last = thk
+                thk = round(thk + step, 5)
+            elif last is not None and abs(step) > max(thk_min_step, 2e-5):
+                step = step / 2
+                if printout:
+                    print('{0:.5f}  |   False  |   XXXX |   XXXX |   {1}   |   {2:.2f}s'.format(thk, step, run_time))
+                thk = round(last + step, 5)
+            else:
+                if printout:
+                    print('{0:.5f}  |   False  |   XXXX |   XXXX |   End   |   {1:.2f}s'.format(thk, run_time))
+                break
+
+        if last is not None and optimiser.exitflag != 0:
+            self.restore(last, objective)
+
+        return thicknesses, fopts
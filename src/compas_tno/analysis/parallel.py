@@ -0,0 +1,196 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from numpy import array
+
+from compas_tno.shapes import Shape
+from compas_tno.optimisers import Optimiser
+from compas_tno.problems import objective_selector
+from compas_tno.analysis.analysis import Analysis
+from compas_tno.analysis.continuation import ThicknessContinuation
+
+
+_WORKER = {}
+
+
+def minmax_sweep_parallel(form, shape, optimiser, thicknesses=None, load_multipliers=None, direction='x', objectives=None, processes=None, printout=True):
+    """Compute the min/max thrust optimisations in a grid of thicknesses or of horizontal load multipliers in parallel.
+
+    The points of the grid and objectives are dispatched in contiguous chunks to a pool of processes.
+    Each worker sets up the :class:`~compas_tno.problems.Problem` once and only updates the thickness or the loads for each point.
+    The optimisations are warm-started from the nearest solution found by the worker, and from the starting point of the set up if these fail.
+
+    Parameters
+    ----------
+    form : :class:`~compas_tno.diagrams.FormDiagram`
+        The form diagram to analyse.
+    shape : :class:`~compas_tno.shapes.Shape` or dict
+        The shape, or the ``datashape`` of a shape from the library, with analytical envelope.
+    optimiser : :class:`~compas_tno.optimisers.Optimiser` or dict
+        The optimiser, or its settings. The objective is overwritten by the ``objectives``.
+    thicknesses : list, optional
+        Grid of thicknesses, by default None.
+    load_multipliers : list, optional
+        Grid of horizontal load multipliers applied on the selfweight in the thickness of the shape, by default None.
+        It requires the feature ``'fixed'``.
+    direction : str, optional
+        Direction of the horizontal loads, ``'x'`` or ``'y'``, by default ``'x'``.
+    objectives : list, optional
+        The objectives computed, by default None, in which ``['min', 'max']`` is used.
+    processes : int, optional
+        Number of processes, by default None, in which the number of processors is used.
+        With ``processes=1`` the optimisations run in the current process.
+    printout : bool, optional
+        Whether or not printing in the screen the solutions obtained, by default True
+
+    Returns
+    -------
+    [list, list], [list, list]
+        Lists with the thicknesses (or load multipliers) and the solutions normalised of min/max thrust in which the optimisation converged,
+        in the format of :func:`~compas_tno.utilities.diagram_of_thrust`.
+        Thicknesses are sorted in decreasing order and load multipliers in increasing order.
+
+    """
+
+    if (thicknesses is None) == (load_multipliers is None):
+        raise ValueError('Provide either a grid of thicknesses or a grid of load multipliers.')
+
+    if objectives is None:
+        objectives = ['min', 'max']
+
+    if isinstance(shape, dict):
+        datashape, ro = dict(shape), None
+    else:
+        datashape, ro = dict(shape.datashape), shape.ro
+
+    settings = dict(optimiser if isinstance(optimiser, dict) else optimiser.settings)
+
+    if thicknesses is not None:
+        parameter = 'thk'
+        grid = sorted(thicknesses, reverse=True)
+    else:
+        parameter = 'load_multiplier'
+        grid = sorted(load_multipliers)
+        if 'fixed' not in settings.get('features', []):
+            raise ValueError('The sweep on the load multipliers requires the feature fixed.')
+
+    tasks = [(objective, value) for objective in objectives for value in grid]
+    initargs = (form, datashape, ro, settings, parameter, direction)
+
+    time0 = time.time()
+    if processes == 1:
+        _initialise_worker(*initargs)
+        results = [_solve_point(task) for task in tasks]
+        _WORKER.clear()
+    else:
+        chunksize = -(-len(tasks) // (processes or os.cpu_count() or 1))
+        with ProcessPoolExecutor(max_workers=processes, initializer=_initialise_worker, initargs=initargs) as executor:
+            results = list(executor.map(_solve_point, tasks, chunksize=chunksize))
+
+    values = {objective: [] for objective in objectives}
+    solutions = {objective: [] for objective in objectives}
+
+    if printout:
+        print('Parallel sweep on ({0}) for ({1}) with diagram ({2})'.format(parameter, datashape['type'], form.parameters.get('type')))
+        print('Objective  |  {0}  |   Solved  |   Opt.Val |   Opt/W   |   Run time'.format(parameter))
+
+    for (objective, value), (exitflag, fopt, swt, run_time) in zip(tasks, results):
+        if printout:
+            if exitflag == 0:
+                print('{0}  |  {1:.5f}  |   True  |   {2:.1f} |   {3:.6f} |   {4:.2f}s'.format(objective, value, fopt, fopt/swt, run_time))
+            else:
+                print('{0}  |  {1:.5f}  |   False  |   XXXX |   XXXX |   {2:.2f}s'.format(objective, value, run_time))
+        if exitflag == 0:
+            values[objective].append(value)
+            solutions[objective].append(fopt/swt)
+
+    if printout:
+        print('Total time: {0:.2f}s'.format(time.time() - time0))
+
+    return [values[objective] for objective in objectives], [solutions[objective] for objective in objectives]
+
+
+def _initialise_worker(form, datashape, ro, settings, parameter, direction):
+    """Initialiser of the workers of :func:`minmax_sweep_parallel` setting up the problem of the worker."""
+
+    shape = Shape.from_library(datashape)
+    if ro is not None:
+        shape.ro = ro
+
+    optimiser = Optimiser()
+    optimiser.settings.update(settings)
+    optimiser.settings['printout'] = False
+    optimiser.settings['plot'] = False
+
+    analysis = Analysis.from_elements(shape, form, optimiser)
+
+    _WORKER.clear()
+    _WORKER['analysis'] = analysis
+    _WORKER['parameter'] = parameter
+    _WORKER['solutions'] = {}
+
+    if parameter == 'thk':
+        _WORKER['continuation'] = ThicknessContinuation(analysis)
+        return
+
+    analysis.apply_selfweight()
+    analysis.apply_hor_multiplier(1.0, direction)
+    analysis.apply_envelope()
+    analysis.apply_reaction_bounds()
+    analysis.set_up_optimiser()
+
+    # the horizontal loads and the particular solution d are linear on the load multiplier
+    M = optimiser.M
+    _WORKER['swt'] = shape.compute_selfweight()
+    _WORKER['x0'] = optimiser.x0.copy()
+    _WORKER['P0'] = M.P[:, :2].copy()
+    _WORKER['ph0'] = array(M.ph, dtype=float).reshape(-1, 1)
+    _WORKER['d0'] = array(M.d, dtype=float).reshape(-1, 1)
+
+
+def _solve_point(task):
+    """Solve one objective in one point of the grid of :func:`minmax_sweep_parallel` in the problem of the worker."""
+
+    objective, value = task
+    analysis = _WORKER['analysis']
+    optimiser = analysis.optimiser
+    solutions = _WORKER['solutions']
+    time0 = time.time()
+
+    # nearest solutions of the worker, preferably of the same objective, and then the starting point of the set up
+    keys = sorted(solutions, key=lambda key: (key[0] != objective, abs(key[1] - value)))[:2]
+
+    if _WORKER['parameter'] == 'thk':
+        continuation = _WORKER['continuation']
+        continuation.set_objective(objective)
+        starting_points = [continuation.warm_start(solutions[key], key[1], value) for key in keys] + [None]
+        for x0 in starting_points:
+            exitflag = continuation.solve(value, x0)
+            if exitflag == 0:
+                break
+        swt = continuation.selfweight(value)
+    else:
+        M = optimiser.M
+        optimiser.settings['objective'] = objective
+        optimiser.fobj, optimiser.fgrad = objective_selector(objective)
+        M.P[:, :2] = value * _WORKER['P0']
+        M.ph = value * _WORKER['ph0']
+        M.d = value * _WORKER['d0']
+        M.d0 = M.d
+        M.clear_cache()
+        starting_points = [solutions[key] for key in keys] + [_WORKER['x0']]
+        for x0 in starting_points:
+            optimiser.x0 = x0.copy()
+            analysis.run()
+            exitflag = optimiser.exitflag
+            if exitflag == 0:
+                break
+        swt = _WORKER['swt']
+
+    if exitflag != 0:
+        return exitflag, None, swt, time.time() - time0
+
+    solutions[(objective, value)] = optimiser.xopt.copy()
+
+    return exitflag, float(optimiser.fopt), swt, time.time() - time0
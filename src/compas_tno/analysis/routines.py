@@ -1,6 +1,7 @@
 import time
 from compas_tno.shapes import Shape
 from compas_tno.diagrams import FormDiagram
+from compas_tno.analysis.continuation import ThicknessContinuation
 import compas_tno
 import os
 import math
@@ -9,6 +10,9 @@ import math
 def limit_analysis_GSF(analysis, thk, thk_reduction, thk_refined=None, limit_equal=0.01, printout=True, save_forms=False):
     """Routine to compute the succesive max/min optimisation optimisation.
 
+    The problem is set up once and continued in the thickness with :class:`~compas_tno.analysis.ThicknessContinuation`.
+    Each optimisation is warm-started from the optimum of the previous thickness.
+
     Parameters
     ----------
     analysis : :class:`~compas_tno.analysis.Analysis`
@@ -36,113 +40,39 @@ def limit_analysis_GSF(analysis, thk, thk_reduction, thk_refined=None, limit_equ
     solutions_max = []  # empty lists to keep track of the solutions for max thrust
     thicknesses_min = []
     thicknesses_max = []
-    t0 = thk
-    form0 = analysis.form.copy()
-    thk_reduction0 = thk_reduction
     data_diagram = analysis.form.parameters
     data_shape = analysis.shape.datashape
-    ro = analysis.shape.ro
-    last_min = 0
-    last_max = 100
-    last_thk_min = t0
     objectives = ['min', 'max']
-    exitflag = 0
-    address = None
 
     print('Limit Analysis - GSF: For ({0}) with diagram ({1})'.format(data_shape['type'], data_diagram['type']))
 
-    while (last_max - last_min) > limit_equal:
+    time0 = time.time()
+    continuation = ThicknessContinuation(analysis, thk)
+    print('Setup time: {0:.2f}s'.format(time.time() - time0))
+
+    for objective in objectives:
+
+        continuation.set_objective(objective)
 
-        if exitflag == 0:
-            pass
+        print('\n----- Starting the [', objective, '] problem for intial thk:', thk)
+        print('THK  |   Solved  |   Opt.Val |   Opt/W   |   THK red.  |   Run time')
+
+        thicknesses, fopts = continuation.sweep(thk, -1 * thk_reduction, thk_min_step=thk_refined, callback=_form_saver(analysis, save_forms))
+        solutions = [fopt/continuation.selfweight(thk_) for thk_, fopt in zip(thicknesses, fopts)]  # divide by selfweight
+
+        if objective == 'min':
+            thicknesses_min, solutions_min = thicknesses, solutions
         else:
-            objectives = objectives[::-1]
-            print('Warning: Did not Achieve precision required. Stopping Anyway.\n')
-            break
-
-        for analysis.optimiser.settings['objective'] in objectives:
-
-            analysis.form = form0
-            exitflag = 0
-            thk = t0
-            thk_reduction = thk_reduction0
-            count = 0
-
-            print('\n----- Starting the [', analysis.optimiser.settings['objective'], '] problem for intial thk:', thk)
-            print('THK  |   Solved  |   Opt.Val |   Opt/W   |   THK red.  |   Setup time  |   Run time')
-
-            while exitflag == 0 and thk > 0:
-
-                # analysis.form = form0  # added for general case
-                data_shape['thk'] = thk
-                time0 = time.time()
-                analysis.shape = Shape.from_library(data_shape)
-                analysis.shape.ro = ro
-                swt = analysis.shape.compute_selfweight()
-                analysis.apply_selfweight()
-                analysis.apply_envelope()
-                analysis.apply_reaction_bounds()
-                analysis.set_up_optimiser()
-                setup_time = time.time() - time0
-                analysis.run()
-                run_time = time.time() - time0 - setup_time
-                exitflag = analysis.optimiser.exitflag  # get info if optimisation was succeded ot not
-                fopt = analysis.optimiser.fopt  # objective function optimum value
-                fopt_over_weight = fopt/swt  # divide by selfweight
-
-                if exitflag == 0:
-                    if analysis.optimiser.settings['objective'] == 'min':
-                        solutions_min.append(fopt_over_weight)
-                        thicknesses_min.append(thk)
-                        last_min = fopt_over_weight
-                        last_thk_min = thk
-                    else:
-                        solutions_max.append(fopt_over_weight)
-                        thicknesses_max.append(thk)
-                        last_max = abs(fopt_over_weight)
-                    if save_forms:
-                        address = save_forms + '_' + analysis.optimiser.settings['objective'] + '_thk_' + str(100*thk) + '.json'
-                    else:
-                        address = os.path.join(compas_tno.get('/temp/'), 'form_' + analysis.optimiser.settings['objective'] + '.json')
-                    analysis.form.to_json(address)
-                    print('{0}  |   True  |   {1:.1f} |   {2:.6f} |   {3}   | {4:.2f}s  |   {5:.2f}s'.format(thk, fopt, fopt_over_weight, thk_reduction, setup_time, run_time))
-                    thk = round(thk - thk_reduction, 5)
-                else:
-                    if not address:
-                        if analysis.optimiser.settings['objective'] == objectives[0]:
-                            print('Failed in Initial Thickness and objective ({0})'.format(analysis.optimiser.settings['objective']))
-                            objectives = objectives[::-1]
-                    elif analysis.optimiser.settings['objective'] == 'max' and last_thk_min <= thk:
-                        print('{0}  |   False  |   XXXX |   XXXX |   Load next [min]  | {1:.2f}s   |  {2:.2f}s'.format(thk, setup_time, run_time))
-                        # print('Try loading next [min] optimisation - 1')
-                        next_min = None
-                        for i in range(len(thicknesses_min)):
-                            if thicknesses_min[i] < thk or (thicknesses_min[i] == thk and count == 0):
-                                next_min = thicknesses_min[i]
-                                break
-                        if next_min:
-                            address = save_forms + '_' + 'min' + '_thk_' + str(100*next_min) + '.json'
-                            analysis.form = FormDiagram.from_json(address)
-                            thk = next_min
-                            exitflag = 0
-                        else:
-                            print('Tried loading all [min] optimisation')
-                            print('---------- End of process -----------', '\n')
-                    elif thk_reduction > thk_refined:  # or (analysis.optimiser.settings['objective'] == 'max' and last_thk_min < last_thk_max and thk_reduction > thk_refined/2):
-                        analysis.form = FormDiagram.from_json(address)  # reload last solved
-                        thk_ = thk
-                        thk = round(thk + thk_reduction, 5)
-                        thk_reduction = thk_reduction / 2
-                        print('{0}  |   False  |   XXXX |   XXXX |   {1}    | {2:.2f}s   |  {3:.2f}s'.format(thk_, thk_reduction, setup_time, run_time))
-                        thk = round(thk - thk_reduction, 5)
-                        exitflag = 0
-                    else:
-                        print('---------- End of process -----------', '\n')
-                count += 1
+            thicknesses_max, solutions_max = thicknesses, solutions
+
+        print('---------- End of process -----------', '\n')
+
+    if not solutions_min or not solutions_max or (abs(solutions_max[-1]) - solutions_min[-1]) > limit_equal:
+        print('Warning: Did not Achieve precision required. Stopping Anyway.\n')
 
     if printout:
         print('------------------ SUMMARY ------------------ ')
-        print('ANALYSIS FOR THICKNESS t0:', t0)
+        print('ANALYSIS FOR THICKNESS t0:', thk)
         print('thicknesses min ({0}):'.format(len(thicknesses_min)))
         print(thicknesses_min)
         print('thicknesses max ({0}):'.format(len(thicknesses_max)))
@@ -158,6 +88,9 @@ def limit_analysis_GSF(analysis, thk, thk_reduction, thk_refined=None, limit_equ
 def thk_minmax_GSF(analysis, thk_max, thk_step=0.05, printout=True, save_forms=None, skip_minthk=False):
     """Routine to compute the succesive max/min optimisations starting from the minimum thickness.
 
+    After the minimum thickness, the problem is set up once and continued in the thickness with :class:`~compas_tno.analysis.ThicknessContinuation`.
+    Each optimisation is warm-started from the optimum of the previous thickness.
+
     Parameters
     ----------
     analysis : :class:`~compas_tno.analysis.Analysis`
@@ -184,12 +117,10 @@ def thk_minmax_GSF(analysis, thk_max, thk_step=0.05, printout=True, save_forms=N
     thicknesses_min = []
     thicknesses_max = []
     objectives = ['min', 'max']
-    ro = analysis.shape.ro
-    data_shape = analysis.shape.datashape
 
     # Find extreme (min thickness) solution:
 
-    print('\n----- Starting the min thk optimisation for starting thk: {0:.4f}'.format(analysis.shape.data['thk']))
+    print('\n----- Starting the min thk optimisation for starting thk: {0:.4f}'.format(analysis.shape.datashape['thk']))
 
     if not skip_minthk:
         time0 = time.time()
@@ -220,9 +151,6 @@ def thk_minmax_GSF(analysis, thk_max, thk_step=0.05, printout=True, save_forms=N
 
         # STORE
 
-        address0 = os.path.join(compas_tno.get('/temp/'), 'form0.json')
-        analysis.form.to_json(address0)
-
         solutions_min.append(T_over_swt)
         solutions_max.append(-1 * T_over_swt)
         thicknesses_min.append(thk_min)
@@ -235,9 +163,7 @@ def thk_minmax_GSF(analysis, thk_max, thk_step=0.05, printout=True, save_forms=N
             analysis.form.to_json(address_min)
             analysis.form.to_json(address_max)
 
-        thk = round(thk_min + thk_increase, 5)
-        thk_increase = thk_step
-        thk0 = thk
+        thk0 = round(thk_min + thk_increase, 5)
 
         if thk_min == thk_max:
             print('Warning: Minimum THK Optimisation found optimum at start. Try rescalling the problem.')
@@ -246,76 +172,38 @@ def thk_minmax_GSF(analysis, thk_max, thk_step=0.05, printout=True, save_forms=N
         print('Error: Minimum THK Optimisation did not find a solution: Try scalling the optimisation, or starting in a different thickness value')
         return
 
-    # Start inverse loop for min/max:
-
-    analysis.optimiser.settings['variables'] = ['ind', 'zb']
-    for analysis.optimiser.settings['objective'] in objectives:
-
-        analysis.form = FormDiagram.from_json(address0)
-
-        exitflag = 0
-        thk = thk0
-        count = 0
-        first_fail = True
+    # Start the continuation from the minimum thickness solution, scaled to the self-weight in thk0:
 
-        print('\n----- Starting the inverse [', analysis.optimiser.settings['objective'], '] problem for minimum thk:', thk)
-        print('THK  |   Solved  |   Opt.Val |   Opt/W   |   THK incr.  |   Setup time  |   Run time')
-
-        while exitflag == 0 and thk <= thk_max:
+    form = analysis.form
+    scale = analysis.shape.compute_selfweight() * thk0 / analysis.shape.datashape['thk'] / abs(form.lumped_swt())
+    for edge in form.edges():
+        form.edge_attribute(edge, 'q', scale * form.edge_attribute(edge, 'q'))
 
-            data_shape['thk'] = thk
+    starting_point = analysis.optimiser.settings.get('starting_point', 'current')
+    analysis.optimiser.settings['variables'] = ['ind', 'zb']
+    analysis.optimiser.settings['starting_point'] = 'current'
+    time0 = time.time()
+    continuation = ThicknessContinuation(analysis, thk0)
+    analysis.optimiser.settings['starting_point'] = starting_point
+    print('Setup time: {0:.2f}s'.format(time.time() - time0))
 
-            time0 = time.time()
-            analysis.shape = Shape.from_library(data_shape)
-            analysis.shape.ro = ro
+    for objective in objectives:
 
-            swt = analysis.shape.compute_selfweight()
+        continuation.set_objective(objective)
 
-            lumped_swt = analysis.form.lumped_swt()
+        print('\n----- Starting the inverse [', objective, '] problem for minimum thk:', thk0)
+        print('THK  |   Solved  |   Opt.Val |   Opt/W   |   THK incr.  |   Run time')
 
-            analysis.form.scale_form(swt/lumped_swt)
-            lumped_swt = analysis.form.lumped_swt()
+        thicknesses, fopts = continuation.sweep(thk0, thk_step, thk_end=thk_max, callback=_form_saver(analysis, save_forms))
+        solutions = [fopt/(-1 * continuation.selfweight(thk)) for thk, fopt in zip(thicknesses, fopts)]  # divide by the lumped (negative) selfweight
 
-            analysis.apply_envelope()
-            analysis.apply_reaction_bounds()
-            analysis.set_up_optimiser()
-            setup_time = time.time() - time0
-            analysis.run()
-            run_time = time.time() - time0 - setup_time
-            exitflag = analysis.optimiser.exitflag  # get info if optimisation was succeded ot not
-            fopt = analysis.optimiser.fopt  # objective function optimum value
-            fopt_over_weight = fopt/lumped_swt  # divide by selfweight
+        if objective == 'min':
+            thicknesses_min += thicknesses
+            solutions_min += solutions
+        else:
+            thicknesses_max += thicknesses
+            solutions_max += solutions
 
-            if exitflag == 0:
-                if analysis.optimiser.settings['objective'] == 'min':
-                    solutions_min.append(fopt_over_weight)
-                    thicknesses_min.append(thk)
-                else:
-                    solutions_max.append(fopt_over_weight)
-                    thicknesses_max.append(thk)
-                if save_forms:
-                    address = save_forms + '_' + analysis.optimiser.settings['objective'] + '_thk_' + str(100*thk) + '.json'
-                else:
-                    address = os.path.join(compas_tno.get('/temp/'), 'form_' + analysis.optimiser.settings['objective'] + '.json')
-                analysis.form.to_json(address)
-                print('{0:.5f}  |   True  |   {1:.1f} |   {2:.6f} |   {3}   | {4:.2f}s  |   {5:.2f}s'.format(thk, fopt, fopt_over_weight, thk_increase, setup_time, run_time))
-                thk = thk + thk_increase
-                first_fail = True
-            else:
-                print('Failed Optimisation for [{0}] with thk: {1}'.format(analysis.optimiser.settings['objective'], thk))
-                other_objective = 'min' if analysis.optimiser.settings['objective'] == 'max' else 'max'
-                if thk < thk_max:
-                    if not first_fail:
-                        thk = thk + thk_increase
-                        first_fail = True
-                        print('Second Fail with [{0}] opt, will load [{1}] opt in incr. thk: {2}'.format(analysis.optimiser.settings['objective'], other_objective, thk))
-                    else:
-                        print('First Fail with [{0}] opt, will load [{1}] opt in thk: {2}'.format(analysis.optimiser.settings['objective'], other_objective, thk))
-                        first_fail = False
-                    address_other_obj = save_forms + '_' + other_objective + '_thk_' + str(100*thk) + '.json'
-                    analysis.form = FormDiagram.from_json(address_other_obj)
-                    exitflag = 0
-            count += 1
         print('---------- End of process -----------', '\n')
 
     thicknesses_min.reverse()
@@ -520,3 +408,16 @@ def max_n_minmax_GSF(analysis, n_step=0.01, printout=True, save_forms=False):
         print(solutions_max)
 
     return [thicknesses_min, thicknesses_max],  [solutions_min, solutions_max]
+
+
+def _form_saver(analysis, save_forms):
+    """Callback of :meth:`ThicknessContinuation.sweep` saving the form diagram of each converged thickness."""
+
+    if not save_forms:
+        return None
+
+    def save_form(thk, fopt):
+        address = save_forms + '_' + analysis.optimiser.settings['objective'] + '_thk_' + str(100*thk) + '.json'
+        analysis.form.to_json(address)
+
+    return save_form
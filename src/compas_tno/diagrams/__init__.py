@@ -15,6 +15,7 @@ Classes
     FormDiagram
     ForceDiagram
     FormGraph
+    FormArrays
 
 
 Rectangular diagrams
@@ -31,6 +32,15 @@ Rectangular diagrams
     create_parametric_form
 
 
+Array-based construction
+========================
+
+.. autosummary::
+    :toctree: generated/
+
+    form_from_arrays
+
+
 Circular diagrams
 =================
 
@@ -58,6 +68,7 @@ from __future__ import absolute_import
 from .force import ForceDiagram
 from .form import FormDiagram
 from .graph import FormGraph
+from .arrays import FormArrays, form_from_arrays
 
 from .diagram_arch import (
     create_arch_form_diagram,
@@ -82,6 +93,7 @@ __all__ = [
     'ForceDiagram',
     'FormDiagram',
     'FormGraph',
+    'FormArrays',
 
     'create_arch_form_diagram',
     'create_linear_form_diagram',
@@ -96,6 +108,7 @@ __all__ = [
     'create_cross_with_diagonal',
     'create_fan_form',
     'create_ortho_form',
-    'create_parametric_form'
+    'create_parametric_form',
 
+    'form_from_arrays',
 ]
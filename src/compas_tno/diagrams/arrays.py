@@ -0,0 +1,179 @@
+from numpy import array
+from numpy import asarray
+from numpy import full
+from numpy import hstack
+from numpy import roll
+from numpy import zeros
+
+from compas_tno.algorithms.equilibrium import weights_from_xyz
+
+
+class FormArrays(object):
+    """Array-backed view of the attributes of the vertices of a :class:`~compas_tno.diagrams.FormDiagram`.
+
+    The attributes (coordinates, loads, bounds, ...) are read from the form diagram in contiguous arrays when first requested,
+    in the order of ``form.vertices()``. Arrays modified with :meth:`set` are written back to the form diagram with :meth:`sync`.
+    The view avoids per-vertex dictionary calls and copies of the form diagram in the computation of loads and envelopes.
+
+    Parameters
+    ----------
+    form : :class:`~compas_tno.diagrams.FormDiagram`
+        The form diagram.
+
+    Attributes
+    ----------
+    keys : list
+        The keys of the vertices, in the order of the arrays.
+    key_index : dict
+        The index of each vertex in the arrays.
+
+    Examples
+    --------
+    >>> from compas_tno.diagrams import FormDiagram
+    >>> form = FormDiagram.create_cross_form()
+    >>> arrays = FormArrays(form)
+    >>> arrays.set('pz', -1.0 * arrays.tributary_areas())
+    >>> arrays.sync()
+
+    """
+
+    def __init__(self, form):
+        self.form = form
+        self.keys = list(form.vertices())
+        self.key_index = {key: i for i, key in enumerate(self.keys)}
+        self._arrays = {}
+        self._modified = set()
+        self._tributary = None
+
+    @property
+    def n(self):
+        """Number of vertices."""
+        return len(self.keys)
+
+    @property
+    def xyz(self):
+        """The coordinates of the vertices, array (n x 3)."""
+        return array([self.get('x'), self.get('y'), self.get('z')]).transpose()
+
+    def get(self, name):
+        """Array of an attribute of the vertices. Attributes set to None are returned as ``nan``.
+
+        Parameters
+        ----------
+        name : str
+            The name of the attribute.
+
+        Returns
+        -------
+        array (n)
+            The values of the attribute.
+
+        """
+
+        if name not in self._arrays:
+            self._arrays[name] = array(self.form.vertices_attribute(name, keys=self.keys), dtype=float).reshape(-1)
+
+        return self._arrays[name]
+
+    def set(self, name, values):
+        """Set the array of an attribute of the vertices. The form diagram is updated with :meth:`sync`.
+
+        Parameters
+        ----------
+        name : str
+            The name of the attribute.
+        values : array (n) or float
+            The values of the attribute.
+
+        """
+
+        values = asarray(values, dtype=float)
+        self._arrays[name] = values.reshape(-1).copy() if values.ndim else full(self.n, float(values))
+        self._modified.add(name)
+
+    def sync(self):
+        """Write the arrays modified to the attributes of the form diagram."""
+
+        vertex_attribute = self.form.vertex_attribute
+        for name in self._modified:
+            for key, value in zip(self.keys, self._arrays[name].tolist()):
+                vertex_attribute(key, name, value)
+        self._modified.clear()
+
+    def clear(self):
+        """Discard the arrays read, to read again the attributes modified in the form diagram. Arrays not synchronised are lost."""
+
+        self._arrays = {}
+        self._modified.clear()
+
+    def tributary_areas(self, z=None):
+        """Tributary areas of the vertices, as in ``vertex_area``, computed with the tributary matrices of the form diagram.
+
+        Parameters
+        ----------
+        z : array (n), optional
+            The heights of the vertices in which the areas are computed, by default None, in which the attribute ``z`` is used.
+
+        Returns
+        -------
+        array (n)
+            The tributary areas.
+
+        """
+
+        if self._tributary is None:
+            self._tributary = self.form.tributary_matrices(sparse=True)
+
+        xyz = self.xyz
+        if z is not None:
+            xyz = hstack([xyz[:, :2], asarray(z, dtype=float).reshape(-1, 1)])
+
+        F, V0, V1, V2 = self._tributary
+
+        return asarray(weights_from_xyz(xyz, F, V0, V1, V2, thk=1.0, density=1.0)).reshape(-1)
+
+
+def form_from_arrays(cls, xy, faces, fixed=None):
+    """Construct a form diagram from the arrays of the plan coordinates of the vertices and of the indices of the faces.
+
+    The vertices are not welded and the faces are not searched: the keys of the vertices are their indices in ``xy``.
+    The faces are oriented counterclockwise in plan.
+
+    Parameters
+    ----------
+    cls : :class:`~compas_tno.diagrams.FormDiagram`
+        The class (or an instance) of the form diagram to construct.
+    xy : array (n x 2)
+        The plan coordinates of the vertices.
+    faces : list
+        Arrays (k x s) with the indices of the vertices of k faces with s vertices each.
+    fixed : array, optional
+        The indices of the vertices fixed, by default None.
+
+    Returns
+    -------
+    :class:`~compas_tno.diagrams.FormDiagram`
+        The FormDiagram created.
+
+    """
+
+    xy = asarray(xy, dtype=float)
+    vertices = hstack([xy, zeros((len(xy), 1))]).tolist()
+
+    face_list = []
+    for face in faces:
+        face = array(face, dtype=int, ndmin=2)
+        if not face.size:
+            continue
+        x, y = xy[face, 0], xy[face, 1]
+        area = (x * roll(y, -1, axis=1) - roll(x, -1, axis=1) * y).sum(axis=1)
+        face[area < 0] = face[area < 0, ::-1]
+        face_list.extend(face.tolist())
+
+    form = cls.from_vertices_and_faces(vertices, face_list)
+
+    if fixed is not None:
+        for key in asarray(fixed, dtype=int).reshape(-1).tolist():
+            form.vertex_attribute(key, 'is_fixed', True)
+
+    return form
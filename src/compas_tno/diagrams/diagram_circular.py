@@ -1,7 +1,14 @@
-
 import math
-from compas.datastructures import Mesh
-from compas.geometry import intersection_line_line_xy
+
+from numpy import arange
+from numpy import array
+from numpy import column_stack
+from numpy import empty
+from numpy import full
+from numpy import roll
+from numpy import vstack
+
+from compas_tno.diagrams.arrays import form_from_arrays
 
 
 def create_circular_radial_form(cls, center=[5.0, 5.0], radius=5.0, discretisation=[8, 20], r_oculus=0.0, diagonal=False, partial_diagonal=False):
@@ -34,84 +41,21 @@ def create_circular_radial_form(cls, center=[5.0, 5.0], radius=5.0, discretisati
     n_spikes = discretisation[1]
     theta = 2*math.pi/n_spikes
     r_div = (radius - r_oculus)/n_radial
-    lines = []
-
-    # indset = []  # TODO: Automate indset selection...
-
-    for nr in range(n_radial+1):
-        for nc in range(n_spikes):
-            if (r_oculus + nr * r_div) > 0.0:
-                # Meridian Elements
-                xa = xc + (r_oculus + nr * r_div) * math.cos(theta * nc)
-                xb = xc + (r_oculus + nr * r_div) * math.cos(theta * (nc + 1))
-                ya = yc + (r_oculus + nr * r_div) * math.sin(theta * nc)
-                yb = yc + (r_oculus + nr * r_div) * math.sin(theta * (nc + 1))
-                lines.append([[xa, ya, 0.0], [xb, yb, 0.0]])
-
-            if nr <= n_radial - 1:
-                # Radial Elements
-                xa = xc + (r_oculus + nr * r_div) * math.cos(theta * nc)
-                xb = xc + (r_oculus + (nr + 1) * r_div) * math.cos(theta * nc)
-                ya = yc + (r_oculus + nr * r_div) * math.sin(theta * nc)
-                yb = yc + (r_oculus + (nr + 1) * r_div) * math.sin(theta * nc)
-                lines.append([[xa, ya, 0.0], [xb, yb, 0.0]])
-
-    if diagonal:
-        for nr in range(n_radial):
-            for nc in range(n_spikes):
-                if (r_oculus + nr * r_div) > 0.0:
-
-                    # Meridian Element i
-                    xa = xc + (r_oculus + nr * r_div) * math.cos(theta * nc)
-                    xb = xc + (r_oculus + nr * r_div) * math.cos(theta * (nc + 1))
-                    ya = yc + (r_oculus + nr * r_div) * math.sin(theta * nc)
-                    yb = yc + (r_oculus + nr * r_div) * math.sin(theta * (nc + 1))
-
-                    # Meridian Element i + 1
-                    xa_ = xc + (r_oculus + (nr + 1) * r_div) * math.cos(theta * nc)
-                    xb_ = xc + (r_oculus + (nr + 1) * r_div) * math.cos(theta * (nc + 1))
-                    ya_ = yc + (r_oculus + (nr + 1) * r_div) * math.sin(theta * nc)
-                    yb_ = yc + (r_oculus + (nr + 1) * r_div) * math.sin(theta * (nc + 1))
-
-                    if partial_diagonal == 'right':
-                        if nc + 1 > n_spikes/2:
-                            lines.append([[xa, ya, 0.0], [xb_, yb_, 0.0]])
-                        else:
-                            lines.append([[xa_, ya_, 0.0], [xb, yb, 0.0]])
-                    elif partial_diagonal == 'left':
-                        if nc + 1 > n_spikes/2:
-                            lines.append([[xa_, ya_, 0.0], [xb, yb, 0.0]])
-                        else:
-                            lines.append([[xa, ya, 0.0], [xb_, yb_, 0.0]])
-                    elif partial_diagonal == 'rotation':
-                        lines.append([[xa, ya, 0.0], [xb_, yb_, 0.0]])
-                    elif partial_diagonal == 'straight':
-                        midx, midy, _ = intersection_line_line_xy([[xa, ya], [xb_, yb_]], [[xa_, ya_], [xb, yb]])
-                        lines.append([[xa, ya, 0.0], [midx, midy, 0.0]])
-                        lines.append([[midx, midy, 0.0], [xb_, yb_, 0.0]])
-                        lines.append([[xa_, ya_, 0.0], [midx, midy, 0.0]])
-                        lines.append([[midx, midy, 0.0], [xb, yb, 0.0]])
-                    else:
-                        midx = (xa + xa_ + xb + xb_)/4
-                        midy = (ya + ya_ + yb + yb_)/4
-                        lines.append([[xa, ya, 0.0], [midx, midy, 0.0]])
-                        lines.append([[midx, midy, 0.0], [xb_, yb_, 0.0]])
-                        lines.append([[xa_, ya_, 0.0], [midx, midy, 0.0]])
-                        lines.append([[midx, midy, 0.0], [xb, yb, 0.0]])
-
-    form = cls.from_lines(lines, delete_boundary_edges=True)
+
+    radii = [r_oculus + nr * r_div for nr in range(n_radial + 1)]
+    angles = [[theta * nc for nc in range(n_spikes)]] * (n_radial + 1)
+    xy, index = _circular_rings(xc, yc, radii, angles)
+    xy, faces = _radial_faces(xy, index, diagonal=diagonal, partial_diagonal=partial_diagonal)
 
     if r_oculus:
-        for key in form.faces():
-            centroid = form.face_centroid(key)
-            if centroid[0] == xc and centroid[1] == yc:
-                form.face_attribute(key, '_is_loaded', False)
+        faces = [index[:1]] + faces
+
+    form = form_from_arrays(cls, xy, faces, fixed=index[-1])
 
-    [bnds] = form.vertices_on_boundaries()
-    for key in bnds:
-        form.vertex_attribute(key, 'is_fixed', True)
+    if r_oculus:
+        form.face_attribute(0, '_is_loaded', False)
 
-    for u, v in form.edges_on_boundary():
+    for u, v in zip(index[-1].tolist(), roll(index[-1], -1).tolist()):
         form.edge_attribute((u, v), '_is_edge', False)
 
     return form
@@ -146,79 +90,21 @@ def create_circular_radial_spaced_form(cls, center=[5.0, 5.0], radius=5.0, discr
     n_radial = discretisation[0]
     n_spikes = discretisation[1]
     theta = 2*math.pi/n_spikes
-    r_div = (radius - r_oculus)/n_radial
-    lines = []
-
-    for nr in range(n_radial+1):
-        for nc in range(n_spikes):
-            if (r_oculus + nr) > 0:
-                # Meridian Elements
-                xa = xc + (r_oculus + radius * math.cos((n_radial - nr)/n_radial * math.pi/2)) * math.cos(theta * nc)
-                xb = xc + (r_oculus + radius * math.cos((n_radial - nr)/n_radial * math.pi/2)) * math.cos(theta * (nc + 1))
-                ya = yc + (r_oculus + radius * math.cos((n_radial - nr)/n_radial * math.pi/2)) * math.sin(theta * nc)
-                yb = yc + (r_oculus + radius * math.cos((n_radial - nr)/n_radial * math.pi/2)) * math.sin(theta * (nc + 1))
-                lines.append([[xa, ya, 0.0], [xb, yb, 0.0]])
-
-            if nr <= n_radial - 1:
-
-                # Radial Elements
-                xa = xc + (r_oculus + radius * math.cos((n_radial - nr)/n_radial * math.pi/2)) * math.cos(theta * nc)
-                xb = xc + (r_oculus + radius * math.cos((n_radial - (nr + 1))/n_radial * math.pi/2)) * math.cos(theta * nc)
-                ya = yc + (r_oculus + radius * math.cos((n_radial - nr)/n_radial * math.pi/2)) * math.sin(theta * nc)
-                yb = yc + (r_oculus + radius * math.cos((n_radial - (nr + 1))/n_radial * math.pi/2)) * math.sin(theta * nc)
-                lines.append([[xa, ya, 0.0], [xb, yb, 0.0]])
-
-    if diagonal:
-        for nr in range(n_radial):
-            for nc in range(n_spikes):
-                if (r_oculus + nr * r_div) > 0.0:
-                    # Meridian Element i
-                    xa = xc + (r_oculus + radius * math.cos((n_radial - nr)/n_radial * math.pi/2)) * math.cos(theta * nc)
-                    xb = xc + (r_oculus + radius * math.cos((n_radial - nr)/n_radial * math.pi/2)) * math.cos(theta * (nc + 1))
-                    ya = yc + (r_oculus + radius * math.cos((n_radial - nr)/n_radial * math.pi/2)) * math.sin(theta * nc)
-                    yb = yc + (r_oculus + radius * math.cos((n_radial - nr)/n_radial * math.pi/2)) * math.sin(theta * (nc + 1))
-
-                    radius * math.cos((n_radial - (nr + 1))/n_radial * math.pi/2)
-                    # Meridian Element i + 1
-                    xa_ = xc + (r_oculus + radius * math.cos((n_radial - (nr + 1))/n_radial * math.pi/2)) * math.cos(theta * nc)
-                    xb_ = xc + (r_oculus + radius * math.cos((n_radial - (nr + 1))/n_radial * math.pi/2)) * math.cos(theta * (nc + 1))
-                    ya_ = yc + (r_oculus + radius * math.cos((n_radial - (nr + 1))/n_radial * math.pi/2)) * math.sin(theta * nc)
-                    yb_ = yc + (r_oculus + radius * math.cos((n_radial - (nr + 1))/n_radial * math.pi/2)) * math.sin(theta * (nc + 1))
-                    if partial_diagonal == 'right':
-                        if nc + 1 > n_spikes/2:
-                            lines.append([[xa, ya, 0.0], [xb_, yb_, 0.0]])
-                        else:
-                            lines.append([[xa_, ya_, 0.0], [xb, yb, 0.0]])
-                    elif partial_diagonal == 'left':
-                        if nc + 1 > n_spikes/2:
-                            lines.append([[xa_, ya_, 0.0], [xb, yb, 0.0]])
-                        else:
-                            lines.append([[xa, ya, 0.0], [xb_, yb_, 0.0]])
-                    elif partial_diagonal == 'straight':
-                        midx, midy, _ = intersection_line_line_xy([[xa, ya], [xb_, yb_]], [[xa_, ya_], [xb, yb]])
-                        lines.append([[xa, ya, 0.0], [midx, midy, 0.0]])
-                        lines.append([[midx, midy, 0.0], [xb_, yb_, 0.0]])
-                        lines.append([[xa_, ya_, 0.0], [midx, midy, 0.0]])
-                        lines.append([[midx, midy, 0.0], [xb, yb, 0.0]])
-                    else:
-                        midx = (xa + xa_ + xb + xb_)/4
-                        midy = (ya + ya_ + yb + yb_)/4
-                        lines.append([[xa, ya, 0.0], [midx, midy, 0.0]])
-                        lines.append([[midx, midy, 0.0], [xb_, yb_, 0.0]])
-                        lines.append([[xa_, ya_, 0.0], [midx, midy, 0.0]])
-                        lines.append([[midx, midy, 0.0], [xb, yb, 0.0]])
-
-    form = cls.from_lines(lines, delete_boundary_edges=True)
+
+    radii = [r_oculus + radius * math.cos((n_radial - nr)/n_radial * math.pi/2) for nr in range(n_radial + 1)]
+    if not r_oculus:
+        radii[0] = 0.0
+    angles = [[theta * nc for nc in range(n_spikes)]] * (n_radial + 1)
+    xy, index = _circular_rings(xc, yc, radii, angles)
+    xy, faces = _radial_faces(xy, index, diagonal=diagonal, partial_diagonal=partial_diagonal, rotation=False)
 
     if r_oculus:
-        for key in form.faces():
-            centroid = form.face_centroid(key)
-            if centroid[0] == xc and centroid[1] == yc:
-                form.set_face_attribute(key, '_is_loaded', False)
+        faces = [index[:1]] + faces
+
+    form = form_from_arrays(cls, xy, faces, fixed=index[-1])
 
-    [bnds] = form.vertices_on_boundaries()
-    for key in bnds:
-        form.vertex_attribute(key, 'is_fixed', True)
+    if r_oculus:
+        form.face_attribute(0, '_is_loaded', False)
 
     form.delete_boundary_edges()
 
@@ -251,69 +137,100 @@ def create_circular_spiral_form(cls, center=[5.0, 5.0], radius=5.0, discretisati
     n_spikes = discretisation[1]
     theta = 2*math.pi/n_spikes
     r_div = (radius - r_oculus)/n_radial
-    lines = []
-
-    for nr in range(n_radial + 1):
-        for nc in range(n_spikes):
-            if nr > 0.0:  # This avoid the center...
-                if nr % 2 == 0:
-                    # Diagonal to Up
-                    xa = xc + (r_oculus + nr * r_div) * math.cos(theta * nc)
-                    xb = xc + (r_oculus + (nr - 1) * r_div) * math.cos(theta * (nc + 1/2))
-                    ya = yc + (r_oculus + nr * r_div) * math.sin(theta * nc)
-                    yb = yc + (r_oculus + (nr - 1) * r_div) * math.sin(theta * (nc + 1/2))
-
-                    # Diagonal to Down
-                    xa_ = xc + (r_oculus + nr * r_div) * math.cos(theta * nc)
-                    xb_ = xc + (r_oculus + (nr - 1) * r_div) * math.cos(theta * (nc - 1/2))
-                    ya_ = yc + (r_oculus + nr * r_div) * math.sin(theta * nc)
-                    yb_ = yc + (r_oculus + (nr - 1) * r_div) * math.sin(theta * (nc - 1/2))
-
-                    lines.append([[xa, ya, 0.0], [xb, yb, 0.0]])
-                    lines.append([[xa_, ya_, 0.0], [xb_, yb_, 0.0]])
-                else:
-                    # Diagonal to Up
-                    xa = xc + (r_oculus + nr * r_div) * math.cos(theta * (nc + 1/2))
-                    xb = xc + (r_oculus + (nr - 1) * r_div) * math.cos(theta * (nc + 1))
-                    ya = yc + (r_oculus + nr * r_div) * math.sin(theta * (nc + 1/2))
-                    yb = yc + (r_oculus + (nr - 1) * r_div) * math.sin(theta * (nc + 1))
-
-                    # Diagonal to Down
-                    xa_ = xc + (r_oculus + nr * r_div) * math.cos(theta * (nc + 1/2))
-                    xb_ = xc + (r_oculus + (nr - 1) * r_div) * math.cos(theta * (nc))
-                    ya_ = yc + (r_oculus + nr * r_div) * math.sin(theta * (nc + 1/2))
-                    yb_ = yc + (r_oculus + (nr - 1) * r_div) * math.sin(theta * (nc))
-
-                    lines.append([[xa, ya, 0.0], [xb, yb, 0.0]])
-                    lines.append([[xa_, ya_, 0.0], [xb_, yb_, 0.0]])
-                if nr == n_radial:
-                    xa = xc + (r_oculus + nr * r_div) * math.cos(theta * nc)
-                    xb = xc + (r_oculus + nr * r_div) * math.cos(theta * (nc + 1))
-                    ya = yc + (r_oculus + nr * r_div) * math.sin(theta * nc)
-                    yb = yc + (r_oculus + nr * r_div) * math.sin(theta * (nc + 1))
-                    lines.append([[xa, ya, 0.0], [xb, yb, 0.0]])
-            if nr == 0 and r_oculus > 0.0:
-                # If oculus, this will be the compression ring
-                xa = xc + (r_oculus) * math.cos(theta * (nc))
-                xb = xc + (r_oculus) * math.cos(theta * (nc + 1))
-                ya = yc + (r_oculus) * math.sin(theta * (nc))
-                yb = yc + (r_oculus) * math.sin(theta * (nc + 1))
-                lines.append([[xa, ya, 0.0], [xb, yb, 0.0]])
-
-    mesh = Mesh.from_lines(lines, delete_boundary_face=True)
-    form = cls.from_mesh(mesh)
-    # form = cls.from_lines(lines, delete_boundary_edges=True)
 
+    # The vertices of the even hoops are on the spikes and the vertices of the odd hoops are between them
+    radii = [r_oculus + nr * r_div for nr in range(n_radial + 1)]
+    angles = [[theta * (nc + (nr % 2)/2) for nc in range(n_spikes)] for nr in range(n_radial + 1)]
+    xy, index = _circular_rings(xc, yc, radii, angles)
+
+    # Quads with diagonals to up and down from each vertex of a hoop to the vertex of the second next hoop
+    nc = arange(n_spikes)
+    faces = []
+    for nr in range(1, n_radial):
+        if (nr - 1) % 2 == 0:
+            up, down = nc, nc - 1
+        else:
+            up, down = (nc + 1) % n_spikes, nc
+        faces.append(column_stack([index[nr - 1], index[nr, up], index[nr + 1], index[nr, down]]))
+
+    # Triangles in the outer hoop and in the compression ring of the oculus
+    faces.append(column_stack([index[-1], roll(index[-1], -1), index[-2, (nc + n_radial % 2) % n_spikes]]))
     if r_oculus != 0.0:
-        for key in form.faces():
-            centroid = form.face_centroid(key)
-            if centroid[0] == xc and centroid[1] == yc:
-                form.set_face_attribute(key, '_is_loaded', False)
+        faces.append(column_stack([index[0], roll(index[0], -1), index[1]]))
+        faces = [index[:1]] + faces
+
+    form = form_from_arrays(cls, xy, faces, fixed=index[-1])
 
-    [bnds] = form.vertices_on_boundaries()
-    for key in bnds:
-        form.vertex_attribute(key, 'is_fixed', True)
+    if r_oculus != 0.0:
+        form.face_attribute(0, '_is_loaded', False)
 
     form.delete_boundary_edges()  # Check what happens if there is oculus
 
     return form
+
+
+def _circular_rings(xc, yc, radii, angles):
+    """Plan coordinates of the vertices of concentric rings and array (rings x spikes) with their indices.
+
+    The vertices of each ring are at the angles in ``angles``. A ring of radius zero is a single vertex in the center.
+    """
+
+    index = empty((len(radii), len(angles[0])), dtype=int)
+    xy = []
+    for i, (r, angle) in enumerate(zip(radii, angles)):
+        if r == 0.0:
+            index[i] = len(xy)
+            xy.append([xc, yc])
+        else:
+            index[i] = arange(len(xy), len(xy) + len(angle))
+            xy.extend([xc + r * math.cos(t), yc + r * math.sin(t)] for t in angle)
+
+    return array(xy), index
+
+
+def _radial_faces(xy, index, diagonal=False, partial_diagonal=False, rotation=True):
+    """Faces between consecutive rings, triangles around the center and quads elsewhere, split in triangles if ``diagonal``.
+
+    The diagonals follow ``partial_diagonal`` as in :func:`create_circular_radial_form`, ``'rotation'`` is accepted if ``rotation``.
+    Returns the plan coordinates, with the vertices added where the diagonals cross, and the faces.
+    """
+
+    n_spikes = index.shape[1]
+    upper_half = arange(n_spikes) + 1 > n_spikes/2
+    points = [xy]
+    nv = len(xy)
+    faces = []
+
+    for nr in range(len(index) - 1):
+        a, b = index[nr], roll(index[nr], -1)
+        a_, b_ = index[nr + 1], roll(index[nr + 1], -1)
+
+        if a[0] == a[-1]:
+            faces.append(column_stack([a, a_, b_]))
+        elif not diagonal:
+            faces.append(column_stack([a, b, b_, a_]))
+        elif partial_diagonal in ['right', 'left'] or (partial_diagonal == 'rotation' and rotation):
+            # Diagonal a - b_ where ``up``, a_ - b elsewhere
+            if partial_diagonal == 'right':
+                up = upper_half
+            elif partial_diagonal == 'left':
+                up = ~upper_half
+            else:
+                up = full(n_spikes, True)
+            faces += [column_stack([a, b, b_])[up], column_stack([a, b_, a_])[up],
+                      column_stack([a, b, a_])[~up], column_stack([b, b_, a_])[~up]]
+        else:
+            pa, pb, pa_, pb_ = xy[a], xy[b], xy[a_], xy[b_]
+            if partial_diagonal == 'straight':
+                d1 = pb_ - pa
+                d2 = pb - pa_
+                t = ((pa_[:, 0] - pa[:, 0]) * d2[:, 1] - (pa_[:, 1] - pa[:, 1]) * d2[:, 0]) / (d1[:, 0] * d2[:, 1] - d1[:, 1] * d2[:, 0])
+                mid = pa + t.reshape(-1, 1) * d1
+            else:
+                mid = (pa + pa_ + pb + pb_)/4
+            m = arange(nv, nv + n_spikes)
+            nv += n_spikes
+            points.append(mid)
+            faces += [column_stack([a, b, m]), column_stack([b, b_, m]), column_stack([b_, a_, m]), column_stack([a_, a, m])]
+
+    return vstack(points), faces
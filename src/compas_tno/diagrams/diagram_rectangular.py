@@ -1,12 +1,21 @@
-import math
-from compas.utilities import geometric_key
+from numpy import arange
+from numpy import array
+from numpy import column_stack
+from numpy import concatenate
+from numpy import empty
+from numpy import full
+from numpy import meshgrid
+from numpy import vstack
+from numpy import zeros
+
 from compas.geometry import mirror_points_line
-from compas.geometry import rotate_points_xy
 from compas.datastructures import Mesh
 
 from compas.geometry import distance_point_point_xy
 from compas.datastructures import mesh_weld
 
+from compas_tno.diagrams.arrays import form_from_arrays
+
 
 def create_cross_form(cls, xy_span=[[0.0, 10.0], [0.0, 10.0]], discretisation=10, fix='corners'):
     """Construct a FormDiagram based on cross discretiastion with orthogonal arrangement and diagonal.
@@ -46,72 +55,29 @@ def create_cross_form(cls, xy_span=[[0.0, 10.0], [0.0, 10.0]], discretisation=10
     dx = x_span/discretisation
     dy = y_span/discretisation
 
-    lines = []
-
-    for i in range(discretisation+1):
-        for j in range(discretisation+1):
-            if i < discretisation and j < discretisation:
-                # Vertical Members:
-                xa = x0 + dx*i
-                ya = y0 + dy*j
-                xb = x0 + dx*(i + 1)
-                yb = y0 + dy*j
-                # Horizontal Members:
-                xc = x0 + dx*i
-                yc = y0 + dy*j
-                xd = x0 + dx*i
-                yd = y0 + dy*(j + 1)
-                lines.append([[xa, ya, 0.0], [xb, yb, 0.0]])
-                lines.append([[xc, yc, 0.0], [xd, yd, 0.0]])
-                if i == j:
-                    # Diagonal Members in + Direction:
-                    xc = x0 + dx*i
-                    yc = y0 + dy*j
-                    xd = x0 + dx*(i + 1)
-                    yd = y0 + dy*(j + 1)
-                    lines.append([[xc, yc, 0.0], [xd, yd, 0.0]])
-                if i + j == discretisation:
-                    # Diagonal Members in - Direction:
-                    xc = x0 + dx*i
-                    yc = y0 + dy*j
-                    xd = x0 + dx*(i - 1)
-                    yd = y0 + dy*(j + 1)
-                    lines.append([[xc, yc, 0.0], [xd, yd, 0.0]])
-                    if i == (discretisation - 1):
-                        xc = x0 + dx*i
-                        yc = y0 + dy*j
-                        xd = x0 + dx*(i + 1)
-                        yd = y0 + dy*(j - 1)
-                        lines.append([[xc, yc, 0.0], [xd, yd, 0.0]])
-            else:
-                if i == discretisation and j < discretisation:
-                    # Vertical Members on last column:
-                    xa = x0 + dx*j
-                    ya = y0 + dy*i
-                    xb = x0 + dx*(j + 1)
-                    yb = y0 + dy*i
-                    # Horizontal Members:
-                    xc = x0 + dx*i
-                    yc = y0 + dy*j
-                    xd = x0 + dx*i
-                    yd = y0 + dy*(j + 1)
-                    lines.append([[xa, ya, 0.0], [xb, yb, 0.0]])
-                    lines.append([[xc, yc, 0.0], [xd, yd, 0.0]])
-
-    mesh = Mesh.from_lines(lines, delete_boundary_face=True)
-    form = cls.from_mesh(mesh)
-    # form = cls.from_lines(lines, delete_boundary_face=True)
-    gkey_key = form.gkey_key()
+    n = discretisation
+    xy, index = _grid_arrays(x0, y0, dx, dy, n, n)
+    a, b, v00, v10, v11, v01 = _grid_cells(index)
+
+    # Diagonal Members in + and - Direction split the cells in triangles
+    plus = a == b
+    minus = a + b == n - 1
+    both = plus & minus
+    single = ~both
+    faces = _split_cells(v00[single], v10[single], v11[single], v01[single], plus[single], minus[single])
+
+    # With odd discretisation both diagonals cross in the central cell
+    if both.any():
+        m = len(xy)
+        xy = vstack([xy, [[x0 + x_span/2, y0 + y_span/2]]])
+        mid = full(both.sum(), m)
+        faces += [column_stack([v00[both], v10[both], mid]), column_stack([v10[both], v11[both], mid]),
+                  column_stack([v11[both], v01[both], mid]), column_stack([v01[both], v00[both], mid])]
 
     if fix == 'corners':
-        form.vertex_attribute(gkey_key[geometric_key([x0, y0, 0.0])], 'is_fixed', True)
-        form.vertex_attribute(gkey_key[geometric_key([x0, y1, 0.0])], 'is_fixed', True)
-        form.vertex_attribute(gkey_key[geometric_key([x1, y0, 0.0])], 'is_fixed', True)
-        form.vertex_attribute(gkey_key[geometric_key([x1, y1, 0.0])], 'is_fixed', True)
+        form = form_from_arrays(cls, xy, faces, fixed=index[[0, 0, n, n], [0, n, 0, n]])
     else:
-        [bnds] = form.vertices_on_boundaries()
-        for key in bnds:
-            form.vertex_attribute(key, 'is_fixed', True)
+        form = form_from_arrays(cls, xy, faces, fixed=_grid_boundary(index))
         form = form.delete_boundary_edges()  # Check if this should be here, or explicit
 
     return form
@@ -152,113 +118,67 @@ def create_cross_diagonal(cls, xy_span=[[0.0, 10.0], [0.0, 10.0]], partial_braci
     xc0 = x0 + x_span/2
     yc0 = y0 + y_span/2
 
-    nx = ny = int(discretisation/2)
+    nx = int(discretisation/2)
     if partial_bracing_modules is None:
         nstop = 0
     else:
         nstop = nx - partial_bracing_modules  # Test to stop
 
-    line_hor = [[x0, yc0, 0.0], [xc0, yc0, 0.0]]
-    line_ver = [[xc0, y0, 0.0], [xc0, yc0, 0.0]]
-    origin = [xc0, yc0, 0.0]
-
-    lines = []
-
-    for i in range(nx):
-        for j in range(ny+1):
-            if j <= i:
-                if i >= nstop and j >= nstop:
-                    # Diagonal Members:
-                    xa = x0 + dx * i
-                    ya = y0 + dy * 1 * (i - j) / (nx - j) + dy * j
-                    xb = x0 + dx * (i + 1)
-                    yb = y0 + dy * 1 * (i - j + 1) / (nx - j) + dy * j
-                    lin = [[xa, ya, 0.0], [xb, yb, 0.0]]
-                    lines = mirror_8x(lin, origin, line_hor, line_ver, lines)
-
-                if i == j and i < nx - 1:
-                    # Main diagonal:
-                    xa = x0 + dx*i
-                    ya = y0 + dy*j
-                    xb = x0 + dx*(i + 1)
-                    yb = y0 + dy*(j + 1)
-                    lin = [[xa, ya, 0.0], [xb, yb, 0.0]]
-                    lines = mirror_4x(lin, line_hor, line_ver, lines)
-
-                # Horizontal Members:
-                xa = x0 + dx*i
-                ya = y0 + dy*j
-                xb = x0 + dx*(i + 1)
-                yb = y0 + dy*j
-                lin = [[xa, ya, 0.0], [xb, yb, 0.0]]
-                lines = mirror_8x(lin, origin, line_hor, line_ver, lines)
-
-                i += 1
-                # Vertical Members:
-                xa = x0 + dx*i
-                ya = y0 + dy*j
-                xb = x0 + dx*i
-                yb = y0 + dy*(j + 1)
-
-                if i >= nstop and j >= nstop:
-                    x_ = xa
-                    y_ = y0 + dy * 1 * (i - j) / (nx - j) + dy * j
-                    lin = [[xa, ya, 0.0], [x_, y_, 0.0]]
-                    lines = mirror_8x(lin, origin, line_hor, line_ver, lines)
-                    lin = [[x_, y_, 0.0], [xb, yb, 0.0]]
-                    lines = mirror_8x(lin, origin, line_hor, line_ver, lines)
+    # Lower left quadrant: grid (a, b) and the points where the fans from the diagonal cross the verticals (a, j) below the diagonal
+    # and the horizontals (j, a) above it. Each fan j goes from the diagonal (j, j) to the vertical axis at (nx, j + 1).
+    xy, index = _grid_arrays(x0, y0, dx, dy, nx, nx)
+    xy = xy.tolist()
+    fans_lower = full((nx + 1, nx + 1), -1)
+    fans_upper = full((nx + 1, nx + 1), -1)
+    for a in range(max(nstop, 1), nx):
+        for j in range(max(nstop, 0), a):
+            t = 1 * (a - j) / (nx - j)
+            fans_lower[a, j] = len(xy)
+            xy.append([x0 + dx * a, y0 + dy * t + dy * j])
+            fans_upper[a, j] = len(xy)
+            xy.append([x0 + dx * t + dx * j, y0 + dy * a])
+
+    # Faces below the diagonal and their reflection above it (with the grid transposed)
+    faces = []
+    for grid, fans in [(index, fans_lower), (index.T, fans_upper)]:
+        for a in range(nx):
+            # Cells split by the fans
+            for b in range(a):
+                has_fan = b >= nstop
+                if has_fan and a + 1 < nx:
+                    faces.append([grid[a, b], grid[a + 1, b], fans[a + 1, b], fans[a, b]])
+                    faces.append([fans[a, b], fans[a + 1, b], grid[a + 1, b + 1], grid[a, b + 1]])
+                elif has_fan:
+                    faces.append([grid[a, b], grid[a + 1, b], grid[a + 1, b + 1], fans[a, b]])
+                    faces.append([fans[a, b], grid[a + 1, b + 1], grid[a, b + 1]])
                 else:
-                    lin = [[xa, ya, 0.0], [xb, yb, 0.0]]
-                    lines = mirror_8x(lin, origin, line_hor, line_ver, lines)
-
-                i -= 1
-
-    mesh = Mesh.from_lines(lines, delete_boundary_face=True)
-    # compas.datastructures.mesh_delete_duplicate_vertices
-    from compas.datastructures import mesh_delete_duplicate_vertices
-    mesh_delete_duplicate_vertices(mesh)
-    form = cls.from_mesh(mesh)
-    # form = cls.from_lines(lines, delete_boundary_face=True)
-    gkey_key = form.gkey_key()
+                    faces.append([grid[a, b], grid[a + 1, b], grid[a + 1, b + 1], grid[a, b + 1]])
+            # Cells on the diagonal split by the first segment of the fan
+            if a >= nstop and a + 1 < nx:
+                faces.append([grid[a, a], grid[a + 1, a], fans[a + 1, a]])
+                faces.append([grid[a, a], fans[a + 1, a], grid[a + 1, a + 1]])
+            elif a >= nstop or a + 1 < nx:
+                faces.append([grid[a, a], grid[a + 1, a], grid[a + 1, a + 1]])
+            elif grid is index:
+                # Without the last fan the main diagonal stops before the center
+                faces.append([index[a, a], index[a + 1, a], index[a + 1, a + 1], index[a, a + 1]])
+
+    on_ver = zeros(len(xy), dtype=bool)
+    on_hor = zeros(len(xy), dtype=bool)
+    on_ver[index[nx]] = True
+    on_hor[index[:, nx]] = True
+    faces = [array([face for face in faces if len(face) == size]) for size in (3, 4)]
+    xy, faces, images = _mirror_quadrant(array(xy), faces, on_ver, on_hor, xc0, yc0)
 
     if fix == 'corners':
-        form.vertex_attribute(gkey_key[geometric_key([x0, y0, 0.0])], 'is_fixed', True)
-        form.vertex_attribute(gkey_key[geometric_key([x0, y1, 0.0])], 'is_fixed', True)
-        form.vertex_attribute(gkey_key[geometric_key([x1, y0, 0.0])], 'is_fixed', True)
-        form.vertex_attribute(gkey_key[geometric_key([x1, y1, 0.0])], 'is_fixed', True)
+        form = form_from_arrays(cls, xy, faces, fixed=images[:, index[0, 0]])
     else:
-        [bnds] = form.vertices_on_boundaries()
-        for key in bnds:
-            form.vertex_attribute(key, 'is_fixed', True)
+        form = form_from_arrays(cls, xy, faces, fixed=images[:, concatenate([index[:, 0], index[0, 1:]])])
         form.delete_boundary_edges()
 
     return form
 
 
-def mirror_4x(line, line_hor, line_ver, lines):
-    """ Helper to mirror an object 4 times."""
-
-    lines.append(line)
-    a_mirror, b_mirror = mirror_points_line(line, line_hor)
-    lines.append([a_mirror, b_mirror])
-    a_mirror, b_mirror = mirror_points_line([a_mirror, b_mirror], line_ver)
-    lines.append([a_mirror, b_mirror])
-    a_mirror, b_mirror = mirror_points_line(line, line_ver)
-    lines.append([a_mirror, b_mirror])
-
-    return lines
-
-
-def mirror_8x(line, origin, line_hor, line_ver, lines):
-    """ Helper to mirror an object 8 times."""
-
-    lines = mirror_4x(line, line_hor, line_ver, lines)
-    rot = rotate_points_xy(line, math.pi/2, origin=origin)
-    lines = mirror_4x(rot, line_hor, line_ver, lines)
-
-    return lines
-
-
 def append_mirrored_lines(line, list_, line_hor, line_ver):
     """ Helper to mirror an object 8 times and add to the list"""
     mirror_a = mirror_points_line(line, line_hor)
@@ -299,73 +219,18 @@ def create_cross_with_diagonal(cls, xy_span=[[0.0, 10.0], [0.0, 10.0]], discreti
     dx = x_span/discretisation
     dy = y_span/discretisation
 
-    lines = []
+    n = discretisation
+    xy, index = _grid_arrays(x0, y0, dx, dy, n, n)
+    a, b, v00, v10, v11, v01 = _grid_cells(index)
 
-    for i in range(discretisation+1):
-        for j in range(discretisation+1):
-            if i < discretisation and j < discretisation:
-                # Hor Members:
-                xa = x0 + dx*i
-                ya = y0 + dy*j
-                xb = x0 + dx*(i + 1)
-                yb = y0 + dy*j
-                # Ver Members:
-                xc = x0 + dx*i
-                yc = y0 + dy*j
-                xd = x0 + dx*i
-                yd = y0 + dy*(j + 1)
-                lines.append([[xa, ya, 0.0], [xb, yb, 0.0]])
-                lines.append([[xc, yc, 0.0], [xd, yd, 0.0]])
-                # lines.append([[xc, yc, 0.0], [xd, yd, 0.0]])
-                if (i < discretisation/2 and j < discretisation/2) or (i >= discretisation/2 and j >= discretisation/2):
-                    # Diagonal Members in + Direction:
-                    xc = x0 + dx*i
-                    yc = y0 + dy*j
-                    xd = x0 + dx*(i + 1)
-                    yd = y0 + dy*(j + 1)
-                    lines.append([[xc, yc, 0.0], [xd, yd, 0.0]])
-                else:
-                    # Diagonal Members in - Direction:
-                    xc = x0 + dx*i
-                    yc = y0 + dy*(j + 1)
-                    xd = x0 + dx*(i + 1)
-                    yd = y0 + dy*j
-                    lines.append([[xc, yc, 0.0], [xd, yd, 0.0]])
-                    # if i == (discretisation - 1):
-                    #     xc = x0 + dx*i
-                    #     yc = y0 + dy*j
-                    #     xd = x0 + dx*(i + 1)
-                    #     yd = y0 + dy*(j - 1)
-                    #     lines.append([[xc, yc, 0.0], [xd, yd, 0.0]])
-            else:
-                if i == discretisation and j < discretisation:
-                    # Vertical Members on last column:
-                    xa = x0 + dx*j
-                    ya = y0 + dy*i
-                    xb = x0 + dx*(j + 1)
-                    yb = y0 + dy*i
-                    # Horizontal Members:
-                    xc = x0 + dx*i
-                    yc = y0 + dy*j
-                    xd = x0 + dx*i
-                    yd = y0 + dy*(j + 1)
-                    lines.append([[xa, ya, 0.0], [xb, yb, 0.0]])
-                    lines.append([[xc, yc, 0.0], [xd, yd, 0.0]])
-
-    mesh = Mesh.from_lines(lines, delete_boundary_face=True)
-    form = cls.from_mesh(mesh)
-    # form = cls.from_lines(lines, delete_boundary_face=True)
-    gkey_key = form.gkey_key()
+    # Diagonal Members in + Direction in the quadrants of the main diagonal and in - Direction in the others
+    plus = ((a < n/2) & (b < n/2)) | ((a >= n/2) & (b >= n/2))
+    faces = _split_cells(v00, v10, v11, v01, plus, ~plus)
 
     if fix == 'corners':
-        form.vertex_attribute(gkey_key[geometric_key([x0, y0, 0.0])], 'is_fixed', True)
-        form.vertex_attribute(gkey_key[geometric_key([x0, y1, 0.0])], 'is_fixed', True)
-        form.vertex_attribute(gkey_key[geometric_key([x1, y0, 0.0])], 'is_fixed', True)
-        form.vertex_attribute(gkey_key[geometric_key([x1, y1, 0.0])], 'is_fixed', True)
+        form = form_from_arrays(cls, xy, faces, fixed=index[[0, 0, n, n], [0, n, 0, n]])
     else:
-        [bnds] = form.vertices_on_boundaries()
-        for key in bnds:
-            form.vertex_attribute(key, 'is_fixed', True)
+        form = form_from_arrays(cls, xy, faces, fixed=_grid_boundary(index))
         form = form.delete_boundary_edges()  # Check if this should be here, or explicit
 
     return form
@@ -394,6 +259,9 @@ def create_fan_form(cls, xy_span=[[0.0, 10.0], [0.0, 10.0]], discretisation=[10,
     if discretisation[0] % 2 != 0 or discretisation[1] % 2 != 0:
         msg = "Warning!: discretisation of this form diagram has to be even."
         raise ValueError(msg)
+    if discretisation[0] != discretisation[1]:
+        msg = "Warning!: discretisation of this form diagram has to be the same in x and y."
+        raise ValueError(msg)
 
     y1 = float(xy_span[1][1])
     y0 = float(xy_span[1][0])
@@ -409,82 +277,37 @@ def create_fan_form(cls, xy_span=[[0.0, 10.0], [0.0, 10.0]], discretisation=[10,
     dx = float(x_span/division_x)
     dy = float(y_span/division_y)
     nx = int(division_x/2)
-    ny = int(division_y/2)
-    line_hor = [[x0, yc0, 0.0], [xc0, yc0, 0.0]]
-    line_ver = [[xc0, y0, 0.0], [xc0, yc0, 0.0]]
 
-    lines = []
+    # Lower left quadrant: the corner (0), the fan of the corner to the vertical axis (lower) and to the horizontal axis (upper)
+    i, j = meshgrid(arange(1, nx + 1), arange(nx + 1), indexing='ij')
+    lower = zeros((nx + 1, nx + 1), dtype=int)
+    upper = zeros((nx + 1, nx + 1), dtype=int)
+    lower[1:] = 1 + (i - 1) * (nx + 1) + j
+    upper[1:, :nx] = 1 + nx * (nx + 1) + (i[:, :nx] - 1) * nx + j[:, :nx]
+    upper[:, nx] = lower[:, nx]
+
+    xy = empty((1 + nx * (2 * nx + 1), 2))
+    xy[0] = x0, y0
+    xy[lower[1:], 0] = x0 + dx * i
+    xy[lower[1:], 1] = y0 + dy * j * i / nx
+    xy[upper[1:, :nx], 0] = x0 + dx * j[:, :nx] * i[:, :nx] / nx
+    xy[upper[1:, :nx], 1] = y0 + dy * i[:, :nx]
 
-    for i in range(nx):
-        for j in range(ny+1):
-            # Diagonal Members:
-            xa = x0 + dx * i
-            ya = y0 + dy * j * i / nx
-            xb = x0 + dx * (i + 1)
-            yb = y0 + dy * j * (i + 1) / nx
-            lines.append([[xa, ya, 0.0], [xb, yb, 0.0]])
+    faces = []
+    for fan in [lower, upper]:
+        faces.append(column_stack([fan[0, :-1], fan[1, :-1], fan[1, 1:]]))
+        faces.append(column_stack([fan[1:-1, :-1].ravel(), fan[2:, :-1].ravel(), fan[2:, 1:].ravel(), fan[1:-1, 1:].ravel()]))
 
-            a_mirror, b_mirror = mirror_points_line([[xa, ya, 0.0], [xb, yb, 0.0]], line_hor)
-            lines.append([a_mirror, b_mirror])
-            a_mirror, b_mirror = mirror_points_line([a_mirror, b_mirror], line_ver)
-            lines.append([a_mirror, b_mirror])
-            a_mirror, b_mirror = mirror_points_line([[xa, ya, 0.0], [xb, yb, 0.0]], line_ver)
-            lines.append([a_mirror, b_mirror])
-
-            xa_ = x0 + dx * j * i / nx
-            ya_ = y0 + dy * i
-            xb_ = x0 + dx * j * (i + 1) / nx
-            yb_ = y0 + dy * (i + 1)
-            lines.append([[xa_, ya_, 0.0], [xb_, yb_, 0.0]])
-
-            a_mirror, b_mirror = mirror_points_line([[xa_, ya_, 0.0], [xb_, yb_, 0.0]], line_hor)
-            lines.append([a_mirror, b_mirror])
-            a_mirror, b_mirror = mirror_points_line([a_mirror, b_mirror], line_ver)
-            lines.append([a_mirror, b_mirror])
-            a_mirror, b_mirror = mirror_points_line([[xa_, ya_, 0.0], [xb_, yb_, 0.0]], line_ver)
-            lines.append([a_mirror, b_mirror])
-
-            if j < ny:
-                # Vertical or Horizontal Members:
-                xc = x0 + dx * (i + 1)
-                yc = y0 + dy * j * (i + 1) / nx
-                xd = x0 + dx * (i + 1)
-                yd = y0 + dy * (j + 1) * (i + 1) / nx
-                lines.append([[xc, yc, 0.0], [xd, yd, 0.0]])
-
-                c_mirror, d_mirror = mirror_points_line([[xc, yc, 0.0], [xd, yd, 0.0]], line_hor)
-                lines.append([c_mirror, d_mirror])
-                c_mirror, d_mirror = mirror_points_line([c_mirror, d_mirror], line_ver)
-                lines.append([c_mirror, d_mirror])
-                c_mirror, d_mirror = mirror_points_line([[xc, yc, 0.0], [xd, yd, 0.0]], line_ver)
-                lines.append([c_mirror, d_mirror])
-
-                xc_ = x0 + dx * j * (i + 1) / nx
-                yc_ = y0 + dy * (i + 1)
-                xd_ = x0 + dx * (j + 1) * (i + 1) / nx
-                yd_ = y0 + dy * (i + 1)
-                lines.append([[xc_, yc_, 0.0], [xd_, yd_, 0.0]])
-
-                c_mirror, d_mirror = mirror_points_line([[xc_, yc_, 0.0], [xd_, yd_, 0.0]], line_hor)
-                lines.append([c_mirror, d_mirror])
-                c_mirror, d_mirror = mirror_points_line([c_mirror, d_mirror], line_ver)
-                lines.append([c_mirror, d_mirror])
-                c_mirror, d_mirror = mirror_points_line([[xc_, yc_, 0.0], [xd_, yd_, 0.0]], line_ver)
-                lines.append([c_mirror, d_mirror])
-
-    form = cls.from_lines(lines)
-
-    gkey_key = form.gkey_key()
+    on_ver = zeros(len(xy), dtype=bool)
+    on_hor = zeros(len(xy), dtype=bool)
+    on_ver[lower[nx]] = True
+    on_hor[upper[nx]] = True
+    xy, faces, images = _mirror_quadrant(xy, faces, on_ver, on_hor, xc0, yc0)
 
     if fix == 'corners':
-        form.vertex_attribute(gkey_key[geometric_key([x0, y0, 0.0])], 'is_fixed', True)
-        form.vertex_attribute(gkey_key[geometric_key([x0, y1, 0.0])], 'is_fixed', True)
-        form.vertex_attribute(gkey_key[geometric_key([x1, y0, 0.0])], 'is_fixed', True)
-        form.vertex_attribute(gkey_key[geometric_key([x1, y1, 0.0])], 'is_fixed', True)
+        form = form_from_arrays(cls, xy, faces, fixed=images[:, 0])
     else:
-        [bnds] = form.vertices_on_boundaries()
-        for key in bnds:
-            form.vertex_attribute(key, 'is_fixed', True)
+        form = form_from_arrays(cls, xy, faces, fixed=images[:, concatenate([[0], lower[1:, 0], upper[1:, 0]])])
         form.delete_boundary_edges()
 
         # Recreate the mesh helps to avoid problems in the future
@@ -539,37 +362,14 @@ def create_ortho_form(cls, xy_span=[[0.0, 10.0], [0.0, 10.0]], discretisation=[1
     dx = float(x_span/division_x)
     dy = float(y_span/division_y)
 
-    vertices = []
-    faces = []
-
-    for j in range(division_y+1):
-        for i in range(division_x+1):
-            xi = x0 + dx*i
-            yi = y0 + dy*j
-            vertices.append([xi, yi, 0.0])
-            if i < division_x and j < division_y:
-                p1 = j * (division_x + 1) + i
-                p2 = j * (division_x + 1) + i + 1
-                p3 = (j + 1) * (division_x + 1) + i + 1
-                p4 = (j + 1) * (division_x + 1) + i
-                face = [p1, p2, p3, p4, p1]
-                faces.append(face)
-                print(face)
-
-    mesh = Mesh.from_vertices_and_faces(vertices, faces)
-
-    form = cls.from_mesh(mesh)
-    gkey_key = form.gkey_key()
+    xy, index = _grid_arrays(x0, y0, dx, dy, division_x, division_y)
+    a, b, v00, v10, v11, v01 = _grid_cells(index)
+    faces = [column_stack([v00, v10, v11, v01])]
 
     if fix == 'corners':
-        form.vertex_attribute(gkey_key[geometric_key([x0, y0, 0.0])], 'is_fixed', True)
-        form.vertex_attribute(gkey_key[geometric_key([x0, y1, 0.0])], 'is_fixed', True)
-        form.vertex_attribute(gkey_key[geometric_key([x1, y0, 0.0])], 'is_fixed', True)
-        form.vertex_attribute(gkey_key[geometric_key([x1, y1, 0.0])], 'is_fixed', True)
+        form = form_from_arrays(cls, xy, faces, fixed=index[[0, 0, -1, -1], [0, -1, 0, -1]])
     else:
-        [bnds] = form.vertices_on_boundaries()
-        for key in bnds:
-            form.vertex_attribute(key, 'is_fixed', True)
+        form = form_from_arrays(cls, xy, faces, fixed=_grid_boundary(index))
 
         for edge in form.edges_on_boundary():
             form.edge_attribute(edge, '_is_edge', False)
@@ -779,3 +579,67 @@ def create_delta_form(cls, xy_span=[[0.0, 10.0], [0.0, 10.0]], discretisation=10
     slide_pattern_inwards(form, delta=delta)
 
     return form
+
+
+def _grid_arrays(x0, y0, dx, dy, nx, ny):
+    """Plan coordinates of the vertices of a grid and array (nx + 1 x ny + 1) with their indices, numbered first along x."""
+
+    i, j = meshgrid(arange(nx + 1), arange(ny + 1), indexing='ij')
+    index = j * (nx + 1) + i
+    xy = empty(((nx + 1) * (ny + 1), 2))
+    xy[index, 0] = x0 + dx * i
+    xy[index, 1] = y0 + dy * j
+
+    return xy, index
+
+
+def _grid_cells(index):
+    """Columns, rows and indices of the corners (0, 0), (1, 0), (1, 1) and (0, 1) of the cells of a grid, numbered first along x."""
+
+    a, b = [v.ravel() for v in meshgrid(arange(index.shape[0] - 1), arange(index.shape[1] - 1), indexing='xy')]
+
+    return a, b, index[a, b], index[a + 1, b], index[a + 1, b + 1], index[a, b + 1]
+
+
+def _grid_boundary(index):
+    """Indices of the vertices on the boundary of a grid."""
+
+    return concatenate([index[:, 0], index[:, -1], index[0, 1:-1], index[-1, 1:-1]])
+
+
+def _split_cells(v00, v10, v11, v01, plus, minus):
+    """Faces of the cells of a grid, split in triangles by the diagonal in + direction in ``plus`` and in - direction in ``minus``."""
+
+    quad = ~plus & ~minus
+
+    return [column_stack([v00, v10, v11, v01])[quad],
+            column_stack([v00, v10, v11])[plus], column_stack([v00, v11, v01])[plus],
+            column_stack([v00, v10, v01])[minus], column_stack([v10, v11, v01])[minus]]
+
+
+def _mirror_quadrant(xy, faces, on_ver, on_hor, xc, yc):
+    """Mirror the vertices and faces of the lower left quadrant of a diagram on the axis ``x = xc`` and ``y = yc``.
+
+    The vertices on the vertical axis (``on_ver``) and on the horizontal axis (``on_hor``) are shared with the mirrored quadrants.
+    Returns the plan coordinates and faces of the diagram, and the array (4 x n) with the index of each vertex of the quadrant in the four quadrants.
+    """
+
+    n = len(xy)
+    images = empty((4, n), dtype=int)
+    images[0] = arange(n)
+    images[1] = images[2] = images[3] = images[0]
+    images[1, ~on_ver] = arange(n, 2 * n - on_ver.sum())
+    images[2, ~on_hor] = arange(images[1].max() + 1, images[1].max() + 1 + n - on_hor.sum())
+    images[3, on_ver] = images[2, on_ver]
+    images[3, on_hor] = images[1, on_hor]
+    inner = ~on_ver & ~on_hor
+    images[3, inner] = arange(images[2].max() + 1, images[2].max() + 1 + inner.sum())
+
+    x, y = xy[:, 0], xy[:, 1]
+    mirrored = empty((images[3].max() + 1, 2))
+    mirrored[images[3]] = column_stack([2 * xc - x, 2 * yc - y])
+    mirrored[images[2]] = column_stack([x, 2 * yc - y])
+    mirrored[images[1]] = column_stack([2 * xc - x, y])
+    mirrored[images[0]] = xy
+
+    return mirrored, [image[face] for image in images for face in faces], images
@@ -17,7 +17,6 @@ from compas_tno.diagrams.diagram_rectangular import create_delta_form
 
 from compas_tna.diagrams import FormDiagram
 
-from compas.geometry import Point
 
 import math
 
@@ -706,6 +705,7 @@ class FormDiagram(FormDiagram):
 
     def store_indset(self, edges=None):
         """Store the indset with the information about the independent edges (used within algorithms)
+        The indset is the list of the coordinates ``[x, y]`` of the midpoints of the independent edges.
 
         Parameters
         ----------
@@ -720,7 +720,7 @@ class FormDiagram(FormDiagram):
 
         points = []
         for edge in edges:
-            points.append(Point(*(self.edge_midpoint(*edge)[:2] + [0])))
+            points.append(self.edge_midpoint(*edge)[:2])
 
         self.attributes['indset'] = points
 
@@ -774,7 +774,7 @@ class FormDiagram(FormDiagram):
         Parameters
         ----------
         sparse : bool, optional
-            If the matrices should be returned as sparse matrices (see ``scipy.linalg.sparse``), by default False
+            If the matrices should be returned as sparse matrices in CSR format (see ``scipy.sparse``), by default False
 
         Returns
         -------
@@ -788,8 +788,8 @@ class FormDiagram(FormDiagram):
             Mark the influence of the centroid points the calculation
         """
 
-        from numpy import zeros
-        from numpy import vstack
+        from numpy import ones
+        from scipy.sparse import csr_matrix
 
         n = self.number_of_vertices()
         f = self.number_of_faces()
@@ -797,62 +797,44 @@ class FormDiagram(FormDiagram):
         vertex_index = self.vertex_index()
         face_index = {}
 
-        F = zeros((f, n))
-        V0 = zeros((0, n))
-        V1 = zeros((0, n))
-        V2 = zeros((0, f))
+        F_rows = []
+        F_cols = []
+        F_data = []
 
         for i, fkey in enumerate(self.faces()):
             face_index[fkey] = i
             faceindices = [vertex_index[v] for v in self.face_vertices(fkey)]
             np = float(len(faceindices))
             for j in faceindices:
-                F[i, j] = 1.0/np
+                F_rows.append(i)
+                F_cols.append(j)
+                F_data.append(1.0/np)
+
+        # each half-edge adjacent to a face contributes with one row g to V0, V1 and V2
+        V0_cols = []
+        V1_cols = []
+        V2_cols = []
 
-        ig = 0
         for key in self.vertices():
             i = vertex_index[key]
-            v0i = zeros((1, n))
-            v0i[0, i] = 1.0
-
             for nbr in self.halfedge[key]:
                 j = vertex_index[nbr]
+                for fkey in [self.halfedge[key][nbr], self.halfedge[nbr][key]]:
+                    if fkey is not None:
+                        V0_cols.append(i)
+                        V1_cols.append(j)
+                        V2_cols.append(face_index[fkey])
 
-                fkey = self.halfedge[key][nbr]
-                if fkey is not None:
-                    findex = face_index[fkey]
-                    facekeys = self.face_vertices(fkey)
-                    faceindices = [vertex_index[v] for v in facekeys]
-
-                    v1i = zeros((1, n))
-                    v1i[0, j] = 1.0
-                    V1 = vstack([V1, v1i])
-
-                    v2i = zeros((1, f))
-                    v2i[0, findex] = 1.0
-                    V2 = vstack([V2, v2i])
-
-                    V0 = vstack([V0, v0i])
-
-                    ig += 1
+        g = len(V0_cols)
+        rows = list(range(g))
 
-                fkey = self.halfedge[nbr][key]
-                if fkey is not None:
-                    findex = face_index[fkey]
-                    facekeys = self.face_vertices(fkey)
-                    faceindices = [vertex_index[v] for v in facekeys]
-
-                    v1i = zeros((1, n))
-                    v1i[0, j] = 1.0
-                    V1 = vstack([V1, v1i])
+        F = csr_matrix((F_data, (F_rows, F_cols)), shape=(f, n))
+        V0 = csr_matrix((ones(g), (rows, V0_cols)), shape=(g, n))
+        V1 = csr_matrix((ones(g), (rows, V1_cols)), shape=(g, n))
+        V2 = csr_matrix((ones(g), (rows, V2_cols)), shape=(g, f))
 
-                    v2i = zeros((1, f))
-                    v2i[0, findex] = 1.0
-                    V2 = vstack([V2, v2i])
-
-                    V0 = vstack([V0, v0i])
-
-                    ig += 1
+        if not sparse:
+            F, V0, V1, V2 = F.toarray(), V0.toarray(), V1.toarray(), V2.toarray()
 
         return F, V0, V1, V2
 
@@ -1129,21 +1111,15 @@ class FormDiagram(FormDiagram):
     def build_symmetry_map(self):
         """Build the dictionary mapsym (i -> j) that associate one edge j per group of symmetry i."""
 
+        first = {}
+        for j, (u, v) in enumerate(self.edges()):
+            first.setdefault(self.edge_attribute((u, v), 'sym_key'), j)
+
         mapsym = {}
 
         i = 0
-        while True:
-            j = 0
-            has_i_sym = False
-            for u, v in self.edges():
-                i_sym = self.edge_attribute((u, v), 'sym_key')
-                if i_sym == i:
-                    mapsym[i] = j
-                    has_i_sym = True
-                    break
-                j += 1
-            if has_i_sym is False:
-                break
+        while i in first:
+            mapsym[i] = first[i]
             i += 1
 
         return mapsym
@@ -33,7 +33,7 @@ class Optimiser(Datastructure):
     --------
     The main settings and default values are shown below:
 
-    *  'library'           : ['Scipy', 'MATLAB', 'MMA', 'IPOPT', 'Scipy', ...]
+    *  'library'           : ['Scipy', 'MATLAB', 'MMA', 'IPOPT', 'NLOPT', ...]
     *  'solver'            : ['SLSQP', 'IPOPT', 'MMA', ...],
     *  'objective'         : ['min', 'max', 't', 'loadpath', 'bestfit', ...],
     *  'constraints'       : ['funicular', 'envelope', 'reac_bounds', ...],
@@ -50,6 +50,9 @@ class Optimiser(Datastructure):
     *  'max_iter'          : 500,
     *  'qmin'              : -1e+4,
     *  'qmax'              : 1e-8,
+    *  'factorization'     : ['lu', 'cholesky'],
+    *  'nullspace'         : ['pinv', 'sparse'],
+    *  'setup_cache'       : [None, True, path, SetupCache],
 
 
     """
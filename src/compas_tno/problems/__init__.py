@@ -12,6 +12,7 @@ Classes
     :toctree: generated/
 
     Problem
+    SetupCache
 
 Initialisation
 ==============
@@ -82,6 +83,7 @@ Gradients
 
     d_fobj
     compute_dQ
+    adjoint_sensitivities
     gradient_feasibility
     gradient_reduce_thk
     gradient_tight_crosssection
@@ -102,6 +104,10 @@ Jacobian
 
     d_fconstr
     sensitivities_wrapper
+    sensitivities_wrapper_sparse
+    sensitivities_operator
+    jacobian_structure
+    jacobian_values
 
 Proxy
 =====
@@ -119,6 +125,9 @@ Callbacks
 .. autosummary::
     :toctree: generated/
 
+    IterationRecorder
+    read_iterations
+    iteration_problem
     callback_save_json
     callback_create_json
     save_geometry_at_iterations
@@ -139,6 +148,7 @@ from .constraints import (
 from .derivatives import (
     d_fobj,
     compute_dQ,
+    adjoint_sensitivities,
     gradient_feasibility,
     gradient_reduce_thk,
     gradient_tight_crosssection,
@@ -154,7 +164,11 @@ from .derivatives import (
 
 from .jacobian import (
     d_fconstr,
-    sensitivities_wrapper
+    sensitivities_wrapper,
+    sensitivities_wrapper_sparse,
+    sensitivities_operator,
+    jacobian_structure,
+    jacobian_values
 )
 
 from .objectives import (
@@ -172,6 +186,10 @@ from .objectives import (
     f_tight_crosssection,
 )
 
+from .setup_cache import (
+    SetupCache
+)
+
 from .problems import (
     Problem,
     initialise_form,
@@ -183,6 +201,9 @@ from .problems import (
 )
 
 from .callbacks import (
+    IterationRecorder,
+    read_iterations,
+    iteration_problem,
     callback_save_json,
     callback_create_json,
     save_geometry_at_iterations
@@ -217,6 +238,7 @@ __all__ = [
 
     'd_fobj',
     'compute_dQ',
+    'adjoint_sensitivities',
     'gradient_feasibility',
     'gradient_reduce_thk',
     'gradient_tight_crosssection',
@@ -231,6 +253,10 @@ __all__ = [
 
     'd_fconstr',
     'sensitivities_wrapper',
+    'sensitivities_wrapper_sparse',
+    'sensitivities_operator',
+    'jacobian_structure',
+    'jacobian_values',
 
     'objective_selector',
     'f_min_thrust',
@@ -246,6 +272,7 @@ __all__ = [
     'f_tight_crosssection',
 
     'Problem',
+    'SetupCache',
     'initialise_form',
     'initialise_problem_general',
     'adapt_problem_to_fixed_diagram',
@@ -253,6 +280,9 @@ __all__ = [
     'adapt_problem_to_sym_and_fixed_diagram',
     'apply_sym_to_form',
 
+    'IterationRecorder',
+    'read_iterations',
+    'iteration_problem',
     'callback_save_json',
     'callback_create_json',
     'save_geometry_at_iterations',
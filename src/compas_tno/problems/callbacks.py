@@ -1,6 +1,13 @@
 import json
+import os
+import struct
 import compas_tno
+from copy import copy
 from numpy import array
+from numpy import asarray
+from numpy import empty
+from numpy import float64
+from numpy import memmap
 
 from compas_tno.algorithms import xyz_from_xopt
 from compas_tno.algorithms import reciprocal_from_form
@@ -42,9 +49,146 @@ def callback_create_json():
     return
 
 
+class IterationRecorder(object):
+    """Append-only binary log of the iterations of an optimisation, to use as the callback of the solvers.
+
+    Each call appends one record with the objective function, the constraint violation and the variables in ``float64``,
+    so that the cost of recording an iteration does not depend on the number of iterations recorded.
+    The log is read with :func:`read_iterations`.
+
+    Parameters
+    ----------
+    filename : str, optional
+        Path of the log, by default None, in which ``iterations.bin`` in the ``compas_tno`` data folder is used.
+    problem : :class:`~compas_tno.problems.Problem`, optional
+        The problem in which the objective and the constraints are evaluated, by default None.
+    fobj : callable, optional
+        The objective function ``fobj(x, problem)``, by default None, in which ``nan`` is recorded.
+    fconstr : callable, optional
+        The constraints ``fconstr(x, problem)``, positive if satisfied, by default None, in which ``nan`` is recorded.
+
+    Attributes
+    ----------
+    filename : str
+        Path of the log.
+    nvar : int
+        Number of variables, set in the first record.
+    iterations : int
+        Number of iterations recorded.
+
+    """
+
+    header = b'TNOITER1'
+
+    def __init__(self, filename=None, problem=None, fobj=None, fconstr=None):
+        self.filename = filename or compas_tno.get('iterations.bin')
+        self.problem = problem
+        self.fobj = fobj
+        self.fconstr = fconstr
+        self.nvar = None
+        self.iterations = 0
+
+        with open(self.filename, mode='wb'):
+            pass
+
+    def __call__(self, xopt, *args, **kwargs):
+        """Append the variables of one iteration to the log.
+
+        Parameters
+        ----------
+        xopt : array
+            The variables in one iteration of the optimisation
+        """
+
+        x = asarray(xopt, dtype=float64).flatten()
+        record = empty(len(x) + 2, dtype=float64)
+        record[0] = float(self.fobj(x, self.problem)) if self.fobj else float('nan')
+        record[1] = max(0.0, -float(asarray(self.fconstr(x, self.problem)).min())) if self.fconstr else float('nan')
+        record[2:] = x
+
+        with open(self.filename, mode='ab') as f:
+            if self.nvar is None:
+                self.nvar = len(x)
+                f.write(self.header + struct.pack('<q', self.nvar))
+            elif len(x) != self.nvar:
+                raise ValueError('Expected {0} variables in the iteration, got: {1}'.format(self.nvar, len(x)))
+            f.write(record.astype('<f8').tobytes())
+
+        self.iterations += 1
+
+        return
+
+
+def read_iterations(filename=None):
+    """Read the log of the iterations written by :class:`IterationRecorder`.
+
+    The records are memory-mapped, not loaded in memory.
+
+    Parameters
+    ----------
+    filename : str, optional
+        Path of the log, by default None, in which ``iterations.bin`` in the ``compas_tno`` data folder is used.
+
+    Returns
+    -------
+    X : array (iterations x nvar)
+        The variables in each iteration.
+    f : array (iterations)
+        The objective function in each iteration.
+    violation : array (iterations)
+        The maximum violation of the constraints in each iteration.
+
+    """
+
+    filename = filename or compas_tno.get('iterations.bin')
+    offset = len(IterationRecorder.header) + 8
+
+    if os.path.getsize(filename) < offset:
+        return empty((0, 0)), empty(0), empty(0)
+
+    with open(filename, mode='rb') as f:
+        if f.read(len(IterationRecorder.header)) != IterationRecorder.header:
+            raise ValueError('Not a log of iterations: {}'.format(filename))
+        nvar = struct.unpack('<q', f.read(8))[0]
+
+    iterations = (os.path.getsize(filename) - offset) // (8 * (nvar + 2))
+    if iterations == 0:
+        return empty((0, nvar)), empty(0), empty(0)
+
+    data = memmap(filename, dtype='<f8', mode='r', offset=offset, shape=(iterations, nvar + 2))
+
+    return data[:, 2:], data[:, 0], data[:, 1]
+
+
+def iteration_problem(M):
+    """Copy of a problem in which the geometry of the iterations can be computed with ``xyz_from_xopt``, without modifying
+    the force densities, coordinates and loads of the problem solved. The matrices are shared with the problem.
+
+    Parameters
+    ----------
+    M : :class:`~compas_tno.problems.Problem`
+        The problem solved.
+
+    Returns
+    -------
+    M : :class:`~compas_tno.problems.Problem`
+        The copy.
+
+    """
+
+    M = copy(M)
+    M.X = M.X.copy()
+    M.P = M.P.copy()
+    M.cache = None
+
+    return M
+
+
 def save_geometry_at_iterations(form, optimiser, force=False):
     """Save the geometry of the form (and force) during iterations of the optimisation. Works only with SLSQP and IPOPT solvers.
 
+    The iterations are read from the log written by :class:`IterationRecorder`.
+
     Parameters
     ----------
     form : :class:`~compas_tno.diagrams.FormDiagram`
@@ -63,9 +207,8 @@ def save_geometry_at_iterations(form, optimiser, force=False):
 
     """
 
-    M = optimiser.M  # matrices of the problem
+    M = iteration_problem(optimiser.M)  # matrices of the problem, the optimum of the problem solved is kept
 
-    file_qs = compas_tno.get('output.json')
     file_Xform = compas_tno.get('Xform.json')
     file_Xforce = None
 
@@ -73,15 +216,12 @@ def save_geometry_at_iterations(form, optimiser, force=False):
         file_Xforce = compas_tno.get('Xforce.json')
         Xforce = {}
 
-    with open(file_qs, mode='r', encoding='utf-8') as f:
-        data = json.load(f)
+    Xiterations = read_iterations(getattr(optimiser.callback, 'filename', None))[0]
 
     Xform = {}
 
-    iterations = len(data['iterations'])
-
-    for i in range(iterations):
-        xopt_i = array(data['iterations'][str(i)]).reshape(-1, 1)
+    for i in range(len(Xiterations)):
+        xopt_i = array(Xiterations[i]).reshape(-1, 1)
         M = xyz_from_xopt(xopt_i, M)
         Xform_i = M.X.tolist()
         Xform[str(i)] = Xform_i
@@ -2,15 +2,10 @@ from numpy import vstack
 from numpy import multiply
 from numpy import divide
 from numpy import zeros
-from scipy.sparse import diags
 
 from compas_tno.problems.bounds_update import ub_lb_update
 from compas_tno.problems.bounds_update import b_update
 
-from compas_tno.algorithms import q_from_variables
-from compas_tno.algorithms import xyz_from_q
-from compas_tno.algorithms import weights_from_xyz
-
 
 def constr_wrapper(variables, M):
     """Wrapper of the constraints assigned.
@@ -31,65 +26,16 @@ def constr_wrapper(variables, M):
     if isinstance(M, list):
         M = M[0]
 
-    k = M.k
-    n = M.n
     nb = M.nb
-    check = k
-    qid = variables[:k].reshape(-1, 1)
-    lambdh = 1.0
-    delta = 0.0
-    thk = M.thk
     t = M.shape.datashape['t']
 
-    if 'xyb' in M.variables:
-        xyb = variables[check:check + 2*nb]
-        check = check + 2*nb
-        M.X[M.fixed, :2] = xyb.reshape(-1, 2, order='F')
-    if 'zb' in M.variables:
-        zb = variables[check: check + nb]
-        check = check + nb
-        M.X[M.fixed, [2]] = zb.flatten()
-    if 't' in M.variables or 'n' in M.variables:
-        thk = variables[check: check + 1]
-        check = check + 1
-    if 'lambdh' in M.variables:
-        lambdh = variables[check: check + 1]
-        M.P[:, [0]] = lambdh * M.px0
-        M.P[:, [1]] = lambdh * M.py0
-        M.d = lambdh * M.d0
-        # M.d[M.dep] = -M.Edinv.dot(vstack([M.P[M.free_x, 0].reshape(-1, 1), M.P[M.free_y, 1].reshape(-1, 1)]))  # make this line shorter
-        check = check + 1
-    if 'lambdv' in M.variables:
-        lambdv = variables[check: check + 1]
-        M.P[:, [2]] = lambdv * M.pzv + M.pz0
-        check = check + 1
-    if 'tub' in M.variables:
-        tub = variables[check: check + n].reshape(-1, 1)
-        M.tub = tub
-        check = check + n
-    if 'tlb' in M.variables:
-        tlb = variables[check: check + n].reshape(-1, 1)
-        M.tlb = tlb
-        check = check + n
-    if 'tub_reac' in M.variables:
-        tub_reac = variables[check: check + 2*nb].reshape(-1, 1)
-        M.tub_reac = tub_reac
-        check = check + 2*nb
-    if 'delta' in M.variables:
-        delta = float(variables[check: check + 1])
-        check = check + 1
-
-    M.q = q_from_variables(qid, M.B, M.d)
-
-    if 'update-loads' in M.features:
-        M.P[:, 2] = -1 * weights_from_xyz(M.X, M.F, M.V0, M.V1, M.V2, thk=M.thk, density=M.ro)
-
-    M.X[M.free] = xyz_from_q(M.q, M.P[M.free], M.X[M.fixed], M.Ci, M.Cit, M.Cb)
-
-    # if 'fixed' in M.features:
-    #     M.X[M.free, 2] = X_free[:, 2]
-    # else:
-    #     M.X[M.free] = X_free
+    cache = M.evaluate_variables(variables)
+
+    thk = cache.thk
+    tub = cache.tub
+    tlb = cache.tlb
+    tub_reac = cache.tub_reac
+    delta = cache.delta
 
     constraints = zeros([0, 1])
 
@@ -134,8 +80,7 @@ def constr_wrapper(variables, M):
         else:
             pass
 
-        CbQC = M.Cb.transpose().dot(diags(M.q.flatten())).dot(M.C)
-        R = CbQC.dot(M.X) - M.P[M.fixed]
+        R = cache.R
         Rx = abs(M.b[:, [0]].reshape(-1, 1)) - multiply(M.X[:, [2]][M.fixed] - M.s[M.fixed], abs(divide(R[:, [0]], R[:, [2]]).reshape(-1, 1)))  # >= 0
         Ry = abs(M.b[:, [1]].reshape(-1, 1)) - multiply(M.X[:, [2]][M.fixed] - M.s[M.fixed], abs(divide(R[:, [1]], R[:, [2]]).reshape(-1, 1)))  # >= 0
 
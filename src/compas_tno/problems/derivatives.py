@@ -13,14 +13,10 @@ from numpy import eye
 from numpy import inner
 from numpy import dstack
 from numpy import array
+from numpy import asarray
 
-from scipy.sparse.linalg import splu
 from scipy.sparse import diags
 
-from compas_tno.algorithms import q_from_variables
-from compas_tno.algorithms import xyz_from_q
-from compas_tno.algorithms import weights_from_xyz
-
 
 def d_fobj(fobj, x0, eps, *args):
     """Gradient approximated by hand using finite differences.
@@ -83,6 +79,48 @@ def compute_dQ(q, ind, dep, Edinv, Ei):
     return dQ, dQdep
 
 
+def adjoint_sensitivities(M, cache, w, coordinate):
+    """Sensitivities of a linear functional ``w^T X[:, coordinate]`` of one coordinate of the vertices, computed with one adjoint solve.
+
+    The coordinates of the free vertices are in equilibrium ``CitQCi Xi = Pi - CitQCb Xb``.
+    Instead of the sensitivities ``dXi/dq`` (one solve for each force density), the adjoint system ``CitQCi lambda = w[free]``
+    is solved with the factorization of the current point, which is symmetric.
+
+    Parameters
+    ----------
+    M : :class:`~compas_tno.problems.Problem`
+        The class with necessary matrices.
+    cache : :class:`~compas_tno.problems.EvaluationCache`
+        The equilibrium state of the current point returned by :meth:`~compas_tno.problems.Problem.evaluate_variables`.
+    w : array (n)
+        Weight of the coordinate of each vertex in the functional.
+    coordinate : int
+        The coordinate, ``0``, ``1`` or ``2`` for ``x``, ``y`` or ``z``.
+
+    Returns
+    -------
+    dq : array (m)
+        Sensitivity of the functional to the force densities of all edges.
+    dXb : array (nb)
+        Sensitivity of the functional to the coordinate of the fixed vertices.
+    """
+
+    w = asarray(w, dtype=float).flatten()
+    UVW = [cache.U, cache.V, cache.W][coordinate]  # diag(C X[:, coordinate])
+
+    lambd = cache.SPLU_D.solve(w[M.free])
+    dq = -1 * (UVW @ (M.Ci @ lambd))
+    dXb = w[M.fixed] - M.Cb.transpose() @ (cache.Q @ (M.Ci @ lambd))
+
+    return asarray(dq).flatten(), asarray(dXb).flatten()
+
+
+def _pullback_q(M, dq):
+    """Sensitivity to the independent force densities ``B^T dq`` from the sensitivity to all force densities."""
+
+    return asarray(M.B.transpose() @ asarray(dq, dtype=float).flatten()).flatten()
+
+
 def deriv_weights_from_matrices(xyz, F, V0, V1, V2, thk=0.5, density=20.0, features=['fixed']):
     """Derivatives of the tributary weights with respect to the position of the nodes based on the assembled sparse matrices linking the topology
 
@@ -227,92 +265,50 @@ def gradient_fmin(variables, M):
     if isinstance(M, list):
         M = M[0]
 
-    n = M.n
-    k = M.k
+    nb = len(M.fixed)
     is_xyb_var = False
     is_zb_var = False
     update_geometry = False
 
-    k = M.k
-    nb = len(M.fixed)
-
     P_Xh_fixed = M.P[M.fixed][:, :2]  # Horizontal loads in the fixed vertices
-    P_free = M.P[M.free]  # Loads in the free vertices
-
-    X = M.X
-    U = diags(M.C @ X[:, 0])  # U = diag(Cx)
-    V = diags(M.C @ X[:, 1])  # V = diag(Cy)
-
-    dxdq = zeros((n, k))
-    dydq = zeros((n, k))
-
-    SPLU_D = None
-
-    qid = variables[:k].reshape(-1, 1)
-    q = q_from_variables(qid, M.B, M.d)
-    Q = diags(q.flatten())
 
     if 'xyb' in M.variables:
-        xyb = variables[k:k + 2*nb]
-        X[M.fixed, :2] = xyb.reshape(-1, 2, order='F')
         is_xyb_var = True
         update_geometry = True
     if 'zb' in M.variables:
-        zb = variables[-nb:]
-        X[M.fixed, 2] = zb.flatten()
         is_zb_var = True
         if 'fixed' not in M.features:
             update_geometry = True
 
-    if update_geometry:
-        if 'update-loads' in M.features:
-            CitQCi = M.Cit @ Q @ M.Ci
-            SPLU_D = splu(CitQCi)
-            X[M.free] = xyz_from_q(q, P_free, X[M.fixed], M.Ci, M.Cit, M.Cb, SPLU_D=SPLU_D)
-            pz = -1 * weights_from_xyz(X, M.F, M.V0, M.V1, M.V2, thk=M.thk, density=M.ro)
-            P_free[:, 2] = pz[M.free]
-
-        X[M.free] = xyz_from_q(q, P_free, X[M.fixed], M.Ci, M.Cit, M.Cb, SPLU_D=SPLU_D)
-        U = diags(M.C @ X[:, 0])  # U = diag(Cx)
-        V = diags(M.C @ X[:, 1])  # V = diag(Cy)
+    cache = M.evaluate_variables(variables)
 
-        if not SPLU_D:
-            CitQCi = M.Cit @ Q @ M.Ci
-            SPLU_D = splu(CitQCi)
-
-        dxidq = SPLU_D.solve((-M.Cit.dot(U)).toarray()).dot(M.B)
-        dxdq = zeros((n, k))
-        dxdq[M.free] = dxidq
-
-        dyidq = SPLU_D.solve((-M.Cit.dot(V)).toarray()).dot(M.B)
-        dydq = zeros((n, k))
-        dydq[M.free] = dyidq
+    q = cache.q
+    Q = cache.Q
+    U = cache.U  # U = diag(Cx)
+    V = cache.V  # V = diag(Cy)
 
     CfU = M.Cb.transpose() @ U
     CfV = M.Cb.transpose() @ V
-    dRxdq = CfU @ M.B + M.Cb.transpose() @ Q @ M.C @ dxdq
-    dRydq = CfV @ M.B + M.Cb.transpose() @ Q @ M.C @ dydq
 
     Rx = (CfU @ q - P_Xh_fixed[:, [0]])  # check this +/- business
     Ry = (CfV @ q - P_Xh_fixed[:, [1]])
     R = norm(hstack([Rx, Ry]), axis=1).reshape(-1, 1)
 
-    Rx_over_R = divide(Rx, R)
-    Ry_over_R = divide(Ry, R)
+    Rx_over_R = divide(Rx, R).flatten()
+    Ry_over_R = divide(Ry, R).flatten()
+
+    # f = sum(|Rh|): dRx/dq = CfU + CbtQC dx/dq, where the second term is computed with the adjoint
+    dq = U @ (M.Cb @ Rx_over_R) + V @ (M.Cb @ Ry_over_R)
 
-    gradient = (Rx_over_R.transpose() @ dRxdq + Ry_over_R.transpose() @ dRydq).transpose()
+    if update_geometry:
+        dq_x, dxb = adjoint_sensitivities(M, cache, M.C.transpose() @ (Q @ (M.Cb @ Rx_over_R)), 0)
+        dq_y, dyb = adjoint_sensitivities(M, cache, M.C.transpose() @ (Q @ (M.Cb @ Ry_over_R)), 1)
+        dq = dq + dq_x + dq_y
+
+    gradient = _pullback_q(M, dq).reshape(-1, 1)
 
     if is_xyb_var:
-        dxdxb = zeros((n, nb))
-        CitQCf = (M.Cit @ Q @ M.Cb).toarray()
-        dxdxb[M.free] = SPLU_D.solve(-CitQCf)
-        dxdxb[M.fixed] = identity(nb)
-        dydyb = dxdxb
-        dRxdx = M.Cb.transpose() @ Q @ M.C @ dxdxb
-        dRydy = M.Cb.transpose() @ Q @ M.C @ dydyb
-        gradient_xb = (Rx_over_R.transpose() @ dRxdx).transpose()
-        gradient_yb = (Ry_over_R.transpose() @ dRydy).transpose()
-        gradient = vstack([gradient, gradient_xb, gradient_yb])
+        gradient = vstack([gradient, dxb.reshape(-1, 1), dyb.reshape(-1, 1)])
     if is_zb_var:
         gradient = vstack([gradient, zeros((nb, 1))])
     if 'delta' in M.variables:
@@ -359,47 +355,18 @@ def gradient_bestfit(variables, M):
     if isinstance(M, list):
         M = M[0]
 
-    n = M.n
-    k = M.k
+    cache = M.evaluate_variables(variables)
 
-    k = M.k
-    nb = len(M.fixed)
-    n = M.n
-
-    qid = variables[:k].reshape(-1, 1)
-    M.q = q_from_variables(qid, M.B, M.d)
-
-    if 'xyb' in M.variables:
-        xyb = variables[k:k + 2*nb]
-        M.X[M.fixed, :2] = xyb.reshape(-1, 2, order='F')
-    if 'zb' in M.variables:
-        zb = variables[-nb:]
-        M.X[M.fixed, [2]] = zb.flatten()
-
-    M.X[M.free] = xyz_from_q(M.q, M.P[M.free], M.X[M.fixed], M.Ci, M.Cit, M.Cb)
-
-    M.W = diags(M.C.dot(M.X[:, 2]))  # W = diag(Cz)
+    M.W = cache.W  # W = diag(Cz)
 
     f = 2*(M.X[:, [2]] - M.s)
 
-    Q = diags(M.q.ravel())
-    CitQCi = M.Cit.dot(Q).dot(M.Ci)
-    SPLU_D = splu(CitQCi)
-
-    dzdq = zeros((n, k))
-    dzidq = SPLU_D.solve(-M.Cit.dot(M.W).toarray()).dot(M.B)
-    dzdq[M.free] = dzidq
+    dq, dzb = adjoint_sensitivities(M, cache, f, 2)
 
-    gradient = (f.transpose().dot(dzdq)).transpose()
+    gradient = _pullback_q(M, dq).reshape(-1, 1)
 
     if 'zb' in M.variables:
-        dz_dzb = zeros((n, nb))
-        CitQCf = M.Cit.dot(Q).dot(M.Cb).toarray()
-        dz_dzb[M.free] = SPLU_D.solve(-CitQCf)
-        dz_dzb[M.fixed] = identity(nb)
-
-        gradient_zb = (f.transpose().dot(dz_dzb)).transpose()
-        gradient = vstack([gradient, gradient_zb])
+        gradient = vstack([gradient, dzb.reshape(-1, 1)])
 
     return gradient
 
@@ -423,52 +390,20 @@ def gradient_horprojection(variables, M):
     if isinstance(M, list):
         M = M[0]
 
-    n = M.n
-    k = M.k
-
-    k = M.k
     nb = len(M.fixed)
-    n = M.n
-
-    qid = variables[:k].reshape(-1, 1)
-    M.q = q_from_variables(qid, M.B, M.d)
-
-    if 'xyb' in M.variables:
-        xyb = variables[k:k + 2*nb]
-        M.X[M.fixed, :2] = xyb.reshape(-1, 2, order='F')
-    if 'zb' in M.variables:
-        zb = variables[-nb:]
-        M.X[M.fixed, [2]] = zb.flatten()
 
-    M.X[M.free] = xyz_from_q(M.q, M.P[M.free], M.X[M.fixed], M.Ci, M.Cit, M.Cb)
+    cache = M.evaluate_variables(variables)
 
-    M.U = diags(M.C.dot(M.X[:, 0]))  # U = diag(Cx)
-    M.V = diags(M.C.dot(M.X[:, 1]))  # V = diag(Cy)
-    # M.W = diags(M.C.dot(M.X[:, 2]))  # W = diag(Cz)
+    M.U = cache.U  # U = diag(Cx)
+    M.V = cache.V  # V = diag(Cy)
 
     fx = 2*(M.X[:, [0]] - M.x0)
     fy = 2*(M.X[:, [1]] - M.y0)
 
-    Q = diags(M.q.ravel())
-    CitQCi = M.Cit.dot(Q).dot(M.Ci)
-    SPLU_D = splu(CitQCi)
-
-    dxdq = zeros((n, k))
-    dxidq = SPLU_D.solve(-M.Cit.dot(M.U).toarray()).dot(M.B)
-    dxdq[M.free] = dxidq
-
-    dydq = zeros((n, k))
-    dyidq = SPLU_D.solve(-M.Cit.dot(M.V).toarray()).dot(M.B)
-    dydq[M.free] = dyidq
+    dq_x, _ = adjoint_sensitivities(M, cache, fx, 0)
+    dq_y, _ = adjoint_sensitivities(M, cache, fy, 1)
 
-    # dzdq = zeros((n, k))
-    # dzidq = SPLU_D.solve(-M.Cit.dot(M.W).toarray()).dot(M.B)
-    # dzdq[M.free] = dzidq
-
-    gradient_x = (fx.transpose().dot(dxdq)).transpose()
-    gradient_y = (fy.transpose().dot(dydq)).transpose()
-
-    gradient = gradient_x + gradient_y
+    gradient = _pullback_q(M, dq_x + dq_y).reshape(-1, 1)
 
     if 'zb' in M.variables:
         gradient_zb = zeros((nb, 1))
@@ -496,76 +431,32 @@ def gradient_complementary_energy(variables, M):
     if isinstance(M, list):
         M = M[0]
 
-    n = M.n
-    k = M.k
-    is_xyb_var = False
-    is_zb_var = False
-
-    k = M.k
-    nb = len(M.fixed)
-
-    qid = variables[:k].reshape(-1, 1)
-    M.q = q_from_variables(qid, M.B, M.d)
-
-    if 'xyb' in M.variables:
-        xyb = variables[k:k + 2*nb]
-        M.X[M.fixed, :2] = xyb.reshape(-1, 2, order='F')
-        is_xyb_var = True
-    if 'zb' in M.variables:
-        zb = variables[-nb:]
-        M.X[M.fixed, [2]] = zb.flatten()
-        is_zb_var = True
-
-    # update geometry
-    M.X[M.free] = xyz_from_q(M.q, M.P[M.free], M.X[M.fixed], M.Ci, M.Cit, M.Cb)
-
-    M.U = diags(M.C.dot(M.X[:, 0]))  # U = diag(Cx)
-    M.V = diags(M.C.dot(M.X[:, 1]))  # V = diag(Cy)
-    M.W = diags(M.C.dot(M.X[:, 2]))  # W = diag(Cz)
-
-    Q = diags(M.q.ravel())
-    CitQCi = M.Cit.dot(Q).dot(M.Ci)
-    SPLU_D = splu(CitQCi)
+    is_xyb_var = 'xyb' in M.variables
+    is_zb_var = 'zb' in M.variables
 
-    dxidq = SPLU_D.solve((-M.Cit.dot(M.U)).toarray()).dot(M.B)
-    dxdq = zeros((n, k))
-    dxdq[M.free] = dxidq
+    cache = M.evaluate_variables(variables)
 
-    dyidq = SPLU_D.solve((-M.Cit.dot(M.V)).toarray()).dot(M.B)
-    dydq = zeros((n, k))
-    dydq[M.free] = dyidq
+    M.U = cache.U  # U = diag(Cx)
+    M.V = cache.V  # V = diag(Cy)
+    M.W = cache.W  # W = diag(Cz)
 
-    dzidq = SPLU_D.solve(-M.Cit.dot(M.W).toarray()).dot(M.B)
-    dzdq = zeros((n, k))
-    dzdq[M.free] = dzidq
+    Q = cache.Q
 
-    CfU = M.Cb.transpose().dot(M.U)
-    CfV = M.Cb.transpose().dot(M.V)
-    CfW = M.Cb.transpose().dot(M.W)
-    dRxdq = CfU.dot(M.B) + M.Cb.transpose().dot(Q).dot(M.C).dot(dxdq)
-    dRydq = CfV.dot(M.B) + M.Cb.transpose().dot(Q).dot(M.C).dot(dydq)
-    dRzdq = CfW.dot(M.B) + M.Cb.transpose().dot(Q).dot(M.C).dot(dzdq)
+    # f = -sum(R * dXb): dR/dq = CbtUVW + CbtQC dX/dq, where the second term is computed with the adjoint
+    dq = zeros(M.m)
+    dXb = []
+    for i, UVW in enumerate([M.U, M.V, M.W]):
+        dXb_i = M.dXb[:, i]
+        dq_i, dXb_fixed = adjoint_sensitivities(M, cache, M.C.transpose() @ (Q @ (M.Cb @ dXb_i)), i)
+        dq = dq + UVW @ (M.Cb @ dXb_i) + dq_i
+        dXb.append(dXb_fixed.reshape(-1, 1))
 
-    gradient = (M.dXb[:, [0]].transpose().dot(dRxdq) + M.dXb[:, [1]].transpose().dot(dRydq) + M.dXb[:, [2]].transpose().dot(dRzdq)).transpose()
+    gradient = _pullback_q(M, dq).reshape(-1, 1)
 
-    CitQCf = M.Cit.dot(Q).dot(M.Cb).toarray()
     if is_xyb_var:
-        dxdxb = zeros((n, nb))
-        dxdxb[M.free] = SPLU_D.solve(-CitQCf)
-        dxdxb[M.fixed] = identity(nb)
-        dydyb = dxdxb
-        dRxdxb = M.Cb.transpose().dot(Q).dot(M.C).dot(dxdxb)
-        dRydyb = M.Cb.transpose().dot(Q).dot(M.C).dot(dydyb)
-        gradient_xb = (M.dXb[:, [0]].transpose().dot(dRxdxb)).transpose()
-        gradient_yb = (M.dXb[:, [1]].transpose().dot(dRydyb)).transpose()
-        gradient = vstack([gradient, gradient_xb, gradient_yb])
+        gradient = vstack([gradient, dXb[0], dXb[1]])
     if is_zb_var:
-        dzdzb = zeros((n, nb))
-        dzdzb[M.free] = SPLU_D.solve(-CitQCf)
-        dzdzb[M.fixed] = identity(nb)
-        dRzdzb = M.Cb.transpose().dot(Q).dot(M.C).dot(dzdzb)
-        gradient_zb = (M.dXb[:, [2]].transpose().dot(dRzdzb)).transpose()
-        gradient = vstack([gradient, gradient_zb])
+        gradient = vstack([gradient, dXb[2]])
 
     return -1 * array(gradient).flatten()
 
@@ -594,7 +485,7 @@ def gradient_complementary_energy_nonlinear(variables, M):
 
         dEdq_vector = 2 * M.stiff * M.q.reshape(-1, 1)
         dEdq = diags(dEdq_vector.flatten())
-        dEdqid = dEdq.dot(M.B)
+        dEdqid = dEdq @ M.B
         grad_quad = npsum(dEdqid, axis=0).reshape(-1, 1)
 
         if 'xyb' in M.variables:
@@ -629,80 +520,29 @@ def gradient_loadpath(variables, M):
     if isinstance(M, list):
         M = M[0]
 
-    n = M.n
-    k = M.k
-
-    k = M.k
-    nb = len(M.fixed)
-    n = M.n
-
-    qid = variables[:k].reshape(-1, 1)
-    M.q = q_from_variables(qid, M.B, M.d)
-
-    if 'xyb' in M.variables:
-        xyb = variables[k:k + 2*nb]
-        M.X[M.fixed, :2] = xyb.reshape(-1, 2, order='F')
-    if 'zb' in M.variables:
-        zb = variables[-nb:]
-        M.X[M.fixed, [2]] = zb.flatten()
-
-    M.X[M.free] = xyz_from_q(M.q, M.P[M.free], M.X[M.fixed], M.Ci, M.Cit, M.Cb)
+    cache = M.evaluate_variables(variables)
 
     uvw = M.C.dot(M.X)
     l2 = npsum(uvw**2, axis=1).reshape(-1, 1)
 
-    M.U = diags(uvw[:, 0])  # U = diag(Cx)
-    M.V = diags(uvw[:, 1])  # V = diag(Cy)
-    M.W = diags(uvw[:, 2])  # W = diag(Cz)
-
-    Q = diags(M.q.ravel())
-    CitQCi = M.Cit.dot(Q).dot(M.Ci)
-    SPLU_D = splu(CitQCi)
-
-    dxdq = zeros((n, k))
-    dydq = zeros((n, k))
-    dzdq = zeros((n, k))
-
-    dxidq = SPLU_D.solve(-M.Cit.dot(M.U).toarray()).dot(M.B)  # not needed if fixed
-    dxdq[M.free] = dxidq
-
-    dyidq = SPLU_D.solve(-M.Cit.dot(M.V).toarray()).dot(M.B)  # not needed if fixed
-    dydq[M.free] = dyidq
-
-    dzidq = SPLU_D.solve(-M.Cit.dot(M.W).toarray()).dot(M.B)
-    dzdq[M.free] = dzidq
+    M.U = cache.U  # U = diag(Cx)
+    M.V = cache.V  # V = diag(Cy)
+    M.W = cache.W  # W = diag(Cz)
 
-    # print(multiply(sign(M.q), l2).transpose().shape)
-    # print(multiply(sign(M.q), l2).transpose().dot(M.B).shape)
-    # print(M.U.dot(M.C.dot(dxdq)).shape)
-    # print(M.V.dot(M.C.dot(dydq)).shape)
-    # print(M.W.dot(M.C.dot(dzdq)).shape)
-    # print(M.q.transpose().shape)
-    # print(abs(M.q.transpose()) * (M.U.dot(M.C.dot(dxdq)) + M.V.dot(M.C.dot(dydq)) + M.W.dot(M.C.dot(dzdq))).shape)
-    # print(M.C.dot(dzdq).shape)
+    q = M.q.reshape(-1, 1)
 
-    dudq = M.C.dot(dxdq)
-    dvdq = M.C.dot(dydq)
-    dwdq = M.C.dot(dzdq)
+    # f = sum(|q| l2): df/dq = sign(q) l2 + 2 |q| uvw dC X/dq, where the second term is computed with the adjoint
+    dq = multiply(sign(q), l2).flatten()
+    for i in range(3):
+        dq_i, dXb_i = adjoint_sensitivities(M, cache, M.C.transpose() @ (2 * abs(q[:, 0]) * uvw[:, i]), i)
+        dq = dq + dq_i
+        if i == 2:
+            dzb = dXb_i
 
-    dldq_1 = (multiply(sign(M.q).reshape(-1, 1), l2).transpose().dot(M.B)).flatten()
-
-    # gradient = (multiply(sign(M.q), l2).transpose().dot(M.B) + 2*abs(M.q.transpose()).dot(M.U.dot(M.C.dot(dxdq)) + M.V.dot(M.C.dot(dydq)) + M.W.dot(M.C.dot(dzdq)))).transpose()
-    gradient = zeros((k, 1))
-
-    for i in range(k):
-        dlidqi = multiply(uvw[:, [0]], dudq[:, [i]]) + multiply(uvw[:, [1]], dvdq[:, [i]]) + multiply(uvw[:, [2]], dwdq[:, [i]])
-        # gradient[i] = sign(M.q[i]) * l2[i] + 2 * abs(M.q.transpose()).dot(dlidqi)
-        gradient[i] = dldq_1[i] + 2*abs(M.q.transpose()).dot(dlidqi)
+    gradient = _pullback_q(M, dq).reshape(-1, 1)
 
     if 'zb' in M.variables:
-        dz_dzb = zeros((n, nb))
-        CitQCf = M.Cit.dot(Q).dot(M.Cb).toarray()
-        dz_dzb[M.free] = SPLU_D.solve(-CitQCf)
-        dz_dzb[M.fixed] = identity(nb)
-
-        gradient_zb = (2*abs(M.q.transpose()).dot(M.W.dot(M.C.dot(dz_dzb)))).transpose().reshape(-1, 1)
-        gradient = vstack([gradient, gradient_zb])
+        gradient = vstack([gradient, dzb.reshape(-1, 1)])
 
     return gradient
 
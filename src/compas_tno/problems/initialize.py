@@ -1,12 +1,7 @@
-from compas_tno.solvers.solver_MATLAB import run_loadpath_from_form_MATLAB
-from compas_tno.solvers.solver_cvxpy import run_loadpath_from_form_CVXPY
-
 from compas_tno.algorithms import form_update_with_parallelisation
 from compas_tno.algorithms import equilibrium_fdm
 from compas_tno.algorithms import compute_reactions
 
-import importlib.util
-
 
 def initialize_loadpath(form, problem=None, find_inds=False, solver_convex='CVXPY', printout=False):
     """Built-in function to optimise the loadpath considering diagram fixed projection.
@@ -31,13 +26,17 @@ def initialize_loadpath(form, problem=None, find_inds=False, solver_convex='CVXP
         The class with the main matrices of the problem
     """
 
+    from compas_tno.solvers import backend_available
+
     if solver_convex == 'CVX' or solver_convex == 'MATLAB':
-        if not importlib.util.find_spec('matlab'):
+        if not backend_available('MATLAB'):
             raise ValueError('MATLAB/CVX not configured. Try changing the <solver_convex> attribute.')
+        from compas_tno.solvers.solver_MATLAB import run_loadpath_from_form_MATLAB
         problem = run_loadpath_from_form_MATLAB(form, problem=problem, find_inds=find_inds, printout=printout)
     elif solver_convex == 'CVXPY' or solver_convex == 'MOSEK':
-        if not importlib.util.find_spec('cvxpy'):
+        if not backend_available('CVXPY'):
             raise ValueError('CVXPY/MOSEK not configured. Try changing the <solver_convex> attribute.')
+        from compas_tno.solvers.solver_cvxpy import run_loadpath_from_form_CVXPY
         problem = run_loadpath_from_form_CVXPY(form, problem=problem, find_inds=find_inds, printout=printout)
     else:
         raise ValueError('Could not initilalise loadpath optimisation with {}. Try changing the <solver_convex> attribute.'.format(solver_convex))
@@ -1,16 +1,25 @@
+from numpy import absolute
+from numpy import arange
+from numpy import asarray
+from numpy import cumsum
+from numpy import hstack
+from numpy import repeat
+from numpy import sign
+from numpy import split
+from numpy import tile
 from numpy import zeros
 from numpy import identity
-from numpy import hstack
 from numpy import vstack
 
-from scipy.sparse.linalg import splu
-from scipy.sparse import diags
+from scipy.sparse import csr_matrix
+from scipy.sparse import identity as sidentity
+from scipy.sparse import hstack as shstack
+from scipy.sparse import vstack as svstack
+from scipy.sparse.linalg import LinearOperator
 
 from compas_tno.problems.bounds_update import dub_dlb_update
 from compas_tno.problems.bounds_update import db_update
-
-from compas_tno.algorithms import q_from_variables
-from compas_tno.algorithms import xyz_from_q
+from compas_tno.problems.derivatives import adjoint_sensitivities
 
 
 def d_fconstr(fconstr, x0, eps, *args):
@@ -55,8 +64,29 @@ def sensitivities_wrapper(variables, M):
 
     Returns
     -------
-    [type]
-        [description]
+    deriv : array
+        The dense jacobian of the constraints. See ``sensitivities_wrapper_sparse`` for the sparse version.
+
+    """
+
+    return sensitivities_wrapper_sparse(variables, M).toarray()
+
+
+def sensitivities_wrapper_sparse(variables, M):
+    """Sparse jacobian matrix computed analytically based on the constraints and variables assigned.
+
+    Parameters
+    ----------
+    variables : array (k x 1)
+        Variables to pass to the function.
+    M : :class:`~compas_tno.problems.Problem`
+        The class with necessary matrices, or arguments, to compute the objective function
+
+    Returns
+    -------
+    deriv : csr_matrix
+        The jacobian of the constraints. Blocks depending on the point are stored with explicit zeros,
+        so that the sparsity pattern of the matrix does not change during the optimisation.
 
     Notes
     -----
@@ -73,71 +103,27 @@ def sensitivities_wrapper(variables, M):
     nb = len(M.fixed)  # number of fixed vertices
     nbz = 0
     nbxy = 0
-    delta = 0.0
-    thk = M.thk  # Introduce this because it might be necessary
     t = M.shape.datashape['t']
-    lambdh = 1.0
-
-    qid = variables[:k].reshape(-1, 1)
-    check = k
 
     if 'xyb' in M.variables:
-        xyb = variables[check:check + 2*nb]
-        check = check + 2*nb
-        M.X[M.fixed, :2] = xyb.reshape(-1, 2, order='F')
         nbxy = nb
     if 'zb' in M.variables:
-        zb = variables[check: check + nb]
-        check = check + nb
-        M.X[M.fixed, [2]] = zb.flatten()
         nbz = nb
-    if 't' in M.variables or 'n' in M.variables:
-        thk = variables[check: check + 1]
-        check = check + 1
-    if 'lambdh' in M.variables:
-        lambdh = variables[check: check + 1]
-        M.P[:, [0]] = lambdh * M.px0
-        M.P[:, [1]] = lambdh * M.py0
-        M.d = lambdh * M.d0
-        # M.d[M.dep] = -M.Edinv.dot(vstack([M.P[M.free_x, 0].reshape(-1, 1), M.P[M.free_y, 1].reshape(-1, 1)]))  # make this line shorter
-        check = check + 1
-    if 'lambdv' in M.variables:
-        lambdv = variables[check: check + 1]
-        M.P[:, [2]] = lambdv * M.pzv + M.pz0
-        check = check + 1
-    if 'tub' in M.variables:
-        tub = variables[check: check + n]
-        M.tub = tub
-        check = check + n
-    if 'tlb' in M.variables:
-        tlb = variables[check: check + n]
-        M.tlb = tlb
-        check = check + n
-    if 'tub_reac' in M.variables:
-        tub_reac = variables[check: check + 2*nb].reshape(-1, 1)
-        M.tub_reac = tub_reac
-        check = check + 2*nb
-    if 'delta' in M.variables:
-        delta = float(variables[check: check + 1])
-        check = check + 1
-
-    M.q = q_from_variables(qid, M.B, M.d)
 
-    # update geometry
-    M.X[M.free] = xyz_from_q(M.q, M.P[M.free], M.X[M.fixed], M.Ci, M.Cit, M.Cb)
+    cache = M.evaluate_variables(variables)
 
-    q = M.q
+    thk = cache.thk
+    delta = cache.delta
 
-    M.U = diags(M.C.dot(M.X[:, 0]))  # U = diag(Cx)
-    M.V = diags(M.C.dot(M.X[:, 1]))  # V = diag(Cy)
-    M.W = diags(M.C.dot(M.X[:, 2]))  # W = diag(Cz)
+    M.U = cache.U  # U = diag(Cx)
+    M.V = cache.V  # V = diag(Cy)
+    M.W = cache.W  # W = diag(Cz)
 
     # initialize jac matrix
-    deriv = zeros([0, M.k])
+    deriv = csr_matrix((0, M.k))
 
-    Q = diags(q.ravel())
-    CitQCi = M.Cit.dot(Q).dot(M.Ci)
-    SPLU_D = splu(CitQCi)
+    Q = cache.Q
+    SPLU_D = cache.SPLU_D
     nlin_fun = 0
     nlin_limitxy = 0
     nlin_env = 0
@@ -157,50 +143,54 @@ def sensitivities_wrapper(variables, M):
     # ------------ Adding rows to the jacobian matrix based on constraints activated ------------
 
     if 'funicular' in M.constraints:
-        deriv = vstack([deriv, dqdqi, - dqdqi])
+        if isinstance(dqdqi, LinearOperator):
+            dqdqi_sparse = csr_matrix(dqdqi.matmat(identity(k)))
+        else:
+            dqdqi_sparse = csr_matrix(dqdqi)
+        deriv = svstack([deriv, dqdqi_sparse, - dqdqi_sparse])
         nlin_fun = 2 * m
 
     if 'envelopexy' in M.constraints:
         # jacobian of in constraints on x
         dxidq = SPLU_D.solve(-M.Cit.dot(M.U).toarray())
-        dxidqi = dxidq.dot(dqdqi)
+        dxidqi = dxidq @ dqdqi
         dxdqi[M.free] = dxidqi
-        deriv = vstack([deriv, dxdqi, - dxdqi])
+        deriv = svstack([deriv, _structural(dxdqi, M.free), _structural(- dxdqi, M.free)])
 
         # jacobian of in constraints on y
         dyidq = SPLU_D.solve(-M.Cit.dot(M.V).toarray())
-        dyidqi = dyidq.dot(dqdqi)
+        dyidqi = dyidq @ dqdqi
         dydqi[M.free] = dyidqi
-        deriv = vstack([deriv, dydqi, - dydqi])
+        deriv = svstack([deriv, _structural(dydqi, M.free), _structural(- dydqi, M.free)])
 
         nlin_limitxy = 4 * n
 
     if 'envelope' in M.constraints:
         # jacobian of in constraints on z
         dzidq = SPLU_D.solve(-M.Cit.dot(M.W).toarray())
-        dzidqi = dzidq.dot(dqdqi)
+        dzidqi = dzidq @ dqdqi
         dzdqi[M.free] = dzidqi
 
         if 'update-envelope' in M.features:
             dzmaxdt, dzmindt, dzmaxdx, dzmindx, dzmaxdy, dzmindy = dub_dlb_update(M.X[:, 0], M.X[:, 1], thk, t, M.shape, None, None, M.s, M.variables)
             dzmaxdq = dzmaxdx.dot(dxdqi) + dzmaxdy.dot(dydqi)
             dzmindq = dzmindx.dot(dxdqi) + dzmindy.dot(dydqi)
-            deriv = vstack([deriv, dzdqi - dzmindq, dzmaxdq - dzdqi])
+            deriv = svstack([deriv, _structural(dzdqi - dzmindq), _structural(dzmaxdq - dzdqi)])
         else:
-            deriv = vstack([deriv, dzdqi, - dzdqi])
+            deriv = svstack([deriv, _structural(dzdqi, M.free), _structural(- dzdqi, M.free)])
 
         nlin_env = 2 * n
 
     if 'reac_bounds' in M.constraints:
-        CbQC = M.Cb.transpose().dot(Q).dot(M.C)
+        CbQC = cache.CbQC
 
-        dRxdq = M.Cb.transpose().dot(M.U).dot(dqdqi) + CbQC.dot(dxdqi)
-        dRydq = M.Cb.transpose().dot(M.V).dot(dqdqi) + CbQC.dot(dydqi)
-        dRzdq = M.Cb.transpose().dot(M.W).dot(dqdqi) + CbQC.dot(dzdqi)
+        dRxdq = M.Cb.transpose().dot(M.U) @ dqdqi + CbQC.dot(dxdqi)
+        dRydq = M.Cb.transpose().dot(M.V) @ dqdqi + CbQC.dot(dydqi)
+        dRzdq = M.Cb.transpose().dot(M.W) @ dqdqi + CbQC.dot(dzdqi)
 
         dRzdzb = CbQC.dot(A)
 
-        R = CbQC.dot(M.X) - M.P[M.fixed]
+        R = cache.R
 
         dslope_dind = zeros((2 * nb, len(M.ind)))
         dslope_dzb = zeros((2 * nb, nb))
@@ -236,7 +226,7 @@ def sensitivities_wrapper(variables, M):
 
             dslope_dind[i_] = zbi * signe_y * (-R[i, 2] * dRydq[i] + R[i, 1] * dRzdq[i]) / R[i, 2]**2 / signe_z
 
-        deriv = vstack([deriv, dslope_dind])
+        deriv = svstack([deriv, _structural(dslope_dind)])
 
         if 't' in M.variables or 'n' in M.variables:
             db = db_update(M.x0, M.y0, thk, M.fixed, M.shape, M.b, M.variables)
@@ -250,7 +240,8 @@ def sensitivities_wrapper(variables, M):
             dhdq = M.E + delta * M.Ed
         else:
             dhdq = M.E
-        deriv = vstack([deriv, dhdq, -dhdq])
+        dhdq = _structural_union(dhdq, M.E, M.Ed)
+        deriv = svstack([deriv, dhdq, -dhdq])
 
         nlin_displ_map = 2 * dhdq.shape[0]
 
@@ -258,19 +249,20 @@ def sensitivities_wrapper(variables, M):
     # ------------ Note: length of the column to be defined through the "marking parameters" ---------------
 
     if nbxy or nbz:  # add a column to the derivatives to count the variables zb or xyb
-        Anull = zeros((n, nb))
+        A_sparse = _structural(A)
+        Anull = csr_matrix((n, nb))
         if nbxy:
-            deriv = hstack([deriv, vstack([zeros((nlin_fun, nb)), A, -A, Anull, -Anull, Anull, -Anull, zeros((nlin_reacbounds, nb))])])
-            deriv = hstack([deriv, vstack([zeros((nlin_fun, nb)), Anull, -Anull, A, -A, Anull, -Anull, zeros((nlin_reacbounds, nb))])])
+            deriv = shstack([deriv, svstack([csr_matrix((nlin_fun, nb)), A_sparse, -A_sparse, Anull, -Anull, Anull, -Anull, csr_matrix((nlin_reacbounds, nb))])])
+            deriv = shstack([deriv, svstack([csr_matrix((nlin_fun, nb)), Anull, -Anull, A_sparse, -A_sparse, Anull, -Anull, csr_matrix((nlin_reacbounds, nb))])])
         if nbz:
-            addcolumn = zeros((nlin_fun + nlin_limitxy, nb))
+            addcolumn = csr_matrix((nlin_fun + nlin_limitxy, nb))
             if 'envelope' in M.constraints:
-                addcolumn = vstack([addcolumn, A, -A])
+                addcolumn = svstack([addcolumn, A_sparse, -A_sparse])
             if 'reac_bounds' in M.constraints:
-                addcolumn = vstack([addcolumn, dslope_dzb])
+                addcolumn = svstack([addcolumn, _structural(dslope_dzb)])
             if 'displ_map' in M.constraints:
-                addcolumn = vstack([addcolumn, zeros((nlin_displ_map, nb))])
-            deriv = hstack([deriv, addcolumn])
+                addcolumn = svstack([addcolumn, csr_matrix((nlin_displ_map, nb))])
+            deriv = shstack([deriv, addcolumn])
 
     if 't' in M.variables or 'n' in M.variables:  # add a column to the derivatives to count the variable t (thickness)
         if 'update-envelope' in M.features:
@@ -278,8 +270,8 @@ def sensitivities_wrapper(variables, M):
         else:
             dzmaxdt, dzmindt = dub_dlb_update(M.x0, M.y0, thk, t, M.shape, M.ub0, M.lb0, M.s, M.variables)[:2]
 
-        dXdt = vstack([zeros((nlin_fun + nlin_limitxy, 1)), -dzmindt, +dzmaxdt, db_column])
-        deriv = hstack([deriv, dXdt])
+        dXdt = vstack([-dzmindt, +dzmaxdt, db_column])
+        deriv = shstack([deriv, svstack([csr_matrix((nlin_fun + nlin_limitxy, 1)), _structural(dXdt)])])
 
         if 'displ_map' in M.constraints:
             raise NotImplementedError()
@@ -335,7 +327,7 @@ def sensitivities_wrapper(variables, M):
         if 'displ_map' in M.constraints:
             raise NotImplementedError()
 
-        deriv = hstack([deriv, dXdlambd])
+        deriv = shstack([deriv, _structural(dXdlambd)])
 
     if 'lambdv' in M.variables:  # add a column to the derivatives to count the variable lambdv (vertical load multiplier)
 
@@ -369,22 +361,21 @@ def sensitivities_wrapper(variables, M):
         if 'displ_map' in M.constraints:
             dXdlambd = vstack([dXdlambd, zeros((nlin_displ_map, 1))])
 
-        deriv = hstack([deriv, dXdlambd])
+        deriv = shstack([deriv, _structural(dXdlambd)])
 
     if 'tub' in M.variables:  # add a column to the derivatives to count the variable tub (max_section)
 
         nconst = deriv.shape[0]
-        dXdtub = zeros((nconst, n))
         startline = nlin_fun + nlin_limitxy
         endline = startline + nlin_env
 
-        In = identity(n)
-        I0 = 0.0 * In
-        Mt = vstack([I0, In])
+        In = sidentity(n)
+        I0 = csr_matrix((n, n))
+        Mt = svstack([I0, In])
 
-        dXdtub[startline: endline, :] = Mt
+        dXdtub = svstack([csr_matrix((startline, n)), Mt, csr_matrix((nconst - endline, n))])
 
-        deriv = hstack([deriv, dXdtub])
+        deriv = shstack([deriv, dXdtub])
 
         if 'displ_map' in M.constraints:
             raise NotImplementedError()
@@ -392,17 +383,16 @@ def sensitivities_wrapper(variables, M):
     if 'tlb' in M.variables:  # add a column to the derivatives to count the variable tub (max_section)
 
         nconst = deriv.shape[0]
-        dXdtub = zeros((nconst, n))
         startline = nlin_fun + nlin_limitxy
         endline = startline + nlin_env
 
-        In = identity(n)
-        I0 = 0.0 * In
-        Mt = vstack([In, I0])
+        In = sidentity(n)
+        I0 = csr_matrix((n, n))
+        Mt = svstack([In, I0])
 
-        dXdtub[startline: endline, :] = Mt
+        dXdtub = svstack([csr_matrix((startline, n)), Mt, csr_matrix((nconst - endline, n))])
 
-        deriv = hstack([deriv, dXdtub])
+        deriv = shstack([deriv, dXdtub])
 
         if 'displ_map' in M.constraints:
             raise NotImplementedError()
@@ -410,17 +400,14 @@ def sensitivities_wrapper(variables, M):
     if 'tub_reac' in M.variables:  # add a column to the derivatives to count the variable tub (max_section)
 
         nconst = deriv.shape[0]
-        dXdtreacub = zeros((nconst, 2*nb))
         startline = nlin_fun + nlin_limitxy + nlin_env
         endline = startline + nlin_reacbounds
 
-        Inb = identity(nb)  # check if the modulus need to be added here
-        Inb0 = 0.0 * Inb
-        Mt = hstack([vstack([Inb, Inb0]), vstack([Inb0, Inb])])
+        Mt = sidentity(2*nb)  # check if the modulus need to be added here
 
-        dXdtreacub[startline: endline, :] = Mt
+        dXdtreacub = svstack([csr_matrix((startline, 2*nb)), Mt, csr_matrix((nconst - endline, 2*nb))])
 
-        deriv = hstack([deriv, dXdtreacub])
+        deriv = shstack([deriv, dXdtreacub])
 
         if 'displ_map' in M.constraints:
             raise NotImplementedError()
@@ -436,6 +423,313 @@ def sensitivities_wrapper(variables, M):
         dhddelta = vstack([dhddelta, - dhddelta])
         addcolumn[startline: endline] = dhddelta
 
-        deriv = hstack([deriv, addcolumn])
+        deriv = shstack([deriv, _structural(addcolumn, range(startline, endline))])
+
+    return csr_matrix(deriv)
+
+
+def jacobian_structure(jac):
+    """Row and column indices of the entries stored in a sparse jacobian, in the order of ``jacobian_values``.
+
+    Parameters
+    ----------
+    jac : sparse matrix
+        The jacobian of the constraints, as returned by ``sensitivities_wrapper_sparse``.
+
+    Returns
+    -------
+    rows : array
+        Row index of the stored entries.
+    cols : array
+        Column index of the stored entries.
+
+    """
+
+    jac = csr_matrix(jac)
+    jac.sum_duplicates()
+    rows = repeat(arange(jac.shape[0]), jac.getnnz(axis=1))
+
+    return rows, jac.indices.copy()
+
+
+def jacobian_values(jac):
+    """Values of the entries stored in a sparse jacobian, in the order of ``jacobian_structure``.
+
+    Parameters
+    ----------
+    jac : sparse matrix
+        The jacobian of the constraints, as returned by ``sensitivities_wrapper_sparse``.
+
+    Returns
+    -------
+    values : array
+        The stored entries, including the explicit zeros.
+
+    """
+
+    jac = csr_matrix(jac)
+    jac.sum_duplicates()
+
+    return jac.data
+
+
+def sensitivities_operator(variables, M):
+    """Matrix-free jacobian of the constraints as a linear operator with the Jacobian-vector and vector-Jacobian products.
+
+    The products are computed with the factorization of ``CitQCi`` of the point, with at most three solves for each product,
+    so that the jacobian is never assembled and the memory used is independent of the number of variables.
+    The rows and the columns are in the order of ``constr_wrapper`` and of the variables, as in ``sensitivities_wrapper_sparse``.
+
+    Parameters
+    ----------
+    variables : array (k x 1)
+        Variables in which the jacobian is evaluated.
+    M : :class:`~compas_tno.problems.Problem`
+        The class with necessary matrices, or arguments, to compute the objective function
+
+    Returns
+    -------
+    jac : LinearOperator
+        The jacobian of the constraints in the point. ``jac.matvec`` computes the Jacobian-vector product and
+        ``jac.rmatvec`` the vector-Jacobian product, with an adjoint solve for each coordinate.
+
+    Notes
+    -----
+        The blocks ``funicular``, ``envelopexy``, ``envelope``, ``reac_bounds`` and ``displ_map`` of the constraints and the variables
+        ``q``, ``xyb``, ``zb``, ``t``, ``tub``, ``tlb``, ``tub_reac`` and ``delta`` are supported.
+        The operator keeps the state of the point and is not affected by later evaluations of the problem.
+    """
+
+    if isinstance(M, list):
+        M = M[0]
+
+    if 'lambdh' in M.variables or 'lambdv' in M.variables:
+        raise NotImplementedError('The load multipliers are not supported in the matrix-free jacobian.')
+    if 'update-envelope' in M.features:
+        raise NotImplementedError('The feature update-envelope is not supported in the matrix-free jacobian.')
+
+    k = M.k
+    n = M.n
+    m = M.m
+    nb = M.nb
+    t = M.shape.datashape['t']
+
+    cache = M.evaluate_variables(variables)
+
+    thk = cache.thk
+    delta = cache.delta
+    q = asarray(cache.q).flatten()
+    X = cache.X.copy()
+    UVW = [cache.U, cache.V, cache.W]
+    CbQC = cache.CbQC
+    CitQCb = M.Cit @ cache.Q @ M.Cb
+    SPLU_D = cache.SPLU_D
+    free = M.free
+    fixed = M.fixed
+
+    # sizes of the blocks of variables
+    nxyb = 2 * nb if 'xyb' in M.variables else 0
+    nzb = nb if 'zb' in M.variables else 0
+    nt = 1 if 't' in M.variables or 'n' in M.variables else 0
+    ntub = n if 'tub' in M.variables else 0
+    ntlb = n if 'tlb' in M.variables else 0
+    ntubreac = 2 * nb if 'tub_reac' in M.variables else 0
+    ndelta = 1 if 'delta' in M.variables else 0
+    splits = cumsum([k, nxyb, nzb, nt, ntub, ntlb, ntubreac, ndelta])
+
+    # coordinates whose sensitivities are needed. In fixed diagrams without xyb, x and y do not change (E B = 0)
+    reac = 'reac_bounds' in M.constraints
+    moving_xy = 'xyb' in M.variables or 'fixed' not in M.features
+    coords = []
+    if moving_xy and ('envelopexy' in M.constraints or reac):
+        coords += [0, 1]
+    if 'envelope' in M.constraints or reac:
+        coords += [2]
+
+    if 'envelope' in M.constraints and nt:
+        dzmaxdt, dzmindt = dub_dlb_update(M.x0, M.y0, thk, t, M.shape, M.ub0, M.lb0, M.s, M.variables)[:2]
+        dzmaxdt, dzmindt = asarray(dzmaxdt).flatten(), asarray(dzmindt).flatten()
+
+    if reac:
+        R = cache.R
+        zb = X[fixed, 2] - asarray(M.s).flatten()[fixed]
+        sx = sign(R[:, 0] / R[:, 2])
+        sy = sign(R[:, 1] / R[:, 2])
+        slope_x = absolute(R[:, 0] / R[:, 2])
+        slope_y = absolute(R[:, 1] / R[:, 2])
+        # derivatives of the rows of the reactions on Rx, Ry and Rz
+        dRx_x = - zb * sx / R[:, 2]
+        dRy_y = - zb * sy / R[:, 2]
+        dRz_x = zb * sx * R[:, 0] / R[:, 2]**2
+        dRz_y = zb * sy * R[:, 1] / R[:, 2]**2
+        if nt:
+            db = db_update(M.x0, M.y0, thk, fixed, M.shape, M.b, M.variables)
+            db = asarray(db).reshape(-1, 2)
+
+    if 'displ_map' in M.constraints:
+        dhdq = M.E + delta * M.Ed if delta else M.E
+        dhddelta = asarray(M.Ed @ q).flatten() if ndelta else None
+        ndispl = dhdq.shape[0]
+
+    nconstr = 0
+    for constraint, size in [('funicular', 2 * m), ('envelopexy', 4 * n), ('envelope', 2 * n), ('reac_bounds', 2 * nb)]:
+        if constraint in M.constraints:
+            nconstr += size
+    if 'displ_map' in M.constraints:
+        nconstr += 2 * ndispl
+
+    nvar = splits[-1]
+
+    def matvec(v):
+        v = asarray(v, dtype=float).flatten()
+        dqid, dxyb, dzb, dt, dtub, dtlb, dtubreac, ddelta = split(v, splits[:-1])
+
+        dq = asarray(M.B @ dqid).flatten()
+        dXb = zeros((nb, 3))
+        if nxyb:
+            dXb[:, 0], dXb[:, 1] = dxyb[:nb], dxyb[nb:]
+        if nzb:
+            dXb[:, 2] = dzb
+
+        dX = zeros((n, 3))
+        for i in coords:
+            dX[fixed, i] = dXb[:, i]
+            dX[free, i] = SPLU_D.solve(- M.Cit @ (UVW[i] @ dq) - CitQCb @ dXb[:, i])
+
+        rows = []
+
+        if 'funicular' in M.constraints:
+            rows += [dq, -dq]
+
+        if 'envelopexy' in M.constraints:
+            rows += [dX[:, 0], -dX[:, 0], dX[:, 1], -dX[:, 1]]
+
+        if 'envelope' in M.constraints:
+            dzmin = dX[:, 2].copy()
+            dzmax = - dX[:, 2]
+            if nt:
+                dzmin -= dzmindt * dt[0]
+                dzmax += dzmaxdt * dt[0]
+            if ntub:
+                dzmax += dtub
+            if ntlb:
+                dzmin += dtlb
+            rows += [dzmin, dzmax]
+
+        if reac:
+            dR = [M.Cb.transpose() @ (UVW[i] @ dq) + CbQC @ dX[:, i] for i in range(3)]
+            drx = - slope_x * dX[fixed, 2] + dRx_x * dR[0] + dRz_x * dR[2]
+            dry = - slope_y * dX[fixed, 2] + dRy_y * dR[1] + dRz_y * dR[2]
+            if nt:
+                drx += db[:, 0] * dt[0]
+                dry += db[:, 1] * dt[0]
+            if ntubreac:
+                drx += dtubreac[:nb]
+                dry += dtubreac[nb:]
+            rows += [drx, dry]
+
+        if 'displ_map' in M.constraints:
+            dh = asarray(dhdq @ dq).flatten()
+            if ndelta:
+                dh = dh + dhddelta * ddelta[0]
+            rows += [dh, -dh]
+
+        return hstack(rows) if rows else zeros(0)
+
+    def rmatvec(w):
+        w = asarray(w, dtype=float).flatten()
+        gq = zeros(m)
+        gX = zeros((n, 3))
+        gXb = zeros((nb, 3))
+        gt = zeros(nt)
+        gtub = zeros(ntub)
+        gtlb = zeros(ntlb)
+        gtubreac = zeros(ntubreac)
+        gdelta = zeros(ndelta)
+        start = 0
+
+        if 'funicular' in M.constraints:
+            gq += w[start:start + m] - w[start + m:start + 2 * m]
+            start += 2 * m
+
+        if 'envelopexy' in M.constraints:
+            wx = w[start:start + 4 * n].reshape(4, n)
+            gX[:, 0] += wx[0] - wx[1]
+            gX[:, 1] += wx[2] - wx[3]
+            start += 4 * n
+
+        if 'envelope' in M.constraints:
+            wzmin, wzmax = w[start:start + n], w[start + n:start + 2 * n]
+            gX[:, 2] += wzmin - wzmax
+            if nt:
+                gt[0] += dzmaxdt @ wzmax - dzmindt @ wzmin
+            if ntub:
+                gtub += wzmax
+            if ntlb:
+                gtlb += wzmin
+            start += 2 * n
+
+        if reac:
+            wrx, wry = w[start:start + nb], w[start + nb:start + 2 * nb]
+            gR = [dRx_x * wrx, dRy_y * wry, dRz_x * wrx + dRz_y * wry]
+            gXb[:, 2] += - slope_x * wrx - slope_y * wry
+            for i in range(3):
+                gq += asarray(UVW[i] @ (M.Cb @ gR[i])).flatten()
+                gX[:, i] += asarray(CbQC.transpose() @ gR[i]).flatten()
+            if nt:
+                gt[0] += db[:, 0] @ wrx + db[:, 1] @ wry
+            if ntubreac:
+                gtubreac += hstack([wrx, wry])
+            start += 2 * nb
+
+        if 'displ_map' in M.constraints:
+            wh = w[start:start + ndispl] - w[start + ndispl:start + 2 * ndispl]
+            gq += asarray(dhdq.transpose() @ wh).flatten()
+            if ndelta:
+                gdelta[0] += dhddelta @ wh
+
+        for i in coords:
+            dq, dXb = adjoint_sensitivities(M, cache, gX[:, i], i)
+            gq += dq
+            gXb[:, i] += dXb
+
+        blocks = [asarray(M.B.transpose() @ gq).flatten()]
+        if nxyb:
+            blocks += [gXb[:, 0], gXb[:, 1]]
+        if nzb:
+            blocks += [gXb[:, 2]]
+
+        return hstack(blocks + [gt, gtub, gtlb, gtubreac, gdelta])
+
+    return LinearOperator((nconstr, nvar), matvec=matvec, rmatvec=rmatvec, dtype=float)
+
+
+def _structural(block, rows=None):
+    """Sparse copy of a dense block storing all entries of ``rows`` (all rows by default), including zeros.
+    This keeps the sparsity pattern of the jacobian independent of the point in which it is evaluated."""
+
+    block = asarray(block)
+    nrows, ncols = block.shape
+    if rows is None:
+        rows = range(nrows)
+    rows = asarray(rows, dtype=int)
+    i = repeat(rows, ncols)
+    j = tile(arange(ncols), len(rows))
+
+    return csr_matrix((block[i, j], (i, j)), shape=(nrows, ncols))
+
+
+def _structural_union(block, *patterns):
+    """Sparse copy of ``block`` storing all entries in the union of the sparsity patterns of ``patterns``, including zeros.
+    Sparse counterpart of :func:`_structural`, for blocks whose pattern is known without densifying them."""
+
+    union = None
+    for pattern in patterns:
+        pattern = csr_matrix(pattern, dtype=float, copy=True)
+        pattern.data[:] = 1.0
+        union = pattern if union is None else union + pattern
+    union = union.tocoo()
+    i, j = union.row, union.col
+    values = asarray(csr_matrix(block)[i, j]).ravel()
 
-    return deriv
+    return csr_matrix((values, (i, j)), shape=union.shape)
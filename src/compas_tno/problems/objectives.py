@@ -1,14 +1,6 @@
 from numpy import sum as npsum
 from numpy.linalg import norm
 
-from compas_tno.algorithms import xyz_from_q
-from compas_tno.algorithms import q_from_variables
-
-from scipy.sparse import diags
-from scipy.sparse.linalg import splu
-
-from compas_tno.algorithms import weights_from_xyz
-
 from compas_tno.problems import gradient_fmin
 from compas_tno.problems import gradient_fmax
 from compas_tno.problems import gradient_bestfit
@@ -105,45 +97,9 @@ def f_min_thrust(variables, M):
     if isinstance(M, list):
         M = M[0]
 
-    update_geometry = False  # In the typical case the geometry does not need to be updated
-    k = M.k
-    nb = len(M.fixed)
-
-    P_Xh_fixed = M.P[M.fixed][:, :2]  # Horizontal loads in the fixed vertices
-    P_free = M.P[M.free]  # Loads in the free vertices
-
-    X = M.X
-    Xh = X[:, :2]  # xy of the thrust (i.e. horizontal projection)
-
-    SPLU_D = None
+    cache = M.evaluate_variables(variables)
 
-    qid = variables[:k].reshape(-1, 1)
-    q = q_from_variables(qid, M.B, M.d)
-    Q = diags(q.flatten())
-
-    if 'xyb' in M.variables:
-        xyb = variables[k:k + 2*nb]
-        X[M.fixed, :2] = xyb.reshape(-1, 2, order='F')
-        update_geometry = True
-    if 'zb' in M.variables:
-        zb = variables[-nb:]
-        X[M.fixed, 2] = zb.flatten()
-        if 'fixed' not in M.features:
-            update_geometry = True
-
-    if update_geometry:
-        if 'update-loads' in M.features:
-            CitQCi = M.Cit @ Q @ M.Ci
-            SPLU_D = splu(CitQCi)
-            X[M.free] = xyz_from_q(q, P_free, X[M.fixed], M.Ci, M.Cit, M.Cb, SPLU_D=SPLU_D)
-            pz = -1 * weights_from_xyz(X, M.F, M.V0, M.V1, M.V2, thk=M.thk, density=M.ro)
-            P_free[:, 2] = pz[M.free]
-
-        X[M.free] = xyz_from_q(q, P_free, X[M.fixed], M.Ci, M.Cit, M.Cb, SPLU_D=SPLU_D)
-        Xh = X[:, :2]
-
-    CfQC = M.Cb.transpose() @ Q @ M.C
-    Rh = CfQC @ Xh - P_Xh_fixed
+    Rh = cache.R[:, :2]  # Horizontal reactions in the fixed vertices
     f = sum(norm(Rh, axis=1))
 
     return f
@@ -187,20 +143,7 @@ def f_bestfit(variables, M):
     if isinstance(M, list):
         M = M[0]
 
-    k = M.k
-    nb = len(M.fixed)
-
-    qid = variables[:k].reshape(-1, 1)
-    M.q = q_from_variables(qid, M.B, M.d)
-
-    if 'xyb' in M.variables:
-        xyb = variables[k:k + 2*nb]
-        M.X[M.fixed, :2] = xyb.reshape(-1, 2, order='F')
-    if 'zb' in M.variables:
-        zb = variables[-nb:]
-        M.X[M.fixed, [2]] = zb.flatten()
-
-    M.X[M.free] = xyz_from_q(M.q, M.P[M.free], M.X[M.fixed], M.Ci, M.Cit, M.Cb)
+    M.evaluate_variables(variables)
 
     f = sum((M.X[:, [2]] - M.s)**2)
 
@@ -226,20 +169,7 @@ def f_horprojection(variables, M):
     if isinstance(M, list):
         M = M[0]
 
-    k = M.k
-    nb = len(M.fixed)
-
-    qid = variables[:k].reshape(-1, 1)
-    M.q = q_from_variables(qid, M.B, M.d)
-
-    if 'xyb' in M.variables:
-        xyb = variables[k:k + 2*nb]
-        M.X[M.fixed, :2] = xyb.reshape(-1, 2, order='F')
-    if 'zb' in M.variables:
-        zb = variables[-nb:]
-        M.X[M.fixed, [2]] = zb.flatten()
-
-    M.X[M.free] = xyz_from_q(M.q, M.P[M.free], M.X[M.fixed], M.Ci, M.Cit, M.Cb)
+    M.evaluate_variables(variables)
 
     f = sum((M.X[:, [0]] - M.x0)**2) + sum((M.X[:, [1]] - M.y0)**2)
 
@@ -265,20 +195,7 @@ def f_loadpath_general(variables, M):
     if isinstance(M, list):
         M = M[0]
 
-    k = M.k
-    nb = len(M.fixed)
-
-    qid = variables[:k].reshape(-1, 1)
-    M.q = q_from_variables(qid, M.B, M.d)
-
-    if 'xyb' in M.variables:
-        xyb = variables[k:k + 2*nb]
-        M.X[M.fixed, :2] = xyb.reshape(-1, 2, order='F')
-    if 'zb' in M.variables:
-        zb = variables[-nb:]
-        M.X[M.fixed, [2]] = zb.flatten()
-
-    M.X[M.free] = xyz_from_q(M.q, M.P[M.free], M.X[M.fixed], M.Ci, M.Cit, M.Cb)
+    M.evaluate_variables(variables)
 
     uvw = M.C @ M.X
 
@@ -308,24 +225,9 @@ def f_complementary_energy(variables, M):
     if isinstance(M, list):
         M = M[0]
 
-    k = M.k
-    nb = len(M.fixed)
-
-    qid = variables[:k].reshape(-1, 1)
-    M.q = q_from_variables(qid, M.B, M.d)
-
-    if 'xyb' in M.variables:
-        xyb = variables[k:k + 2*nb]
-        M.X[M.fixed, :2] = xyb.reshape(-1, 2, order='F')
-    if 'zb' in M.variables:
-        zb = variables[-nb:]
-        M.X[M.fixed, [2]] = zb.flatten()
-
-    M.X[M.free] = xyz_from_q(M.q, M.P[M.free], M.X[M.fixed], M.Ci, M.Cit, M.Cb)
+    cache = M.evaluate_variables(variables)
 
-    CfQC = M.Cb.transpose().dot(diags(M.q.flatten())).dot(M.C)
-    R = CfQC.dot(M.X) - M.P[M.fixed]
-    f = -1 * npsum(R*M.dXb)
+    f = -1 * npsum(cache.R*M.dXb)
 
     return f
 
@@ -4,23 +4,40 @@ from numpy import vstack
 from numpy import hstack
 from numpy import identity
 from numpy import asarray
+from numpy import array_equal
+from numpy import arange
+from numpy import diff
+from numpy import repeat
+from numpy import isnan
+from numpy import absolute
+from numpy import finfo
+from numpy import float64
+from numpy import sqrt
 from numpy.linalg import pinv
 from numpy.linalg import svd
 
 from scipy.sparse import csr_matrix
 from scipy.sparse import diags
 from scipy.sparse import vstack as svstack
+from scipy.sparse.linalg import splu
+from scipy.spatial import cKDTree
 
 from compas.numerical import connectivity_matrix
 
 from compas.utilities import reverse_geometric_key
 
-from compas.geometry import Point
-from compas.geometry import distance_point_point_xy
 
 from compas_tno.algorithms import check_independents
 from compas_tno.algorithms import check_horizontal_loads
 from compas_tno.algorithms import find_independents
+from compas_tno.algorithms import find_independents_sparse
+from compas_tno.algorithms import NullSpaceOperator
+from compas_tno.algorithms import q_from_variables
+from compas_tno.algorithms import xyz_from_q
+from compas_tno.algorithms import LaplacianFactorization
+from compas_tno.algorithms import weights_from_xyz
+
+from compas_tno.diagrams import FormArrays
 
 from compas_tno.utilities import apply_radial_symmetry
 from compas_tno.utilities import apply_symmetry_from_axis
@@ -50,8 +67,13 @@ class Problem():
         The number of vertices
     nb : int
         The number of fixed vertices
-    E : array(2n x m)
-        The horizontal equilibrium matrix
+    E : csr_matrix(2n x m)
+        The horizontal equilibrium matrix. Its sparsity pattern depends only on the topology and its values are updated in place
+        from the plan coordinates with ``update_equilibrium_matrix``
+    Esign : array
+        The sign of the entries of ``E``, from the connectivity matrix
+    Ecoord : array
+        The coordinate, ``0`` for ``x`` or ``1`` for ``y``, of the entries of ``E``
     C : array(n x m)
         The connectivity matrix
     Ct : array(m x n)
@@ -130,6 +152,10 @@ class Problem():
         List with the index of the dependent edges
     B : array(m x k)
         Matrix transforming the force densities in the independent edges to all force densities
+    factorization : :class:`~compas_tno.algorithms.LaplacianFactorization`
+        Reusable factorization of CitQCi, whose pattern does not change during the optimisation
+    cache : :class:`~compas_tno.problems.problems.EvaluationCache`
+        The equilibrium state computed for the last variables evaluated. See ``Problem.evaluate_variables``.
 
     """
 
@@ -141,6 +167,8 @@ class Problem():
         self.ni = None
         self.nb = None
         self.E = None
+        self.Esign = None
+        self.Ecoord = None
         self.C = None
         self.Ct = None
         self.Ci = None
@@ -179,6 +207,11 @@ class Problem():
         self.k = None
         self.dep = None
         self.B = None
+        self.variables = []
+        self.constraints = []
+        self.features = []
+        self.factorization = None
+        self.cache = None
 
         pass
 
@@ -189,8 +222,278 @@ class Problem():
 
         return problem
 
+    def clear_cache(self):
+        """Clear the evaluation cache of the problem.
+
+        Note
+        ----
+        The cache should be cleared whenever the matrices of the problem (``B``, ``d``, ``P``, ...) are modified outside the optimisation callbacks.
+        """
+
+        self.cache = None
+
+    def update_equilibrium_matrix(self):
+        """Update in place the values of the equilibrium matrix ``E`` and of ``U`` and ``V`` from the plan coordinates in ``X``.
+        The sparsity pattern of ``E`` does not depend on the coordinates and is not rebuilt.
+        """
+
+        uv = self.C @ self.X[:, :2]
+        self.E.data[:] = self.Esign * uv[self.E.indices, self.Ecoord]
+        self.U = diags(uv[:, 0])
+        self.V = diags(uv[:, 1])
+
+    def update_plan_geometry(self, xy):
+        """Update the plan coordinates of the vertices, for example after ``slide_diagram`` or ``move_pattern_inwards``,
+        without rebuilding the matrices of the problem.
+
+        Parameters
+        ----------
+        xy : array (n x 2)
+            The plan coordinates of the vertices, in the order of the vertices of the form diagram.
+
+        Note
+        ----
+        The independent edges and the matrix ``B`` of a fixed diagram depend on ``E``. These should be recomputed with
+        ``adapt_problem_to_fixed_diagram`` after the update.
+        """
+
+        self.X[:, :2] = asarray(xy, dtype=float).reshape(-1, 2)
+        self.x0 = self.X[:, [0]].copy()
+        self.y0 = self.X[:, [1]].copy()
+        self.update_equilibrium_matrix()
+        self.clear_cache()
+
+    def evaluate_variables(self, variables, q=None):
+        """Unpack the variables of the optimisation and compute the equilibrium state of the network.
+        The state is cached and reused while the variables do not change, so that objective, constraints,
+        gradient and jacobian evaluated in the same point share a single factorization of ``CitQCi``.
+
+        Parameters
+        ----------
+        variables : array
+            The variables of the optimisation.
+        q : array (m x 1), optional
+            The force densities of the variables if already computed, as in :meth:`evaluate_batch`, by default None.
+
+        Returns
+        -------
+        cache : :class:`~compas_tno.problems.problems.EvaluationCache`
+            The equilibrium state in the point. The attributes ``q`` and ``X`` of the problem are updated in place.
+
+        Note
+        ----
+            Observe the order in which variables are added.
+        """
+
+        variables = asarray(variables, dtype=float).flatten()
+
+        k = self.k
+        n = self.n
+        nb = self.nb
+        check = k
+
+        thk = self.thk if hasattr(self, 'thk') else None
+        lambdh = 1.0
+        lambdv = None
+        delta = 0.0
+        tub = None
+        tlb = None
+        tub_reac = None
+
+        if 'xyb' in self.variables:
+            xyb = variables[check:check + 2*nb]
+            check = check + 2*nb
+            self.X[self.fixed, :2] = xyb.reshape(-1, 2, order='F')
+            self.update_equilibrium_matrix()
+        if 'zb' in self.variables:
+            zb = variables[check: check + nb]
+            check = check + nb
+            self.X[self.fixed, [2]] = zb.flatten()
+        if 't' in self.variables or 'n' in self.variables:
+            thk = variables[check: check + 1]
+            check = check + 1
+        if 'lambdh' in self.variables:
+            lambdh = variables[check: check + 1]
+            self.P[:, [0]] = lambdh * self.px0
+            self.P[:, [1]] = lambdh * self.py0
+            self.d = lambdh * self.d0
+            check = check + 1
+        if 'lambdv' in self.variables:
+            lambdv = variables[check: check + 1]
+            self.P[:, [2]] = lambdv * self.pzv + self.pz0
+            check = check + 1
+        if 'tub' in self.variables:
+            tub = variables[check: check + n].reshape(-1, 1)
+            self.tub = tub
+            check = check + n
+        if 'tlb' in self.variables:
+            tlb = variables[check: check + n].reshape(-1, 1)
+            self.tlb = tlb
+            check = check + n
+        if 'tub_reac' in self.variables:
+            tub_reac = variables[check: check + 2*nb].reshape(-1, 1)
+            self.tub_reac = tub_reac
+            check = check + 2*nb
+        if 'delta' in self.variables:
+            delta = float(variables[check: check + 1])
+            check = check + 1
+
+        cache = self.cache
+
+        if cache is None or not array_equal(cache.variables, variables):
+
+            if q is None:
+                qid = variables[:k].reshape(-1, 1)
+                q = q_from_variables(qid, self.B, self.d)
+            Q = diags(q.flatten())
+
+            if 'update-loads' in self.features:
+                self.P[:, 2] = -1 * weights_from_xyz(self.X, self.F, self.V0, self.V1, self.V2, thk=self.thk, density=self.ro)
+
+            if self.factorization:
+                SPLU_D = self.factorization.factorize(q)
+            else:
+                SPLU_D = splu(self.Cit @ Q @ self.Ci)
+            self.X[self.free] = xyz_from_q(q, self.P[self.free], self.X[self.fixed], self.Ci, self.Cit, self.Cb, SPLU_D=SPLU_D)
+
+            uvw = self.C @ self.X
+            CbQC = self.Cb.transpose() @ Q @ self.C
+
+            cache = EvaluationCache()
+            cache.variables = variables.copy()
+            cache.q = q
+            cache.X = self.X.copy()
+            cache.Q = Q
+            cache.SPLU_D = SPLU_D
+            cache.U = diags(uvw[:, 0])
+            cache.V = diags(uvw[:, 1])
+            cache.W = diags(uvw[:, 2])
+            cache.CbQC = CbQC
+            cache.R = CbQC @ self.X - self.P[self.fixed]
+
+            self.cache = cache
+
+        else:
+            self.X[:] = cache.X
+
+        cache.thk = thk
+        cache.lambdh = lambdh
+        cache.lambdv = lambdv
+        cache.delta = delta
+        cache.tub = tub
+        cache.tlb = tlb
+        cache.tub_reac = tub_reac
+
+        self.q = cache.q
+
+        return cache
+
+    def evaluate_batch(self, X, fobj=None, fconstr=None):
+        """Evaluate the objective function and the constraints in many vectors of variables, as in population-based
+        searches or Monte-Carlo studies.
+        The force densities of all vectors are computed at once with the matrix product ``B @ Qid + d``. The equilibrium of
+        each vector is computed with :meth:`evaluate_variables`, and shared by the objective and the constraints.
+
+        Parameters
+        ----------
+        X : array (N x nvar)
+            The vectors of variables, one per row.
+        fobj : callable, optional
+            The objective function ``fobj(x, problem)``, by default None.
+        fconstr : callable, optional
+            The constraints ``fconstr(x, problem)``, by default None.
+
+        Returns
+        -------
+        f : array (N) or None
+            The objective function in each vector, or None if ``fobj`` is not given.
+        g : array (N x nconstr) or None
+            The constraints in each vector, or None if ``fconstr`` is not given.
+
+        Note
+        ----
+            The state of the problem is left in the last vector evaluated.
+        """
+
+        X = asarray(X, dtype=float)
+        X = X.reshape(-1, X.shape[-1])
+        N = X.shape[0]
+
+        Qb = None
+        if 'lambdh' not in self.variables:  # otherwise d changes with each vector
+            Qb = q_from_variables(X[:, :self.k].T, self.B, self.d)
+
+        f = zeros(N) if fobj else None
+        g = None
+
+        for i in range(N):
+            self.evaluate_variables(X[i], q=Qb[:, [i]] if Qb is not None else None)
+            if fobj:
+                f[i] = fobj(X[i], self)
+            if fconstr:
+                gi = asarray(fconstr(X[i], self), dtype=float).flatten()
+                if g is None:
+                    g = zeros((N, len(gi)))
+                g[i] = gi
+
+        return f, g
+
+
+class EvaluationCache():
+    """
+    The ``EvaluationCache`` stores the equilibrium state of a :class:`~compas_tno.problems.Problem` for a given vector of variables.
+
+    Attributes
+    ----------
+    variables : array
+        The variables for which the state was computed
+    q : array(m x 1)
+        The vector of force densities
+    X : array(n x 3)
+        The nodal position of the vertices of the network
+    Q : array(m x m)
+        The diagonal matrix of force densities
+    SPLU_D : callable
+        Sparse LU decomposition of ``CitQCi``
+    U : array(m x m)
+        The diagonal matrix of coordinate differences in the x-direction
+    V : array(m x m)
+        The diagonal matrix of coordinate differences in the y-direction
+    W : array(m x m)
+        The diagonal matrix of coordinate differences in the z-direction
+    CbQC : array(nb x n)
+        Matrix mapping the nodal positions to the reaction forces
+    R : array(nb x 3)
+        The reaction forces on the fixed vertices
+    thk, lambdh, lambdv, delta, tub, tlb, tub_reac :
+        The additional variables unpacked from the vector of variables
+
+    """
+
+    def __init__(self):
+
+        self.variables = None
+        self.q = None
+        self.X = None
+        self.Q = None
+        self.SPLU_D = None
+        self.U = None
+        self.V = None
+        self.W = None
+        self.CbQC = None
+        self.R = None
+        self.thk = None
+        self.lambdh = 1.0
+        self.lambdv = None
+        self.delta = 0.0
+        self.tub = None
+        self.tlb = None
+        self.tub_reac = None
+
+        pass
+
 
-def initialise_form(form, find_inds=True, method='SVD', printout=False, tol=None):
+def initialise_form(form, find_inds=True, method='sparse', printout=False, tol=None):
     """ Initialise the problem for a Form-Diagram and return the FormDiagram with independent edges assigned and the matrices relevant to the equilibrium problem.
 
     Parameters
@@ -200,7 +503,7 @@ def initialise_form(form, find_inds=True, method='SVD', printout=False, tol=None
     find_inds : bool, optional
         Whether or not independents should be found (fixed diagram), by default True
     method : str, optional
-        Method to find independent edges, the default is 'SVD'. More options to come.
+        Method to find independent edges, 'sparse', 'SVD' or 'QR', the default is 'sparse'.
     printout : bool, optional
         Whether or not prints should appear on the screen, by default False
     tool : float, optional
@@ -225,13 +528,16 @@ def initialise_form(form, find_inds=True, method='SVD', printout=False, tol=None
     return M
 
 
-def initialise_problem_general(form):
+def initialise_problem_general(form, factorization='lu'):
     """ Initialise the problem for a given Form-Diagram building the main matrices used in the subsequent analysis.
 
     Parameters
     ----------
     form : :class:`~compas_tno.diagrams.FormDiagram`
         The FormDiagram.
+    factorization : str, optional
+        Method of the reusable factorization of ``CitQCi``, ``'lu'`` or ``'cholesky'``, by default ``'lu'``.
+        See :class:`~compas_tno.algorithms.LaplacianFactorization`.
 
     Returns
     -------
@@ -262,37 +568,21 @@ def initialise_problem_general(form):
 
     # Co-ordinates, loads and constraints
 
-    xyz = zeros((n, 3))
-    x = zeros((n, 1))
-    y = zeros((n, 1))
-    z = zeros((n, 1))
-    s = zeros((n, 1))
-    px = zeros((n, 1))
-    py = zeros((n, 1))
-    pz = zeros((n, 1))
-    lb = zeros((n, 1))
-    ub = zeros((n, 1))
-    xlimits = zeros((n, 2))
-    ylimits = zeros((n, 2))
-
-    for key, vertex in form.vertex.items():
-        i = k_i[key]
-        xyz[i, :] = form.vertex_coordinates(key)
-        x[i] = vertex.get('x')
-        y[i] = vertex.get('y')
-        z[i] = vertex.get('z')
-        px[i] = vertex.get('px', 0)
-        py[i] = vertex.get('py', 0)
-        pz[i] = vertex.get('pz', 0)
-        s[i] = vertex.get('target', 0)
-        if abs(s[i]) < 1e-6:
-            s[i] = 0.0
-        xlimits[i, 0] = vertex.get('xmin', None)
-        xlimits[i, 1] = vertex.get('xmax', None)
-        ylimits[i, 0] = vertex.get('ymin', None)
-        ylimits[i, 1] = vertex.get('ymax', None)
-        lb[i] = vertex.get('lb', None)
-        ub[i] = vertex.get('ub', None)
+    arrays = FormArrays(form)
+
+    x = arrays.get('x').reshape(-1, 1)
+    y = arrays.get('y').reshape(-1, 1)
+    z = arrays.get('z').reshape(-1, 1)
+    px = arrays.get('px').reshape(-1, 1)
+    py = arrays.get('py').reshape(-1, 1)
+    pz = arrays.get('pz').reshape(-1, 1)
+    s = arrays.get('target').reshape(-1, 1)
+    s[isnan(s)] = 0.0
+    s[abs(s) < 1e-6] = 0.0
+    xlimits = array([arrays.get('xmin'), arrays.get('xmax')]).transpose()
+    ylimits = array([arrays.get('ymin'), arrays.get('ymax')]).transpose()
+    lb = arrays.get('lb').reshape(-1, 1)
+    ub = arrays.get('ub').reshape(-1, 1)
 
     # Partial supports, or rollers.
 
@@ -318,10 +608,10 @@ def initialise_problem_general(form):
     Cit = Ci.transpose()
     Citx = Ct[free_x, :]
     City = Ct[free_y, :]
-    uvw = C.dot(xyz)
-    U = diags(uvw[:, 0].flatten())
-    V = diags(uvw[:, 1].flatten())
-    E = svstack((Citx.dot(U), City.dot(V))).toarray()
+    E = csr_matrix(svstack((Citx, City)))  # pattern of E = [Citx U; City V]
+    E.sort_indices()
+    Esign = E.data.copy()
+    Ecoord = (repeat(arange(E.shape[0]), diff(E.indptr)) >= len(free_x)).astype(int)
 
     # Settings of a free to move problem 'all q are variable'
 
@@ -351,13 +641,13 @@ def initialise_problem_general(form):
     problem.ni = ni
     problem.nb = nb
     problem.E = E
+    problem.Esign = Esign
+    problem.Ecoord = Ecoord
     problem.C = C
     problem.Ct = Ct
     problem.Ci = Ci
     problem.Cit = Cit
     problem.Cb = Cb
-    problem.U = U
-    problem.V = V
     problem.P = hstack([px, py, pz])
     problem.free = free
     problem.fixed = fixed
@@ -391,12 +681,14 @@ def initialise_problem_general(form):
     problem.B = B
     problem.d = d
     problem.Pmatrix = Pmatrix
+    problem.factorization = LaplacianFactorization(Ci, method=factorization)
+    problem.update_equilibrium_matrix()
     # problem.Bfixed = Bfixed
 
     return problem
 
 
-def adapt_problem_to_fixed_diagram(problem, form, method='SVD', printout=False, tol=None):
+def adapt_problem_to_fixed_diagram(problem, form, method='sparse', printout=False, tol=None, nullspace='pinv', cache=None):
     """Adapt the problem assuming that the form diagram is fixed in plan.
 
     Parameters
@@ -406,11 +698,18 @@ def adapt_problem_to_fixed_diagram(problem, form, method='SVD', printout=False,
     form : :class:`~compas_tno.diagrams.FormDiagram`
         The form diagram to be analysed
     method : str, optional
-        Method to find independent edges, the default is 'SVD'. More options to come.
+        Method to find independent edges, 'sparse', 'SVD' or 'QR', the default is 'sparse'.
     printout : bool, optional
         If prints should show in the screen, by default False
     tol : float, optional
         Tolerance of the singular values, by default None
+    nullspace : str, optional
+        How the matrix ``B`` and the vector ``d`` are computed, by default 'pinv'.
+        With 'pinv' ``B`` is a dense matrix computed with the pseudo-inverse of ``Ed``.
+        With 'sparse' ``B`` is a :class:`~compas_tno.algorithms.NullSpaceOperator` based on a sparse factorization of ``Ed`` and is never formed.
+    cache : :class:`~compas_tno.problems.SetupCache`, optional
+        Cache on disk of the independent edges and of the pseudo-inverse of ``Ed``, by default None.
+        With the same matrix ``E``, stored independents and settings, these are loaded instead of computed.
 
     """
 
@@ -419,29 +718,29 @@ def adapt_problem_to_fixed_diagram(problem, form, method='SVD', printout=False,
 
     start_time = time.time()
 
+    indset = _indset_xy(form.attributes['indset'])
+
+    stored = None
+    if cache is not None:
+        key = cache.key(problem.E, indset=indset.round(6), method=method, tol=tol, nullspace=nullspace)
+        stored = cache.load(key)
+
     # Independent and dependent branches
 
-    if form.attributes['indset']:
-        # check if it is a string and "restaure the points"
-        indset = [a if not isinstance(a, str) else reverse_geometric_key(a) for a in form.attributes['indset']]
-        ind = []
-
-        for u, v in form.edges_where({'_is_edge': True}):
-            index = problem.uv_i[(u, v)]
-            edgemid = Point(*(form.edge_midpoint(u, v)[:2] + [0]))
-            for pt in indset:
-                if distance_point_point_xy(edgemid, pt) < tol_old_ind:
-                    ind.append(index)
-                    break
-            if index in ind:
-                indset.remove(pt)
+    if stored is not None:
+        ind = stored['ind'].tolist()
+        if printout:
+            print('Loaded {} independents from the cache'.format(len(ind)))
+    elif len(indset):
+        ind = _match_indset(problem, form, indset, tol=tol_old_ind)
 
         if printout:
-            print('Loaded {} previous independents'.format(len(form.attributes['indset'])))
+            print('Loaded {} previous independents'.format(len(indset)))
             print('Found {} independents in the new pattern'.format(len(ind)))
-        if len(form.attributes['indset']) != len(ind):
+        # the matched edges are kept if they are a complete set, otherwise (e.g. stored points missing) they are completed
+        if len(ind) != len(indset) or not _independents_complete(problem.E, ind, tol=tol):
             print('Did not match problem inds')
-            ind = find_independents(problem.E, method=method, tol=tol)
+            ind = _complete_independents(problem.E, ind, tol=tol)
     else:
         ind = find_independents(problem.E, method=method, tol=tol)
 
@@ -454,27 +753,45 @@ def adapt_problem_to_fixed_diagram(problem, form, method='SVD', printout=False,
         print('Reduced problem to {0} force variables with ind. edges'.format(k))
         print('Elapsed Time: {0:.1f} sec'.format(elapsed_time))
 
+    set_ind = set(ind)
     points = []
     for u, v in form.edges_where({'_is_edge': True}):
-        if problem.uv_i[(u, v)] in ind:
+        if problem.uv_i[(u, v)] in set_ind:
             form.edge_attribute((u, v), 'is_ind', True)
-            points.append(Point(*(form.edge_midpoint(u, v)[:2] + [0])))
+            points.append(form.edge_midpoint(u, v)[:2])
         else:
             form.edge_attribute((u, v), 'is_ind', False)
     form.attributes['indset'] = points
 
-    rcond = 1e-17
-    if tol:
-        rcond = tol
-    Ed = problem.E[:, dep]
-    Edinv = -csr_matrix(pinv(problem.E[:, dep], rcond=rcond))
-    Ei = csr_matrix(problem.E[:, ind])
-    B = zeros((problem.m, k))
-    B[dep] = Edinv.dot(Ei).toarray()
-    B[ind] = identity(k)
+    if nullspace == 'sparse':
+        B = NullSpaceOperator(problem.E, ind, dep)
+        Ed = B.Ed
+        Ei = B.Ei
+        Edinv = None
+        d = B.particular_solution(problem.ph)  # q = Bqi + d | d = Ed(-1)*ph
+    else:
+        rcond = 1e-17
+        if tol:
+            rcond = tol
+        Ed = problem.E[:, dep]
+        Ei = problem.E[:, ind]
+        if stored is not None:
+            Edinv = csr_matrix(stored['Edinv'])
+            B = stored['B']
+        else:
+            Edinv = -csr_matrix(pinv(Ed.toarray(), rcond=rcond))
+            B = zeros((problem.m, k))
+            B[dep] = Edinv.dot(Ei).toarray()
+            B[ind] = identity(k)
 
-    d = zeros((problem.m, 1))
-    d[dep] = -Edinv.dot(problem.ph)  # q = Bqi + d | d = Ed(-1)*ph
+        d = zeros((problem.m, 1))
+        d[dep] = -Edinv.dot(problem.ph)  # q = Bqi + d | d = Ed(-1)*ph
+
+    if cache is not None and stored is None:
+        if nullspace == 'sparse':
+            cache.save(key, ind=array(ind, dtype=int))
+        else:
+            cache.save(key, ind=array(ind, dtype=int), Edinv=Edinv.toarray(), B=B)
 
     if any(problem.ph):
         check_hor = check_horizontal_loads(problem.E, problem.ph)
@@ -497,6 +814,65 @@ def adapt_problem_to_fixed_diagram(problem, form, method='SVD', printout=False,
     return
 
 
+def _indset_xy(indset):
+    """Coordinates (k x 2) of the stored independents, saved as lists ``[x, y]``, points or geometric keys of older files."""
+
+    points = [reverse_geometric_key(pt) if isinstance(pt, str) else pt for pt in indset or []]
+
+    return array([[pt[0], pt[1]] for pt in points], dtype=float).reshape(-1, 2)
+
+
+def _match_indset(problem, form, indset, tol=1e-3):
+    """Independent edges whose midpoint is within ``tol`` of a stored independent, each stored point matched once."""
+
+    edges = list(form.edges_where({'_is_edge': True}))
+    midpoints = array([form.edge_midpoint(u, v)[:2] for u, v in edges]).reshape(-1, 2)
+    dist, closest = cKDTree(indset).query(midpoints, distance_upper_bound=tol)
+
+    ind = []
+    matched = set()
+    for edge, d, i in zip(edges, dist, closest):
+        if d <= tol and i not in matched:
+            matched.add(i)
+            ind.append(problem.uv_i[edge])
+
+    return sorted(ind)
+
+
+def _independents_complete(E, ind, tol=None):
+    """Check cheaply if ``ind`` is a complete set of independent edges, i.e. if ``Ed`` has full column rank and spans the columns of ``Ei``.
+    Both are checked on the sparse factorization of :class:`~compas_tno.algorithms.NullSpaceOperator`, by its pivots and the residuals of ``Ei``."""
+
+    set_ind = set(ind)
+    dep = [j for j in range(E.shape[1]) if j not in set_ind]
+    try:
+        B = NullSpaceOperator(E, ind, dep)
+    except RuntimeError:  # Ed is exactly rank deficient
+        return False
+
+    pivots = absolute(B.lu.U.diagonal())
+    if not tol:
+        tol = max(B.lu.shape) * finfo(float64).eps
+    if pivots.min() <= tol * pivots.max():
+        return False
+
+    Ei = B.Ei.toarray()
+    residual = Ei - B.Ed @ B.solve_dep(Ei)
+
+    return bool(abs(residual).max() <= sqrt(finfo(float64).eps) * max(abs(Ei).max(), 1.0))
+
+
+def _complete_independents(E, ind, tol=None):
+    """Complete a partial set of independent edges. The elimination of ``find_independents_sparse`` takes the given edges
+    as the last columns, so that these are kept as independents unless they are spanned by the other given edges."""
+
+    set_ind = set(ind)
+    order = [j for j in range(E.shape[1]) if j not in set_ind] + sorted(set_ind)
+    ind_order = find_independents_sparse(csr_matrix(E)[:, order], tol=tol)
+
+    return sorted(order[j] for j in ind_order)
+
+
 def adapt_problem_to_sym_diagram(problem, form, list_axis_symmetry=None, center=None, correct_loads=True, printout=False):
     """Adapt the problem assuming that the form diagram is symmetric.
 
@@ -534,8 +910,9 @@ def adapt_problem_to_sym_diagram(problem, form, list_axis_symmetry=None, center=
         print('Reduced problem to {0} force variables by SYM'.format(k))
         print('Elapsed Time: {0:.1f} sec'.format(elapsed_time))
 
+    set_ind = set(ind)
     for u, v in form.edges_where({'_is_edge': True}):
-        form.edge_attribute((u, v), 'is_ind', True if problem.uv_i[(u, v)] in ind else False)
+        form.edge_attribute((u, v), 'is_ind', True if problem.uv_i[(u, v)] in set_ind else False)
 
     B = Esym
 
@@ -547,7 +924,8 @@ def adapt_problem_to_sym_diagram(problem, form, list_axis_symmetry=None, center=
     return
 
 
-def adapt_problem_to_sym_and_fixed_diagram(problem, form, method='SVD', list_axis_symmetry=None, center=None, correct_loads=True, printout=False, tol=None):
+def adapt_problem_to_sym_and_fixed_diagram(problem, form, method='sparse', list_axis_symmetry=None, center=None, correct_loads=True, printout=False, tol=None, nullspace='pinv',
+                                           cache=None):
     """ Adapt the problem assuming that the form diagram is symmetric and fixed in plane.
 
     Parameters
@@ -557,7 +935,7 @@ def adapt_problem_to_sym_and_fixed_diagram(problem, form, method='SVD', list_axi
     form : :class:`~compas_tno.diagrams.FormDiagram`
         The form diagram to analyse
     method : str, optional
-        Method to find independent edges, the default is 'SVD'. More options to come.
+        Method to find independent edges, 'sparse', 'SVD' or 'QR', the default is 'sparse'.
     list_axis_symmetry : [list], optional
         List of the axis of symmetry to consider, by default None
     center : [list], optional
@@ -566,41 +944,41 @@ def adapt_problem_to_sym_and_fixed_diagram(problem, form, method='SVD', list_axi
         If update should be done in the applied loads regarding the symmetry, by default True
     printout : bool, optional
         If prints should show in the screen, by default False
+    tol : float, optional
+        Tolerance of the singular values, by default None
+    nullspace : str, optional
+        How the matrix ``B`` of the fixed diagram is computed, 'pinv' or 'sparse', by default 'pinv'.
+        See ``adapt_problem_to_fixed_diagram``.
+    cache : :class:`~compas_tno.problems.SetupCache`, optional
+        Cache on disk of the set up of the fixed diagram, by default None. See ``adapt_problem_to_fixed_diagram``.
 
     """
 
     start_time = time.time()
 
-    adapt_problem_to_fixed_diagram(problem, form, method=method, printout=printout, tol=tol)
+    adapt_problem_to_fixed_diagram(problem, form, method=method, printout=printout, tol=tol, nullspace=nullspace, cache=cache)
 
     apply_sym_to_form(form, list_axis_symmetry, center, correct_loads)
 
     ind = problem.ind
     k = problem.k
     i_uv = problem.i_uv
-    uv_i = problem.uv_i
-    unique_sym = []
+    column_sym = {}
     ind_reduc = []
 
     for index in ind:
         u, v = i_uv[index]
         index_sym = form.edge_attribute((u, v), 'sym_key')
-        if index_sym not in unique_sym:
-            unique_sym.append(index_sym)
+        if index_sym not in column_sym:
+            column_sym[index_sym] = len(ind_reduc)
             ind_reduc.append(index)
 
     k_sym = len(ind_reduc)
     Bsym = zeros((k, k_sym))
 
-    j = 0
-    for key in unique_sym:
-        edges_sym = [uv_i[(u, v)] for u, v in form.edges_where({'sym_key': key})]
-        col = zeros((k, 1))
-        for i, ind_i in enumerate(ind):
-            if ind_i in edges_sym:
-                col[i] = 1.0
-        Bsym[:, [j]] = col
-        j += 1
+    for i, index in enumerate(ind):
+        u, v = i_uv[index]
+        Bsym[i, column_sym[form.edge_attribute((u, v), 'sym_key')]] = 1.0
 
     B = problem.B.dot(Bsym)
     ind = ind_reduc
@@ -613,8 +991,9 @@ def adapt_problem_to_sym_and_fixed_diagram(problem, form, method='SVD', list_axi
         print('Reduced problem to {0} force variables'.format(k))
         print('Elapsed Time: {0:.1f} sec'.format(elapsed_time))
 
+    set_ind = set(ind)
     for u, v in form.edges_where({'_is_edge': True}):
-        form.edge_attribute((u, v), 'is_ind', True if problem.uv_i[(u, v)] in ind else False)
+        form.edge_attribute((u, v), 'is_ind', True if problem.uv_i[(u, v)] in set_ind else False)
 
     problem.ind = ind
     problem.k = k
@@ -716,10 +1095,10 @@ def plot_svds(M, tol=None):
     n, m = M.E.shape
     # mn_min = min(n, m)
 
-    _, s, _ = svd(asarray(M.E))
+    _, s, _ = svd(M.E.toarray())
     # _, s, _ = svds(M.E, k=min(M.E.shape), solver='propack')
     print('max/min singular vectors E', max(s), min(s), len(s))
-    print('Shape E: {} | #ind: {} | rank : {}:'.format(M.E.shape, k, matrix_rank(M.E, tol=tol)))
+    print('Shape E: {} | #ind: {} | rank : {}:'.format(M.E.shape, k, matrix_rank(M.E.toarray(), tol=tol)))
 
     # mn = max(m - n, n - m)
     mn = max(m - n, 0)
@@ -732,7 +1111,7 @@ def plot_svds(M, tol=None):
 
     check = check_independents(M)
     print('Check independents:', check)
-    print('Shape/ Rank Ed:', M.Ed.shape, matrix_rank(M.Ed))
+    print('Shape/ Rank Ed:', M.Ed.shape, matrix_rank(M.Ed.toarray()))
 
     if zs > 0:
         first_zero = s[len(s)-zs]
@@ -3,11 +3,11 @@ from compas_tno.problems import initialise_problem_general
 from compas_tno.problems import adapt_problem_to_fixed_diagram
 from compas_tno.problems import adapt_problem_to_sym_diagram
 from compas_tno.problems import adapt_problem_to_sym_and_fixed_diagram
+from compas_tno.problems import SetupCache
 
 from compas_tno.problems import objective_selector
 
-from compas_tno.problems import callback_save_json
-from compas_tno.problems import callback_create_json
+from compas_tno.problems import IterationRecorder
 
 from compas_tno.problems import initialize_loadpath
 from compas_tno.problems import initialize_tna
@@ -18,11 +18,10 @@ from compas_tno.algorithms import q_from_variables
 from compas_tno.algorithms import xyz_from_q
 
 from compas_tno.problems import sensitivities_wrapper
+from compas_tno.problems import sensitivities_wrapper_sparse
 
 from compas_tno.problems import constr_wrapper
 
-from compas_tno.plotters import TNOPlotter
-
 from compas_tno.utilities import apply_bounds_on_q
 from compas_tno.utilities import compute_form_initial_lengths
 from compas_tno.utilities import compute_edge_stiffness
@@ -65,12 +64,15 @@ def set_up_general_optimisation(analysis):
     find_inds = optimiser.settings.get('find_inds', False)
     tol_inds = optimiser.settings.get('tol_inds', None)
     method_ind = optimiser.settings.get('method_ind', 'QR')
+    nullspace = optimiser.settings.get('nullspace', 'pinv')
+    setup_cache = optimiser.settings.get('setup_cache', None)
     qmin = optimiser.settings.get('qmin', -1e+4)
     qmax = optimiser.settings.get('qmax', +1e-8)
     features = optimiser.settings.get('features', [])
     save_iterations = optimiser.settings.get('save_iterations', False)
     solver_convex = optimiser.settings.get('solver_convex', 'MATLAB')
     autodiff = optimiser.settings.get('autodiff', False)
+    factorization = optimiser.settings.get('factorization', 'lu')
 
     pattern_center = form.parameters.get('center', None)
 
@@ -97,16 +99,17 @@ def set_up_general_optimisation(analysis):
 
     M = optimiser.M
     if not M:
-        M = initialise_problem_general(form)
+        M = initialise_problem_general(form, factorization=factorization)
 
     M.variables = variables
     M.constraints = constraints
     M.features = features
     M.shape = shape
     M.thk = thk
+    M.clear_cache()
 
     if 'update-loads' in features:
-        F, V0, V1, V2 = form.tributary_matrices(sparse=False)
+        F, V0, V1, V2 = form.tributary_matrices(sparse=True)
     else:
         F, V0, V1, V2 = 4*[None]
 
@@ -134,16 +137,24 @@ def set_up_general_optimisation(analysis):
 
     M.q = array([form.edge_attribute((u, v), 'q') for u, v in form.edges_where({'_is_edge': True})]).reshape(-1, 1)
 
+    if setup_cache is True:
+        setup_cache = SetupCache()
+    elif isinstance(setup_cache, str):
+        setup_cache = SetupCache(setup_cache)
+    elif not setup_cache:
+        setup_cache = None
+
     if 'fixed' in features and 'sym' in features:
         # print('\n-------- Initialisation with fixed and sym form --------')
         adapt_problem_to_sym_and_fixed_diagram(M, form, method=method_ind, list_axis_symmetry=axis_symmetry,
-                                               center=pattern_center, correct_loads=sym_loads, printout=printout, tol=tol_inds)
+                                               center=pattern_center, correct_loads=sym_loads, printout=printout, tol=tol_inds, nullspace=nullspace,
+                                               cache=setup_cache)
     elif 'sym' in features:
         # print('\n-------- Initialisation with sym form --------')
         adapt_problem_to_sym_diagram(M, form, list_axis_symmetry=axis_symmetry, center=pattern_center, correct_loads=sym_loads, printout=printout)
     elif 'fixed' in features:
         # print('\n-------- Initialisation with fixed form --------')
-        adapt_problem_to_fixed_diagram(M, form, method=method_ind, printout=printout, tol=tol_inds)
+        adapt_problem_to_fixed_diagram(M, form, method=method_ind, printout=printout, tol=tol_inds, nullspace=nullspace, cache=setup_cache)
     else:
         # print('\n-------- Initialisation with no-fixed and no-sym form --------')
         pass
@@ -181,7 +192,11 @@ def set_up_general_optimisation(analysis):
 
     fconstr = constr_wrapper
     if fjac:
-        fjac = sensitivities_wrapper
+        solver = optimiser.settings.get('solver')
+        if solver == 'IPOPT' or (solver == 'MMA' and optimiser.settings.get('library') == 'MMA'):
+            fjac = sensitivities_wrapper_sparse
+        else:
+            fjac = sensitivities_wrapper
 
     # Alternative for autodiff
 
@@ -298,11 +313,12 @@ def set_up_general_optimisation(analysis):
         M.Ed = vstack([Edx, Edy])
 
     if save_iterations:
-        callback_create_json()
-        optimiser.callback = callback_save_json
-        callback_save_json(x0)  # save staring point to file
+        optimiser.callback = IterationRecorder(problem=M, fobj=fobj, fconstr=fconstr)
+        optimiser.callback(x0)  # save staring point to file
 
     if plot:
+        from compas_tno.plotters import TNOPlotter
+
         plotter = TNOPlotter(form)
         plotter.draw_form_independents()
         plotter.show()
@@ -0,0 +1,215 @@
+import hashlib
+import os
+import tempfile
+
+import compas_tno
+
+from numpy import array
+from numpy import asarray
+from numpy import ascontiguousarray
+from numpy import load
+from numpy import savez_compressed
+
+from scipy.sparse import issparse
+
+
+class SetupCache(object):
+    """Persistent cache on disk of the set up of fixed form diagrams, with a limit of size.
+
+    The entries are content-addressed: the key hashes the equilibrium matrix ``E``, which encodes the topology, the plan coordinates
+    and the supports of the form diagram, together with the stored independent edges and the settings of the set up.
+    Each entry is a compressed ``.npz`` file. When the cache exceeds its size, the least recently used entries are evicted.
+
+    Parameters
+    ----------
+    path : str, optional
+        Folder of the cache, by default None, in which ``setup_cache`` in the ``compas_tno`` temp folder is used.
+    max_size : float, optional
+        Maximum size of the cache in MB, by default 500.0.
+    max_entries : int, optional
+        Maximum number of entries of the cache, by default None, in which the number of entries is not limited.
+
+    Attributes
+    ----------
+    hits : int
+        Number of entries loaded.
+    misses : int
+        Number of entries not found.
+
+    """
+
+    extension = '.npz'
+
+    def __init__(self, path=None, max_size=500.0, max_entries=None):
+        self.path = path or os.path.join(compas_tno.TEMP, 'setup_cache')
+        self.max_size = max_size
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        if not os.path.isdir(self.path):
+            os.makedirs(self.path)
+
+    def key(self, E, **settings):
+        """Key of the entry of an equilibrium matrix and settings.
+
+        Parameters
+        ----------
+        E : array or sparse matrix
+            The equilibrium matrix of the form diagram.
+        **settings : dict
+            Other data defining the entry. Values are hashed with ``repr``, arrays with their content.
+
+        Returns
+        -------
+        str
+            The hexadecimal key.
+
+        """
+
+        h = hashlib.sha1()
+        if issparse(E):
+            E = E.tocsr()
+            E.sum_duplicates()
+            E.sort_indices()
+            arrays = [E.indptr, E.indices, E.data]
+        else:
+            arrays = [asarray(E, dtype=float)]
+        h.update(repr(E.shape).encode())
+        for a in arrays:
+            h.update(ascontiguousarray(a).tobytes())
+        for name in sorted(settings):
+            value = settings[name]
+            h.update(name.encode())
+            if hasattr(value, 'tobytes'):
+                h.update(ascontiguousarray(value).tobytes())
+            else:
+                h.update(repr(value).encode())
+
+        return h.hexdigest()
+
+    def filename(self, key):
+        """Path of the file of an entry."""
+
+        return os.path.join(self.path, key + self.extension)
+
+    def load(self, key):
+        """Load an entry of the cache.
+
+        Parameters
+        ----------
+        key : str
+            The key of the entry.
+
+        Returns
+        -------
+        dict or None
+            The arrays stored, or None if the entry is not in the cache or cannot be read.
+
+        """
+
+        filename = self.filename(key)
+        try:
+            with load(filename, allow_pickle=False) as data:
+                arrays = {name: data[name] for name in data.files}
+        except (IOError, OSError, ValueError):
+            self.misses += 1
+            return None
+
+        os.utime(filename, None)  # most recently used
+        self.hits += 1
+
+        return arrays
+
+    def save(self, key, **arrays):
+        """Save an entry in the cache and evict the least recently used entries above the limits.
+
+        Parameters
+        ----------
+        key : str
+            The key of the entry.
+        **arrays : dict
+            The arrays to store.
+
+        Returns
+        -------
+        str
+            Path of the file of the entry.
+
+        """
+
+        filename = self.filename(key)
+        fd, temp = tempfile.mkstemp(suffix=self.extension, dir=self.path)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                savez_compressed(f, **{name: array(value) for name, value in arrays.items()})
+            os.replace(temp, filename)  # atomic, concurrent processes never read partial entries
+        except BaseException:
+            os.remove(temp)
+            raise
+
+        self.evict()
+
+        return filename
+
+    def entries(self):
+        """Entries of the cache from the least to the most recently used.
+
+        Returns
+        -------
+        list
+            Tuples with the path, the size in bytes and the time of last use of the entries.
+
+        """
+
+        entries = []
+        for name in os.listdir(self.path):
+            if not name.endswith(self.extension):
+                continue
+            filename = os.path.join(self.path, name)
+            try:
+                stat = os.stat(filename)
+            except OSError:
+                continue
+            entries.append((filename, stat.st_size, stat.st_mtime))
+
+        return sorted(entries, key=lambda entry: entry[2])
+
+    def size(self):
+        """Size of the cache in MB."""
+
+        return sum(entry[1] for entry in self.entries()) / 1e6
+
+    def evict(self):
+        """Remove the least recently used entries until the cache is within its limits.
+
+        Returns
+        -------
+        int
+            Number of entries removed.
+
+        """
+
+        entries = self.entries()
+        size = sum(entry[1] for entry in entries)
+        removed = 0
+
+        for filename, nbytes, _ in entries:
+            over_size = size > self.max_size * 1e6
+            over_entries = self.max_entries is not None and len(entries) - removed > self.max_entries
+            if not over_size and not over_entries:
+                break
+            try:
+                os.remove(filename)
+            except OSError:
+                pass
+            size -= nbytes
+            removed += 1
+
+        return removed
+
+    def clear(self):
+        """Remove all entries of the cache."""
+
+        for filename, _, _ in self.entries():
+            os.remove(filename)
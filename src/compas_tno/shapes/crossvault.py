@@ -1,4 +1,8 @@
 from numpy import array
+from numpy import asarray
+from numpy import clip
+from numpy import sqrt
+from numpy import where
 from numpy import ones
 from numpy import zeros
 from numpy import concatenate
@@ -159,55 +163,40 @@ def crossvault_ub_lb_update(x, y, thk, t, xy_span=[[0.0, 10.0], [0.0, 10.0]], to
     hc_ub = max(rx_ub, ry_ub)
     hc_lb = max(rx_lb, ry_lb)
 
+    x = asarray(x, dtype=float).flatten()
+    y = asarray(y, dtype=float).flatten()
+
     ub = ones((len(x), 1))
     lb = ones((len(x), 1)) * - t
 
-    for i in range(len(x)):
-        xi, yi = x[i], y[i]
-        xd_ub = x0_ub + (x1_ub - x0_ub)/(y1_ub - y0_ub) * (yi - y0_ub)
-        yd_ub = y0_ub + (y1_ub - y0_ub)/(x1_ub - x0_ub) * (xi - x0_ub)
-        hxd_ub = math.sqrt((rx_ub)**2 - ((xd_ub - x0_ub) - rx_ub)**2)
-        hyd_ub = math.sqrt((ry_ub)**2 - ((yd_ub - y0_ub) - ry_ub)**2)
+    xd_ub = x0_ub + (x1_ub - x0_ub)/(y1_ub - y0_ub) * (y - y0_ub)
+    yd_ub = y0_ub + (y1_ub - y0_ub)/(x1_ub - x0_ub) * (x - x0_ub)
+    hxd_ub = _sqrt_strict((rx_ub)**2 - ((xd_ub - x0_ub) - rx_ub)**2)
+    hyd_ub = _sqrt_strict((ry_ub)**2 - ((yd_ub - y0_ub) - ry_ub)**2)
 
-        intrados_null = False
+    intrados, x_intra, y_intra = _intrados_projection(x, y, x0_lb, x1_lb, y0_lb, y1_lb)
+    xd_lb = x0_lb + (x1_lb - x0_lb)/(y1_lb - y0_lb) * (y_intra - y0_lb)
+    yd_lb = y0_lb + (y1_lb - y0_lb)/(x1_lb - x0_lb) * (x_intra - x0_lb)
+    hxd_lb = _sqrt_array(((rx_lb)**2 - ((xd_lb - x0_lb) - rx_lb)**2))
+    hyd_lb = _sqrt_array(((ry_lb)**2 - ((yd_lb - y0_lb) - ry_lb)**2))
 
-        if (yi > y1_lb and (xi > x1_lb or xi < x0_lb)) or (yi < y0_lb and (xi > x1_lb or xi < x0_lb)):
-            intrados_null = True
-        else:
-            yi_intra = yi
-            xi_intra = xi
-            if yi > y1_lb:
-                yi_intra = y1_lb
-            if yi < y0_lb:
-                yi_intra = y0_lb
-            elif xi > x1_lb:
-                xi_intra = x1_lb
-            elif xi < x0_lb:
-                xi_intra = x0_lb
-
-            xd_lb = x0_lb + (x1_lb - x0_lb)/(y1_lb - y0_lb) * (yi_intra - y0_lb)
-            yd_lb = y0_lb + (y1_lb - y0_lb)/(x1_lb - x0_lb) * (xi_intra - x0_lb)
-            hxd_lb = _sqrt(((rx_lb)**2 - ((xd_lb - x0_lb) - rx_lb)**2))
-            hyd_lb = _sqrt(((ry_lb)**2 - ((yd_lb - y0_lb) - ry_lb)**2))
+    q1, q2, q3, q4 = _diagonal_quadrants(x, y, xy_span, tol)
+    q3 = q3 & ~q1
+    q2 = q2 & ~(q1 | q3)
+    q4 = q4 & ~(q1 | q3 | q2)
 
-        if yi <= y0 + (y1 - y0)/(x1 - x0) * (xi - x0) + tol and yi >= y1 - (y1 - y0)/(x1 - x0) * (xi - x0) - tol:  # Q1
-            ub[i] = hc_ub*(hxd_ub + math.sqrt((ry_ub)**2 - ((yi - y0_ub) - ry_ub)**2))/(rx_ub + ry_ub)
-            if not intrados_null:
-                lb[i] = hc_lb*(hxd_lb + math.sqrt((ry_lb)**2 - ((yi_intra - y0_lb) - ry_lb)**2))/(rx_lb + ry_lb)
-        elif yi >= y0 + (y1 - y0)/(x1 - x0) * (xi - x0) - tol and yi >= y1 - (y1 - y0)/(x1 - x0) * (xi - x0) - tol:  # Q3
-            ub[i] = hc_ub*(hyd_ub + math.sqrt((rx_ub)**2 - ((xi - x0_ub) - rx_ub)**2))/(rx_ub + ry_ub)
-            if not intrados_null:
-                lb[i] = hc_lb*(hyd_lb + math.sqrt((rx_lb)**2 - ((xi_intra - x0_lb) - rx_lb)**2))/(rx_lb + ry_lb)
-        elif yi >= y0 + (y1 - y0)/(x1 - x0) * (xi - x0) - tol and yi <= y1 - (y1 - y0)/(x1 - x0) * (xi - x0) + tol:  # Q2
-            ub[i] = hc_ub*(hxd_ub + math.sqrt((ry_ub)**2 - ((yi - y0_ub) - ry_ub)**2))/(rx_ub + ry_ub)
-            if not intrados_null:
-                lb[i] = hc_lb*(hxd_lb + math.sqrt((ry_lb)**2 - ((yi_intra - y0_lb) - ry_lb)**2))/(rx_lb + ry_lb)
-        elif yi <= y0 + (y1 - y0)/(x1 - x0) * (xi - x0) + tol and yi <= y1 - (y1 - y0)/(x1 - x0) * (xi - x0) + tol:  # Q4
-            ub[i] = hc_ub*(hyd_ub + math.sqrt((rx_ub)**2 - ((xi - x0_ub) - rx_ub)**2))/(rx_ub + ry_ub)
-            if not intrados_null:
-                lb[i] = hc_lb*(hyd_lb + math.sqrt((rx_lb)**2 - ((xi_intra - x0_lb) - rx_lb)**2))/(rx_lb + ry_lb)
-        else:
-            print('Error Q. (x,y) = ({0},{1})'.format(xi, yi))
+    i = (q1 | q2).nonzero()[0]  # Q1 and Q2
+    ub[i, 0] = hc_ub*(hxd_ub[i] + _sqrt_strict((ry_ub)**2 - ((y[i] - y0_ub) - ry_ub)**2))/(rx_ub + ry_ub)
+    i = i[intrados[i]]
+    lb[i, 0] = hc_lb*(hxd_lb[i] + _sqrt_strict((ry_lb)**2 - ((y_intra[i] - y0_lb) - ry_lb)**2))/(rx_lb + ry_lb)
+
+    i = (q3 | q4).nonzero()[0]  # Q3 and Q4
+    ub[i, 0] = hc_ub*(hyd_ub[i] + _sqrt_strict((rx_ub)**2 - ((x[i] - x0_ub) - rx_ub)**2))/(rx_ub + ry_ub)
+    i = i[intrados[i]]
+    lb[i, 0] = hc_lb*(hyd_lb[i] + _sqrt_strict((rx_lb)**2 - ((x_intra[i] - x0_lb) - rx_lb)**2))/(rx_lb + ry_lb)
+
+    for i in (~(q1 | q2 | q3 | q4)).nonzero()[0]:
+        print('Error Q. (x,y) = ({0},{1})'.format(x[i], y[i]))
 
     return ub, lb
 
@@ -261,6 +250,9 @@ def crossvault_dub_dlb(x, y, thk, t, xy_span=[[0.0, 10.0], [0.0, 10.0]], tol=1e-
     hc_ub = max(rx_ub, ry_ub)
     hc_lb = max(rx_lb, ry_lb)
 
+    x = asarray(x, dtype=float).flatten()
+    y = asarray(y, dtype=float).flatten()
+
     ub = ones((len(x), 1))
     lb = ones((len(x), 1)) * - t
     dub = zeros((len(x), 1))  # dzub / dt
@@ -274,77 +266,37 @@ def crossvault_dub_dlb(x, y, thk, t, xy_span=[[0.0, 10.0], [0.0, 10.0]], tol=1e-
     yc = ry_ub + y0_ub  # Only works for square
     xc = rx_ub + x0_ub
 
-    for i in range(len(x)):
-
-        xi, yi = x[i], y[i]
-        xd_ub = x0_ub + (x1_ub - x0_ub)/(y1_ub - y0_ub) * (yi - y0_ub)
-        yd_ub = y0_ub + (y1_ub - y0_ub)/(x1_ub - x0_ub) * (xi - x0_ub)
-        hxd_ub = math.sqrt((rx_ub)**2 - ((xd_ub - x0_ub) - rx_ub)**2)
-        hyd_ub = math.sqrt((ry_ub)**2 - ((yd_ub - y0_ub) - ry_ub)**2)
-
-        intrados_null = False
-
-        if (yi > y1_lb and (xi > x1_lb or xi < x0_lb)) or (yi < y0_lb and (xi > x1_lb or xi < x0_lb)):
-            intrados_null = True
+    xd_ub = x0_ub + (x1_ub - x0_ub)/(y1_ub - y0_ub) * (y - y0_ub)
+    yd_ub = y0_ub + (y1_ub - y0_ub)/(x1_ub - x0_ub) * (x - x0_ub)
+    hxd_ub = _sqrt_strict((rx_ub)**2 - ((xd_ub - x0_ub) - rx_ub)**2)
+    hyd_ub = _sqrt_strict((ry_ub)**2 - ((yd_ub - y0_ub) - ry_ub)**2)
+
+    intrados, x_intra, y_intra = _intrados_projection(x, y, x0_lb, x1_lb, y0_lb, y1_lb)
+    xd_lb = x0_lb + (x1_lb - x0_lb)/(y1_lb - y0_lb) * (y_intra - y0_lb)
+    yd_lb = y0_lb + (y1_lb - y0_lb)/(x1_lb - x0_lb) * (x_intra - x0_lb)
+    hxd_lb = _sqrt_array(((rx_lb)**2 - ((xd_lb - x0_lb) - rx_lb)**2))
+    hyd_lb = _sqrt_array(((ry_lb)**2 - ((yd_lb - y0_lb) - ry_lb)**2))
+
+    # points on the diagonals belong to two quadrants, the contributions of both are summed in the derivatives
+    q1, q2, q3, q4 = _diagonal_quadrants(x, y, xy_span, tol)
+
+    for quadrant, spans_y in [(q1, True), (q3, False), (q2, True), (q4, False)]:
+        i = quadrant.nonzero()[0]
+        j = i[intrados[i]]
+        if spans_y:
+            ub[i, 0] = hc_ub*(hxd_ub[i] + _sqrt_strict((ry_ub)**2 - ((y[i] - y0_ub) - ry_ub)**2))/(rx_ub + ry_ub)
+            dub[i, 0] = 1/2 * ry_ub/ub[i, 0] * hc_ub/((rx_ub + ry_ub)/2)
+            dubdy[i, i] += - (y[i] - yc) / ub[i, 0]
+            lb[j, 0] = hc_lb*(hxd_lb[j] + _sqrt_strict((ry_lb)**2 - ((y_intra[j] - y0_lb) - ry_lb)**2))/(rx_lb + ry_lb)
+            dlb[j, 0] = - 1/2 * ry_lb/lb[j, 0] * hc_lb/((rx_lb + ry_lb)/2)
+            dlbdy[j, j] += - (y[j] - yc) / lb[j, 0]
         else:
-            yi_intra = yi
-            xi_intra = xi
-            if yi > y1_lb:
-                yi_intra = y1_lb
-            elif yi < y0_lb:
-                yi_intra = y0_lb
-            if xi > x1_lb:
-                xi_intra = x1_lb
-            elif xi < x0_lb:
-                xi_intra = x0_lb
-
-            xd_lb = x0_lb + (x1_lb - x0_lb)/(y1_lb - y0_lb) * (yi_intra - y0_lb)
-            yd_lb = y0_lb + (y1_lb - y0_lb)/(x1_lb - x0_lb) * (xi_intra - x0_lb)
-            hxd_lb = _sqrt(((rx_lb)**2 - ((xd_lb - x0_lb) - rx_lb)**2))
-            hyd_lb = _sqrt(((ry_lb)**2 - ((yd_lb - y0_lb) - ry_lb)**2))
-
-        if yi <= y0 + (y1 - y0)/(x1 - x0) * (xi - x0) + tol and yi >= y1 - (y1 - y0)/(x1 - x0) * (xi - x0) - tol:  # Q1
-            ub[i] = hc_ub*(hxd_ub + math.sqrt((ry_ub)**2 - ((yi - y0_ub) - ry_ub)**2))/(rx_ub + ry_ub)
-            dub[i] = 1/2 * ry_ub/ub[i] * hc_ub/((rx_ub + ry_ub)/2)
-            # dubdx[i, i] += 0.0
-            dubdy[i, i] += - (yi - yc) / ub[i]
-            if not intrados_null:
-                lb[i] = hc_lb*(hxd_lb + math.sqrt((ry_lb)**2 - ((yi_intra - y0_lb) - ry_lb)**2))/(rx_lb + ry_lb)
-                dlb[i] = - 1/2 * ry_lb/lb[i] * hc_lb/((rx_lb + ry_lb)/2)
-                # dlbdx[i, i] += 0.0
-                dlbdy[i, i] += - (yi - yc) / lb[i]
-        if yi >= y0 + (y1 - y0)/(x1 - x0) * (xi - x0) - tol and yi >= y1 - (y1 - y0)/(x1 - x0) * (xi - x0) - tol:  # Q3
-            ub[i] = hc_ub*(hyd_ub + math.sqrt((rx_ub)**2 - ((xi - x0_ub) - rx_ub)**2))/(rx_ub + ry_ub)
-            dub[i] = 1/2 * rx_ub/ub[i] * hc_ub/((rx_ub + ry_ub)/2)
-            # dubdy[i, i] += 0.0
-            dubdx[i, i] += - (xi - xc) / ub[i]
-            if not intrados_null:
-                lb[i] = hc_lb*(hyd_lb + math.sqrt((rx_lb)**2 - ((xi_intra - x0_lb) - rx_lb)**2))/(rx_lb + ry_lb)
-                dlb[i] = - 1/2 * rx_lb/lb[i] * hc_lb/((rx_lb + ry_lb)/2)
-                # dlbdy[i, i] += 0.0
-                dlbdx[i, i] += - (xi - xc) / lb[i]
-        if yi >= y0 + (y1 - y0)/(x1 - x0) * (xi - x0) - tol and yi <= y1 - (y1 - y0)/(x1 - x0) * (xi - x0) + tol:  # Q2
-            ub[i] = hc_ub*(hxd_ub + math.sqrt((ry_ub)**2 - ((yi - y0_ub) - ry_ub)**2))/(rx_ub + ry_ub)
-            dub[i] = 1/2 * ry_ub/ub[i] * hc_ub/((rx_ub + ry_ub)/2)
-            # dubdx[i, i] += 0.0
-            dubdy[i, i] += - (yi - yc) / ub[i]
-            if not intrados_null:
-                lb[i] = hc_lb*(hxd_lb + math.sqrt((ry_lb)**2 - ((yi_intra - y0_lb) - ry_lb)**2))/(rx_lb + ry_lb)
-                dlb[i] = - 1/2 * ry_lb/lb[i] * hc_lb/((rx_lb + ry_lb)/2)
-                # dlbdx[i, i] += 0.0
-                dlbdy[i, i] += - (yi - yc) / lb[i]
-        if yi <= y0 + (y1 - y0)/(x1 - x0) * (xi - x0) + tol and yi <= y1 - (y1 - y0)/(x1 - x0) * (xi - x0) + tol:  # Q4
-            ub[i] = hc_ub*(hyd_ub + math.sqrt((rx_ub)**2 - ((xi - x0_ub) - rx_ub)**2))/(rx_ub + ry_ub)
-            dub[i] = 1/2 * rx_ub/ub[i] * hc_ub/((rx_ub + ry_ub)/2)
-            # dubdy[i, i] += 0.0
-            dubdx[i, i] += - (xi - xc) / ub[i]
-            if not intrados_null:
-                lb[i] = hc_lb*(hyd_lb + math.sqrt((rx_lb)**2 - ((xi_intra - x0_lb) - rx_lb)**2))/(rx_lb + ry_lb)
-                dlb[i] = - 1/2 * rx_lb/lb[i] * hc_lb/((rx_lb + ry_lb)/2)
-                # dlbdy[i, i] += 0.0
-                dlbdx[i, i] += - (xi - xc) / lb[i]
-        # else:
-        #     print('Error Q. (x,y) = ({0},{1})'.format(xi, yi))
+            ub[i, 0] = hc_ub*(hyd_ub[i] + _sqrt_strict((rx_ub)**2 - ((x[i] - x0_ub) - rx_ub)**2))/(rx_ub + ry_ub)
+            dub[i, 0] = 1/2 * rx_ub/ub[i, 0] * hc_ub/((rx_ub + ry_ub)/2)
+            dubdx[i, i] += - (x[i] - xc) / ub[i, 0]
+            lb[j, 0] = hc_lb*(hyd_lb[j] + _sqrt_strict((rx_lb)**2 - ((x_intra[j] - x0_lb) - rx_lb)**2))/(rx_lb + ry_lb)
+            dlb[j, 0] = - 1/2 * rx_lb/lb[j, 0] * hc_lb/((rx_lb + ry_lb)/2)
+            dlbdx[j, j] += - (x[j] - xc) / lb[j, 0]
 
     return dub, dlb, dubdx, dubdy, dlbdx, dlbdy  # ub, lb
 
@@ -425,6 +377,46 @@ def _sqrt(x):
     return sqrt_x
 
 
+def _sqrt_array(x):
+    """Vectorised version of :func:`_sqrt`."""
+    x = asarray(x, dtype=float)
+    problems = x <= -10e4
+    if problems.any():
+        print('Problems to sqrt: ', x[problems])
+    return where(problems, 0.0, sqrt(abs(x)))
+
+
+def _sqrt_strict(x):
+    """Square root of an array raising ``ValueError`` for negative entries, as ``math.sqrt``."""
+    x = asarray(x, dtype=float)
+    if (x < 0).any():
+        raise ValueError('math domain error')
+    return sqrt(x)
+
+
+def _diagonal_quadrants(x, y, xy_span, tol=1e-6):
+    """Masks of the points in the quadrants Q1, Q2, Q3 and Q4 delimited by the diagonals of the span.
+
+    Points within ``tol`` of a diagonal belong to the two quadrants sharing it.
+    """
+    x0, x1 = xy_span[0]
+    y0, y1 = xy_span[1]
+    d1 = y0 + (y1 - y0)/(x1 - x0) * (x - x0)
+    d2 = y1 - (y1 - y0)/(x1 - x0) * (x - x0)
+    below_d1 = y <= d1 + tol
+    above_d1 = y >= d1 - tol
+    below_d2 = y <= d2 + tol
+    above_d2 = y >= d2 - tol
+    return below_d1 & above_d2, above_d1 & below_d2, above_d1 & above_d2, below_d1 & below_d2
+
+
+def _intrados_projection(x, y, x0_lb, x1_lb, y0_lb, y1_lb):
+    """Mask of the points with intrados (all but the corners outside the intrados span) and their projection on the intrados span."""
+    x_out = (x > x1_lb) | (x < x0_lb)
+    y_out = (y > y1_lb) | (y < y0_lb)
+    return ~(x_out & y_out), clip(x, x0_lb, x1_lb), clip(y, y0_lb, y1_lb)
+
+
 # def crossvault_dub_dlb_old(x, y, thk, t, xy_span=[[0.0, 10.0], [0.0, 10.0]], tol=1e-6):
 
 #     y1 = xy_span[1][1]
@@ -1,9 +1,13 @@
 from numpy import zeros
 from numpy import array
 from numpy import ones
+from numpy import arange
+from numpy import asarray
+from numpy import sqrt
 import math
 
 from compas_tno.shapes import MeshDos
+from compas_tno.shapes.crossvault import _sqrt_strict
 from compas.datastructures import mesh_delete_duplicate_vertices
 
 
@@ -522,12 +526,14 @@ def dome_ub_lb_update(x, y, thk, t, center=[5.0, 5.0], radius=5.0):
     ub = ones((len(x), 1))
     lb = ones((len(x), 1)) * -t
 
-    for i in range(len(x)):
-        zi2 = ri**2 - (x[i] - xc)**2 - (y[i] - yc)**2
-        ze2 = re**2 - (x[i] - xc)**2 - (y[i] - yc)**2
-        ub[i] = math.sqrt(ze2)
-        if zi2 > 0.0:
-            lb[i] = math.sqrt(zi2)
+    x = asarray(x, dtype=float).flatten()
+    y = asarray(y, dtype=float).flatten()
+
+    zi2 = ri**2 - (x - xc)**2 - (y - yc)**2
+    ze2 = re**2 - (x - xc)**2 - (y - yc)**2
+    ub[:, 0] = _sqrt_strict(ze2)
+    i = (zi2 > 0.0).nonzero()[0]
+    lb[i, 0] = sqrt(zi2[i])
 
     return ub, lb
 
@@ -569,18 +575,21 @@ def dome_dub_dlb(x, y, thk, t, center=[5.0, 5.0], radius=5.0):
     dlbdx = zeros((len(x), len(x)))
     dlbdy = zeros((len(x), len(x)))
 
-    for i in range(len(x)):
-        zi2 = ri**2 - (x[i] - xc)**2 - (y[i] - yc)**2
-        ze2 = re**2 - (x[i] - xc)**2 - (y[i] - yc)**2
-        ze = math.sqrt(ze2)
-        dub[i] = 1/2 * re/ze
-        dubdx[i, i] = 1/2/ze * -2 * (x[i] - xc)
-        dubdy[i, i] = 1/2/ze * -2 * (y[i] - yc)
-        if zi2 > 0.0:
-            zi = math.sqrt(zi2)
-            dlb[i] = -1/2 * ri/zi
-            dlbdx[i, i] = 1/2/zi * -2 * (x[i] - xc)
-            dlbdy[i, i] = 1/2/zi * -2 * (y[i] - yc)
+    x = asarray(x, dtype=float).flatten()
+    y = asarray(y, dtype=float).flatten()
+
+    zi2 = ri**2 - (x - xc)**2 - (y - yc)**2
+    ze2 = re**2 - (x - xc)**2 - (y - yc)**2
+    ze = _sqrt_strict(ze2)
+    i = arange(len(x))
+    dub[:, 0] = 1/2 * re/ze
+    dubdx[i, i] = 1/2/ze * -2 * (x - xc)
+    dubdy[i, i] = 1/2/ze * -2 * (y - yc)
+    i = (zi2 > 0.0).nonzero()[0]
+    zi = sqrt(zi2[i])
+    dlb[i, 0] = -1/2 * ri/zi
+    dlbdx[i, i] = 1/2/zi * -2 * (x[i] - xc)
+    dlbdy[i, i] = 1/2/zi * -2 * (y[i] - yc)
 
     return dub, dlb, dubdx, dubdy, dlbdx, dlbdy
 
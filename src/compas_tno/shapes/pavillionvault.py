@@ -4,9 +4,11 @@ from numpy import zeros
 from numpy import ones
 from numpy import array
 from numpy import linspace
+from numpy import asarray
 
 from compas_tno.shapes import MeshDos
 from compas_tno.shapes import rectangular_topology
+from compas_tno.shapes.crossvault import _sqrt_strict
 
 import math
 
@@ -228,29 +230,24 @@ def pavillionvault_ub_lb_update(x, y, thk, t, xy_span=[[0.0, 10.0], [0.0, 10.0]]
     ub = ones((len(x), 1))
     lb = ones((len(x), 1)) * - t
 
-    for i in range(len(x)):
-        xi, yi = x[i], y[i]
-        intrados_null = False
-        if yi > y1_lb or xi > x1_lb or xi < x0_lb or yi < y0_lb:
-            intrados_null = True
-        if (yi - y0) <= y1/x1 * (xi - x0) + tol and (yi - y0) <= (y1 - y0) - (xi - x0) + tol:  # Q1
-            ub[i] = math.sqrt((ry_ub)**2 - ((yi - y0_ub)-ry_ub)**2) - z_
-            if not intrados_null:
-                lb[i] = math.sqrt((ry_lb)**2 - ((yi - y0_lb)-ry_lb)**2) - z_
-        elif (yi - y0) >= y1/x1 * (xi - x0) - tol and (yi - y0) >= (y1 - y0) - (xi - x0) - tol:  # Q3
-            ub[i] = math.sqrt((ry_ub)**2 - ((yi - y0_ub)-ry_ub)**2) - z_
-            if not intrados_null:
-                lb[i] = math.sqrt((ry_lb)**2 - ((yi - y0_lb)-ry_lb)**2) - z_
-        elif (yi - y0) <= y1/x1 * (xi - x0) + tol and (yi - y0) >= (y1 - y0) - (xi - x0) - tol:  # Q2
-            ub[i] = math.sqrt((rx_ub)**2 - ((xi - x0_ub)-rx_ub)**2) - z_
-            if not intrados_null:
-                lb[i] = math.sqrt((rx_lb)**2 - ((xi - x0_lb)-rx_lb)**2) - z_
-        elif (yi - y0) >= y1/x1 * (xi - x0) - tol and (yi - y0) <= (y1 - y0) - (xi - x0) + tol:  # Q4
-            ub[i] = math.sqrt((rx_ub)**2 - ((xi - x0_ub)-rx_ub)**2) - z_
-            if not intrados_null:
-                lb[i] = math.sqrt((rx_lb)**2 - ((xi - x0_lb)-rx_lb)**2) - z_
-        else:
-            print('Error Q. (x,y) = ({0},{1})'.format(xi, yi))
+    x = asarray(x, dtype=float).flatten()
+    y = asarray(y, dtype=float).flatten()
+
+    intrados = ~((y > y1_lb) | (x > x1_lb) | (x < x0_lb) | (y < y0_lb))
+    spans_y, spans_x = _pavillion_quadrants(x, y, x0, x1, y0, y1, tol)
+
+    i = spans_y.nonzero()[0]  # Q1 and Q3
+    ub[i, 0] = _sqrt_strict((ry_ub)**2 - ((y[i] - y0_ub)-ry_ub)**2) - z_
+    i = i[intrados[i]]
+    lb[i, 0] = _sqrt_strict((ry_lb)**2 - ((y[i] - y0_lb)-ry_lb)**2) - z_
+
+    i = spans_x.nonzero()[0]  # Q2 and Q4
+    ub[i, 0] = _sqrt_strict((rx_ub)**2 - ((x[i] - x0_ub)-rx_ub)**2) - z_
+    i = i[intrados[i]]
+    lb[i, 0] = _sqrt_strict((rx_lb)**2 - ((x[i] - x0_lb)-rx_lb)**2) - z_
+
+    for i in (~(spans_y | spans_x)).nonzero()[0]:
+        print('Error Q. (x,y) = ({0},{1})'.format(x[i], y[i]))
 
     return ub, lb
 
@@ -304,37 +301,28 @@ def pavillionvault_dub_dlb(x, y, thk, t, xy_span=[[0.0, 10.0], [0.0, 10.0]], tol
     dub = zeros((len(x), 1))
     dlb = zeros((len(x), 1))
 
-    for i in range(len(x)):
-        xi, yi = x[i], y[i]
-        intrados_null = False
-        if yi > y1_lb or xi > x1_lb or xi < x0_lb or yi < y0_lb:
-            intrados_null = True
-        if (yi - y0) <= y1/x1 * (xi - x0) + tol and (yi - y0) <= (y1 - y0) - (xi - x0) + tol:  # Q1
-            ub[i] = math.sqrt((ry_ub)**2 - ((yi - y0_ub)-ry_ub)**2)
-            dub[i] = 1/2 * ry_ub/ub[i]
-            if not intrados_null:
-                lb[i] = math.sqrt((ry_lb)**2 - ((yi - y0_lb)-ry_lb)**2)
-                dlb[i] = - 1/2 * ry_lb/lb[i]
-        elif (yi - y0) >= y1/x1 * (xi - x0) - tol and (yi - y0) >= (y1 - y0) - (xi - x0) - tol:  # Q3
-            ub[i] = math.sqrt((ry_ub)**2 - ((yi - y0_ub)-ry_ub)**2)
-            dub[i] = 1/2 * ry_ub/ub[i]
-            if not intrados_null:
-                lb[i] = math.sqrt((ry_lb)**2 - ((yi - y0_lb)-ry_lb)**2)
-                dlb[i] = - 1/2 * ry_lb/lb[i]
-        elif (yi - y0) <= y1/x1 * (xi - x0) + tol and (yi - y0) >= (y1 - y0) - (xi - x0) - tol:  # Q2
-            ub[i] = math.sqrt((rx_ub)**2 - ((xi - x0_ub)-rx_ub)**2)
-            dub[i] = 1/2 * rx_ub/ub[i]
-            if not intrados_null:
-                lb[i] = math.sqrt((rx_lb)**2 - ((xi - x0_lb)-rx_lb)**2)
-                dlb[i] = - 1/2 * rx_lb/lb[i]
-        elif (yi - y0) >= y1/x1 * (xi - x0) - tol and (yi - y0) <= (y1 - y0) - (xi - x0) + tol:  # Q4
-            ub[i] = math.sqrt((rx_ub)**2 - ((xi - x0_ub)-rx_ub)**2)
-            dub[i] = 1/2 * rx_ub/ub[i]
-            if not intrados_null:
-                lb[i] = math.sqrt((rx_lb)**2 - ((xi - x0_lb)-rx_lb)**2)
-                dlb[i] = - 1/2 * rx_lb/lb[i]
-        else:
-            print('Error Q. (x,y) = ({0},{1})'.format(xi, yi))
+    x = asarray(x, dtype=float).flatten()
+    y = asarray(y, dtype=float).flatten()
+
+    intrados = ~((y > y1_lb) | (x > x1_lb) | (x < x0_lb) | (y < y0_lb))
+    spans_y, spans_x = _pavillion_quadrants(x, y, x0, x1, y0, y1, tol)
+
+    i = spans_y.nonzero()[0]  # Q1 and Q3
+    ub[i, 0] = _sqrt_strict((ry_ub)**2 - ((y[i] - y0_ub)-ry_ub)**2)
+    dub[i, 0] = 1/2 * ry_ub/ub[i, 0]
+    i = i[intrados[i]]
+    lb[i, 0] = _sqrt_strict((ry_lb)**2 - ((y[i] - y0_lb)-ry_lb)**2)
+    dlb[i, 0] = - 1/2 * ry_lb/lb[i, 0]
+
+    i = spans_x.nonzero()[0]  # Q2 and Q4
+    ub[i, 0] = _sqrt_strict((rx_ub)**2 - ((x[i] - x0_ub)-rx_ub)**2)
+    dub[i, 0] = 1/2 * rx_ub/ub[i, 0]
+    i = i[intrados[i]]
+    lb[i, 0] = _sqrt_strict((rx_lb)**2 - ((x[i] - x0_lb)-rx_lb)**2)
+    dlb[i, 0] = - 1/2 * rx_lb/lb[i, 0]
+
+    for i in (~(spans_y | spans_x)).nonzero()[0]:
+        print('Error Q. (x,y) = ({0},{1})'.format(x[i], y[i]))
 
     return dub, dlb  # ub, lb
 
@@ -421,3 +409,17 @@ def pavillionvault_db(x, y, thk, fixed, xy_span=[[0.0, 10.0], [0.0, 10.0]]):
             db[i, :] += [0, +1/2]
 
     return abs(db)
+
+
+def _pavillion_quadrants(x, y, x0, x1, y0, y1, tol=1e-6):
+    """Masks of the points in the quadrants Q1 and Q3, spanning in y, and Q2 and Q4, spanning in x, of a pavillion vault.
+
+    Points within ``tol`` of a diagonal of the span are assigned to the first quadrant in the order Q1, Q3, Q2, Q4.
+    """
+    below_d1 = (y - y0) <= y1/x1 * (x - x0) + tol
+    above_d1 = (y - y0) >= y1/x1 * (x - x0) - tol
+    below_d2 = (y - y0) <= (y1 - y0) - (x - x0) + tol
+    above_d2 = (y - y0) >= (y1 - y0) - (x - x0) - tol
+    spans_y = (below_d1 & below_d2) | (above_d1 & above_d2)
+    spans_x = ~spans_y & ((below_d1 & above_d2) | (above_d1 & below_d2))
+    return spans_y, spans_x
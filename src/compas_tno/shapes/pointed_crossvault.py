@@ -2,9 +2,16 @@ from numpy import array
 from numpy import linspace
 from numpy import ones
 from numpy import zeros
+from numpy import asarray
+from numpy import concatenate
+from numpy import where
 
 from compas_tno.shapes import MeshDos
 from compas_tno.shapes import rectangular_topology
+from compas_tno.shapes.crossvault import _diagonal_quadrants
+from compas_tno.shapes.crossvault import _intrados_projection
+from compas_tno.shapes.crossvault import _sqrt_array
+from compas_tno.shapes.crossvault import _sqrt_strict
 
 import math
 
@@ -278,9 +285,6 @@ def pointed_vault_ub_lb_update(x, y, thk, t, xy_span=[[0.0, 10.0], [0.0, 10.0]],
     # lx_lb = x1_lb - x0_lb
     # ly_lb = y1_lb - y0_lb
 
-    lx = x1 - x0
-    ly = y1 - y0
-
     # hc_ub = hc + thk/2
     # hc_lb = hc - thk/2
 
@@ -313,9 +317,7 @@ def pointed_vault_ub_lb_update(x, y, thk, t, xy_span=[[0.0, 10.0], [0.0, 10.0]],
         # h4_lb, k4_lb, r4_lb = h3_lb, k3_lb, r3_lb
 
         h1, k1, r1 = _circle_3points_xy([x0, he[1]], [(x1+x0)/2, hc], [x1, he[0]])
-        h2, k2, r2 = h1, k1, r1
         h3, k3, r3 = _circle_3points_xy([y0, he[3]], [(y1+y0)/2, hc], [y1, he[2]])
-        h4, k4, r4 = h3, k3, r3
 
     # elif hm and he:
     #     h1_ub, k1_ub, r1_ub = _circle_3points_xy([(x1+x0)/2, hc_ub], [3*(x1+x0)/4, hm_ub[0]], [x1, he_ub[0]])
@@ -328,108 +330,19 @@ def pointed_vault_ub_lb_update(x, y, thk, t, xy_span=[[0.0, 10.0], [0.0, 10.0]],
     #     h3_lb, k3_lb, r3_lb = _circle_3points_xy([(y1+y0)/2, hc_lb], [3*(y1+y0)/4, hm_lb[2]], [y1, he_lb[2]])
     #     h4_lb, k4_lb, r4_lb = _circle_3points_xy([(y1+y0)/2, hc_lb], [1*(y1+y0)/4, hm_lb[3]], [y0, he_lb[3]])
 
+    x = asarray(x, dtype=float).flatten()
+    y = asarray(y, dtype=float).flatten()
+
     ub = ones((len(x), 1))
     lb = ones((len(x), 1)) * - t
 
-    for i in range(len(x)):
-        xi, yi = x[i], y[i]
-
-        if yi <= y0 + (y1 - y0)/(x1 - x0) * (xi - x0) + tol and yi >= y1 - (y1 - y0)/(x1 - x0) * (xi - x0) - tol:  # Q1
-            if he:
-                # hi_ub = k1_ub + math.sqrt(r1_ub ** 2 - (xi - h1_ub) ** 2)  # is in fact hi
-                # hi_lb = k1_lb + math.sqrt(r1_lb ** 2 - (xi - h1_lb) ** 2)
-                hi = k1 + math.sqrt(r1 ** 2 - (xi - h1) ** 2)
-            else:
-                hi = hc
-                # hi_ub = hc_ub
-                # hi_lb = hc_lb
-            # ri_ub = _find_r_given_h_l(hi_ub, ly_ub)  # This in the equation ri ** 2 =  (xi - xc_) ** 2 + (zi - zc_) ** 2  -> zc = 0.0 and xc_ = (x0 + x1)/2
-            # ri_lb = _find_r_given_h_l(hi_lb, ly_lb)  # This in the equation ri ** 2 =  (xi - xc_) ** 2 + (zi - zc_) ** 2  -> zc = 0.0 and xc_ = (x0 + x1)/2
-            ri = _find_r_given_h_l(hi, ly)
-            ri_ub = ri + thk/2  # This in the equation ri ** 2 =  (xi - xc_) ** 2 + (zi - zc_) ** 2  -> zc = 0.0 and xc_ = (x0 + x1)/2
-            ri_lb = ri - thk/2  # This in the equation ri ** 2 =  (xi - xc_) ** 2 + (zi - zc_) ** 2  -> zc = 0.0 and xc_ = (x0 + x1)/2
-            # ri_ub = r_y + thk/2  # This only works for pointed (he only)
-            # ri_lb = r_y - thk/2  # This only works for pointed (he only)
-            if yi <= (y1 + y0)/2:
-                ub[i] = _sqrt((ri_ub)**2 - (yi-(y0+ri))**2)
-                lb[i] = _sqrt((ri_lb)**2 - (yi-(y0+ri))**2)
-            else:
-                ub[i] = _sqrt((ri_ub)**2 - (yi-(y1-ri))**2)
-                lb[i] = _sqrt((ri_lb)**2 - (yi-(y1-ri))**2)
-
-        elif yi >= y0 + (y1 - y0)/(x1 - x0) * (xi - x0) - tol and yi >= y1 - (y1 - y0)/(x1 - x0) * (xi - x0) - tol:  # Q3
-            if he:
-                # hi_ub = k3_ub + math.sqrt(r3_ub ** 2 - (yi - h3_ub) ** 2)
-                # hi_lb = k3_lb + math.sqrt(r3_lb ** 2 - (yi - h3_lb) ** 2)
-                hi = k3 + math.sqrt(r3 ** 2 - (yi - h3) ** 2)
-            else:
-                hi = hc
-                # hi_ub = hc_ub
-                # hi_lb = hc_lb
-            # ri_ub = _find_r_given_h_l(hi_ub, lx_ub)  # This in the equation ri ** 2 =  (xi - xc_) ** 2 + (zi - zc_) ** 2  -> zc = 0.0 and xc_ = (x0 + x1)/2
-            # ri_lb = _find_r_given_h_l(hi_lb, lx_lb)  # This in the equation ri ** 2 =  (xi - xc_) ** 2 + (zi - zc_) ** 2  -> zc = 0.0 and xc_ = (x0 + x1)/2
-            ri = _find_r_given_h_l(hi, lx)
-            ri_ub = ri + thk/2  # This in the equation ri ** 2 =  (xi - xc_) ** 2 + (zi - zc_) ** 2  -> zc = 0.0 and xc_ = (x0 + x1)/2
-            ri_lb = ri - thk/2  # This in the equation ri ** 2 =  (xi - xc_) ** 2 + (zi - zc_) ** 2  -> zc = 0.0 and xc_ = (x0 + x1)/2
-            # ri_ub = r_x + thk/2  # This only works for pointed (he only)
-            # ri_lb = r_x - thk/2  # This only works for pointed (he only)
-            if xi <= (x0 + x1)/2:
-                ub[i] = _sqrt((ri_ub)**2 - (xi-(x0+ri))**2)
-                lb[i] = _sqrt((ri_lb)**2 - (xi-(x0+ri))**2)
-            else:
-                ub[i] = _sqrt((ri_ub)**2 - (xi-(x1-ri))**2)
-                lb[i] = _sqrt((ri_lb)**2 - (xi-(x1-ri))**2)
-
-        elif yi >= y0 + (y1 - y0)/(x1 - x0) * (xi - x0) - tol and yi <= y1 - (y1 - y0)/(x1 - x0) * (xi - x0) + tol:  # Q2
-            if he:
-                # hi_ub = k2_ub + math.sqrt(r2_ub ** 2 - (xi - h2_ub) ** 2)
-                # hi_lb = k2_lb + math.sqrt(r2_lb ** 2 - (xi - h2_lb) ** 2)
-                hi = k2 + math.sqrt(r2 ** 2 - (xi - h2) ** 2)
-            else:
-                hi = hc
-                # hi_ub = hc_ub
-                # hi_lb = hc_lb
-            # ri_lb = _find_r_given_h_l(hi_lb, ly_lb)  # This in the equation ri ** 2 =  (xi - xc_) ** 2 + (zi - zc_) ** 2  -> zc = 0.0 and xc_ = (x0 + x1)/2
-            # ri_ub = _find_r_given_h_l(hi_ub, ly_ub)  # This in the equation ri ** 2 =  (xi - xc_) ** 2 + (zi - zc_) ** 2  -> zc = 0.0 and xc_ = (x0 + x1)/2
-            ri = _find_r_given_h_l(hi, ly)
-            ri_lb = ri - thk/2  # This in the equation ri ** 2 =  (xi - xc_) ** 2 + (zi - zc_) ** 2  -> zc = 0.0 and xc_ = (x0 + x1)/2
-            ri_ub = ri + thk/2  # This in the equation ri ** 2 =  (xi - xc_) ** 2 + (zi - zc_) ** 2  -> zc = 0.0 and xc_ = (x0 + x1)/2
-            # ri_ub = r_y + thk/2  # This only works for pointed (he only)
-            # ri_lb = r_y - thk/2  # This only works for pointed (he only)
-            if yi <= (y1 + y0)/2:
-                ub[i] = _sqrt((ri_ub)**2 - (yi-(y0+ri))**2)
-                lb[i] = _sqrt((ri_lb)**2 - (yi-(y0+ri))**2)
-            else:
-                ub[i] = _sqrt((ri_ub)**2 - (yi-(y1-ri))**2)
-                lb[i] = _sqrt((ri_lb)**2 - (yi-(y1-ri))**2)
-
-        elif yi <= y0 + (y1 - y0)/(x1 - x0) * (xi - x0) + tol and yi <= y1 - (y1 - y0)/(x1 - x0) * (xi - x0) + tol:  # Q4
-            if he:
-                # hi_ub = k4_ub + math.sqrt(r4_ub ** 2 - (yi - h4_ub) ** 2)
-                # hi_lb = k4_lb + math.sqrt(r4_lb ** 2 - (yi - h4_lb) ** 2)
-                hi = k4 + math.sqrt(r4 ** 2 - (yi - h4) ** 2)
-            else:
-                hi = hc
-                # hi_ub = hc_ub
-                # hi_lb = hc_lb
-            # ri_ub = _find_r_given_h_l(hi_ub, lx_ub)  # This in the equation ri ** 2 =  (xi - xc_) ** 2 + (zi - zc_) ** 2  -> zc = 0.0 and xc_ = (x0 + x1)/2
-            # ri_lb = _find_r_given_h_l(hi_lb, lx_lb)  # This in the equation ri ** 2 =  (xi - xc_) ** 2 + (zi - zc_) ** 2  -> zc = 0.0 and xc_ = (x0 + x1)/2
-            ri = _find_r_given_h_l(hi, lx)
-            ri_ub = ri + thk/2  # This in the equation ri ** 2 =  (xi - xc_) ** 2 + (zi - zc_) ** 2  -> zc = 0.0 and xc_ = (x0 + x1)/2
-            ri_lb = ri - thk/2  # This in the equation ri ** 2 =  (xi - xc_) ** 2 + (zi - zc_) ** 2  -> zc = 0.0 and xc_ = (x0 + x1)/2
-            # ri_ub = r_x + thk/2  # This only works for pointed (he only)
-            # ri_lb = r_x - thk/2  # This only works for pointed (he only)
-            if xi <= (x0 + x1)/2:
-                ub[i] = _sqrt((ri_ub)**2 - (xi-(x0+ri))**2)
-                lb[i] = _sqrt((ri_lb)**2 - (xi-(x0+ri))**2)
-            else:
-                ub[i] = _sqrt((ri_ub)**2 - (xi-(x1-ri))**2)
-                lb[i] = _sqrt((ri_lb)**2 - (xi-(x1-ri))**2)
-        else:
-            print('Vertex did not belong to any Q. (x,y) = ({0},{1})'.format(xi, yi))
+    circles = [(h1, k1, r1), (h3, k3, r3)] if he else None
+    i, zub, zlb, _, _ = _pointed_vault_bounds(x, y, thk, xy_span, hc, circles, tol)
+    ub[i, 0] = zub
+    lb[i, 0] = zlb
 
-        if ((yi) > y1_lb and ((xi) > x1_lb or (xi) < x0_lb)) or ((yi) < y0_lb and ((xi) > x1_lb or (xi) < x0_lb)):
-            lb[i] = - 1*t
+    intrados, _, _ = _intrados_projection(x, y, x0_lb, x1_lb, y0_lb, y1_lb)
+    lb[~intrados, 0] = - 1*t
 
     return ub, lb
 
@@ -487,9 +400,6 @@ def pointed_vault_dub_dlb(x, y, thk, t, xy_span=[[0.0, 10.0], [0.0, 10.0]], hc=8
     # lx_lb = x1_lb - x0_lb
     # ly_lb = y1_lb - y0_lb
 
-    lx = x1 - x0
-    ly = y1 - y0
-
     # hc_ub = hc + thk/2
     # hc_lb = hc - thk/2
 
@@ -522,9 +432,7 @@ def pointed_vault_dub_dlb(x, y, thk, t, xy_span=[[0.0, 10.0], [0.0, 10.0]], hc=8
         # h4_lb, k4_lb, r4_lb = h3_lb, k3_lb, r3_lb
 
         h1, k1, r1 = _circle_3points_xy([x0, he[1]], [(x1+x0)/2, hc], [x1, he[0]])
-        h2, k2, r2 = h1, k1, r1
         h3, k3, r3 = _circle_3points_xy([y0, he[3]], [(y1+y0)/2, hc], [y1, he[2]])
-        h4, k4, r4 = h3, k3, r3
 
     # elif hm and he:
     #     h1_ub, k1_ub, r1_ub = _circle_3points_xy([(x1+x0)/2, hc_ub], [3*(x1+x0)/4, hm_ub[0]], [x1, he_ub[0]])
@@ -537,121 +445,67 @@ def pointed_vault_dub_dlb(x, y, thk, t, xy_span=[[0.0, 10.0], [0.0, 10.0]], hc=8
     #     h3_lb, k3_lb, r3_lb = _circle_3points_xy([(y1+y0)/2, hc_lb], [3*(y1+y0)/4, hm_lb[2]], [y1, he_lb[2]])
     #     h4_lb, k4_lb, r4_lb = _circle_3points_xy([(y1+y0)/2, hc_lb], [1*(y1+y0)/4, hm_lb[3]], [y0, he_lb[3]])
 
-    ub = ones((len(x), 1))
-    lb = ones((len(x), 1)) * - t
+    x = asarray(x, dtype=float).flatten()
+    y = asarray(y, dtype=float).flatten()
+
     dub = zeros((len(x), 1))
     dlb = zeros((len(x), 1))
 
-    for i in range(len(x)):
-        xi, yi = x[i], y[i]
+    circles = [(h1, k1, r1), (h3, k3, r3)] if he else None
+    i, zub, zlb, ri_ub, ri_lb = _pointed_vault_bounds(x, y, thk, xy_span, hc, circles, tol)
+    dub[i, 0] = 1/2 * ri_ub/zub
+    dlb[i, 0] = - 1/2 * ri_lb/zlb
 
-        if yi <= y0 + (y1 - y0)/(x1 - x0) * (xi - x0) + tol and yi >= y1 - (y1 - y0)/(x1 - x0) * (xi - x0) - tol:  # Q1
-            if he:
-                # hi_ub = k1_ub + math.sqrt(r1_ub ** 2 - (xi - h1_ub) ** 2)  # is in fact hi
-                # hi_lb = k1_lb + math.sqrt(r1_lb ** 2 - (xi - h1_lb) ** 2)
-                hi = k1 + math.sqrt(r1 ** 2 - (xi - h1) ** 2)
-            else:
-                hi = hc
-                # hi_ub = hc_ub
-                # hi_lb = hc_lb
-            # ri_ub = _find_r_given_h_l(hi_ub, ly_ub)  # This in the equation ri ** 2 =  (xi - xc_) ** 2 + (zi - zc_) ** 2  -> zc = 0.0 and xc_ = (x0 + x1)/2
-            # ri_lb = _find_r_given_h_l(hi_lb, ly_lb)  # This in the equation ri ** 2 =  (xi - xc_) ** 2 + (zi - zc_) ** 2  -> zc = 0.0 and xc_ = (x0 + x1)/2
-            ri = _find_r_given_h_l(hi, ly)
-            ri_ub = ri + thk/2  # This in the equation ri ** 2 =  (xi - xc_) ** 2 + (zi - zc_) ** 2  -> zc = 0.0 and xc_ = (x0 + x1)/2
-            ri_lb = ri - thk/2  # This in the equation ri ** 2 =  (xi - xc_) ** 2 + (zi - zc_) ** 2  -> zc = 0.0 and xc_ = (x0 + x1)/2
-            # ri_ub = r_y + thk/2  # This only works for pointed (he only)
-            # ri_lb = r_y - thk/2  # This only works for pointed (he only)
-            if yi <= (y1 + y0)/2:
-                ub[i] = _sqrt((ri_ub)**2 - (yi-(y0+ri))**2)
-                lb[i] = _sqrt((ri_lb)**2 - (yi-(y0+ri))**2)
-            else:
-                ub[i] = _sqrt((ri_ub)**2 - (yi-(y1-ri))**2)
-                lb[i] = _sqrt((ri_lb)**2 - (yi-(y1-ri))**2)
-            dub[i] = 1/2 * ri_ub/ub[i]
-            dlb[i] = - 1/2 * ri_lb/lb[i]
+    intrados, _, _ = _intrados_projection(x, y, x0_lb, x1_lb, y0_lb, y1_lb)
+    dlb[~intrados, 0] = 0.0
 
-        elif yi >= y0 + (y1 - y0)/(x1 - x0) * (xi - x0) - tol and yi >= y1 - (y1 - y0)/(x1 - x0) * (xi - x0) - tol:  # Q3
-            if he:
-                # hi_ub = k3_ub + math.sqrt(r3_ub ** 2 - (yi - h3_ub) ** 2)
-                # hi_lb = k3_lb + math.sqrt(r3_lb ** 2 - (yi - h3_lb) ** 2)
-                hi = k3 + math.sqrt(r3 ** 2 - (yi - h3) ** 2)
-            else:
-                hi = hc
-                # hi_ub = hc_ub
-                # hi_lb = hc_lb
-            # ri_ub = _find_r_given_h_l(hi_ub, lx_ub)  # This in the equation ri ** 2 =  (xi - xc_) ** 2 + (zi - zc_) ** 2  -> zc = 0.0 and xc_ = (x0 + x1)/2
-            # ri_lb = _find_r_given_h_l(hi_lb, lx_lb)  # This in the equation ri ** 2 =  (xi - xc_) ** 2 + (zi - zc_) ** 2  -> zc = 0.0 and xc_ = (x0 + x1)/2
-            ri = _find_r_given_h_l(hi, lx)
-            ri_ub = ri + thk/2  # This in the equation ri ** 2 =  (xi - xc_) ** 2 + (zi - zc_) ** 2  -> zc = 0.0 and xc_ = (x0 + x1)/2
-            ri_lb = ri - thk/2  # This in the equation ri ** 2 =  (xi - xc_) ** 2 + (zi - zc_) ** 2  -> zc = 0.0 and xc_ = (x0 + x1)/2
-            # ri_ub = r_x + thk/2  # This only works for pointed (he only)
-            # ri_lb = r_x - thk/2  # This only works for pointed (he only)
-            if xi <= (x0 + x1)/2:
-                ub[i] = _sqrt((ri_ub)**2 - (xi-(x0+ri))**2)
-                lb[i] = _sqrt((ri_lb)**2 - (xi-(x0+ri))**2)
-            else:
-                ub[i] = _sqrt((ri_ub)**2 - (xi-(x1-ri))**2)
-                lb[i] = _sqrt((ri_lb)**2 - (xi-(x1-ri))**2)
-            dub[i] = 1/2 * ri_ub/ub[i]
-            dlb[i] = - 1/2 * ri_lb/lb[i]
+    return dub, dlb  # ub, lb
 
-        elif yi >= y0 + (y1 - y0)/(x1 - x0) * (xi - x0) - tol and yi <= y1 - (y1 - y0)/(x1 - x0) * (xi - x0) + tol:  # Q2
-            if he:
-                # hi_ub = k2_ub + math.sqrt(r2_ub ** 2 - (xi - h2_ub) ** 2)
-                # hi_lb = k2_lb + math.sqrt(r2_lb ** 2 - (xi - h2_lb) ** 2)
-                hi = k2 + math.sqrt(r2 ** 2 - (xi - h2) ** 2)
-            else:
-                hi = hc
-                # hi_ub = hc_ub
-                # hi_lb = hc_lb
-            # ri_lb = _find_r_given_h_l(hi_lb, ly_lb)  # This in the equation ri ** 2 =  (xi - xc_) ** 2 + (zi - zc_) ** 2  -> zc = 0.0 and xc_ = (x0 + x1)/2
-            # ri_ub = _find_r_given_h_l(hi_ub, ly_ub)  # This in the equation ri ** 2 =  (xi - xc_) ** 2 + (zi - zc_) ** 2  -> zc = 0.0 and xc_ = (x0 + x1)/2
-            ri = _find_r_given_h_l(hi, ly)
-            ri_lb = ri - thk/2  # This in the equation ri ** 2 =  (xi - xc_) ** 2 + (zi - zc_) ** 2  -> zc = 0.0 and xc_ = (x0 + x1)/2
-            ri_ub = ri + thk/2  # This in the equation ri ** 2 =  (xi - xc_) ** 2 + (zi - zc_) ** 2  -> zc = 0.0 and xc_ = (x0 + x1)/2
-            # ri_ub = r_y + thk/2  # This only works for pointed (he only)
-            # ri_lb = r_y - thk/2  # This only works for pointed (he only)
-            if yi <= (y1 + y0)/2:
-                ub[i] = _sqrt((ri_ub)**2 - (yi-(y0+ri))**2)
-                lb[i] = _sqrt((ri_lb)**2 - (yi-(y0+ri))**2)
-            else:
-                ub[i] = _sqrt((ri_ub)**2 - (yi-(y1-ri))**2)
-                lb[i] = _sqrt((ri_lb)**2 - (yi-(y1-ri))**2)
-            dub[i] = 1/2 * ri_ub/ub[i]
-            dlb[i] = - 1/2 * ri_lb/lb[i]
 
-        elif yi <= y0 + (y1 - y0)/(x1 - x0) * (xi - x0) + tol and yi <= y1 - (y1 - y0)/(x1 - x0) * (xi - x0) + tol:  # Q4
-            if he:
-                # hi_ub = k4_ub + math.sqrt(r4_ub ** 2 - (yi - h4_ub) ** 2)
-                # hi_lb = k4_lb + math.sqrt(r4_lb ** 2 - (yi - h4_lb) ** 2)
-                hi = k4 + math.sqrt(r4 ** 2 - (yi - h4) ** 2)
-            else:
-                hi = hc
-                # hi_ub = hc_ub
-                # hi_lb = hc_lb
-            # ri_ub = _find_r_given_h_l(hi_ub, lx_ub)  # This in the equation ri ** 2 =  (xi - xc_) ** 2 + (zi - zc_) ** 2  -> zc = 0.0 and xc_ = (x0 + x1)/2
-            # ri_lb = _find_r_given_h_l(hi_lb, lx_lb)  # This in the equation ri ** 2 =  (xi - xc_) ** 2 + (zi - zc_) ** 2  -> zc = 0.0 and xc_ = (x0 + x1)/2
-            ri = _find_r_given_h_l(hi, lx)
-            ri_ub = ri + thk/2  # This in the equation ri ** 2 =  (xi - xc_) ** 2 + (zi - zc_) ** 2  -> zc = 0.0 and xc_ = (x0 + x1)/2
-            ri_lb = ri - thk/2  # This in the equation ri ** 2 =  (xi - xc_) ** 2 + (zi - zc_) ** 2  -> zc = 0.0 and xc_ = (x0 + x1)/2
-            # ri_ub = r_x + thk/2  # This only works for pointed (he only)
-            # ri_lb = r_x - thk/2  # This only works for pointed (he only)
-            if xi <= (x0 + x1)/2:
-                ub[i] = _sqrt((ri_ub)**2 - (xi-(x0+ri))**2)
-                lb[i] = _sqrt((ri_lb)**2 - (xi-(x0+ri))**2)
-            else:
-                ub[i] = _sqrt((ri_ub)**2 - (xi-(x1-ri))**2)
-                lb[i] = _sqrt((ri_lb)**2 - (xi-(x1-ri))**2)
-            dub[i] = 1/2 * ri_ub/ub[i]
-            dlb[i] = - 1/2 * ri_lb/lb[i]
-        else:
-            print('Vertex did not belong to any Q. (x,y) = ({0},{1})'.format(xi, yi))
+def _pointed_vault_bounds(x, y, thk, xy_span, hc, circles=None, tol=1e-6):
+    """Upper and lower bounds of a pointed vault in the points, without removing the intrados outside its span.
 
-        if ((yi) > y1_lb and ((xi) > x1_lb or (xi) < x0_lb)) or ((yi) < y0_lb and ((xi) > x1_lb or (xi) < x0_lb)):
-            lb[i] = - 1*t
-            dlb[i] = 0.0
+    The points in Q1 and Q2 lie on pointed arches spanning in y and the points in Q3 and Q4 on pointed arches spanning in x.
+    The height of these arches is ``hc``, or follows the circles ``(h, k, r)`` through the mid-span of the openings in x and in y.
 
-    return dub, dlb  # ub, lb
+    Returns
+    -------
+    i : array
+        Indices of the points assigned to a quadrant.
+    ub, lb : array
+        Upper and lower bounds in these points.
+    ri_ub, ri_lb : array
+        Radii of the extrados and intrados arches through these points.
+    """
+    x0, x1 = xy_span[0]
+    y0, y1 = xy_span[1]
+
+    q1, q2, q3, q4 = _diagonal_quadrants(x, y, xy_span, tol)
+    q3 = q3 & ~q1
+    q2 = q2 & ~(q1 | q3)
+    q4 = q4 & ~(q1 | q3 | q2)
+
+    for i in (~(q1 | q2 | q3 | q4)).nonzero()[0]:
+        print('Vertex did not belong to any Q. (x,y) = ({0},{1})'.format(x[i], y[i]))
+
+    index = []
+    bounds = []
+    arches = [(q1 | q2, y, x, y0, y1), (q3 | q4, x, y, x0, x1)]
+    for (quadrant, s, u, s0, s1), circle in zip(arches, circles or [None, None]):
+        i = quadrant.nonzero()[0]
+        if circle:
+            h, k, r = circle
+            hi = k + _sqrt_strict(r ** 2 - (u[i] - h) ** 2)
+        else:
+            hi = hc
+        ri = _find_r_given_h_l(hi, s1 - s0) * ones(len(i))
+        ri_ub = ri + thk/2
+        ri_lb = ri - thk/2
+        sc = where(s[i] <= (s0 + s1)/2, s0 + ri, s1 - ri)
+        index.append(i)
+        bounds.append((_sqrt_array((ri_ub)**2 - (s[i]-sc)**2), _sqrt_array((ri_lb)**2 - (s[i]-sc)**2), ri_ub, ri_lb))
+
+    return (concatenate(index),) + tuple(concatenate(values) for values in zip(*bounds))
 
 
 def _find_r_given_h_l(h, length):
@@ -106,6 +106,7 @@ class Shape(Datastructure):
 
     def __init__(self):
         super(Shape, self).__init__()
+        self._interpolators = {}
         self.datashape = {
             'type': None,
             'thk': 1.0,
@@ -122,6 +123,47 @@ class Shape(Datastructure):
         self.ro = 20.0
         self.fill = False
         self.fill_ro = 14.0
+        self.extrados_fill = None
+
+    @property
+    def intrados(self):
+        """MeshDos : Mesh representing the intrados. Setting the mesh clears the cached interpolators."""
+        return self._intrados
+
+    @intrados.setter
+    def intrados(self, mesh):
+        self._intrados = mesh
+        self.clear_interpolators()
+
+    @property
+    def extrados(self):
+        """MeshDos : Mesh representing the extrados. Setting the mesh clears the cached interpolators."""
+        return self._extrados
+
+    @extrados.setter
+    def extrados(self, mesh):
+        self._extrados = mesh
+        self.clear_interpolators()
+
+    @property
+    def middle(self):
+        """MeshDos : Mesh representing the middle surface. Setting the mesh clears the cached interpolators."""
+        return self._middle
+
+    @middle.setter
+    def middle(self, mesh):
+        self._middle = mesh
+        self.clear_interpolators()
+
+    @property
+    def extrados_fill(self):
+        """MeshDos : Mesh representing the fill. Setting the mesh clears the cached interpolators."""
+        return self._extrados_fill
+
+    @extrados_fill.setter
+    def extrados_fill(self, mesh):
+        self._extrados_fill = mesh
+        self.clear_interpolators()
 
     @property
     def data(self):
@@ -898,6 +940,147 @@ class Shape(Datastructure):
 
         raise NotImplementedError
 
+    def clear_interpolators(self):
+        """Clear the cached interpolators of the surfaces.
+
+        Note
+        ----
+        The interpolators are cleared automatically when a surface is replaced.
+        If the vertices of a surface are modified in place, this method should be called.
+        """
+
+        self._interpolators = {}
+
+    def interpolator(self, surface='middle', method=None):
+        """Returns the interpolator of the heights of a surface, which is built once and cached.
+
+        Parameters
+        ----------
+        surface : str, optional
+            The surface to interpolate, ``'intrados'``, ``'extrados'``, ``'middle'`` or ``'extrados_fill'``, by default ``'middle'``
+        method : str, optional
+            The interpolation method, ``'linear'``, ``'cubic'`` or ``'nearest'``, as in ``scipy.interpolate.griddata``.
+            By default None, in which the method in ``datashape['interpolation']`` or ``'linear'`` is used.
+
+        Returns
+        -------
+        interpolator : callable
+            The interpolator taking an array of XY coordinates (see ``scipy.interpolate.LinearNDInterpolator``).
+        """
+
+        if not method:
+            method = self.datashape.get('interpolation', 'linear')
+
+        key = (surface, method)
+        if key not in self._interpolators:
+            from compas_tno.utilities import pointcloud_interpolator
+            mesh = getattr(self, surface)
+            self._interpolators[key] = pointcloud_interpolator(mesh.vertices_attributes('xyz'), method=method)
+
+        return self._interpolators[key]
+
+    def get_ub(self, x, y):
+        """Get the height of the extrados in the point.
+
+        Parameters
+        ----------
+        x : float
+            x-coordinate of the point to evaluate.
+        y : float
+            y-coordinate of the point to evaluate.
+
+        Returns
+        -------
+        z : array
+            The extrados evaluated in the point.
+        """
+
+        return self.interpolator('extrados')([x, y])
+
+    def get_lb(self, x, y):
+        """Get the height of the intrados in the point.
+
+        Parameters
+        ----------
+        x : float
+            x-coordinate of the point to evaluate.
+        y : float
+            y-coordinate of the point to evaluate.
+
+        Returns
+        -------
+        z : array
+            The intrados evaluated in the point.
+        """
+
+        return self.interpolator('intrados')([x, y])
+
+    def get_middle(self, x, y):
+        """Get the height of the middle surface in the point.
+
+        Parameters
+        ----------
+        x : float
+            x-coordinate of the point to evaluate.
+        y : float
+            y-coordinate of the point to evaluate.
+
+        Returns
+        -------
+        z : array
+            The middle surface evaluated in the point.
+        """
+
+        return self.interpolator('middle')([x, y])
+
+    def get_ub_pattern(self, XY):
+        """Get the height of the extrados in a list of points.
+
+        Parameters
+        ----------
+        XY : list or array
+            List of the x-coordinate and y-coordinate of the points to evaluate.
+
+        Returns
+        -------
+        z : array
+            The extrados evaluated in the points.
+        """
+
+        return self.interpolator('extrados')(XY)
+
+    def get_lb_pattern(self, XY):
+        """Get the height of the intrados in a list of points.
+
+        Parameters
+        ----------
+        XY : list or array
+            List of the x-coordinate and y-coordinate of the points to evaluate.
+
+        Returns
+        -------
+        z : array
+            The intrados evaluated in the points.
+        """
+
+        return self.interpolator('intrados')(XY)
+
+    def get_middle_pattern(self, XY):
+        """Get the height of the middle surface in a list of points.
+
+        Parameters
+        ----------
+        XY : list or array
+            List of the x-coordinate and y-coordinate of the points to evaluate.
+
+        Returns
+        -------
+        z : array
+            The middle surface evaluated in the points.
+        """
+
+        return self.interpolator('middle')(XY)
+
     def interpolate_middle_from_ub_lb(self, intrados=None, extrados=None):
         """Interpolate the middle surface based on intrados and extrados
 
@@ -1114,6 +1297,7 @@ class Shape(Datastructure):
                 vol_i = proj_area*(height - zi)
                 volume += vol_i
 
+        self.clear_interpolators()  # the fill was modified in place
         self.fill = True
         self.fill_volume = volume
         print('Proj area total of shape', proj_area_total)
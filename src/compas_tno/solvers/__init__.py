@@ -42,6 +42,8 @@ CVXPY
     run_optimisation_CVXPY
     run_loadpath_from_form_CVXPY
     call_and_output_CVXPY
+    LoadpathModel
+    loadpath_model
 
 PyOpt
 ========
@@ -68,9 +70,24 @@ Post Processing
 
     post_process_general
 
+Backends
+========
+
+.. autosummary::
+    :toctree: generated/
+
+    backend_available
+    available_backends
+    require_backend
+
 """
 from __future__ import absolute_import
 
+from .backends import (
+    backend_available,
+    available_backends,
+    require_backend
+)
 from .mma_numpy import mma_numpy
 from .solver_scipy import (
     run_optimisation_scipy
@@ -88,7 +105,9 @@ from .solver_MATLAB import (
 from .solver_cvxpy import (
     run_optimisation_CVXPY,
     run_loadpath_from_form_CVXPY,
-    call_and_output_CVXPY
+    call_and_output_CVXPY,
+    LoadpathModel,
+    loadpath_model,
 )
 from .post_process import post_process_general
 from .solver_MMA import run_optimisation_MMA
@@ -112,9 +131,14 @@ __all__ = [
     'run_optimisation_CVXPY',
     'run_loadpath_from_form_CVXPY',
     'call_and_output_CVXPY',
+    'LoadpathModel',
+    'loadpath_model',
 
     'post_process_general',
 
     'run_optimisation_MMA',
 
+    'backend_available',
+    'available_backends',
+    'require_backend',
 ]
@@ -0,0 +1,100 @@
+import importlib.util
+
+
+BACKENDS = {
+    'IPOPT': 'cyipopt',
+    'CVXPY': 'cvxpy',
+    'MOSEK': ('cvxpy', 'mosek'),
+    'MATLAB': 'matlab',
+    'CVX': 'matlab',
+    'pyOpt': 'pyOpt',
+    'NLOPT': 'nlopt',
+    'PYTORCH': 'torch',
+}
+
+_AVAILABLE = {}
+
+
+def backend_available(name):
+    """Check whether the package of an optional solver backend is installed, without importing it.
+
+    Parameters
+    ----------
+    name : str
+        The name of the solver in ``BACKENDS`` (e.g. ``'IPOPT'``, ``'CVXPY'``, ``'MATLAB'``) or the name of a package.
+        Solvers requiring several packages, such as ``'MOSEK'`` through ``cvxpy``, are available if all are installed.
+        Solvers without optional backend, such as ``'SLSQP'`` or ``'MMA'``, are always available.
+
+    Returns
+    -------
+    bool
+        Whether or not the backend can be imported.
+
+    Examples
+    --------
+    >>> from compas_tno.solvers import backend_available
+    >>> backend_available('SLSQP')
+    True
+
+    """
+
+    modules = _packages(name)
+    if not modules:
+        return True
+
+    for module in modules:
+        if module not in _AVAILABLE:
+            try:
+                _AVAILABLE[module] = importlib.util.find_spec(module) is not None
+            except (ImportError, ValueError):
+                _AVAILABLE[module] = False
+
+    return all(_AVAILABLE[module] for module in modules)
+
+
+def _packages(name):
+    """Packages required by a solver of ``BACKENDS`` or a package name, empty for solvers without optional backend."""
+
+    def as_tuple(packages):
+        return (packages,) if isinstance(packages, str) else tuple(packages)
+
+    if name in BACKENDS:
+        return as_tuple(BACKENDS[name])
+
+    if any(name in as_tuple(packages) for packages in BACKENDS.values()):
+        return (name,)
+
+    return ()
+
+
+def available_backends():
+    """List the optional solver backends installed, without importing them.
+
+    Returns
+    -------
+    list
+        The names of the solvers of ``BACKENDS`` available.
+
+    """
+
+    return [name for name in BACKENDS if backend_available(name)]
+
+
+def require_backend(name):
+    """Raise an error if the package of an optional solver backend is not installed.
+
+    Parameters
+    ----------
+    name : str
+        The name of the solver in ``BACKENDS``.
+
+    Raises
+    ------
+    ImportError
+        If the package of the backend is not installed.
+
+    """
+
+    if not backend_available(name):
+        missing = [module for module in _packages(name) if not _AVAILABLE[module]]
+        raise ImportError('The solver {0} requires the package <{1}>, which is not installed. Try changing the <solver> attribute.'.format(name, ', '.join(missing)))
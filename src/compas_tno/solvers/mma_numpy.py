@@ -2,12 +2,13 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+from scipy.sparse import csr_matrix
 from scipy.sparse import diags
+from scipy.sparse import issparse
 from scipy.linalg import solve
 from scipy.sparse.linalg import spsolve
+from scipy.sparse.linalg import splu
 import numpy as np
-import logging
-import os
 import time
 
 
@@ -33,7 +34,7 @@ def mma_numpy(f_g_eval, f_df_g_dg_eval, x0, bounds, args=(), kkttol=1e-6, maxout
         and the constraints (g) and its derivatives. It takes as input the point to evaluate
         (x), and the arguments (args). It returns four arrays, first the evaluation of
         (f - 1x1 array) and (dfdx - nx1 array), and also the evaluation of (g - mx1 array)
-        and its derivative (dgdx - mxn array).
+        and its derivative (dgdx - mxn array or sparse matrix).
     x0 :  array
         Starting point for the MMA optimisation.
     bounds: list
@@ -59,6 +60,10 @@ def mma_numpy(f_g_eval, f_df_g_dg_eval, x0, bounds, args=(), kkttol=1e-6, maxout
     -----
     For more info, see [1]. This is the python version of the code written by Arjen Deetman [2].
 
+    With a sparse ``dgdx``, the subproblem is solved with sparse matrices if ``min(m, n)^2 max(m, n)`` is larger than
+    ``1e7``, i.e. if the dense Schur complements of its Newton steps are expensive. On smaller problems the overhead of the
+    sparse matrices dominates and ``dgdx`` is converted to a dense array.
+
     Notes
     ----------
     .. [1] Svanberg, K., *The method of moving asymptotes–a new method for structural optimization*,
@@ -73,17 +78,15 @@ def mma_numpy(f_g_eval, f_df_g_dg_eval, x0, bounds, args=(), kkttol=1e-6, maxout
     # Start Time
     start_time = time.time()
 
-    # Logger
-    path = os.path.dirname(os.path.realpath(__file__))
-    file = os.path.join(path, "GCMMA_TEST.log")
-    logger = setup_logger(file)
-    logger.info("Started\n")
+    if plot != '0':
+        print("Started\n")
     # Set numpy print options
     np.set_printoptions(precision=4, formatter={'float': '{: 0.4f}'.format})
     # Beam initial settings
     f0val, g0 = f_g_eval(x0, *args)
     m = len(g0)
     n = len(x0)
+    sparse = min(m, n)**2*max(m, n) > 1e7
     epsimin = 0.0000001
     eeem = np.ones((m, 1))
     zerom = np.zeros((m, 1))
@@ -109,17 +112,17 @@ def mma_numpy(f_g_eval, f_df_g_dg_eval, x0, bounds, args=(), kkttol=1e-6, maxout
     # Calculate function values and gradients of the objective and constraints functions
     if outeriter == 0:
         f0val, df0dx, fval, dfdx = f_df_g_dg_eval(xval, *args)
+        if issparse(dfdx) and not sparse:
+            dfdx = dfdx.toarray()
         innerit = 0
-        outvector1 = np.array([outeriter, innerit, f0val, fval])
-        outvector2 = xval.flatten()
         # Log
         if plot == '0':
             pass
         elif plot == '2':
-            logger.info("Starting Objective Value = {}\n".format(f0val))
+            print("Starting Objective Value = {}\n".format(f0val))
         else:
-            logger.info("outvector1 = {}".format(outvector1))
-            logger.info("outvector2 = {}\n".format(outvector2))
+            print("outvector1 = {}".format(np.hstack([outeriter, innerit, np.ravel(f0val), np.ravel(fval)])))
+            print("outvector2 = {}\n".format(xval.flatten()))
     # The iterations starts
     kktnorm = kkttol + 10
     outit = 0
@@ -127,7 +130,7 @@ def mma_numpy(f_g_eval, f_df_g_dg_eval, x0, bounds, args=(), kkttol=1e-6, maxout
         outit += 1
         outeriter += 1
         if plot != '0':
-            logger.info("iteration = {}".format(outit))
+            print("iteration = {}".format(outit))
         # The parameters low, upp, raa0 and raa are calculated:
         low, upp, raa0, raa = \
             asymp(outeriter, n, xval, xold1, xold2, xmin, xmax, low, upp, raa0, raa, raa0eps, raaeps, df0dx, dfdx)
@@ -162,38 +165,40 @@ def mma_numpy(f_g_eval, f_df_g_dg_eval, x0, bounds, args=(), kkttol=1e-6, maxout
         xval = xmma.copy()
         # Re-calculate function values and gradients of the objective and constraints functions
         f0val, df0dx, fval, dfdx = f_df_g_dg_eval(xval, *args)
+        if issparse(dfdx) and not sparse:
+            dfdx = dfdx.toarray()
         # The residual vector of the KKT conditions is calculated
         residu, kktnorm, residumax = \
             kktcheck(m, n, xmma, ymma, zmma, lam, xsi, eta, mu, zet,
                      s, xmin, xmax, df0dx, fval, dfdx, a0, a, c, d)
-        outvector1 = np.array([outeriter, innerit, f0val, fval])
-        outvector2 = xval.flatten()
         # Log
         if plot == '0':
             pass
         elif plot == '2':
-            logger.info("kktnorm    = {}".format(kktnorm))
-            logger.info("Objective Iteration: {}\n".format(f0val))
+            print("kktnorm    = {}".format(kktnorm))
+            print("Objective Iteration: {}\n".format(f0val))
         else:
-            logger.info("outvector1 = {}".format(outvector1))
-            logger.info("outvector2 = {}".format(outvector2))
-            logger.info("kktnorm    = {}".format(kktnorm))
-            logger.info("Objective Iteration: {}\n".format(f0val))
+            print("outvector1 = {}".format(np.hstack([outeriter, innerit, np.ravel(f0val), np.ravel(fval)])))
+            print("outvector2 = {}".format(xval.flatten()))
+            print("kktnorm    = {}".format(kktnorm))
+            print("Objective Iteration: {}\n".format(f0val))
     # Final log
     elapsed_time = time.time() - start_time
-    logger.info("Finished")
     if kktnorm < kkttol:
-        logger.info('Optimisation Terminated Sucessfully.')
         exitflag = 0
+        message = 'Optimisation Terminated Sucessfully.'
+    elif outit == maxoutit:
+        exitflag = 2
+        message = 'Optimisation did not respect KKT conditions.\nMaximum iterations reached.'
     else:
-        logger.info('Optimisation did not respect KKT conditions.')
         exitflag = 1
-        if outit == maxoutit:
-            logger.info('Maximum iterations reached.')
-            exitflag = 2
-    logger.info("Objective Value: {}".format(f0val))
-    logger.info("Total Iterations: {}".format(outeriter))
-    print('Elapsed Time: {0:.1f} sec'.format(elapsed_time))
+        message = 'Optimisation did not respect KKT conditions.'
+    if plot != '0':
+        print("Finished")
+        print(message)
+        print("Objective Value: {}".format(f0val))
+        print("Total Iterations: {}".format(outeriter))
+        print('Elapsed Time: {0:.1f} sec'.format(elapsed_time))
 
     return f0val, xval, exitflag
 
@@ -309,16 +314,19 @@ def mmasub(m, n, iter, xval, xmin, xmax, xold1, xold2, f0val, df0dx, fval, dfdx,
     q0 = q0+pq0
     p0 = p0*ux2
     q0 = q0*xl2
-    P = np.zeros((m, n))  # @@ make sparse with scipy?
-    Q = np.zeros((m, n))  # @@ make sparse with scipy?
-    P = np.maximum(dfdx, 0)
-    Q = np.maximum(-dfdx, 0)
-    PQ = 0.001*(P+Q)+raa0*np.dot(eeem, xmamiinv.T)
-    P = P+PQ
-    Q = Q+PQ
-    P = (diags(ux2.flatten(), 0).dot(P.T)).T
-    Q = (diags(xl2.flatten(), 0).dot(Q.T)).T
-    b = (np.dot(P, uxinv)+np.dot(Q, xlinv)-fval)
+    if issparse(dfdx):
+        P, Q = SparseLowRank.split(dfdx, raa0*eeem, xmamiinv)
+        P = P.scale_columns(ux2)
+        Q = Q.scale_columns(xl2)
+    else:
+        P = np.maximum(dfdx, 0)
+        Q = np.maximum(-dfdx, 0)
+        PQ = 0.001*(P+Q)+raa0*np.dot(eeem, xmamiinv.T)
+        P = P+PQ
+        Q = Q+PQ
+        P = P*ux2.T
+        Q = Q*xl2.T
+    b = (_dot(P, uxinv)+_dot(Q, xlinv)-fval)
     # Solving the subproblem by a primal-dual Newton method
     xmma, ymma, zmma, lam, xsi, eta, mu, zet, s = subsolv(m, n, epsimin, low, upp, alfa, beta, p0, q0, P, Q, a0, a, b, c, d)
     # Return values
@@ -361,21 +369,21 @@ def gcmmasub(m, n, iter, epsimin, xval, xmin, xmax, low, upp, raa0, raa, f0val,
     q0 = q0*xl2
     r0 = f0val-np.dot(p0.T, uxinv)-np.dot(q0.T, xlinv)
     #
-    P = np.zeros((m, n))  # @@ make sparse with scipy?
-    Q = np.zeros((m, n))  # @@ make sparse with scipy
-    P = (diags(ux2.flatten(), 0).dot(P.T)).T
-    Q = (diags(xl2.flatten(), 0).dot(Q.T)).T
-    b = (np.dot(P, uxinv)+np.dot(Q, xlinv)-fval)
-    P = np.maximum(dfdx, 0)
-    Q = np.maximum(-dfdx, 0)
-    PQ = P+Q
-    P = P+0.001*PQ
-    Q = Q+0.001*PQ
-    P = P+np.dot(raa, xmamiinv.T)
-    Q = Q+np.dot(raa, xmamiinv.T)
-    P = (diags(ux2.flatten(), 0).dot(P.T)).T
-    Q = (diags(xl2.flatten(), 0).dot(Q.T)).T
-    r = fval-np.dot(P, uxinv)-np.dot(Q, xlinv)
+    if issparse(dfdx):
+        P, Q = SparseLowRank.split(dfdx, raa, xmamiinv)
+        P = P.scale_columns(ux2)
+        Q = Q.scale_columns(xl2)
+    else:
+        P = np.maximum(dfdx, 0)
+        Q = np.maximum(-dfdx, 0)
+        PQ = P+Q
+        P = P+0.001*PQ
+        Q = Q+0.001*PQ
+        P = P+np.dot(raa, xmamiinv.T)
+        Q = Q+np.dot(raa, xmamiinv.T)
+        P = P*ux2.T
+        Q = Q*xl2.T
+    r = fval-_dot(P, uxinv)-_dot(Q, xlinv)
     b = -r
     # Solving the subproblem by a primal-dual Newton method
     xmma, ymma, zmma, lam, xsi, eta, mu, zet, s = subsolv(m, n, epsimin, low, upp, alfa, beta, p0, q0, P, Q, a0, a, b, c, d)
@@ -385,7 +393,7 @@ def gcmmasub(m, n, iter, epsimin, xval, xmin, xmax, low, upp, raa0, raa, f0val,
     uxinv = eeen/ux1
     xlinv = eeen/xl1
     f0app = r0+np.dot(p0.T, uxinv)+np.dot(q0.T, xlinv)
-    fapp = r+np.dot(P, uxinv)+np.dot(Q, xlinv)
+    fapp = r+_dot(P, uxinv)+_dot(Q, xlinv)
     # Return values
     return xmma, ymma, zmma, lam, xsi, eta, mu, zet, s, f0app, fapp
 
@@ -407,6 +415,7 @@ def subsolv(m, n, epsimin, low, upp, alfa, beta, p0, q0, P, Q, a0, a, b, c, d):
 
     een = np.ones((n, 1))
     eem = np.ones((m, 1))
+    sparse = isinstance(P, SparseLowRank)
     epsi = 1
     epsvecn = epsi*een
     epsvecm = epsi*eem
@@ -432,9 +441,9 @@ def subsolv(m, n, epsimin, low, upp, alfa, beta, p0, q0, P, Q, a0, a, b, c, d):
         xl2 = xl1*xl1
         uxinv1 = een/ux1
         xlinv1 = een/xl1
-        plam = p0+np.dot(P.T, lam)
-        qlam = q0+np.dot(Q.T, lam)
-        gvec = np.dot(P, uxinv1)+np.dot(Q, xlinv1)
+        plam = p0+_tdot(P, lam)
+        qlam = q0+_tdot(Q, lam)
+        gvec = _dot(P, uxinv1)+_dot(Q, xlinv1)
         dpsidx = plam/ux2-qlam/xl2
         rex = dpsidx-xsi+eta
         rey = c+d*y-mu-lam
@@ -465,10 +474,13 @@ def subsolv(m, n, epsimin, low, upp, alfa, beta, p0, q0, P, Q, a0, a, b, c, d):
             xlinv1 = een/xl1
             uxinv2 = een/ux2
             xlinv2 = een/xl2
-            plam = p0+np.dot(P.T, lam)
-            qlam = q0+np.dot(Q.T, lam)
-            gvec = np.dot(P, uxinv1)+np.dot(Q, xlinv1)
-            GG = (diags(uxinv2.flatten(), 0).dot(P.T)).T-(diags(xlinv2.flatten(), 0).dot(Q.T)).T
+            plam = p0+_tdot(P, lam)
+            qlam = q0+_tdot(Q, lam)
+            gvec = _dot(P, uxinv1)+_dot(Q, xlinv1)
+            if sparse:
+                GG = P.scale_columns(uxinv2)-Q.scale_columns(xlinv2)
+            else:
+                GG = P*uxinv2.T-Q*xlinv2.T
             dpsidx = plam/ux2-qlam/xl2
             delx = dpsidx-epsvecn/(x-alfa)+epsvecn/(beta-x)
             dely = c+d*y-lam-epsvecm/y
@@ -482,15 +494,16 @@ def subsolv(m, n, epsimin, low, upp, alfa, beta, p0, q0, P, Q, a0, a, b, c, d):
             diaglam = s/lam
             diaglamyi = diaglam+diagyinv
             # Start if m<n
-            if m < n:
+            if sparse:
+                dx, dlam, dz = _newton_step_sparse(m, n, GG, diagx, diagy, diaglamyi, delx, dely, delz, dellam, a, z, zet)
+            elif m < n:
                 blam = dellam+dely/diagy-np.dot(GG, (delx/diagx))
                 bb = np.concatenate((blam, delz), axis=0)
-                Alam = np.asarray(diags(diaglamyi.flatten(), 0)
-                                  + (diags(diagxinv.flatten(), 0).dot(GG.T).T).dot(GG.T))
+                Alam = np.diag(diaglamyi.flatten())+np.dot(GG*diagxinv.T, GG.T)
                 AAr1 = np.concatenate((Alam, a), axis=1)
                 AAr2 = np.concatenate((a, -zet/z), axis=0).T
                 AA = np.concatenate((AAr1, AAr2), axis=0)
-                solut = spsolve(AA, bb)
+                solut = spsolve(AA, bb).reshape(-1, 1)
                 # solut = solve(AA, bb)
                 dlam = solut[0:m]
                 dz = solut[m:m+1]
@@ -498,8 +511,7 @@ def subsolv(m, n, epsimin, low, upp, alfa, beta, p0, q0, P, Q, a0, a, b, c, d):
             else:
                 diaglamyiinv = eem/diaglamyi
                 dellamyi = dellam+dely/diagy
-                Axx = np.asarray(diags(diagx.flatten(), 0)
-                                 + (diags(diaglamyiinv.flatten(), 0).dot(GG).T).dot(GG))
+                Axx = np.diag(diagx.flatten())+np.dot(GG.T*diaglamyiinv.T, GG)
                 azz = zet/z+np.dot(a.T, (a/diaglamyi))
                 axz = np.dot(-GG.T, (a/diaglamyi))
                 bx = delx+np.dot(GG.T, (dellamyi/diaglamyi))
@@ -568,9 +580,9 @@ def subsolv(m, n, epsimin, low, upp, alfa, beta, p0, q0, P, Q, a0, a, b, c, d):
                 xl2 = xl1*xl1
                 uxinv1 = een/ux1
                 xlinv1 = een/xl1
-                plam = p0+np.dot(P.T, lam)
-                qlam = q0+np.dot(Q.T, lam)
-                gvec = np.dot(P, uxinv1)+np.dot(Q, xlinv1)
+                plam = p0+_tdot(P, lam)
+                qlam = q0+_tdot(Q, lam)
+                gvec = _dot(P, uxinv1)+_dot(Q, xlinv1)
                 dpsidx = plam/ux2-qlam/xl2
                 rex = dpsidx-xsi+eta
                 rey = c+d*y-mu-lam
@@ -588,7 +600,7 @@ def subsolv(m, n, epsimin, low, upp, alfa, beta, p0, q0, P, Q, a0, a, b, c, d):
                 steg = steg/2
                 # End: while (resinew>residunorm) and (itto<50)
             residunorm = resinew.copy()
-            residumax = max(abs(residu))
+            residumax = np.max(np.abs(residu))
             steg = 2*steg
             # End: while (residumax>0.9*epsi) and (ittt<200)
         epsi = 0.1*epsi
@@ -605,6 +617,155 @@ def subsolv(m, n, epsimin, low, upp, alfa, beta, p0, q0, P, Q, a0, a, b, c, d):
     # Return values
     return xmma, ymma, zmma, lamma, xsimma, etamma, mumma, zetmma, smma
 
+# Sparse matrices and Newton step of the subproblem (used with a sparse dfdx)
+
+
+class SparseLowRank(object):
+    """Matrix ``S + U V^T`` with a sparse part ``S`` and a term of low rank, for the approximations ``P`` and ``Q`` of the MMA
+    subproblem with a sparse ``dfdx``. The terms ``raa * xmamiinv^T`` are dense, but of rank one.
+
+    Parameters
+    ----------
+    S : sparse matrix (m x n)
+        The sparse part.
+    U : array (m x r)
+        The left factor of the low rank part.
+    V : array (n x r)
+        The right factor of the low rank part.
+    ST : sparse matrix (n x m), optional
+        The transpose of ``S`` as csr matrix, computed if not given.
+
+    Notes
+    -----
+    ``S`` and its transpose are stored once as csr matrices. The scaling of the columns and the difference of matrices with
+    the same sparsity pattern (as ``P`` and ``Q`` from :meth:`split`) only update the data of the matrices, so that the
+    Newton steps of ``subsolv`` do not build new sparse patterns.
+
+    """
+
+    def __init__(self, S, U, V, ST=None):
+        self.S = csr_matrix(S)
+        self.ST = csr_matrix(self.S.T) if ST is None else ST
+        self.U = np.asarray(U, dtype=float).reshape(S.shape[0], -1)
+        self.V = np.asarray(V, dtype=float).reshape(S.shape[1], -1)
+
+    @classmethod
+    def split(cls, dfdx, raa, xmamiinv):
+        """Matrices ``P`` and ``Q`` of the subproblem before the scaling by the asymptotes, i.e. the positive and negative
+        parts of ``dfdx`` plus ``0.001 |dfdx| + raa xmamiinv^T``, on the same sparsity pattern."""
+        D = csr_matrix(dfdx, dtype=float, copy=True)
+        D.sum_duplicates()
+        DT = csr_matrix(D.T)
+        P = cls(D, raa, xmamiinv, DT)._with_data(np.maximum(D.data, 0)+0.001*np.abs(D.data), np.maximum(DT.data, 0)+0.001*np.abs(DT.data))
+        Q = cls(D, raa, xmamiinv, DT)._with_data(np.maximum(-D.data, 0)+0.001*np.abs(D.data), np.maximum(-DT.data, 0)+0.001*np.abs(DT.data))
+        return P, Q
+
+    @property
+    def shape(self):
+        return self.S.shape
+
+    def dot(self, x):
+        """Product ``(S + U V^T) x``."""
+        return self.S @ x + self.U @ (self.V.T @ x)
+
+    def tdot(self, y):
+        """Product ``(S + U V^T)^T y``."""
+        return self.ST @ y + self.V @ (self.U.T @ y)
+
+    def scale_columns(self, w):
+        """Matrix ``(S + U V^T) diag(w)``."""
+        w = w.flatten()
+        data = self.S.data*w[self.S.indices]
+        data_t = self.ST.data*np.repeat(w, np.diff(self.ST.indptr))
+        return self._with_data(data, data_t, V=self.V*w.reshape(-1, 1))
+
+    def __sub__(self, other):
+        U = np.hstack([self.U, other.U])
+        V = np.hstack([self.V, -other.V])
+        if self._same_pattern(other):
+            return self._with_data(self.S.data-other.S.data, self.ST.data-other.ST.data, U, V)
+        return SparseLowRank(self.S-other.S, U, V)
+
+    def _same_pattern(self, other):
+        if self.S.indices is other.S.indices and self.ST.indices is other.ST.indices:
+            return True
+        return (np.array_equal(self.S.indptr, other.S.indptr) and np.array_equal(self.S.indices, other.S.indices)
+                and np.array_equal(self.ST.indptr, other.ST.indptr) and np.array_equal(self.ST.indices, other.ST.indices))
+
+    def _with_data(self, data, data_t, U=None, V=None):
+        """Matrix with the sparsity pattern of this one and the sparse data ``data`` (of ``S``) and ``data_t`` (of ``S^T``)."""
+        S = csr_matrix((data, self.S.indices, self.S.indptr), shape=self.S.shape)
+        ST = csr_matrix((data_t, self.ST.indices, self.ST.indptr), shape=self.ST.shape)
+        return SparseLowRank(S, self.U if U is None else U, self.V if V is None else V, ST)
+
+
+def _dot(P, x):
+    return P.dot(x) if isinstance(P, SparseLowRank) else np.dot(P, x)
+
+
+def _tdot(P, y):
+    return P.tdot(y) if isinstance(P, SparseLowRank) else np.dot(P.T, y)
+
+
+def _newton_step_sparse(m, n, GG, diagx, diagy, diaglamyi, delx, dely, delz, dellam, a, z, zet):
+    """Newton step of ``subsolv`` with ``GG`` as a :class:`SparseLowRank`. The system is reduced to the smallest of the
+    dual (m + 1) and primal (n + 1) Schur complements, factorized as sparse matrices with the low rank terms by Woodbury."""
+
+    if m < n:
+        blam = dellam+dely/diagy-GG.dot(delx/diagx)
+        solve_lam = _woodbury_solver(GG.S, GG.ST, GG.U, GG.V, 1/diagx, diaglamyi)
+        dlam, dz = _bordered_solve(solve_lam, a, -zet/z, blam, delz)
+        dx = -delx/diagx-GG.tdot(dlam)/diagx
+    else:
+        dellamyi = dellam+dely/diagy
+        azz = zet/z+np.dot(a.T, (a/diaglamyi))
+        axz = -GG.tdot(a/diaglamyi)
+        bx = delx+GG.tdot(dellamyi/diaglamyi)
+        bz = delz-np.dot(a.T, (dellamyi/diaglamyi))
+        solve_x = _woodbury_solver(GG.ST, GG.S, GG.V, GG.U, 1/diaglamyi, diagx)
+        dx, dz = _bordered_solve(solve_x, axz, azz, -bx, -bz)
+        dlam = GG.dot(dx)/diaglamyi-dz*(a/diaglamyi)+dellamyi/diaglamyi
+
+    return dx, dlam, dz
+
+
+def _woodbury_solver(S, ST, U, V, X, D):
+    """Solver of ``(diag(D) + G diag(X) G^T) y = b`` with ``G = S + U V^T`` and ``S`` and ``ST = S^T`` as csr matrices. The
+    sparse part ``diag(D) + S diag(X) S^T`` is factorized and the low rank terms ``[U, S X V] C [U, S X V]^T`` are added with
+    the Woodbury identity."""
+
+    X = X.reshape(-1, 1)
+    SX = csr_matrix((S.data*X.flatten()[S.indices], S.indices, S.indptr), shape=S.shape)
+    K = SX @ ST
+    K = K + diags(D.flatten())
+    lu = splu(K.tocsc())
+    r = U.shape[1]
+
+    if r == 0:
+        return lu.solve
+
+    L = np.hstack([U, SX @ V])
+    Cinv = np.block([[np.zeros((r, r)), np.eye(r)], [np.eye(r), -V.T @ (X * V)]])
+    KL = lu.solve(L)
+    small = Cinv + L.T @ KL
+
+    def solve(b):
+        y = lu.solve(b)
+        return y - KL @ np.linalg.solve(small, L.T @ y)
+
+    return solve
+
+
+def _bordered_solve(solve, h, sigma, rhs, rz):
+    """Solution of ``[[A, h], [h^T, sigma]] [v, w] = [rhs, rz]`` with ``solve`` applying the inverse of ``A``."""
+
+    y1 = solve(rhs)
+    y2 = solve(h)
+    w = (rz - h.T @ y1) / (sigma - h.T @ y2)
+
+    return y1 - y2 @ w, w
+
+
 # Function for Karush–Kuhn–Tucker check
 
 
@@ -653,7 +814,7 @@ def kktcheck(m, n, x, y, z, lam, xsi, eta, mu, zet, s, xmin, xmax, df0dx, fval,
 
     """
 
-    rex = df0dx+np.dot(dfdx.T, lam)-xsi+eta
+    rex = df0dx+dfdx.T @ lam-xsi+eta
     rey = c+d*y-mu-lam
     rez = a0-zet-np.dot(a.T, lam)
     relam = fval-a*z-y+s
@@ -743,7 +904,7 @@ def asymp(outeriter, n, xval, xold1, xold2, xmin, xmax, low, upp, raa0, raa, raa
     xmami = np.maximum(xmami, xmamieps)
     raa0 = np.dot(np.abs(df0dx).T, xmami)
     raa0 = np.maximum(raa0eps, (0.1/n)*raa0)
-    raa = np.dot(np.abs(dfdx), xmami)
+    raa = abs(dfdx) @ xmami
     raa = np.maximum(raaeps, (0.1/n)*raa)
     if outeriter <= 2:
         low = xval-asyinit*xmami
@@ -766,31 +927,6 @@ def asymp(outeriter, n, xval, xold1, xold2, xmin, xmax, low, upp, raa0, raa, raa
     return low, upp, raa0, raa
 
 
-def setup_logger(logfile):
-    # Create logger
-    logger = logging.getLogger(__name__)
-    logger.setLevel(logging.DEBUG)
-    # Create console handler and set level to debug
-    ch = logging.StreamHandler()
-    ch.setLevel(logging.DEBUG)
-    # Create file handler and set level to debug
-    fh = logging.FileHandler(logfile)
-    fh.setLevel(logging.DEBUG)
-    # Add formatter to ch and fh
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    ch.setFormatter(formatter)
-    fh.setFormatter(formatter)
-    # Add ch and fh to logger
-    logger.addHandler(ch)
-    logger.addHandler(fh)
-    # Open logfile and reset
-    with open(logfile, 'w'):
-        pass
-    # Return logger
-    return logger
-
-
 # Function for the example with evaluation of f and g
 def _evaluate_f_g(xval, *args):
     nx = 5
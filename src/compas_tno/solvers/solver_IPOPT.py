@@ -1,19 +1,13 @@
-import cyipopt
-
 import time
 
 from numpy import hstack
 from numpy import array
+from numpy import indices
 
-try:
-    from torch import tensor
+from scipy.sparse import issparse
 
-    from compas_tno.autodiff.equilibrium_pytorch import f_constraints_pytorch
-    from compas_tno.autodiff.equilibrium_pytorch import f_objective_pytorch
-    from compas_tno.autodiff.equilibrium_pytorch import compute_autograd
-    from compas_tno.autodiff.equilibrium_pytorch import compute_autograd_jacobian
-except BaseException:
-    pass  # Module tensor not available
+from compas_tno.problems import jacobian_structure
+from compas_tno.problems import jacobian_values
 
 from .post_process import post_process_general
 
@@ -45,6 +39,8 @@ class Wrapper_ipopt_autodiff(object):
             The objective function value at x.
         """
 
+        from torch import tensor
+
         variables = tensor(x.reshape(-1, 1))
         return array(self.fobj(variables, *self.args_obj))
 
@@ -62,6 +58,9 @@ class Wrapper_ipopt_autodiff(object):
             The gradient of the objective function at x.
         """
 
+        from torch import tensor
+        from compas_tno.autodiff.equilibrium_pytorch import compute_autograd
+
         variables = tensor(x.reshape(-1, 1), requires_grad=True)
         f = self.fobj(variables, *self.args_obj)
         return array(compute_autograd(variables, f))
@@ -80,6 +79,8 @@ class Wrapper_ipopt_autodiff(object):
             The constraints of the objective function at x.
         """
 
+        from torch import tensor
+
         variables = tensor(x.reshape(-1, 1))
         return array(self.fconstr(variables, *self.args_constr))
 
@@ -96,6 +97,9 @@ class Wrapper_ipopt_autodiff(object):
         jac : array
             The gradient of the jacobian matrix at x.
         """
+        from torch import tensor
+        from compas_tno.autodiff.equilibrium_pytorch import compute_autograd_jacobian
+
         variables = tensor(x.reshape(-1, 1), requires_grad=True)
         constraints = self.fconstr(variables, *self.args_constr)
         return array(compute_autograd_jacobian(variables, constraints)).flatten()
@@ -114,6 +118,7 @@ class Wrapper_ipopt(object):
         self.x0 = None
         self.eps = 1e-8
         self.fjac = None
+        self.structure = None
         pass
 
     def objective(self, x):
@@ -177,10 +182,31 @@ class Wrapper_ipopt(object):
         Returns
         -------
         jac : array
-            The gradient of the jacobian matrix at x.
+            The gradient of the jacobian matrix at x, in the order given by ``jacobianstructure``.
+        """
+
+        jac = self.fjac(x, *self.args)
+        if issparse(jac):
+            return jacobian_values(jac)
+        return jac.flatten()
+
+    def jacobianstructure(self):
+        """The callback for the sparsity structure of the jacobian
+
+        Returns
+        -------
+        structure : tuple
+            Row and column indices of the non-zeros of the jacobian matrix.
         """
 
-        return self.fjac(x, *self.args).flatten()
+        if self.structure is None:
+            jac = self.fjac(self.x0, *self.args)
+            if issparse(jac):
+                self.structure = jacobian_structure(jac)
+            else:
+                rows, cols = indices(jac.shape)
+                self.structure = (rows.flatten(), cols.flatten())
+        return self.structure
 
 
 def run_optimisation_ipopt(analysis):
@@ -198,6 +224,8 @@ def run_optimisation_ipopt(analysis):
 
     """
 
+    import cyipopt
+
     optimiser = analysis.optimiser
 
     constraints = optimiser.settings['constraints']
@@ -219,6 +247,10 @@ def run_optimisation_ipopt(analysis):
 
     if not gradients:
 
+        from torch import tensor
+        from compas_tno.autodiff.equilibrium_pytorch import f_constraints_pytorch
+        from compas_tno.autodiff.equilibrium_pytorch import f_objective_pytorch
+
         (q, ind, dep, E, Edinv, Ei, C, Ct, Ci, Cit, Cf, U, V, p, px, py, pz, z, free, fixed, lh, sym, k, lb, ub, lb_ind, ub_ind, s, Wfree, x, y, b, joints, cracks_lb, cracks_ub,
          free_x, free_y, rol_x, rol_y, Citx, City, Cftx, Cfty, qmin, constraints, max_rol_rx, max_rol_ry, Asym) = args[:48]
 
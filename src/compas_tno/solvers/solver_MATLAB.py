@@ -1,10 +1,5 @@
 from compas_tno.algorithms import xyz_from_q
 
-try:
-    import matlab.engine
-except BaseException:
-    pass
-    # print('matlab not available in the system')
 import time
 
 from numpy import array
@@ -61,10 +56,7 @@ def run_loadpath_from_form_MATLAB(form, problem=None, find_inds=False, printout=
         Dictionary with the returned values from the convex optimisation.
     """
 
-    # try:
-    #     import matlab.engine
-    # except BaseException:
-    #     print('Warning: Matlab not available in the system')
+    import matlab.engine
 
     # future = matlab.engine.connect_matlab(background=True)
     future = matlab.engine.start_matlab(background=True)
@@ -199,7 +191,7 @@ def call_cvx(problem, eng, printout=False):
     eng.workspace['C'] = problem.C.toarray()
     eng.workspace['Ci'] = problem.Ci.toarray()
     eng.workspace['Cb'] = problem.Cb.toarray()
-    eng.workspace['E'] = problem.E
+    eng.workspace['E'] = problem.E.toarray()
 
     eng.workspace['x'] = array(problem.X[:, 0].reshape(-1, 1))
     eng.workspace['y'] = array(problem.X[:, 1].reshape(-1, 1))
@@ -286,6 +278,8 @@ def call_cvx_ind(problem, eng, printout=True):
 
     """
 
+    import matlab
+
     # q, ind, dep, E, Edinv, Ei, C, Ct, Ci, Cit, Cf, U, V, p, px, py, pz, z, free, fixed, lh, sym, k, lb, ub, lb_ind, ub_ind, s, Wfree, x, y, qmax, i_uv, k_i, eng = args_cvx
 
     ind_ = [x+1 for x in problem.ind]
@@ -1,25 +1,15 @@
 from compas_tno.solvers import mma_numpy
 from numpy import hstack
 from numpy import array
+from numpy import asarray
 from numpy import zeros
 
 from .post_process import post_process_general
 
 import time
 
-from compas_tno.problems import sensitivities_wrapper
 from compas_tno.problems import constr_wrapper
 
-try:
-    from torch import tensor
-
-    from compas_tno.autodiff.equilibrium_pytorch import f_constraints_pytorch_MMA
-    from compas_tno.autodiff.equilibrium_pytorch import f_objective_pytorch
-    from compas_tno.autodiff.equilibrium_pytorch import compute_autograd
-    from compas_tno.autodiff.equilibrium_pytorch import compute_autograd_jacobian
-except BaseException:
-    pass
-
 
 def run_optimisation_MMA(analysis):
     """ Run convex optimisation problem with MMA.
@@ -38,12 +28,14 @@ def run_optimisation_MMA(analysis):
 
     optimiser = analysis.optimiser
     solver = optimiser.settings['solver']
-    constraints = optimiser.settings['constraints']
+    library = optimiser.settings.get('library', 'NLOPT')
     objective = optimiser.settings['objective']
     gradient = optimiser.settings.get('gradient', False)
     jacobian = optimiser.settings.get('jacobian', False)
-    fconstr = optimiser.fconstr
-    args = optimiser.args
+    printout = optimiser.settings.get('printout', True)
+    max_iter = optimiser.settings.get('max_iter', 100)
+    kkttol = optimiser.settings.get('kkttol', 10e-4)
+    args = [optimiser.M]
 
     bounds = optimiser.bounds
     x0 = optimiser.x0
@@ -59,7 +51,7 @@ def run_optimisation_MMA(analysis):
 
     start_time = time.time()
 
-    if gradient and jacobian:
+    if gradient and jacobian and library != 'MMA':
 
         import nlopt
 
@@ -83,12 +75,20 @@ def run_optimisation_MMA(analysis):
         if result > 0:
             exitflag = 0
 
-        # args_MMA = list(args)
-        # args_MMA.append([fobj, fgrad])
-        # f_g_eval = analytical_f_g
-        # f_g_df_dg_eval = analytical_f_g_df_dg
+    elif gradient and jacobian:
+
+        # implementation in numpy of MMA with the setting library='MMA', with the sparse jacobian sensitivities_wrapper_sparse
+        args_MMA = list(args)
+        args_MMA.append([fobj, fgrad, fjac])
+        plot = '2' if printout else '0'
+        fopt, xopt, exitflag = mma_numpy(analytical_f_g, analytical_f_g_df_dg, x0.reshape(-1, 1), bounds, args_MMA, kkttol, max_iter, plot=plot)
+        fopt = float(fopt)
+        xopt = xopt.flatten()
+
     else:
 
+        from torch import tensor
+
         (q, ind, dep, E, Edinv, Ei, C, Ct, Ci, Cit, Cf, U, V, p, px, py, pz, z, free, fixed, lh, sym, k, lb, ub, lb_ind, ub_ind, s, Wfree, x, y, b, joints,
          cracks_lb, cracks_ub, free_x, free_y, rol_x, rol_y, Citx, City, Cftx, Cfty, qmin, constraints, max_rol_rx, max_rol_ry, Asym) = args[:48]
 
@@ -141,6 +141,10 @@ def run_optimisation_MMA(analysis):
 
 
 def pytorch_f_g(variables, *args):
+    from torch import tensor
+    from compas_tno.autodiff.equilibrium_pytorch import f_constraints_pytorch_MMA
+    from compas_tno.autodiff.equilibrium_pytorch import f_objective_pytorch
+
     variables = tensor(variables, requires_grad=False)
     args_obj = args[0]
     args_constr = args[1]
@@ -150,6 +154,12 @@ def pytorch_f_g(variables, *args):
 
 
 def pytorch_f_g_df_dg(variables, *args):
+    from torch import tensor
+    from compas_tno.autodiff.equilibrium_pytorch import f_constraints_pytorch_MMA
+    from compas_tno.autodiff.equilibrium_pytorch import f_objective_pytorch
+    from compas_tno.autodiff.equilibrium_pytorch import compute_autograd
+    from compas_tno.autodiff.equilibrium_pytorch import compute_autograd_jacobian
+
     variables = tensor(variables, requires_grad=True)
     args_obj = args[0]
     args_constr = args[1]
@@ -168,20 +178,20 @@ def pytorch_f_g_df_dg(variables, *args):
 
 
 def analytical_f_g(xopt, *args):
-    [fobj, _] = args[-1]
+    fobj = args[-1][0]
     args = args[:-1]
     f0val = fobj(xopt, *args)
-    fval = - 1 * constr_wrapper(xopt, *args)  # change args here
+    fval = - 1 * constr_wrapper(xopt, *args)
     return f0val, fval.reshape(-1, 1)
 
 
 def analytical_f_g_df_dg(xopt, *args):
-    [fobj, fgrad] = args[-1]
+    [fobj, fgrad, fjac] = args[-1]
     args = args[:-1]
     f0val = fobj(xopt, *args)
-    fval = - 1 * constr_wrapper(xopt, *args)  # change args here
-    df0dx = fgrad(xopt, *args)
-    dfdx = -1 * sensitivities_wrapper(xopt, *args)
+    fval = - 1 * constr_wrapper(xopt, *args)
+    df0dx = asarray(fgrad(xopt, *args)).reshape(-1, 1)
+    dfdx = -1 * fjac(xopt, *args)
     return f0val, df0dx, fval.reshape(-1, 1), dfdx
 
 
@@ -1,15 +1,17 @@
+import hashlib
+from collections import OrderedDict
+
+from numpy import asarray
+from numpy import ascontiguousarray
+
+from scipy.sparse import csr_matrix
+
 from compas_tno.algorithms import xyz_from_q
 from compas_tno.algorithms import compute_reactions
 
 from compas_tno.problems import initialise_problem_general
 from compas_tno.problems import adapt_problem_to_fixed_diagram
 
-import cvxpy as cp
-from cvxpy import diag
-from cvxpy import matrix_frac
-from cvxpy import Minimize
-from cvxpy import Problem
-
 
 def run_optimisation_CVXPY(analysis):
     """ Run convex optimisation problem with CVXPY after going through the optimisation set up.
@@ -136,7 +138,7 @@ def call_and_output_CVXPY(form, problem, printout=False):
     return problem
 
 
-def call_cvxpy(problem, printout=False):
+def call_cvxpy(problem, printout=False, solver=None):
     """Call and output the loadpath optimisation with CVXPY
 
     Parameters
@@ -145,6 +147,8 @@ def call_cvxpy(problem, printout=False):
         The Problem with relevant matrices and vectors`
     printout : bool, optional
         Whether or not print results, by default False
+    solver : str, optional
+        The solver of CVXPY, by default None, in which MOSEK or else CLARABEL is used if installed
 
     Returns
     -------
@@ -160,78 +164,19 @@ def call_cvxpy(problem, printout=False):
         Message with statuss.
     sol_time : dict
         Time to solve optimisation.
+
+    Notes
+    -----
+    The model is compiled once per topology with :func:`loadpath_model` and only its parameters are updated in later calls.
     """
 
-    # Retrieve important vector and matrices
-    q = problem.q
-    E = problem.E
-    C = problem.C
-    Ci = problem.Ci
-    Cit = problem.Cit
-    Cb = problem.Cb
-    pz = problem.P[:, 2].reshape(-1, 1)
-    ph = problem.ph
-    free = problem.free
-    fixed = problem.fixed
-    qmin = problem.qmin
-    qmax = problem.qmax
-    x = problem.x0
-    y = problem.y0
-    m = problem.m
-
-    # # If need to store the matrices/vectors in
-    # dict_parameters = {}
-    # dict_parameters['q'] = q.tolist()
-    # dict_parameters['qmin'] = qmin.tolist()
-    # dict_parameters['qmax'] = qmax.tolist()
-    # dict_parameters['E'] = E.tolist()
-    # dict_parameters['C'] = C.todense().tolist()
-    # dict_parameters['Ci'] = Ci.todense().tolist()
-    # dict_parameters['Cit'] = Cit.todense().tolist()
-    # dict_parameters['Cb'] = Cb.todense().tolist()
-    # dict_parameters['pz'] = pz.tolist()
-    # dict_parameters['free'] = free
-    # dict_parameters['fixed'] = fixed
-    # dict_parameters['x'] = x.tolist()
-    # dict_parameters['y'] = y.tolist()
-    # dict_parameters['m'] = m
-
-    # import json
-
-    # with open('/Users/mricardo/compas_dev/compas_tno/data/data.json', 'w') as outfile:
-    #     json.dump(dict_parameters, outfile)
-
-    q = cp.Variable(m)
-    # fobj = matrix_frac(pz[free], Cit@cp.diag(q)@Ci) + x.T@C.T@diag(q)@Cb@x[fixed] + y.T@C.T@diag(q)@Cb@y[fixed]  # for q positive
-    fobj = matrix_frac(pz[free], - Cit@cp.diag(q)@Ci) - x.T@C.T@diag(q)@Cb@x[fixed] - y.T@C.T@diag(q)@Cb@y[fixed]  # for q negative
-    objective = Minimize(fobj)
-
-    horz = E@q == ph.flatten()
-    pos = q >= qmin.flatten()
-    maxq = q <= qmax.flatten()
-
-    constraints = [horz, pos, maxq]
-
-    prob = Problem(objective, constraints)
-    prob.solve(solver='MOSEK', verbose=printout)
-    # prob.solve(solver='MOSEK', verbose=True)
-
-    # save output
-    fopt = prob.value
-    qopt = q.value
-    status = prob.status
-    niter = prob.solver_stats.num_iters
-    sol_time = prob.solver_stats.solve_time
-
-    if status not in ["infeasible", "unbounded"]:
-        exitflag = 1
-    else:
-        exitflag = 0
+    model = loadpath_model(problem)
+    model.update(problem)
 
-    return fopt, qopt, exitflag, niter, status, sol_time
+    return model.solve(solver=solver, printout=printout)
 
 
-def call_cvxpy_ind(problem, printout=False):
+def call_cvxpy_ind(problem, printout=False, solver=None):
     """Call and output the loadpath optimisation with CVXPY using independents
 
     Parameters
@@ -240,6 +185,8 @@ def call_cvxpy_ind(problem, printout=False):
         The Problem with relevant matrices and vectors`
     printout : bool, optional
         Whether or not print results, by default False
+    solver : str, optional
+        The solver of CVXPY, by default None, in which MOSEK or else CLARABEL is used if installed
 
     Returns
     -------
@@ -255,52 +202,164 @@ def call_cvxpy_ind(problem, printout=False):
         Message with statuss.
     sol_time : dict
         Time to solve optimisation.
+
+    Notes
+    -----
+    The relation of the dependent and independent force densities ``Ed q[dep] = ph - Ei q[ind]`` is the equilibrium ``E q = ph``
+    of the model of :func:`loadpath_model`, which keeps ``E`` sparse instead of the dense ``Edinv``.
+    """
+
+    return call_cvxpy(problem, printout=printout, solver=solver)
+
+
+class LoadpathModel(object):
+    """Parameterized loadpath optimisation with CVXPY, compiled once for a topology and solved for new loads and bounds.
+
+    The loadpath of the vertical loads ``pz^T (Ci^T diag(-q) Ci)^-1 pz`` is the minimum of ``sum(u^2 / -q)`` with ``Ci^T u = pz``,
+    written with one rotated second order cone per edge. ``E`` and ``Ci`` stay sparse and no semidefinite constraint is needed.
+    The loads, the bounds of the force densities and the terms of the supports are parameters, so that the problem is DPP and
+    CVXPY reuses its canonicalization in the later solves.
+
+    Parameters
+    ----------
+    problem : :class:`~compas_tno.problems.Problem`
+        The Problem with relevant matrices and vectors
+
+    Attributes
+    ----------
+    prob : :class:`cvxpy.Problem`
+        The CVXPY problem.
+    q : :class:`cvxpy.Variable`
+        The force densities.
+    solves : int
+        Number of solves of the model.
+
+    """
+
+    def __init__(self, problem):
+        import cvxpy as cp
+
+        m = problem.m
+        self.q = cp.Variable(m)
+        self.u = cp.Variable(m)  # vertical forces in the edges
+        self.t = cp.Variable(m)  # loadpath of the vertical forces in the edges
+
+        self.pz = cp.Parameter(len(problem.free))
+        self.ph = cp.Parameter(problem.E.shape[0])
+        self.qmin = cp.Parameter(m)
+        self.qmax = cp.Parameter(m)
+        self.c = cp.Parameter(m)  # loadpath of the supports, linear in q
+
+        s = -self.q
+        fobj = cp.sum(self.t) + self.c @ self.q
+        constraints = [
+            problem.Cit @ self.u == self.pz,
+            problem.E @ self.q == self.ph,
+            self.q >= self.qmin,
+            self.q <= self.qmax,
+            cp.SOC(self.t + s, cp.vstack([2 * self.u, self.t - s]), axis=0),  # t >= u^2 / s
+        ]
+
+        self.prob = cp.Problem(cp.Minimize(fobj), constraints)
+        self.solves = 0
+
+    def update(self, problem):
+        """Update the parameters of the model with the loads and bounds of a problem with the same topology.
+
+        Parameters
+        ----------
+        problem : :class:`~compas_tno.problems.Problem`
+            The Problem with relevant matrices and vectors
+        """
+
+        C = problem.C
+        Cb = problem.Cb
+        x = problem.x0
+        y = problem.y0
+        fixed = problem.fixed
+
+        self.pz.value = problem.P[problem.free, 2].reshape(-1)
+        self.ph.value = asarray(problem.ph, dtype=float).reshape(-1)
+        self.qmin.value = asarray(problem.qmin, dtype=float).reshape(-1)
+        self.qmax.value = asarray(problem.qmax, dtype=float).reshape(-1)
+        self.c.value = -(asarray(C.dot(x)) * asarray(Cb.dot(x[fixed])) + asarray(C.dot(y)) * asarray(Cb.dot(y[fixed]))).reshape(-1)
+
+    def solve(self, solver=None, printout=False):
+        """Solve the model with the current parameters.
+
+        Parameters
+        ----------
+        solver : str, optional
+            The solver of CVXPY, by default None, in which MOSEK or else CLARABEL is used if installed
+        printout : bool, optional
+            Whether or not print results, by default False
+
+        Returns
+        -------
+        fopt, qopt, exitflag, niter, status, sol_time
+            As in :func:`call_cvxpy`.
+        """
+
+        import cvxpy as cp
+
+        if solver is None:
+            installed = cp.installed_solvers()
+            solver = 'MOSEK' if 'MOSEK' in installed else 'CLARABEL' if 'CLARABEL' in installed else None
+
+        self.prob.solve(solver=solver, verbose=printout)
+        self.solves += 1
+
+        fopt = self.prob.value
+        qopt = self.q.value
+        status = self.prob.status
+        niter = self.prob.solver_stats.num_iters
+        sol_time = self.prob.solver_stats.solve_time
+
+        if status not in ["infeasible", "unbounded"]:
+            exitflag = 1
+        else:
+            exitflag = 0
+
+        return fopt, qopt, exitflag, niter, status, sol_time
+
+
+_MODELS = OrderedDict()
+
+
+def loadpath_model(problem, max_models=8):
+    """The loadpath model of the topology of a problem, compiled in the first call and reused while in the cache.
+
+    The models are identified by the connectivity and equilibrium matrices of the problem, and the least recently used
+    are discarded above ``max_models``.
+
+    Parameters
+    ----------
+    problem : :class:`~compas_tno.problems.Problem`
+        The Problem with relevant matrices and vectors
+    max_models : int, optional
+        Maximum number of models kept, by default 8
+
+    Returns
+    -------
+    :class:`LoadpathModel`
+        The model, with the parameters of the last problem solved.
     """
 
-    # Retrieve important vector and matrices
-    q = problem.q
-    Edinv = problem.Edinv
-    Ei = problem.Ei
-    ph = problem.ph
-    C = problem.C
-    Ci = problem.Ci
-    Cit = problem.Cit
-    Cb = problem.Cb
-    pz = problem.P[:, 2].reshape(-1, 1)
-    free = problem.free
-    fixed = problem.fixed
-    dep = problem.dep
-    ind = problem.ind
-    qmin = problem.qmin
-    qmax = problem.qmax
-    x = problem.x0
-    y = problem.y0
-    m = problem.m
-
-    q = cp.Variable(m)
-
-    fobj = matrix_frac(pz[free], -Cit@cp.diag(q)@Ci) - x.T@C.T@diag(q)@Cb@x[fixed] - y.T@C.T@diag(q)@Cb@y[fixed]
-    objective = Minimize(fobj)
-
-    horz = q[dep] == Edinv@(Ei@q[ind] - ph.flatten())
-    pos = q >= qmin.flatten()
-    maxq = q <= qmax.flatten()
-
-    constraints = [horz, pos, maxq]
-
-    prob = Problem(objective, constraints)
-    prob.solve(solver='MOSEK', verbose=printout)
-
-    # save output
-    fopt = prob.value
-    qopt = q.value
-    status = prob.status
-    niter = prob.solver_stats.num_iters
-    sol_time = prob.solver_stats.solve_time
-
-    if status not in ["infeasible", "unbounded"]:
-        exitflag = 1
+    h = hashlib.sha1()
+    for matrix in [problem.Ci, problem.E]:
+        matrix = csr_matrix(matrix, copy=True)
+        matrix.sum_duplicates()
+        matrix.sort_indices()
+        h.update(repr(matrix.shape).encode())
+        for a in [matrix.indptr, matrix.indices, matrix.data]:
+            h.update(ascontiguousarray(a).tobytes())
+    key = h.hexdigest()
+
+    if key in _MODELS:
+        _MODELS.move_to_end(key)
     else:
-        exitflag = 0
+        _MODELS[key] = LoadpathModel(problem)
+        while len(_MODELS) > max_models:
+            _MODELS.popitem(last=False)
 
-    return fopt, qopt, exitflag, niter, status, sol_time
+    return _MODELS[key]
@@ -1,4 +1,8 @@
+from numpy import array_equal
+from numpy import asarray
+
 from scipy.optimize import fmin_slsqp
+from scipy.optimize import minimize
 from scipy.optimize import shgo
 
 from compas.numerical import devo_numpy
@@ -49,28 +53,26 @@ def run_optimisation_scipy(analysis):
     if solver == 'slsqp' or solver == 'SLSQP':
         fopt, xopt, exitflag, niter, message = _slsqp(fobj, x0, bounds, fgrad, fjac, printout, fconstr, args, max_iter, callback)
     elif solver == 'shgo':
-        dict_constr = []
-        for i in range(len(fconstr(x0, *args))):
-            args_constr = list(args)
-            args_constr.append(i)
-            args_constr.append(fconstr)
-            dict_ = {
-                'type': 'ineq',
-                'fun': _shgo_constraint_wrapper,
-                'args': args_constr,
-            }
-            dict_constr.append(dict_)
-        args_constr[len(args_constr)-2] = 0
+        dict_constr = {
+            'type': 'ineq',
+            'fun': _memoized_constraints(fconstr, args),
+        }
         result = _shgo(fobj, bounds, True, dict_constr, args)
         fopt = result['fun']
         xopt = result['x']
         sucess = result['success']
         message = result['message']
+        niter = result['nit']
+        if xopt is None:  # no feasible point sampled
+            xopt = x0
+            fopt = fobj(x0, *args)
         if sucess is True:
             exitflag = 0
         else:
             exitflag = 1
             print(message)
+    elif solver == 'cobyla' or solver == 'COBYLA':
+        fopt, xopt, exitflag, niter, message = _cobyla(fobj, x0, bounds, printout, _memoized_constraints(fconstr, args), args, max_iter)
 
     elapsed_time = time.time() - start_time
     if printout:
@@ -104,24 +106,28 @@ def _shgo(fn, bounds, printout, dict_constr, args):
     return res
 
 
-def _shgo_constraint_wrapper(x, *args_constr):
-    length = len(args_constr)
-    args = args_constr[:length-2]
-    i = args_constr[length-2]
-    fconstr = args_constr[length-1]
-    gi = fconstr(x, *args)[i]
+def _memoized_constraints(fconstr, args):
+    """Vector of constraints evaluated once per point and shared by all the checks of the solver in the point."""
+
+    memo = {}
 
-    return gi
+    def fun(x, *_):
+        x = asarray(x, dtype=float).flatten()
+        if 'x' not in memo or not array_equal(memo['x'], x):
+            memo['x'] = x.copy()
+            memo['g'] = asarray(fconstr(x, *args), dtype=float).flatten()
+        return memo['g']
 
+    return fun
 
-def _cobyla(fn, qid0, bounds, printout, fieq, args):
 
-    # pout = 2 if printout else 0
-    # opt  = fmin_cobyla(fn, qid0, args=args, disp=pout, bounds=bounds, full_output=1, iter=500, f_ieqcons=fieq)
+def _cobyla(fn, qid0, bounds, printout, fieq, args, iter):
 
-    # W.I.P
+    res = minimize(fn, asarray(qid0).flatten(), args=tuple(args), method='COBYLA', bounds=bounds, constraints={'type': 'ineq', 'fun': fieq},
+                   options={'disp': printout, 'maxiter': iter})
+    exitflag = 0 if res.success else 1
 
-    return None
+    return res.fun, res.x, exitflag, res.nfev, res.message
 
 
 def _diff_evo(fn, bounds, population, generations, printout, plot, frange, args):
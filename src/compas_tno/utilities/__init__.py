@@ -70,6 +70,7 @@ Interpolation
     :toctree: generated/
 
     interpolate_from_pointcloud
+    pointcloud_interpolator
     get_shape_ub
     get_shape_ub_pattern
     get_shape_ub_fill
@@ -192,6 +193,7 @@ from .envelopes import (
 
 from .interpolation import (
     interpolate_from_pointcloud,
+    pointcloud_interpolator,
     get_shape_ub,
     get_shape_ub_pattern,
     get_shape_ub_fill,
@@ -292,6 +294,7 @@ __all__ = [
     'apply_bounds_reactions',
 
     'interpolate_from_pointcloud',
+    'pointcloud_interpolator',
     'get_shape_ub',
     'get_shape_ub_pattern',
     'get_shape_ub_fill',
@@ -6,9 +6,6 @@ from numpy import linspace
 
 from compas.geometry import intersection_line_line_xy
 
-import matplotlib.pyplot as plt
-from matplotlib.ticker import FormatStrFormatter
-from matplotlib import cm
 
 import compas_tno
 import json
@@ -61,6 +58,10 @@ def diagram_of_thrust(thicknesses, solutions, limit_state=True, fill=False, xy_l
         Plotter object.
 
     """
+
+    import matplotlib.pyplot as plt
+    from matplotlib.ticker import FormatStrFormatter
+
     thicknesses_min, thicknesses_max = thicknesses
     min_sol, max_sol = solutions
     xmin = thicknesses_min
@@ -219,6 +220,9 @@ def diagram_of_multiple_thrust(thicknesses, solutions, legends, simplified=True,
 
     """
 
+    import matplotlib.pyplot as plt
+    from matplotlib.ticker import FormatStrFormatter
+
     kmax = len(legends)
 
     if markers is None:
@@ -374,6 +378,9 @@ def diagram_of_thrust_load_mult(dimension, min_sol, max_sol, limit_state=True, f
 
     """
 
+    import matplotlib.pyplot as plt
+    from matplotlib.ticker import FormatStrFormatter
+
     xmin = xmax = array(dimension)
     fmin = 100.0 * array(min_sol)
     fmax = -100.0 * array(max_sol)
@@ -458,6 +465,9 @@ def surface_GSF_load_mult(sizes, mins, maxs, legends, save=None):
 
     """
 
+    import matplotlib.pyplot as plt
+    from matplotlib import cm
+
     fig = plt.figure()
     ax = fig.gca(projection='3d')
 
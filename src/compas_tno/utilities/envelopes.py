@@ -1,5 +1,7 @@
 import math
 
+from compas_tno.diagrams.arrays import FormArrays
+
 from compas_tno.shapes.dome import dome_ub_lb_update
 from compas_tno.shapes.dome import dome_zt_update
 
@@ -76,8 +78,9 @@ def apply_envelope_from_shape(form, shape):
         The formdiagram is updated in place.
     """
 
-    x = form.vertices_attribute('x')  # check if array is necessary here
-    y = form.vertices_attribute('y')
+    arrays = FormArrays(form)
+    x = arrays.get('x')
+    y = arrays.get('y')
 
     if shape.datashape['type'] == 'dome':
         zub, zlb = dome_ub_lb_update(x, y, shape.datashape['thk'], shape.datashape['t'], shape.datashape['center'], shape.datashape['radius'])
@@ -93,21 +96,15 @@ def apply_envelope_from_shape(form, shape):
     elif shape.datashape['type'] == 'pavillionvault':
         zub, zlb = pavillionvault_ub_lb_update(x, y, shape.datashape['thk'], shape.datashape['t'], shape.datashape['xy_span'], shape.datashape['spr_angle'])
     elif shape.datashape['type'] == 'general':
-        XY = form.vertices_attributes('xy')
+        XY = arrays.xyz[:, :2]
         zub = get_shape_ub_pattern(shape, XY)
         zlb = get_shape_lb_pattern(shape, XY)
     else:
         raise Exception
 
-    i = 0
-
-    for key in form.vertices():
-        ub_ = float(zub[i])
-        lb_ = float(zlb[i])
-        x, y, _ = form.vertex_coordinates(key)
-        form.vertex_attribute(key, 'ub', value=ub_)
-        form.vertex_attribute(key, 'lb', value=lb_)
-        i += 1
+    arrays.set('ub', zub)
+    arrays.set('lb', zlb)
+    arrays.sync()
 
     return
 
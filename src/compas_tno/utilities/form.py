@@ -159,7 +159,7 @@ def form_add_lines_support(form, loaded_node, supports):
 
 def store_inds(form, ind_edges=[]):
     """Store independent edges as an attribute.
-    Note: The midpoint of the independent edges is stored.
+    Note: The coordinates ``[x, y]`` of the midpoint of the independent edges are stored.
 
     Parameters
     ----------
@@ -177,10 +177,10 @@ def store_inds(form, ind_edges=[]):
     points = []
     if len(ind_edges) == 0:
         for u, v in form.edges_where({'is_ind': True}):
-            points.append(Point(*(form.edge_midpoint(u, v)[:2] + [0])))
+            points.append(form.edge_midpoint(u, v)[:2])
     else:
         for u, v in ind_edges:
-            points.append(Point(*(form.edge_midpoint(u, v)[:2] + [0])))
+            points.append(form.edge_midpoint(u, v)[:2])
     form.attributes['indset'] = points
 
     return
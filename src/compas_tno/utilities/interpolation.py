@@ -6,6 +6,7 @@ import math
 
 __all__ = [
     'interpolate_from_pointcloud',
+    'pointcloud_interpolator',
     'get_shape_ub',
     'get_shape_ub_pattern',
     'get_shape_ub_fill',
@@ -24,6 +25,35 @@ def interpolate_from_pointcloud(pointcloud, XY, method='linear'):
     return interpolate.griddata(pointcloud_array[:, :2], pointcloud_array[:, 2], array(XY), method=method)
 
 
+def pointcloud_interpolator(pointcloud, method='linear'):
+    """Build an interpolator of the heights of a pointcloud that can be evaluated several times without triangulating the points again.
+    The results are the same of ``interpolate_from_pointcloud``.
+
+    Parameters
+    ----------
+    pointcloud : list or array
+        XYZ coordinates of the points.
+    method : str, optional
+        The interpolation method, ``'linear'``, ``'cubic'`` or ``'nearest'``, by default ``'linear'``
+
+    Returns
+    -------
+    interpolator : callable
+        Interpolator taking an array of XY coordinates.
+    """
+
+    pointcloud_array = array(pointcloud)
+    points = pointcloud_array[:, :2]
+    values = pointcloud_array[:, 2]
+    if method == 'linear':
+        return interpolate.LinearNDInterpolator(points, values)
+    elif method == 'cubic':
+        return interpolate.CloughTocher2DInterpolator(points, values)
+    elif method == 'nearest':
+        return interpolate.NearestNDInterpolator(points, values)
+    raise ValueError('Unknown interpolation method: {}'.format(method))
+
+
 def get_shape_ub(shape, x, y):
     """Get the height of the extrados in the point.
 
@@ -41,8 +71,7 @@ def get_shape_ub(shape, x, y):
     z : float
         The extrados evaluated in the point.
     """
-    method = shape.datashape.get('interpolation', 'linear')
-    return interpolate_from_pointcloud(shape.extrados.vertices_attributes('xyz'), [x, y], method=method)
+    return shape.get_ub(x, y)
 
 
 def get_shape_ub_pattern(shape, XY):
@@ -60,8 +89,7 @@ def get_shape_ub_pattern(shape, XY):
     z : float
         The extrados evaluated in the point.
     """
-    method = shape.datashape.get('interpolation', 'linear')
-    return interpolate_from_pointcloud(shape.extrados.vertices_attributes('xyz'), XY, method=method)
+    return shape.get_ub_pattern(XY)
 
 
 def get_shape_ub_fill(shape, x, y):
@@ -81,8 +109,7 @@ def get_shape_ub_fill(shape, x, y):
     z : float
         The extrados evaluated in the point.
     """
-    method = shape.datashape.get('interpolation', 'linear')
-    return interpolate_from_pointcloud(shape.extrados_fill.vertices_attributes('xyz'), [x, y], method=method)
+    return shape.interpolator('extrados_fill')([x, y])
 
 
 def get_shape_lb(shape, x, y):
@@ -102,8 +129,7 @@ def get_shape_lb(shape, x, y):
     z : float
         The intrados evaluated in the point.
     """
-    method = shape.datashape.get('interpolation', 'linear')
-    return interpolate_from_pointcloud(shape.intrados.vertices_attributes('xyz'), [x, y], method=method)
+    return shape.get_lb(x, y)
 
 
 def get_shape_lb_pattern(shape, XY):
@@ -121,8 +147,7 @@ def get_shape_lb_pattern(shape, XY):
     z : float
         The extrados evaluated in the point.
     """
-    method = shape.datashape.get('interpolation', 'linear')
-    return interpolate_from_pointcloud(shape.intrados.vertices_attributes('xyz'), XY, method=method)
+    return shape.get_lb_pattern(XY)
 
 
 def get_shape_middle(shape, x, y):
@@ -142,8 +167,7 @@ def get_shape_middle(shape, x, y):
     z : float
         The middle surface evaluated in the point.
     """
-    method = shape.datashape.get('interpolation', 'linear')
-    return interpolate_from_pointcloud(shape.middle.vertices_attributes('xyz'), [x, y], method=method)
+    return shape.get_middle(x, y)
 
 
 def get_shape_middle_pattern(shape, XY):
@@ -161,8 +185,7 @@ def get_shape_middle_pattern(shape, XY):
     z : float
         The extrados evaluated in the point.
     """
-    method = shape.datashape.get('interpolation', 'linear')
-    return interpolate_from_pointcloud(shape.middle.vertices_attributes('xyz'), XY, method=method)
+    return shape.get_middle_pattern(XY)
 
 
 def delaunay_mesh_from_points(points):
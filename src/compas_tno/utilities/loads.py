@@ -1,4 +1,9 @@
 
+from numpy import array
+from numpy import asarray
+from numpy import where
+
+from compas_tno.diagrams.arrays import FormArrays
 from compas_tno.shapes.dome import dome_zt_update
 from compas_tno.shapes.crossvault import crossvault_middle_update
 from compas_tno.shapes.pointed_crossvault import pointed_vault_middle_update
@@ -52,13 +57,13 @@ def apply_selfweight_from_shape(form, shape, pz_negative=True, normalize=True):
         The FormDiagram is modified in place
     """
 
-    form_ = form.copy()
+    arrays = FormArrays(form)
     total_selfweight = shape.compute_selfweight()
     ro = shape.ro
     thk = shape.datashape['thk']
 
-    x = form.vertices_attribute('x')
-    y = form.vertices_attribute('y')
+    x = arrays.get('x')
+    y = arrays.get('y')
 
     if shape.datashape['type'] == 'dome':
         zt = dome_zt_update(x, y, shape.datashape['radius'], shape.datashape['t'], shape.datashape['center'])
@@ -68,29 +73,19 @@ def apply_selfweight_from_shape(form, shape, pz_negative=True, normalize=True):
         zt = pointed_vault_middle_update(x, y,  shape.datashape['t'],  xy_span=shape.datashape['xy_span'],
                                          hc=shape.datashape['hc'], he=shape.datashape['he'], hm=shape.datashape['hm'])
     else:
-        XY = form.vertices_attributes('xy')
+        XY = arrays.xyz[:, :2]
         zt = get_shape_middle_pattern(shape, XY)
 
-    i = 0
-    for key in form_.vertices():
-        z = float(zt[i])
-        form_.vertex_attribute(key, 'z', value=z)
-        form.vertex_attribute(key, 'target', value=z)
-        i += 1
+    zt = asarray(zt, dtype=float).reshape(-1)
+    arrays.set('target', zt)
 
-    pzt = 0
-    for key in form.vertices():
-        pz = form_.vertex_area(key)
-        form.vertex_attribute(key, 'pz', value=pz)
-        pzt += pz
+    pz = arrays.tributary_areas(z=zt)  # tributary areas on the middle surface
 
     if shape.datashape['type'] == 'arch' or shape.datashape['type'] == 'pointed_arch':
-        pzt = 0
-        for key in form.vertices():
-            form.vertex_attribute(key, 'pz', value=1.0)
-            if form.vertex_attribute(key, 'is_fixed') is True:
-                form.vertex_attribute(key, 'pz', value=0.5)
-            pzt += form.vertex_attribute(key, 'pz')
+        fixed = array(arrays.form.vertices_attribute('is_fixed', keys=arrays.keys), dtype=bool)
+        pz = where(fixed, 0.5, 1.0)
+
+    pzt = pz.sum()
 
     factor = 1.0 * ro * thk  # Transform tributary area in tributary load
     if normalize:
@@ -98,9 +93,8 @@ def apply_selfweight_from_shape(form, shape, pz_negative=True, normalize=True):
     if pz_negative:
         factor *= -1  # make loads negative
 
-    for key in form.vertices():
-        pzi = factor * form.vertex_attribute(key, 'pz')
-        form.vertex_attribute(key, 'pz', value=pzi)
+    arrays.set('pz', factor * pz)
+    arrays.sync()
 
 
 def apply_selfweight_from_pattern(form, pattern, plot=False, pz_negative=True, tol=10e-4):
@@ -1,10 +1,19 @@
-from compas.geometry import distance_point_point_xy
-from compas.geometry import distance_point_line_xy
-from compas.geometry import closest_point_on_line_xy
-
+from numpy import arange
+from numpy import argsort
+from numpy import around
+from numpy import array
+from numpy import concatenate
+from numpy import empty
+from numpy import isinf
+from numpy import ones
+from numpy import unique
 from numpy import zeros
+from numpy.linalg import norm
 
-import matplotlib.pyplot as plt
+from scipy.sparse import coo_matrix
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
+from scipy.spatial import cKDTree
 
 
 __all__ = [
@@ -21,6 +30,8 @@ __all__ = [
 def apply_radial_symmetry(form, center=[5.0, 5.0, 0.0], correct_loads=True):
     """Apply a radial symmetry based on a center points. Applicable for dome circulat patterns.
 
+    Edges and vertices are grouped by their distance to the center, hashed with 10 decimals.
+
     Parameters
     ----------
     form : :class:`~compas_tno.diagrams.FormDiagram`
@@ -39,57 +50,26 @@ def apply_radial_symmetry(form, center=[5.0, 5.0, 0.0], correct_loads=True):
     form.edges_attribute('sym_key', None)
     form.vertices_attribute('sym_key', None)
 
-    dist_checked = []
-    dist_dict = {}
-
     # Symmetry on the independent edges
 
-    for u, v in form.edges_where({'_is_edge': True}):
-        midpoint = form.edge_midpoint(u, v)
-        dist = round(distance_point_point_xy(center, midpoint), 10)
-        dist_dict[(u, v)] = dist
-        if dist not in dist_checked:
-            dist_checked.append(dist)
-    i = 0
-    for dist in dist_checked:
-        for u, v in dist_dict:
-            if dist_dict[(u, v)] == dist:
-                form.edge_attribute((u, v), 'sym_key', i)
+    edges = list(form.edges_where({'_is_edge': True}))
+    midpoints = array([form.edge_midpoint(u, v)[:2] for u, v in edges]).reshape(-1, 2)
+    sym_edges = _classes_from_hash(around(norm(midpoints - array(center[:2]), axis=1), 10))
 
-        i += 1
+    for edge, sym_key in zip(edges, sym_edges):
+        form.edge_attribute(edge, 'sym_key', int(sym_key))
 
     # Symmetry on the Support's position
 
-    dist_checked = []
-    dist_dict = {}
+    vertices = list(form.vertices())
+    points = array([form.vertex_coordinates(key)[:2] for key in vertices]).reshape(-1, 2)
+    sym_vertices = _classes_from_hash(around(norm(points - array(center[:2]), axis=1), 10))
 
-    for key in form.vertices():
-        point = form.vertex_coordinates(key)
-        dist = round(distance_point_point_xy(center, point), 10)
-        dist_dict[key] = dist
-        if dist not in dist_checked:
-            dist_checked.append(dist)
-    i = 0
-    for dist in dist_checked:
-        pass_first = False
-        pz = None
-        ub = None
-        lb = None
-        for key in dist_dict:
-            if dist_dict[key] == dist:
-                form.vertex_attribute(key, 'sym_key', i)
-                if correct_loads:
-                    if not pass_first:
-                        pass_first = True
-                        pz = form.vertex_attribute(key, 'pz')
-                        ub = form.vertex_attribute(key, 'ub')
-                        lb = form.vertex_attribute(key, 'lb')
-                        s = form.vertex_attribute(key, 'target')
-                    form.vertex_attribute(key, 'pz', pz)
-                    form.vertex_attribute(key, 'ub', ub)
-                    form.vertex_attribute(key, 'lb', lb)
-                    form.vertex_attribute(key, 'target', s)
-        i += 1
+    for key, sym_key in zip(vertices, sym_vertices):
+        form.vertex_attribute(key, 'sym_key', int(sym_key))
+
+    if correct_loads:
+        _correct_loads(form, vertices, sym_vertices)
 
     return
 
@@ -97,6 +77,9 @@ def apply_radial_symmetry(form, center=[5.0, 5.0, 0.0], correct_loads=True):
 def apply_symmetry_from_axis(form, list_axis_symmetry=[], correct_loads=True, tol=0.01):
     """ Apply a symmetry based on a series of axis of symmetry. Applicable for rectangular patterns.
 
+    The edge midpoints and the vertices are reflected on each axis and matched to their mirror with a KD-tree.
+    With more than one axis, the groups of symmetry are the groups of edges (vertices) connected by the mirrors on all axis.
+
     Parameters
     ----------
     form : :class:`~compas_tno.diagrams.FormDiagram`
@@ -106,7 +89,7 @@ def apply_symmetry_from_axis(form, list_axis_symmetry=[], correct_loads=True, to
     correct_loads : bool, optional
         Whether or not the loads should be corrected in the nodes for perfect symmetry, by default True
     tol : float, optional
-        Tollerance to assume symmetry, by default 0.001
+        Tollerance to assume symmetry, by default 0.01
 
     Returns
     -------
@@ -120,118 +103,116 @@ def apply_symmetry_from_axis(form, list_axis_symmetry=[], correct_loads=True, to
     form.edges_attribute('sym_key', None)
     form.vertices_attribute('sym_key', None)
 
-    i = 0
+    if not list_axis_symmetry:
+        return
+
+    edges = list(form.edges_where({'_is_edge': True}))
+    midpoints = array([form.edge_midpoint(u, v)[:2] for u, v in edges]).reshape(-1, 2)
+    sym_edges, dict_edges = _symmetry_from_axis(midpoints, list_axis_symmetry, tol)
+
+    for edge, sym_key, dic in zip(edges, sym_edges, dict_edges):
+        form.edge_attribute(edge, 'sym_key', int(sym_key))
+        form.edge_attribute(edge, 'sym_dict', dic)
+
+    vertices = list(form.vertices())
+    points = array([form.vertex_coordinates(key)[:2] for key in vertices]).reshape(-1, 2)
+    sym_vertices, dict_vertices = _symmetry_from_axis(points, list_axis_symmetry, tol)
+
+    for key, sym_key, dic in zip(vertices, sym_vertices, dict_vertices):
+        form.vertex_attribute(key, 'sym_key', int(sym_key))
+        form.vertex_attribute(key, 'sym_dict', dic)
+
+    if correct_loads and len(list_axis_symmetry) > 1:
+        _correct_loads(form, vertices, sym_vertices)
+
+    return
+
+
+def _symmetry_from_axis(points, list_axis_symmetry, tol):
+    """Groups of symmetry of a set of points in the plan for a list of axis. Returns the group of each point and the
+    dictionaries with the class of each point, the pair point-mirror, on each axis."""
+
+    n = len(points)
+    tree = cKDTree(points) if n else None
+    dicts = [{} for _ in range(n)]
+    sym_key = zeros(n, dtype=int)
+    partners = []
+    offset = 0
+
     for axis_symmetry in list_axis_symmetry:
         axis_str = str(axis_symmetry)
-        dist_checked = []
-        dist_dict = {}
-        for u, v in form.edges_where({'_is_edge': True}):
-            midpoint = form.edge_midpoint(u, v)
-            dist_line = round(distance_point_line_xy(midpoint, axis_symmetry), 10)  # change this logic to something that takes into account tol
-            closest_pt = closest_point_on_line_xy(midpoint, axis_symmetry)  # geometric_key(..) used before
-            # dist = [closest_pt, dist_line]
-            dist = [dist_line, closest_pt]
-            dist_dict[(u, v)] = dist
-            if dist not in dist_checked:
-                dist_checked.append(dist)
-        for dist in dist_checked:
-            for u, v in dist_dict:
-                # if dist_dict[(u, v)] == dist:
-                if abs(dist[0] - dist_dict[(u, v)][0]) < tol and distance_point_point_xy(dist[1], dist_dict[(u, v)][1]) < tol:
-                    form.edge_attribute((u, v), 'sym_key', i)
-                    if not form.edge_attribute((u, v), 'sym_dict'):
-                        dic = {}
-                    else:
-                        dic = form.edge_attribute((u, v), 'sym_dict')
-                    dic[axis_str] = i
-                    form.edge_attribute((u, v), 'sym_dict', dic)
-            i += 1
+        partner = _mirror_partners(tree, points, axis_symmetry, tol)
+        sym_key = _classes_from_partners(partner) + offset
+        for dic, i in zip(dicts, sym_key):
+            dic[axis_str] = int(i)
+        offset = sym_key.max() + 1 if n else offset
+        partners.append(partner)
 
     if len(list_axis_symmetry) > 1:
-        checked_edge = []
-        groups_of_edges = []
-        for edge in form.edges_where({'_is_edge': True}):
-            if edge in checked_edge:
-                continue
-            group = [edge]
-            checked_edge.append(edge)
-            values = list(form.edge_attribute(edge, 'sym_dict').values())
-            for edge2 in form.edges_where({'_is_edge': True}):
-                if edge2 in checked_edge:
-                    continue
-                values2 = list(form.edge_attribute(edge2, 'sym_dict').values())
-                if len(set(values2) & set(values)):
-                    group.append(edge2)
-                    checked_edge.append(edge2)
-                    values = list(set(values + values2))
-            groups_of_edges.append(group)
-
-        i = 0
-        for group in groups_of_edges:
-            form.edges_attribute('sym_key', value=i, keys=group)
-            i += 1
+        rows = concatenate([arange(n)] * len(partners))
+        cols = concatenate(partners)
+        graph = coo_matrix((ones(len(rows)), (rows, cols)), shape=(n, n))
+        _, labels = connected_components(graph, directed=False)
+        sym_key = _classes_from_hash(labels)
+
+    return sym_key, dicts
+
+
+def _mirror_partners(tree, points, axis_symmetry, tol):
+    """Index of the mirror of each point on an axis of symmetry, or of the point itself if it has no mirror within the tolerance."""
 
+    n = len(points)
+    if not n:
+        return zeros(0, dtype=int)
+
+    a = array(axis_symmetry[0][:2], dtype=float)
+    b = array(axis_symmetry[1][:2], dtype=float)
+    t = (b - a) / norm(b - a)
+    d = points - a
+    reflected = a + 2 * (d @ t)[:, None] * t - d
+
+    dist, partner = tree.query(reflected, distance_upper_bound=tol)
+    alone = isinf(dist)
+    partner[alone] = arange(n)[alone]
+
+    return partner
+
+
+def _classes_from_partners(partner):
+    """Classes of the pairs point-mirror, numbered in the order in which the points appear."""
+
+    classes = -ones(len(partner), dtype=int)
     i = 0
-    for axis_symmetry in list_axis_symmetry:
-        axis_str = str(axis_symmetry)
-        dist_checked = []
-        dist_dict = {}
-        for key in form.vertices():
-            point = form.vertex_coordinates(key)
-            dist_line = round(distance_point_line_xy(point, axis_symmetry), 10)
-            closest_pt = closest_point_on_line_xy(point, axis_symmetry)  # geometric_key( .. )
-            # dist = [closest_pt, dist_line]
-            dist = [dist_line, closest_pt]
-            dist_dict[key] = dist
-            if dist not in dist_checked:
-                dist_checked.append(dist)
-        for dist in dist_checked:
-            for key in dist_dict:
-                # if dist_dict[key] == dist:
-                if abs(dist[0] - dist_dict[key][0]) < tol and distance_point_point_xy(dist[1], dist_dict[key][1]) < tol:
-                    form.vertex_attribute(key, 'sym_key', i)
-                    if not form.vertex_attribute(key, 'sym_dict'):
-                        dic = {}
-                    else:
-                        dic = form.vertex_attribute(key, 'sym_dict')
-                    dic[axis_str] = i
-                    form.vertex_attribute(key, 'sym_dict', dic)
-            i += 1
+    for j, p in enumerate(partner):
+        if classes[j] >= 0:
+            continue
+        classes[j] = i
+        if classes[p] < 0:
+            classes[p] = i
+        i += 1
 
-    if len(list_axis_symmetry) > 1:
-        checked_vertex = []
-        groups_of_vertices = []
-        for vertex in form.vertices():
-            if vertex in checked_vertex:
-                continue
-            group = [vertex]
-            checked_vertex.append(vertex)
-            values = list(form.vertex_attribute(vertex, 'sym_dict').values())
-            for vertex2 in form.vertices():
-                if vertex2 in checked_vertex:
-                    continue
-                values2 = list(form.vertex_attribute(vertex2, 'sym_dict').values())
-                if len(set(values2) & set(values)):
-                    group.append(vertex2)
-                    checked_vertex.append(vertex2)
-                    values = list(set(values + values2))
-            groups_of_vertices.append(group)
-
-        i = 0
-        for group in groups_of_vertices:
-            form.vertices_attribute('sym_key', value=i, keys=group)
-            i += 1
-            if correct_loads:
-                pz = form.vertex_attribute(group[0], 'pz')
-                ub = form.vertex_attribute(group[0], 'ub')
-                lb = form.vertex_attribute(group[0], 'lb')
-                s = form.vertex_attribute(group[0], 'target')
-                form.vertices_attribute('pz', value=pz, keys=group)
-                form.vertices_attribute('ub', value=ub, keys=group)
-                form.vertices_attribute('lb', value=lb, keys=group)
-                form.vertices_attribute('target', value=s, keys=group)
+    return classes
+
+
+def _classes_from_hash(values):
+    """Classes of equal values, numbered in the order in which the values appear."""
+
+    _, first, inverse = unique(values, return_index=True, return_inverse=True)
+    rank = empty(len(first), dtype=int)
+    rank[argsort(first)] = arange(len(first))
+
+    return rank[inverse]
 
-    return
+
+def _correct_loads(form, vertices, sym_vertices):
+    """Copy the loads, bounds and target of the first vertex of each group of symmetry to the other vertices of the group."""
+
+    _, first, inverse = unique(sym_vertices, return_index=True, return_inverse=True)
+    attributes = ['pz', 'ub', 'lb', 'target']
+    values = [form.vertex_attributes(vertices[i], attributes) for i in first]
+
+    for key, group in zip(vertices, inverse):
+        form.vertex_attributes(key, attributes, values[group])
 
 
 def find_sym_axis_in_rect_patterns(data_form):
@@ -265,15 +246,19 @@ def find_sym_axis_in_rect_patterns(data_form):
     return lines
 
 
-def build_symmetry_matrix(form, printout=False):
+def build_symmetry_matrix(form, printout=False, sparse=False):
     """ Build a symmetry matrix such as Asym * q = 0, with Asym shape (m - k; m)
 
+    Each edge of a group of symmetry is equated to the first edge of the group.
+
     Parameters
     ----------
     form : :class:`~compas_tno.diagrams.FormDiagram`
         The form diagram of the problem
     printout : bool, optional
         Whether or not display messages are printed, by default True
+    sparse : bool, optional
+        Whether or not the matrix is returned as a sparse matrix, by default False
 
     Returns
     -------
@@ -281,33 +266,23 @@ def build_symmetry_matrix(form, printout=False):
         The symmetry matrix.
     """
 
-    m = len(list(form.edges_where({'_is_edge': True})))
-    k_unique = form.number_of_sym_edges(printout=printout)
-    Asym = zeros((m - k_unique, m))
     uv_i = form.uv_index()
+    index = [uv_i[edge] for edge in form.edges_where({'_is_edge': True})]
+    sym_key = [form.edge_attribute(edge, 'sym_key') for edge in form.edges_where({'_is_edge': True})]
+
+    Asym = _symmetry_matrix(index, sym_key, len(index))
 
-    line = 0
-    for id_sym in range(k_unique):
-        i = 0
-        for u, v in form.edges():
-            if form.edge_attribute((u, v), 'sym_key') == id_sym:
-                index = uv_i[(u, v)]
-                if i == 0:
-                    index0 = index
-                else:
-                    Asym[line, index0] = 1
-                    Asym[line, index] = -1
-                    line += 1
-                i += 1
     if printout:
-        plt.matshow(Asym)
+        import matplotlib.pyplot as plt
+
+        plt.matshow(Asym.toarray())
         plt.colorbar()
         plt.show()
 
-    return Asym
+    return Asym if sparse else Asym.toarray()
 
 
-def build_symmetry_transformation(form, printout=False):
+def build_symmetry_transformation(form, printout=False, sparse=False):
     """Build a symmetry matrix Esym (m, k) such as q = Esym * qsym.
 
     Parameters
@@ -316,6 +291,8 @@ def build_symmetry_transformation(form, printout=False):
         The form diagram of the problem
     printout : bool, optional
         Whether or not display messages are printed, by default True
+    sparse : bool, optional
+        Whether or not the matrix is returned as a sparse matrix, by default False
 
     Returns
     -------
@@ -324,28 +301,24 @@ def build_symmetry_transformation(form, printout=False):
 
     """
 
-    m = len(list(form.edges_where({'_is_edge': True})))
-    k_unique = form.number_of_sym_edges(printout=printout)
-    Esym = zeros((m, k_unique))
     uv_i = form.uv_index()
+    index = [uv_i[edge] for edge in form.edges_where({'_is_edge': True})]
+    sym_key = [form.edge_attribute(edge, 'sym_key') for edge in form.edges_where({'_is_edge': True})]
+    k_unique = form.number_of_sym_edges(printout=printout)
 
-    for id_sym in range(k_unique):
-        Ei = zeros((m, 1))
-        for u, v in form.edges():
-            if form.edge_attribute((u, v), 'sym_key') == id_sym:
-                index = uv_i[(u, v)]
-                Ei[index] = 1.0
-        Esym[:, id_sym] = Ei.flatten()
+    Esym = _symmetry_transformation(index, sym_key, len(index), k_unique)
 
     if printout:
-        plt.matshow(Esym)
+        import matplotlib.pyplot as plt
+
+        plt.matshow(Esym.toarray())
         plt.colorbar()
         plt.show()
 
-    return Esym
+    return Esym if sparse else Esym.toarray()
 
 
-def build_vertex_symmetry_transformation(form, printout=False):
+def build_vertex_symmetry_transformation(form, printout=False, sparse=False):
     """Build a symmetry matrix Evsym (n, k) such as z = Evsym * zb.
 
     Parameters
@@ -354,6 +327,8 @@ def build_vertex_symmetry_transformation(form, printout=False):
         The form diagram of the problem
     printout : bool, optional
         Whether or not display messages are printed, by default True
+    sparse : bool, optional
+        Whether or not the matrix is returned as a sparse matrix, by default False
 
     Returns
     -------
@@ -361,28 +336,24 @@ def build_vertex_symmetry_transformation(form, printout=False):
         The symmetry matrix.
     """
 
-    n = form.number_of_edges()
-    k_unique = form.number_of_sym_vertices(printout=printout)
-    Evsym = zeros((n, k_unique))
     k_i = form.key_index()
+    index = [k_i[key] for key in form.vertices()]
+    sym_key = [form.vertex_attribute(key, 'sym_key') for key in form.vertices()]
+    k_unique = max(sym_key) + 1 if sym_key else 0
 
-    for id_sym in range(k_unique):
-        Ei = zeros((n, 1))
-        for key in form.vertices():
-            if form.vertex_attribute(key, 'sym_key') == id_sym:
-                index = k_i[key]
-                Ei[index] = 1.0
-        Evsym[:, id_sym] = Ei.flatten()
+    Evsym = _symmetry_transformation(index, sym_key, form.number_of_vertices(), k_unique)
 
     if printout:
-        plt.matshow(Evsym)
+        import matplotlib.pyplot as plt
+
+        plt.matshow(Evsym.toarray())
         plt.colorbar()
         plt.show()
 
-    return Evsym
+    return Evsym if sparse else Evsym.toarray()
 
 
-def build_symmetry_matrix_supports(form, printout=False):
+def build_symmetry_matrix_supports(form, printout=False, sparse=False):
     """Build a symmetry matrix to the supports.
 
     Parameters
@@ -391,6 +362,8 @@ def build_symmetry_matrix_supports(form, printout=False):
         The form diagram of the problem
     printout : bool, optional
         Whether or not display messages are printed, by default True
+    sparse : bool, optional
+        Whether or not the matrix is returned as a sparse matrix, by default False
 
     Returns
     -------
@@ -398,32 +371,41 @@ def build_symmetry_matrix_supports(form, printout=False):
         The symmetry matrix.
     """
 
-    n = form.number_of_supports()
-    k_unique = form.number_of_sym_supports(printout=printout)
-    Asym = zeros((n - k_unique, n))
-    key_i_sup = {}
+    supports = list(form.vertices_where({'is_fixed': True}))
+    sym_key = [form.vertex_attribute(key, 'sym_key') for key in supports]
 
-    i = 0
-    for key in form.vertices_where({'is_fixed': True}):
-        key_i_sup[key] = i
-        i += 1
+    Asym = _symmetry_matrix(range(len(supports)), sym_key, len(supports))
 
-    line = 0
-    for id_sym in range(k_unique):
-        i = 0
-        for key in form.vertices_where({'is_fixed': True}):
-            if form.vertex_attribute(key, 'sym_key') == id_sym:
-                index = key_i_sup[key]
-                if i == 0:
-                    index0 = index
-                else:
-                    Asym[line, index0] = 1
-                    Asym[line, index] = -1
-                    line += 1
-                i += 1
     if printout:
-        plt.matshow(Asym)
+        import matplotlib.pyplot as plt
+
+        plt.matshow(Asym.toarray())
         plt.colorbar()
         plt.show()
 
-    return Asym
+    return Asym if sparse else Asym.toarray()
+
+
+def _symmetry_matrix(index, sym_key, n):
+    """Sparse matrix equating the entries of each group of symmetry to the first entry of the group, ordered by group."""
+
+    first = {}
+    pairs = []
+    for i, key in zip(index, sym_key):
+        if key not in first:
+            first[key] = i
+        else:
+            pairs.append((key, first[key], i))
+    pairs.sort(key=lambda pair: pair[0])  # stable, rows grouped by id of symmetry
+
+    rows = arange(len(pairs))
+    data = concatenate([ones(len(pairs)), -ones(len(pairs))])
+    cols = [pair[1] for pair in pairs] + [pair[2] for pair in pairs]
+
+    return csr_matrix((data, (concatenate([rows, rows]), cols)), shape=(len(pairs), n))
+
+
+def _symmetry_transformation(index, sym_key, n, k_unique):
+    """Sparse matrix with a one in the column of the group of symmetry of each entry."""
+
+    return csr_matrix((ones(len(index)), (list(index), list(sym_key))), shape=(n, k_unique))
@@ -10,6 +10,8 @@ from compas_tno.plotters import TNOPlotter
 def animation_from_optimisation(analysis, show_force=False, settings=None, record=False, interval=100, jump_each=1):
     """Make a 3D animated plot with the optimisation steps.
 
+    The geometry of the form diagram in each step is computed from the log of iterations saved with the setting ``save_iterations``.
+
     Parameters
     ----------
     form : FormDiagram
@@ -32,17 +34,20 @@ def animation_from_optimisation(analysis, show_force=False, settings=None, recor
         Interval tot jump among iteration frames, by default 1, in which all frames are shown
     """
 
+    from numpy import array
     from compas_tno.algorithms import reciprocal_from_form
+    from compas_tno.algorithms import xyz_from_xopt
+    from compas_tno.problems import iteration_problem
+    from compas_tno.problems import read_iterations
     from compas_tno.viewers import Viewer
     import compas_tno
 
     form = analysis.form
-    # optimiser = analysis.optimiser
+    optimiser = analysis.optimiser
     shape = analysis.shape
     force = None
     if show_force:
         force = reciprocal_from_form(form)
-    file_Xform = compas_tno.get('Xform.json')  # analysis.optimiser.Xform
     file_Xforce = compas_tno.get('Xforce.json')  # analysis.optimiser.Xforce
 
     viewer = Viewer(form, shape=shape)
@@ -50,14 +55,14 @@ def animation_from_optimisation(analysis, show_force=False, settings=None, recor
         viewer.settings = settings
     viewer.initiate_app()
 
-    with open(file_Xform, mode='r', encoding='utf-8') as f:
-        Xform = json.load(f)
+    Xiterations = read_iterations(getattr(optimiser.callback, 'filename', None))[0]
+    M = iteration_problem(optimiser.M)  # the frames do not modify the optimum of the problem solved
 
     if force:
         with open(file_Xforce, mode='r', encoding='utf-8') as f:
             Xforce = json.load(f)
 
-    iterations_total = len(Xform)
+    iterations_total = len(Xiterations)
     iterations = round(iterations_total / jump_each)
 
     print('Displaying {0} iterations from a total of {1} iterations'.format(iterations, iterations_total))
@@ -80,7 +85,7 @@ def animation_from_optimisation(analysis, show_force=False, settings=None, recor
 
         viewer.clear()
 
-        Xf = Xform[str(f * jump_each)]
+        Xf = xyz_from_xopt(array(Xiterations[f * jump_each]).reshape(-1, 1), M).X
         index = 0
         for vertex in form.vertices():
             viewer.thrust.vertex_attribute(vertex, 'x', Xf[index][0])
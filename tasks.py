@@ -174,6 +174,31 @@ def test(ctx, checks=False, doctest=False):
         ctx.run(' '.join(cmd))
 
 
+@task(help={
+      'output': 'Path of the JSON report. Defaults to benchmark_<commit>.json.',
+      'sizes': 'Discretisations of the form diagrams, separated by commas. Defaults to 6,10,14.',
+      'compare': 'Path of a previous report to compare with the new one.'})
+def benchmark(ctx, output=None, sizes=None, compare=None):
+    """Run the benchmarks of the canonical vaults and write a JSON report."""
+    with chdir(BASE_FOLDER):
+        if compare and not output:
+            # the default report of the script, to compare with
+            commit = ctx.run('git rev-parse HEAD', hide=True, warn=True).stdout.strip()
+            output = 'benchmark_{0}.json'.format(commit[:7] or 'local')
+
+        cmd = ['python', os.path.join('benchmarks', 'benchmark.py')]
+        if sizes:
+            cmd += ['--sizes'] + sizes.split(',')
+        if output:
+            cmd += ['--output', output]
+
+        log.write('Running benchmarks...')
+        ctx.run(' '.join(cmd))
+
+        if compare:
+            ctx.run(' '.join(['python', os.path.join('benchmarks', 'benchmark.py'), '--compare', compare, output]), warn=True)
+
+
 @task
 def prepare_changelog(ctx):
     """Prepare changelog for next release."""
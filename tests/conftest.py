@@ -0,0 +1,7 @@
+import os
+import sys
+
+# run the tests on the sources of the checkout, also without an installation of the package
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+if SRC not in sys.path:
+    sys.path.insert(0, SRC)
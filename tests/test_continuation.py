@@ -0,0 +1,45 @@
+import pytest
+
+pytest.importorskip('compas')
+
+from compas_tno.analysis import Analysis  # noqa: E402
+from compas_tno.analysis import ThicknessContinuation  # noqa: E402
+from compas_tno.diagrams import FormDiagram  # noqa: E402
+from compas_tno.optimisers import Optimiser  # noqa: E402
+from compas_tno.shapes import Shape  # noqa: E402
+
+
+def crossvault_analysis(thk=0.5):
+    form = FormDiagram.create_cross_form(discretisation=6)
+    shape = Shape.create_crossvault(thk=thk)
+    optimiser = Optimiser()
+    optimiser.settings['solver'] = 'SLSQP'
+    optimiser.settings['objective'] = 'min'
+    optimiser.settings['variables'] = ['q', 'zb']
+    optimiser.settings['constraints'] = ['funicular', 'envelope']
+    optimiser.settings['features'] = ['fixed']
+    optimiser.settings['starting_point'] = 'tna'
+    optimiser.settings['printout'] = False
+    analysis = Analysis.from_elements(shape, form, optimiser)
+    analysis.apply_selfweight()
+    analysis.apply_envelope()
+    return analysis
+
+
+@pytest.mark.parametrize('objective', ['min', 'max'])
+def test_continuation_after_set_up_matches_standalone(objective):
+    standalone = crossvault_analysis()
+    standalone.optimiser.settings['objective'] = objective
+    standalone.set_up_optimiser()
+    standalone.run()
+
+    # the set up with starting point 'tna' changes the faces of the form before the continuation is built
+    analysis = crossvault_analysis()
+    analysis.set_up_optimiser()
+    continuation = ThicknessContinuation(analysis, 0.5)
+    continuation.set_objective(objective)
+
+    assert continuation.solve(0.5) == 0
+    assert standalone.optimiser.exitflag == 0
+    assert analysis.optimiser.fopt == pytest.approx(standalone.optimiser.fopt, rel=1e-6)
+    assert analysis.form.thrust() == pytest.approx(standalone.form.thrust(), rel=1e-6)
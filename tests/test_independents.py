@@ -0,0 +1,34 @@
+import pytest
+
+pytest.importorskip('compas')
+
+from numpy.linalg import matrix_rank  # noqa: E402
+
+from compas_tno.algorithms import find_independents_forward  # noqa: E402
+from compas_tno.algorithms import find_independents_sparse  # noqa: E402
+from compas_tno.diagrams import FormDiagram  # noqa: E402
+from compas_tno.problems import initialise_problem_general  # noqa: E402
+
+# small diagrams of the generators, as the forward method computes a rank for each edge
+DIAGRAMS = {
+    'cross': lambda: FormDiagram.create_cross_form(discretisation=4),
+    'fan': lambda: FormDiagram.create_fan_form(discretisation=[4, 4]),
+    'ortho': lambda: FormDiagram.create_ortho_form(discretisation=[4, 4]),
+    'radial': lambda: FormDiagram.create_circular_radial_form(discretisation=[3, 8]),
+    'spiral': lambda: FormDiagram.create_circular_spiral_form(discretisation=[3, 8]),
+    'delta': lambda: FormDiagram.create_delta_form(discretisation=4),
+    'parametric': lambda: FormDiagram.create_parametric_form(discretisation=4),
+}
+
+
+@pytest.mark.parametrize('name', sorted(DIAGRAMS))
+def test_sparse_independents_match_forward(name):
+    problem = initialise_problem_general(DIAGRAMS[name]())
+    E = problem.E.toarray()
+
+    ind, diagnostics = find_independents_sparse(problem.E, diagnostics=True)
+    ind_forward = find_independents_forward(E)
+
+    assert sorted(ind) == sorted(ind_forward)
+    assert diagnostics['rank'] == matrix_rank(E)
+    assert len(ind) == problem.m - diagnostics['rank']
@@ -0,0 +1,62 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip('compas')
+
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+# packages of the optional backends, imported only when a solver that needs them runs
+BACKENDS = ['cvxpy', 'cyipopt', 'torch', 'matlab', 'nlopt', 'pyOpt', 'compas_tno.plotters']
+
+# generous budget in seconds for a cold import, to catch backends imported again at startup
+IMPORT_BUDGET = float(os.environ.get('COMPAS_TNO_IMPORT_BUDGET', 10.0))
+
+
+def run_python(code):
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([SRC, env.get('PYTHONPATH', '')])
+    output = subprocess.check_output([sys.executable, '-c', code], env=env)
+    return json.loads(output.decode().strip().splitlines()[-1])
+
+
+def test_import_does_not_load_backends():
+    code = (
+        'import sys, json, time\n'
+        't0 = time.time()\n'
+        'import compas_tno.analysis, compas_tno.problems, compas_tno.solvers, compas_tno.utilities\n'
+        'print(json.dumps({"time": time.time() - t0, "modules": sorted(sys.modules)}))\n'
+    )
+    result = run_python(code)
+    loaded = [name for name in BACKENDS if name in result['modules']]
+    assert loaded == []
+    assert result['time'] < IMPORT_BUDGET
+
+
+def test_backend_probing_does_not_import():
+    code = (
+        'import sys, json\n'
+        'from compas_tno.solvers import available_backends, backend_available\n'
+        'result = {"available": available_backends(), "SLSQP": backend_available("SLSQP"), "modules": sorted(sys.modules)}\n'
+        'print(json.dumps(result))\n'
+    )
+    result = run_python(code)
+    assert result['SLSQP']
+    assert [name for name in BACKENDS if name in result['modules']] == []
+
+
+def test_mosek_requires_mosek():
+    code = (
+        'import sys, json, importlib.util\n'
+        'from compas_tno.solvers import available_backends, backend_available\n'
+        'installed = all(importlib.util.find_spec(name) is not None for name in ["cvxpy", "mosek"])\n'
+        'result = {"MOSEK": backend_available("MOSEK"), "listed": "MOSEK" in available_backends(), "installed": installed,\n'
+        '          "mosek": backend_available("mosek"), "modules": sorted(sys.modules)}\n'
+        'print(json.dumps(result))\n'
+    )
+    result = run_python(code)
+    assert result['MOSEK'] == result['listed'] == result['installed']
+    assert 'mosek' not in result['modules']